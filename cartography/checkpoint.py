@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import threading
+from typing import Optional
+from typing import Set
+from typing import TextIO
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# A unit of work of a sync, e.g. ('aws',), ('aws', '123456789012') or ('aws', '123456789012', 'ec2:instance'): the
+# stage, then optionally the account (or subscription, project, ...), region and resource.
+Unit = Tuple[str, ...]
+
+
+class CheckpointStore:
+    """
+    Records the units of work that a sync has completed in a JSON-lines file, so that a sync that died part way through
+    can be resumed with the same update tag without redoing them.
+
+    Every line of the file is of the form `{"update_tag": 1234, "unit": ["aws", "123456789012", "ec2:instance"]}`.
+    Lines are written as soon as a unit completes, so the file is up to date however the sync ends.
+
+    :type path: string
+    :param path: The path of the checkpoint file.
+    :type update_tag: int
+    :param update_tag: The update tag of the sync.
+    :type resume: bool
+    :param resume: If True, the units already recorded in the file for `update_tag` are considered complete. If False,
+        the file is truncated: a new sync starts from scratch.
+    """
+
+    def __init__(self, path: str, update_tag: int, resume: bool = False):
+        self.path = path
+        self.update_tag = update_tag
+        self._lock = threading.Lock()
+        self._completed: Set[Unit] = set()
+        if resume:
+            self._completed = self._load(path, update_tag)
+            logger.info(
+                "Resuming sync with update tag %d: %d units were completed by a previous run.",
+                update_tag,
+                len(self._completed),
+            )
+        self._file: Optional[TextIO] = open(path, 'a' if resume else 'w', buffering=1)
+
+    @staticmethod
+    def _load(path: str, update_tag: int) -> Set[Unit]:
+        completed: Set[Unit] = set()
+        if not os.path.exists(path):
+            logger.warning("Checkpoint file %s does not exist, resuming sync from scratch.", path)
+            return completed
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be incomplete if the previous run was killed while writing it.
+                    logger.warning("Ignoring malformed line in checkpoint file %s: %s", path, line)
+                    continue
+                if entry.get('update_tag') == update_tag:
+                    completed.add(tuple(entry['unit']))
+        return completed
+
+    def is_complete(self, *unit: str) -> bool:
+        with self._lock:
+            return unit in self._completed
+
+    def mark_complete(self, *unit: str) -> None:
+        with self._lock:
+            if unit in self._completed:
+                return
+            self._completed.add(unit)
+            if self._file:
+                self._file.write(json.dumps({'update_tag': self.update_tag, 'unit': list(unit)}) + '\n')
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+_checkpoint_store: Optional[CheckpointStore] = None
+
+
+def set_checkpoint_store(store: Optional[CheckpointStore]) -> None:
+    """
+    Set the process-wide CheckpointStore. Pass None to disable checkpointing.
+    """
+    global _checkpoint_store
+    if _checkpoint_store and _checkpoint_store is not store:
+        _checkpoint_store.close()
+    _checkpoint_store = store
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    return _checkpoint_store
+
+
+def is_unit_complete(*unit: str) -> bool:
+    """
+    :return: True if checkpointing is enabled and the given unit was completed by a previous run of the sync being
+    resumed.
+    """
+    if _checkpoint_store is None:
+        return False
+    return _checkpoint_store.is_complete(*unit)
+
+
+def mark_unit_complete(*unit: str) -> None:
+    """
+    Record that the given unit completed, if checkpointing is enabled. Only call this once all of the unit's writes and
+    cleanup jobs have run, since a resumed sync skips the unit entirely.
+    """
+    if _checkpoint_store is not None:
+        _checkpoint_store.mark_complete(*unit)
@@ -3,10 +3,15 @@ import getpass
 import logging
 import os
 import sys
+from typing import Callable
+from typing import Dict
+from typing import List
 from typing import Optional
 
 import cartography.config
+import cartography.graph.plancheck
 import cartography.sync
+import cartography.tracing
 import cartography.util
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
 
@@ -20,11 +25,14 @@ class CLI:
     :param sync: A sync task for the command line program to execute.
     :type prog: string
     :param prog: The name of the command line program. This will be displayed in usage and help output.
+    :type worker: bool
+    :param worker: If True, the program runs a worker of distributed syncs instead of a sync.
     """
 
-    def __init__(self, sync: Optional[cartography.sync.Sync] = None, prog: Optional[str] = None):
+    def __init__(self, sync: Optional[cartography.sync.Sync] = None, prog: Optional[str] = None, worker: bool = False):
         self.sync = sync if sync else cartography.sync.build_default_sync()
         self.prog = prog
+        self.worker = worker
         self.parser = self._build_parser()
 
     def _build_parser(self):
@@ -111,6 +119,16 @@ class CLI:
                 'See https://neo4j.com/docs/api/python-driver/4.4/api.html#database.'
             ),
         )
+        parser.add_argument(
+            '--neo4j-writer-sessions',
+            type=int,
+            default=None,
+            help=(
+                'Number of Neo4j sessions that write the data of the intel modules that support it, such as EC2 '
+                'instances, volumes and network interfaces, while the modules fetch the next data from their APIs. '
+                'Each session writes concurrently with the others. By default, modules fetch and write in turn.'
+            ),
+        )
         parser.add_argument(
             '--selected-modules',
             type=str,
@@ -160,6 +178,14 @@ class CLI:
                 'syncing other accounts and delay raising an exception until the very end.'
             ),
         )
+        parser.add_argument(
+            '--aws-tags-single-pass',
+            action='store_true',
+            help=(
+                'Fetch AWS tags with a single unfiltered scan of the resource groups tagging API per region, and route '
+                'each resource to its node label by its ARN, instead of one scan per supported resource type.'
+            ),
+        )
         parser.add_argument(
             '--oci-sync-all-profiles',
             action='store_true',
@@ -210,6 +236,15 @@ class CLI:
                 'The name of environment variable containing Azure Client Secret for Service Principal Authentication.'
             ),
         )
+        parser.add_argument(
+            '--azure-subscription-workers',
+            type=int,
+            default=None,
+            help=(
+                'The number of Azure subscriptions to sync at the same time. Each subscription gets its own Neo4j '
+                'session. Defaults to 4.'
+            ),
+        )
         parser.add_argument(
             '--aws-requested-syncs',
             type=str,
@@ -379,6 +414,166 @@ class CLI:
                 'The port of your statsd server. Only used if --statsd-enabled is on. Default = UDP 8125.'
             ),
         )
+        parser.add_argument(
+            '--query-profiling-enabled',
+            action='store_true',
+            help=(
+                'If set, records server timings and row counts for every Cypher statement run by cartography jobs, '
+                'loaders and read helpers. Timings are sent to statsd if --statsd-enabled is on.'
+            ),
+        )
+        parser.add_argument(
+            '--slow-query-log-file',
+            type=str,
+            default=None,
+            help=(
+                'Path to a JSON-lines file that slow Cypher statements will be appended to, along with their job name '
+                'and statement number. Implies --query-profiling-enabled.'
+            ),
+        )
+        parser.add_argument(
+            '--slow-query-threshold-ms',
+            type=int,
+            default=None,
+            help=(
+                'Statements taking at least this many milliseconds on the Neo4j server are written to the slow query '
+                'log. Only used if --slow-query-log-file is set. Default = 1000.'
+            ),
+        )
+        parser.add_argument(
+            '--query-profile-sample-rate',
+            type=float,
+            default=0.0,
+            help=(
+                'Fraction of statements, between 0 and 1, to run with PROFILE so that their plans and db hits are '
+                'included in the slow query log. Only used if query profiling is enabled. Default = 0.'
+            ),
+        )
+        parser.add_argument(
+            '--index-population-timeout',
+            type=int,
+            default=None,
+            help=(
+                'If set, the create-indexes stage waits up to this many seconds for newly created indexes to be '
+                'populated, so that the rest of the sync does not run against indexes that are still being built. '
+                'Default = do not wait.'
+            ),
+        )
+        parser.add_argument(
+            '--merge-duplicate-nodes',
+            action='store_true',
+            help=(
+                'If set, the create-indexes stage merges nodes that share a property that their node schema declares '
+                'as unique, keeping the most recently updated one and moving the relationships of the others to it, '
+                'so that the uniqueness constraint can be created. '
+                'Without this, such properties keep a plain index until the duplicates are gone.'
+            ),
+        )
+        parser.add_argument(
+            '--checkpoint-file',
+            type=str,
+            default=None,
+            help=(
+                'Path to a JSON-lines file that the sync records its completed stages, AWS accounts and AWS resources '
+                'in. If the sync dies, it can be resumed with --resume-update-tag.'
+            ),
+        )
+        parser.add_argument(
+            '--resume-update-tag',
+            type=int,
+            default=None,
+            help=(
+                'The update tag of a sync that did not complete. The sync reuses this update tag and skips the units '
+                'that --checkpoint-file records as completed for it. Requires --checkpoint-file.'
+            ),
+        )
+        parser.add_argument(
+            '--record-to',
+            type=str,
+            default=None,
+            help=(
+                'Directory to record the raw responses of provider APIs to, gzipped. Currently only AWS API calls are '
+                'recorded. The recording can be loaded again with --replay-from.'
+            ),
+        )
+        parser.add_argument(
+            '--replay-from',
+            type=str,
+            default=None,
+            help=(
+                'Directory of API responses recorded with --record-to. AWS APIs are not called: their responses are '
+                'replayed from this directory instead, e.g. to test changes to transforms and loaders or to benchmark '
+                'ingestion against a fixed workload.'
+            ),
+        )
+        parser.add_argument(
+            '--skip-unchanged-writes',
+            action='store_true',
+            help=(
+                'If set, nodes loaded through node schemas store a hash of their properties, and nodes whose hash is '
+                'unchanged on the next sync only get their lastupdated property written. This reduces the write load '
+                'on Neo4j when most resources do not change between syncs.'
+            ),
+        )
+        parser.add_argument(
+            '--id-set-cleanup',
+            action='store_true',
+            help=(
+                'If set, the ids of the nodes loaded through node schemas are kept in memory during the sync, and '
+                'their cleanup jobs read the ids of the existing nodes once and delete the ones that were not loaded, '
+                'instead of repeatedly scanning all nodes for stale lastupdated values. Useful for large tables with '
+                'few deletions.'
+            ),
+        )
+        parser.add_argument(
+            '--work-queue',
+            type=str,
+            default=None,
+            help=(
+                'Path to a SQLite file to coordinate a distributed sync through. The sync publishes its stages and AWS '
+                'accounts to this queue, `cartography worker --work-queue <path>` processes run them, and the sync '
+                'runs the create-indexes and analysis stages once all of them are done. The sync also runs units '
+                'itself while it waits, so it completes even without workers. Required by `cartography worker`.'
+            ),
+        )
+        parser.add_argument(
+            '--work-unit-max-attempts',
+            type=int,
+            default=None,
+            help=(
+                'The number of times a unit of a distributed sync is run before it is marked as failed. Defaults to 3. '
+                'Ignored without --work-queue.'
+            ),
+        )
+        parser.add_argument(
+            '--worker-idle-timeout',
+            type=int,
+            default=None,
+            help=(
+                'Seconds after which `cartography worker` stops if it could not claim any unit of work. By default, '
+                'the worker runs until it is interrupted.'
+            ),
+        )
+        parser.add_argument(
+            '--trace-file',
+            type=str,
+            default=None,
+            help=(
+                'Path of a file to write a trace of the sync to: how long its stages, accounts, projects, '
+                'subscriptions, AWS resources, loads and jobs took, and how they nest. Summarize it with '
+                '`cartography trace-summary <path>`.'
+            ),
+        )
+        parser.add_argument(
+            '--trace-format',
+            type=str,
+            default='json',
+            choices=cartography.tracing.TRACE_FORMATS,
+            help=(
+                'The format of --trace-file: json, or chrome for the Chrome trace event format that chrome://tracing '
+                'and https://ui.perfetto.dev can open. Defaults to json.'
+            ),
+        )
         parser.add_argument(
             '--pagerduty-api-key-env-var',
             type=str,
@@ -511,11 +706,11 @@ class CLI:
         )
         return parser
 
-    def main(self, argv: str) -> int:
+    def main(self, argv: List[str]) -> int:
         """
         Entrypoint for the command line interface.
 
-        :type argv: string
+        :type argv: List[string]
         :param argv: The parameters supplied to the command line program.
         """
         # TODO support parameter lookup in environment variables if not present on command line
@@ -618,6 +813,33 @@ class CLI:
                 f'Metrics have prefix "{config.statsd_prefix}".',
             )
 
+        if config.slow_query_log_file:
+            config.query_profiling_enabled = True
+        if config.query_profile_sample_rate and not 0 <= config.query_profile_sample_rate <= 1:
+            raise ValueError(
+                f'--query-profile-sample-rate must be between 0 and 1. You specified '
+                f'{config.query_profile_sample_rate}.',
+            )
+
+        if config.resume_update_tag and not config.checkpoint_file:
+            raise ValueError('--resume-update-tag requires --checkpoint-file.')
+        if config.resume_update_tag and config.update_tag and config.update_tag != config.resume_update_tag:
+            raise ValueError('--update-tag and --resume-update-tag must be the same if both are specified.')
+
+        if config.record_to and config.replay_from:
+            raise ValueError('--record-to and --replay-from cannot be used together.')
+
+        if config.neo4j_writer_sessions is not None and config.neo4j_writer_sessions < 0:
+            raise ValueError('--neo4j-writer-sessions must not be negative.')
+
+        if config.work_queue and config.checkpoint_file:
+            raise ValueError(
+                '--work-queue and --checkpoint-file cannot be used together: the work queue records the completed '
+                'units itself, and publishing the units of a sync again with the same --update-tag resumes it.',
+            )
+        if self.worker and not config.work_queue:
+            raise ValueError('`cartography worker` requires --work-queue.')
+
         # Pagerduty config
         if config.pagerduty_api_key_env_var:
             logger.debug(f"Reading API key for PagerDuty from environment variable {config.pagerduty_api_key_env_var}")
@@ -686,12 +908,28 @@ class CLI:
             config.semgrep_app_token = None
 
         # Run cartography
+        sync = cartography.sync.SyncWorker(self.sync) if self.worker else self.sync
         try:
-            return cartography.sync.run_with_config(self.sync, config)
+            return cartography.sync.run_with_config(sync, config)
         except KeyboardInterrupt:
             return cartography.util.STATUS_KEYBOARD_INTERRUPT
 
 
+def worker_main(argv: List[str]) -> int:
+    """
+    Entrypoint for the `cartography worker` subcommand, which takes the same options as a sync.
+    """
+    return CLI(prog='cartography worker', worker=True).main(argv)
+
+
+# Subcommands are dispatched on the first CLI argument. Without one, `cartography` runs a sync.
+SUBCOMMANDS: Dict[str, Callable[[List[str]], int]] = {
+    'check-job-plans': cartography.graph.plancheck.main,
+    'worker': worker_main,
+    'trace-summary': cartography.tracing.main,
+}
+
+
 def main(argv=None):
     """
     Entrypoint for the default cartography command line interface.
@@ -706,4 +944,6 @@ def main(argv=None):
     logging.getLogger('googleapiclient').setLevel(logging.WARNING)
     logging.getLogger('neo4j').setLevel(logging.WARNING)
     argv = argv if argv is not None else sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        sys.exit(SUBCOMMANDS[argv[0]](argv[1:]))
     sys.exit(CLI(prog='cartography').main(argv))
@@ -1,17 +1,40 @@
+import hashlib
+import json
+import logging
 from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Union
 
-import neo4j
+import neo4j.exceptions
 
+from cartography.graph.loadedids import record_loaded_ids
+from cartography.graph.profiling import prepare_query
+from cartography.graph.profiling import query_scope
+from cartography.graph.profiling import record_query
 from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import build_create_index_query
 from cartography.graph.querybuilder import build_ingestion_query
+from cartography.graph.querybuilder import CONTENT_HASH_FIELD
+from cartography.graph.querybuilder import content_hash_fields
+from cartography.graph.querybuilder import parse_create_index_query
 from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.tracing import span
 from cartography.util import batch
 
+logger = logging.getLogger(__name__)
+
+# `CREATE INDEX/CONSTRAINT IF NOT EXISTS` queries that are known to have been run against the graph by this process.
+# Each of them takes a schema lock on the server even if the index exists, so they are only sent once.
+_ensured_index_queries: Set[str] = set()
+
+# Whether load() skips rewriting the properties of nodes whose content did not change, unless told otherwise.
+_skip_unchanged_writes = False
+
 
 def read_list_of_values_tx(tx: neo4j.Transaction, query: str, **kwargs) -> List[Union[str, int]]:
     """
@@ -33,9 +56,9 @@ def read_list_of_values_tx(tx: neo4j.Transaction, query: str, **kwargs) -> List[
     :param kwargs: kwargs that are passed to tx.run()'s kwargs argument.
     :return: A list of str or int.
     """
-    result: neo4j.BoltStatementResult = tx.run(query, kwargs)
+    result: neo4j.BoltStatementResult = tx.run(prepare_query(query), kwargs)
     values = [n.value() for n in result]
-    result.consume()
+    record_query(query, result.consume(), len(values))
     return values
 
 
@@ -61,12 +84,12 @@ def read_single_value_tx(tx: neo4j.Transaction, query: str, **kwargs) -> Optiona
     :param kwargs: kwargs that are passed to tx.run()'s kwargs argument.
     :return: The result of the query as a single str, int, or None
     """
-    result: neo4j.BoltStatementResult = tx.run(query, kwargs)
+    result: neo4j.BoltStatementResult = tx.run(prepare_query(query), kwargs)
     record: neo4j.Record = result.single()
 
     value = record.value() if record else None
 
-    result.consume()
+    record_query(query, result.consume(), 1 if record else 0)
     return value
 
 
@@ -86,9 +109,9 @@ def read_list_of_dicts_tx(tx: neo4j.Transaction, query: str, **kwargs) -> List[D
     :param kwargs: kwargs that are passed to tx.run()'s kwargs argument.
     :return: The result of the query as a list of dicts.
     """
-    result: neo4j.BoltStatementResult = tx.run(query, kwargs)
+    result: neo4j.BoltStatementResult = tx.run(prepare_query(query), kwargs)
     values = [n.data() for n in result]
-    result.consume()
+    record_query(query, result.consume(), len(values))
     return values
 
 
@@ -115,9 +138,9 @@ def read_list_of_tuples_tx(tx: neo4j.Transaction, query: str, **kwargs) -> List[
     :param kwargs: kwargs that are passed to tx.run()'s kwargs argument.
     :return: The result of the query as a list of tuples.
     """
-    result: neo4j.BoltStatementResult = tx.run(query, kwargs)
+    result: neo4j.BoltStatementResult = tx.run(prepare_query(query), kwargs)
     values: List[Any] = result.values()
-    result.consume()
+    record_query(query, result.consume(), len(values))
     # All neo4j APIs return List type- https://neo4j.com/docs/api/python-driver/current/api.html#result - so we do this:
     return [tuple(val) for val in values]
 
@@ -144,12 +167,12 @@ def read_single_dict_tx(tx: neo4j.Transaction, query: str, **kwargs) -> Dict[str
     :param kwargs: kwargs that are passed to tx.run()'s kwargs argument.
     :return: The result of the query as a single dict.
     """
-    result: neo4j.BoltStatementResult = tx.run(query, kwargs)
+    result: neo4j.BoltStatementResult = tx.run(prepare_query(query), kwargs)
     record: neo4j.Record = result.single()
 
     value = record.data() if record else None
 
-    result.consume()
+    record_query(query, result.consume(), 1 if record else 0)
     return value
 
 
@@ -188,7 +211,9 @@ def write_list_of_dicts_tx(
     :param kwargs: Keyword args to be supplied to the Neo4j query.
     :return: None
     """
-    tx.run(query, kwargs)
+    result: neo4j.Result = tx.run(prepare_query(query), kwargs)
+    dict_list = kwargs.get('DictList')
+    record_query(query, result.consume(), len(dict_list) if dict_list is not None else None)
 
 
 def load_graph_data(
@@ -229,15 +254,86 @@ def ensure_indexes(neo4j_session: neo4j.Session, node_schema: CartographyNodeSch
     queries = build_create_index_queries(node_schema)
 
     for query in queries:
-        if not query.startswith('CREATE INDEX IF NOT EXISTS'):
-            raise ValueError('Query provided to `ensure_indexes()` does not start with "CREATE INDEX IF NOT EXISTS".')
-        neo4j_session.run(query)
+        parsed = parse_create_index_query(query)
+        if not parsed:
+            raise ValueError(
+                'Query provided to `ensure_indexes()` does not start with "CREATE INDEX IF NOT EXISTS" or '
+                '"CREATE CONSTRAINT IF NOT EXISTS".',
+            )
+        if query in _ensured_index_queries:
+            continue
+        label, prop_name, unique = parsed
+        try:
+            neo4j_session.run(query).consume()
+        except neo4j.exceptions.ClientError:
+            if not unique:
+                raise
+            # The label has duplicate nodes or a plain index on the property. The create-indexes stage migrates these.
+            logger.warning(
+                "Could not create a uniqueness constraint on %s.%s, creating an index instead. Run the create-indexes "
+                "stage with --merge-duplicate-nodes to migrate to the constraint.",
+                label,
+                prop_name,
+                exc_info=True,
+            )
+            neo4j_session.run(build_create_index_query(label, prop_name)).consume()
+        _ensured_index_queries.add(query)
+
+
+def mark_indexes_ensured(queries: Iterable[str]) -> None:
+    """
+    Record that the indexes created by the given `CREATE INDEX IF NOT EXISTS` queries exist, so that ensure_indexes()
+    does not send them to Neo4j again for the rest of this process. The create-indexes sync stage calls this after it
+    has created every index that cartography knows about.
+    """
+    _ensured_index_queries.update(queries)
+
+
+def set_skip_unchanged_writes(enabled: bool) -> None:
+    """
+    Set whether load() skips rewriting the properties of nodes whose content did not change since the last sync, for
+    the calls to load() that do not say otherwise.
+    """
+    global _skip_unchanged_writes
+    _skip_unchanged_writes = enabled
+
+
+def add_content_hashes(
+        node_schema: CartographyNodeSchema,
+        ingestion_query: str,
+        dict_list: List[Dict[str, Any]],
+        **kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Returns copies of the given items with a content hash of the values of their mapped node properties in the field
+    CONTENT_HASH_FIELD, for a query built with build_ingestion_query(skip_unchanged=True). The query is hashed in too,
+    so that all nodes are rewritten once after the schema changes.
+    :param node_schema: The CartographyNodeSchema of the items.
+    :param ingestion_query: The query that the items will be loaded with.
+    :param dict_list: The items.
+    :param kwargs: The keyword args of the query, some of which may be mapped to node properties.
+    :return: The items with their content hashes.
+    """
+    prop_refs = content_hash_fields(node_schema)
+    kwargs_values = [kwargs.get(ref.name) for ref in prop_refs if ref.set_in_kwargs]
+    item_fields = [ref.name for ref in prop_refs if not ref.set_in_kwargs]
+    query_digest = hashlib.sha256(ingestion_query.encode('utf-8')).hexdigest()
+    result = []
+    for item in dict_list:
+        content = json.dumps(
+            [query_digest, kwargs_values, [item.get(field) for field in item_fields]],
+            default=str,
+            sort_keys=True,
+        )
+        result.append({**item, CONTENT_HASH_FIELD: hashlib.sha256(content.encode('utf-8')).hexdigest()})
+    return result
 
 
 def load(
         neo4j_session: neo4j.Session,
         node_schema: CartographyNodeSchema,
         dict_list: List[Dict[str, Any]],
+        skip_unchanged: Optional[bool] = None,
         **kwargs,
 ) -> None:
     """
@@ -246,9 +342,18 @@ def load(
     :param neo4j_session: The Neo4j session
     :param node_schema: The CartographyNodeSchema object to create indexes for and generate a query.
     :param dict_list: The data to load to the graph represented as a list of dicts.
+    :param skip_unchanged: If True, existing nodes whose mapped properties have the same values as on the last load only
+    get their `lastupdated` set, instead of all of their properties. Cleanup jobs are unaffected since `lastupdated` and
+    relationships are still written. Defaults to the value given to set_skip_unchanged_writes().
     :param kwargs: Allows additional keyword args to be supplied to the Neo4j query.
     :return: None
     """
+    if skip_unchanged is None:
+        skip_unchanged = _skip_unchanged_writes
     ensure_indexes(neo4j_session, node_schema)
-    ingestion_query = build_ingestion_query(node_schema)
-    load_graph_data(neo4j_session, ingestion_query, dict_list, **kwargs)
+    ingestion_query = build_ingestion_query(node_schema, skip_unchanged=skip_unchanged)
+    record_loaded_ids(node_schema, dict_list, kwargs)
+    if skip_unchanged:
+        dict_list = add_content_hashes(node_schema, ingestion_query, dict_list, **kwargs)
+    with query_scope(f'load.{node_schema.label}'), span(node_schema.label, 'load', items=len(dict_list)):
+        load_graph_data(neo4j_session, ingestion_query, dict_list, **kwargs)
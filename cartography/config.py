@@ -19,6 +19,9 @@ class Config:
     :param neo4j_database: The name of the database in Neo4j to connect to. If not specified, uses your Neo4j database
     settings to infer which database is set to default.
     See https://neo4j.com/docs/api/python-driver/4.4/api.html#database. Optional.
+    :type neo4j_writer_sessions: int
+    :param neo4j_writer_sessions: Number of Neo4j sessions that write the data of the intel modules that support it
+        while they fetch the next data. If not specified, modules fetch and write in turn. Optional.
     :type selected_modules: str
     :param selected_modules: Comma-separated list of cartography top-level modules to sync. Optional.
     :type update_tag: int
@@ -29,6 +32,9 @@ class Config:
     :type aws_best_effort_mode: bool
     :param aws_best_effort_mode: If True, AWS sync will not raise any exceptions, just log. If False (default),
         exceptions will be raised.
+    :type aws_tags_single_pass: bool
+    :param aws_tags_single_pass: If True, AWS tags are fetched with one unfiltered scan of the tagging API per region
+        and routed to their resource types by ARN. If False (default), one scan is made per resource type. Optional.
     :type azure_sync_all_subscriptions: bool
     :param azure_sync_all_subscriptions: If True, Azure sync will run for all profiles in azureProfile.json. If
         False (default), Azure sync will run using current user session via CLI credentials. Optional.
@@ -41,6 +47,8 @@ class Config:
     :param azure_client_id: Client Id for connecting in a Service Principal Authentication approach. Optional.
     :type azure_client_secret: str
     :param azure_client_secret: Client Secret for connecting in a Service Principal Authentication approach. Optional.
+    :type azure_subscription_workers: int
+    :param azure_subscription_workers: Number of Azure subscriptions to sync at the same time. Optional.
     :type aws_requested_syncs: str
     :param aws_requested_syncs: Comma-separated list of AWS resources to sync. Optional.
     :type crxcavator_api_base_uri: str
@@ -105,6 +113,57 @@ class Config:
     :param duo_api_hostname: The Duo api hostname, e.g. "api-abc123.duosecurity.com". Optional.
     :param semgrep_app_token: The Semgrep api token. Optional.
     :type semgrep_app_token: str
+    :type query_profiling_enabled: bool
+    :param query_profiling_enabled: If True, record server timings and row counts for every Cypher statement run by
+        cartography jobs, loaders and read helpers, and send them to statsd. Optional.
+    :type slow_query_log_file: str
+    :param slow_query_log_file: Path of a JSON-lines file to write slow Cypher statements to. Setting this enables query
+        profiling. Optional.
+    :type slow_query_threshold_ms: int
+    :param slow_query_threshold_ms: Statements that take at least this many milliseconds on the server are written to
+        the slow query log. Optional.
+    :type query_profile_sample_rate: float
+    :param query_profile_sample_rate: Fraction (0 to 1) of statements to run with PROFILE so that their plans and db
+        hits are included in the slow query log. Optional.
+    :type index_population_timeout: int
+    :param index_population_timeout: If set, the create-indexes stage waits up to this many seconds for newly created
+        indexes to be populated before the rest of the sync runs. Optional.
+    :type merge_duplicate_nodes: bool
+    :param merge_duplicate_nodes: If True, the create-indexes stage merges duplicate nodes on properties declared as
+        unique by the node schemas so that their uniqueness constraints can be created. Optional.
+    :type checkpoint_file: str
+    :param checkpoint_file: Path of a JSON-lines file to record the stages, accounts and resources completed by the
+        sync in, so that the sync can be resumed with resume_update_tag if it dies. Optional.
+    :type resume_update_tag: int
+    :param resume_update_tag: The update tag of a previous sync to resume. The sync reuses this update tag and skips
+        the units recorded for it in checkpoint_file. Optional.
+    :type record_to: str
+    :param record_to: Directory to record the raw responses of provider APIs to, so that they can be replayed with
+        replay_from. Optional.
+    :type replay_from: str
+    :param replay_from: Directory of responses recorded with record_to. Provider APIs are not called: their responses
+        are replayed from this directory instead. Optional.
+    :type skip_unchanged_writes: bool
+    :param skip_unchanged_writes: If True, nodes loaded through node schemas whose properties did not change since the
+        last sync only get their lastupdated property updated. Optional.
+    :type id_set_cleanup: bool
+    :param id_set_cleanup: If True, the ids of the nodes loaded through node schemas are kept in memory, and the cleanup
+        jobs of these schemas delete the nodes whose ids were not loaded instead of scanning for stale lastupdated
+        values. Optional.
+    :type work_queue: str
+    :param work_queue: Path of a SQLite file to use as the work queue of a distributed sync. The sync publishes its
+        stages and AWS accounts to the queue for `cartography worker` processes to run, and runs the create-indexes and
+        analysis stages itself once all of them are done. Optional.
+    :type work_unit_max_attempts: int
+    :param work_unit_max_attempts: The number of times a unit of a distributed sync is run before it is marked as
+        failed. Optional.
+    :type worker_idle_timeout: int
+    :param worker_idle_timeout: Seconds after which a worker stops if it could not claim any unit of work. Optional.
+    :type trace_file: str
+    :param trace_file: Path of a file to export the spans of the sync to, e.g. its stages, accounts, loads and jobs.
+        Optional.
+    :type trace_format: str
+    :param trace_format: The format of trace_file: 'json' (the default) or 'chrome'. Optional.
     """
 
     def __init__(
@@ -114,15 +173,18 @@ class Config:
         neo4j_password=None,
         neo4j_max_connection_lifetime=None,
         neo4j_database=None,
+        neo4j_writer_sessions=None,
         selected_modules=None,
         update_tag=None,
         aws_sync_all_profiles=False,
         aws_best_effort_mode=False,
+        aws_tags_single_pass=False,
         azure_sync_all_subscriptions=False,
         azure_sp_auth=None,
         azure_tenant_id=None,
         azure_client_id=None,
         azure_client_secret=None,
+        azure_subscription_workers=None,
         aws_requested_syncs=None,
         analysis_job_directory=None,
         crxcavator_api_base_uri=None,
@@ -160,21 +222,41 @@ class Config:
         duo_api_secret=None,
         duo_api_hostname=None,
         semgrep_app_token=None,
+        query_profiling_enabled=False,
+        slow_query_log_file=None,
+        slow_query_threshold_ms=None,
+        query_profile_sample_rate=None,
+        index_population_timeout=None,
+        merge_duplicate_nodes=False,
+        checkpoint_file=None,
+        resume_update_tag=None,
+        record_to=None,
+        replay_from=None,
+        skip_unchanged_writes=False,
+        id_set_cleanup=False,
+        work_queue=None,
+        work_unit_max_attempts=None,
+        worker_idle_timeout=None,
+        trace_file=None,
+        trace_format=None,
     ):
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         self.neo4j_max_connection_lifetime = neo4j_max_connection_lifetime
         self.neo4j_database = neo4j_database
+        self.neo4j_writer_sessions = neo4j_writer_sessions
         self.selected_modules = selected_modules
         self.update_tag = update_tag
         self.aws_sync_all_profiles = aws_sync_all_profiles
         self.aws_best_effort_mode = aws_best_effort_mode
+        self.aws_tags_single_pass = aws_tags_single_pass
         self.azure_sync_all_subscriptions = azure_sync_all_subscriptions
         self.azure_sp_auth = azure_sp_auth
         self.azure_tenant_id = azure_tenant_id
         self.azure_client_id = azure_client_id
         self.azure_client_secret = azure_client_secret
+        self.azure_subscription_workers = azure_subscription_workers
         self.aws_requested_syncs = aws_requested_syncs
         self.analysis_job_directory = analysis_job_directory
         self.crxcavator_api_base_uri = crxcavator_api_base_uri
@@ -212,3 +294,20 @@ class Config:
         self.duo_api_secret = duo_api_secret
         self.duo_api_hostname = duo_api_hostname
         self.semgrep_app_token = semgrep_app_token
+        self.query_profiling_enabled = query_profiling_enabled
+        self.slow_query_log_file = slow_query_log_file
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.query_profile_sample_rate = query_profile_sample_rate
+        self.index_population_timeout = index_population_timeout
+        self.merge_duplicate_nodes = merge_duplicate_nodes
+        self.checkpoint_file = checkpoint_file
+        self.resume_update_tag = resume_update_tag
+        self.record_to = record_to
+        self.replay_from = replay_from
+        self.skip_unchanged_writes = skip_unchanged_writes
+        self.id_set_cleanup = id_set_cleanup
+        self.work_queue = work_queue
+        self.work_unit_max_attempts = work_unit_max_attempts
+        self.worker_idle_timeout = worker_idle_timeout
+        self.trace_file = trace_file
+        self.trace_format = trace_format
@@ -4,20 +4,14 @@ CREATE INDEX IF NOT EXISTS FOR (n:AWSConfigDeliveryChannel) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSConfigDeliveryChannel) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSConfigRule) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSConfigRule) ON (n.lastupdated);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayClientCertificate) ON (n.id);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayClientCertificate) ON (n.lastupdated);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayRestAPI) ON (n.id);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayRestAPI) ON (n.lastupdated);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayResource) ON (n.id);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayResource) ON (n.lastupdated);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayStage) ON (n.id);
-CREATE INDEX IF NOT EXISTS FOR (n:APIGatewayStage) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSCidrBlock) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSCidrBlock) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSRecord) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSRecord) ON (n.lastupdated);
+CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSRecord) ON (n.name);
+CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSRecord) ON (n.value);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSZone) ON (n.name);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSZone) ON (n.zoneid);
 CREATE INDEX IF NOT EXISTS FOR (n:AWSDNSZone) ON (n.lastupdated);
@@ -64,6 +58,7 @@ CREATE INDEX IF NOT EXISTS FOR (n:AWSVpc) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:AccountAccessKey) ON (n.accesskeyid);
 CREATE INDEX IF NOT EXISTS FOR (n:AccountAccessKey) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:AutoScalingGroup) ON (n.arn);
+CREATE INDEX IF NOT EXISTS FOR (n:AutoScalingGroup) ON (n.exposed_internet);
 CREATE INDEX IF NOT EXISTS FOR (n:AutoScalingGroup) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:ChromeExtension) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:ChromeExtension) ON (n.lastupdated);
@@ -88,6 +83,8 @@ CREATE INDEX IF NOT EXISTS FOR (n:DOProject) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:DOProject) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:EBSSnapshot) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:EBSSnapshot) ON (n.lastupdated);
+CREATE INDEX IF NOT EXISTS FOR (n:EC2Instance) ON (n.exposed_internet);
+CREATE INDEX IF NOT EXISTS FOR (n:EC2Instance) ON (n.publicdnsname);
 CREATE INDEX IF NOT EXISTS FOR (n:EC2KeyPair) ON (n.keyfingerprint);
 CREATE INDEX IF NOT EXISTS FOR (n:EC2ReservedInstance) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:EC2ReservedInstance) ON (n.lastupdated);
@@ -142,6 +139,7 @@ CREATE INDEX IF NOT EXISTS FOR (n:GCPFolder) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:GCPFolder) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:GCPForwardingRule) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:GCPForwardingRule) ON (n.lastupdated);
+CREATE INDEX IF NOT EXISTS FOR (n:GCPInstance) ON (n.exposed_internet);
 CREATE INDEX IF NOT EXISTS FOR (n:GCPInstance) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:GCPInstance) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:GCPNetworkInterface) ON (n.id);
@@ -169,6 +167,7 @@ CREATE INDEX IF NOT EXISTS FOR (n:GitHubRepository) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:GitHubRepository) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.lastupdated);
+CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.username_lower);
 CREATE INDEX IF NOT EXISTS FOR (n:GKECluster) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:GKECluster) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:GSuiteGroup) ON (n.email);
@@ -207,9 +206,11 @@ CREATE INDEX IF NOT EXISTS FOR (n:LaunchTemplateVersion) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:LaunchTemplateVersion) ON (n.name);
 CREATE INDEX IF NOT EXISTS FOR (n:LaunchTemplateVersion) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancer) ON (n.dnsname);
+CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancer) ON (n.exposed_internet);
 CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancer) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancer) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancerV2) ON (n.dnsname);
+CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancerV2) ON (n.exposed_internet);
 CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancerV2) ON (n.id);
 CREATE INDEX IF NOT EXISTS FOR (n:LoadBalancerV2) ON (n.lastupdated);
 CREATE INDEX IF NOT EXISTS FOR (n:NameServer) ON (n.id);
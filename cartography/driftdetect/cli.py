@@ -98,6 +98,15 @@ class CLI:
                 'them. Drift-detection does not guarantee the order in which the detector jobs are executed.'
             ),
         )
+        parser_get_state.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help=(
+                'The number of validation queries to run against Neo4j at the same time. Each query directory gets its '
+                'own Neo4j session. Defaults to 4.'
+            ),
+        )
         parser_get_drift = subparsers.add_parser(
             name='get-drift',
             help=(
@@ -129,6 +138,23 @@ class CLI:
                 'The filename of the later state chronologically to be compared to.'
             ),
         )
+        parser_get_drift.add_argument(
+            '--drift-detection-directory',
+            type=str,
+            default=None,
+            help=(
+                'A path to a directory containing query directories. If given instead of --query-directory, the drift '
+                'between --start-state and --end-state is reported for every query directory in it. Use shortcuts '
+                'such as most-recent to name the states.'
+            ),
+        )
+        parser_get_drift.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='The number of query directories to diff at the same time with --drift-detection-directory. '
+                 'Defaults to 4.',
+        )
         parser_add_shortcut = subparsers.add_parser(
             name='add-shortcut',
             help=(
@@ -17,6 +17,8 @@ class UpdateConfig:
     :param neo4j_user: User name for a Neo4j graph database service. Optional.
     :type neo4j_password: string
     :param neo4j_password: Password for a Neo4j graph database service. Optional.
+    :type workers: int
+    :param workers: Number of validation queries to run against Neo4j at the same time. Optional.
     """
 
     def __init__(
@@ -25,11 +27,13 @@ class UpdateConfig:
         neo4j_uri: str,
         neo4j_user: Optional[str] = None,
         neo4j_password: Optional[str] = None,
+        workers: Optional[int] = None,
     ):
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         self.drift_detection_directory = drift_detection_directory
+        self.workers = workers
 
 
 class GetDriftConfig:
@@ -40,22 +44,31 @@ class GetDriftConfig:
     contain valid values.
 
     :type query_directory: string
-    :param query_directory: Path to query directory. Required.
+    :param query_directory: Path to query directory. Required unless drift_detection_directory is given.
     :type start_state: string
     :param start_state: Filename (without the directory prefix) of the earlier state to be compared with. Required.
     :type end_state: string
     :param end_state: Filename (without the directory prefix) of the later state to be compared with. Required.
+    :type drift_detection_directory: string
+    :param drift_detection_directory: Path to drift detection directory. If given, the drift of every query directory
+        in it is reported, using start_state and end_state as shortcuts or filenames in each of them. Optional.
+    :type workers: int
+    :param workers: Number of query directories to diff at the same time. Optional.
     """
 
     def __init__(
         self,
-        query_directory: str,
+        query_directory: Optional[str],
         start_state: str,
         end_state: str,
+        drift_detection_directory: Optional[str] = None,
+        workers: Optional[int] = None,
     ):
-        self.query_directory: str = query_directory
+        self.query_directory: Optional[str] = query_directory
         self.start_state: str = start_state
         self.end_state: str = end_state
+        self.drift_detection_directory: Optional[str] = drift_detection_directory
+        self.workers: Optional[int] = workers
 
 
 class AddShortcutConfig:
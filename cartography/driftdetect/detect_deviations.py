@@ -1,6 +1,17 @@
+import json
 import logging
 import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
 from typing import Union
 
 from marshmallow import ValidationError
@@ -15,54 +26,148 @@ from cartography.driftdetect.util import valid_directory
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 4
+
+NEW = 'new'
+MISSING = 'missing'
+
+Drift = List[Union[str, List[str]]]
+
 
 def run_drift_detection(config: GetDriftConfig) -> None:
+    """
+    Reports the drift between two states of a query directory, or of every query directory in a drift detection
+    directory if one is given.
+
+    :type config: GetDriftConfig
+    :param config: Config Object from CLI
+    :return:
+    """
+    if config.drift_detection_directory:
+        run_drift_detection_for_directories(config)
+        return
+    if not config.query_directory or not valid_directory(config.query_directory):
+        logger.error("Invalid Drift Detection Directory")
+        return
+    detect_query_directory_drift(config.query_directory, config.start_state, config.end_state, sys.stdout)
+
+
+def run_drift_detection_for_directories(config: GetDriftConfig) -> None:
+    """
+    Diffs the states of every query directory in config.drift_detection_directory, up to config.workers at a time.
+    Each report is buffered in a temporary file while it is written, and printed as a whole once it is complete so
+    that reports of different query directories are not interleaved.
+
+    :type config: GetDriftConfig
+    :param config: Config Object from CLI
+    :return:
+    """
+    if not valid_directory(config.drift_detection_directory):
+        logger.error("Invalid Drift Detection Directory")
+        return
+
+    def diff(query_directory: str) -> TextIO:
+        out = tempfile.TemporaryFile('w+')
+        try:
+            detect_query_directory_drift(query_directory, config.start_state, config.end_state, out)
+        except FileNotFoundError as err:
+            # A query directory without one of the states is skipped, without stopping the other diffs.
+            logger.exception(err)
+        return out
+
+    with ThreadPoolExecutor(max_workers=config.workers or DEFAULT_WORKERS) as executor:
+        futures = [
+            executor.submit(diff, query_directory)
+            for query_directory in FileSystem.walk(config.drift_detection_directory)
+            if FileSystem.has_file(os.path.join(query_directory, "shortcut.json"))
+        ]
+        for future in as_completed(futures):
+            with future.result() as out:
+                out.seek(0)
+                shutil.copyfileobj(out, sys.stdout)
+
+
+def detect_query_directory_drift(query_directory: str, start_state: str, end_state: str, out: TextIO) -> None:
+    """
+    Reports the drift between two states of a query directory to `out`, logging any errors.
+
+    :type query_directory: String.
+    :param query_directory: Path to query directory.
+    :type start_state: String.
+    :param start_state: Filename or shortcut of the earlier state chronologically to be compared to.
+    :type end_state: String.
+    :param end_state: Filename or shortcut of the later state chronologically to be compared to.
+    :type out: TextIO.
+    :param out: File to write the report to.
+    :return:
+    """
     try:
-        if not valid_directory(config.query_directory):
-            logger.error("Invalid Drift Detection Directory")
-            return
-        state_serializer = StateSchema()
-        shortcut_serializer = ShortcutSchema()
-        shortcut_data = FileSystem.load(os.path.join(config.query_directory, "shortcut.json"))
-        shortcut = shortcut_serializer.load(shortcut_data)
-        start_state_data = FileSystem.load(
-            os.path.join(
-                config.query_directory, shortcut.shortcuts.get(
-                    config.start_state,
-                    config.start_state,
-                ),
-            ),
-        )
-        start_state = state_serializer.load(start_state_data)
-        end_state_data = FileSystem.load(
-            os.path.join(
-                config.query_directory, shortcut.shortcuts.get(
-                    config.end_state,
-                    config.end_state,
-                ),
-            ),
-        )
-        end_state = state_serializer.load(end_state_data)
-        new_results, missing_results = perform_drift_detection(start_state, end_state)
-        report_drift(new_results, missing_results, end_state.name, end_state.properties)
+        shortcut_data = FileSystem.load(os.path.join(query_directory, "shortcut.json"))
+        shortcut = ShortcutSchema().load(shortcut_data)
+        start_path = os.path.join(query_directory, shortcut.shortcuts.get(start_state, start_state))
+        end_path = os.path.join(query_directory, shortcut.shortcuts.get(end_state, end_state))
+        state = load_state_header(start_path)
+        validate_states(state, load_state_header(end_path))
+
+        # Only the missing results are spilled to disk: new results are reported while the states are being diffed,
+        # and missing results are reported once the diff is complete.
+        with tempfile.TemporaryFile('w+') as missing_spill:
+            def new_results() -> Iterator[Drift]:
+                for kind, drift in merge_diff(FileSystem.iter_results(start_path), FileSystem.iter_results(end_path)):
+                    if kind == NEW:
+                        yield drift
+                    else:
+                        missing_spill.write(json.dumps(drift) + '\n')
+
+            def missing_results() -> Iterator[Drift]:
+                missing_spill.seek(0)
+                for line in missing_spill:
+                    yield json.loads(line)
+
+            report_drift(new_results(), missing_results(), state.name, state.properties, out)
     except ValidationError as err:
         msg = "Unable to create DriftStates from files {},{} for \n{} in directory {}.".format(
-            config.start_state,
-            config.end_state,
+            start_state,
+            end_state,
             err.messages,
-            config.query_directory,
+            query_directory,
         )
         logger.exception(msg)
     except ValueError as err:
         msg = "Unable to create DriftStates from files {},{} for \n{} in directory {}.".format(
-            config.start_state,
-            config.end_state,
+            start_state,
+            end_state,
             err,
-            config.query_directory,
+            query_directory,
         )
         logger.exception(msg)
 
 
+def load_state_header(file_path: str) -> State:
+    """
+    Loads a State without its results.
+
+    :type file_path: String.
+    :param file_path: Path to the state file.
+    :return: The State, with empty results.
+    """
+    header = FileSystem.load_header(file_path)
+    header['results'] = []
+    return StateSchema().load(header)
+
+
+def validate_states(start_state: State, end_state: State) -> None:
+    """
+    Raises ValueError if the given States are not of the same query.
+    """
+    if start_state.name != end_state.name:
+        raise ValueError("State names do not match.")
+    if start_state.validation_query != end_state.validation_query:
+        raise ValueError("State queries do not match.")
+    if start_state.properties != end_state.properties:
+        raise ValueError("State properties do not match.")
+
+
 def perform_drift_detection(start_state: State, end_state: State):
     """
     Returns differences (additions and missing results) between two States.
@@ -74,14 +179,11 @@ def perform_drift_detection(start_state: State, end_state: State):
     :return: tuple of additions and subtractions between the end and start detector in the form of drift_info_detector
     pairs
     """
-    if start_state.name != end_state.name:
-        raise ValueError("State names do not match.")
-    if start_state.validation_query != end_state.validation_query:
-        raise ValueError("State queries do not match.")
-    if start_state.properties != end_state.properties:
-        raise ValueError("State properties do not match.")
-    new_results = compare_states(start_state, end_state)
-    missing_results = compare_states(end_state, start_state)
+    validate_states(start_state, end_state)
+    new_results: List[Drift] = []
+    missing_results: List[Drift] = []
+    for kind, drift in merge_diff(sorted(start_state.results), sorted(end_state.results)):
+        (new_results if kind == NEW else missing_results).append(drift)
     return new_results, missing_results
 
 
@@ -93,20 +195,68 @@ def compare_states(start_state: State, end_state: State):
     :param start_state: The earlier state chronologically to be compared to.
     :type end_state: State
     :param end_state: The later state chronologically to be compared to.
-    :return: list of tuples of differences between states in the form (dictionary, State object)
-    """
-    differences = []
-    # Use set for faster membership check
-    start_state_results = {tuple(res) for res in start_state.results}
-    for result in end_state.results:
-        if tuple(result) in start_state_results:
-            continue
-        drift: List[Union[str, List[str]]] = []
-        for field in result:
-            value = field.split("|")
-            if len(value) > 1:
-                drift.append(value)
-            else:
-                drift.append(field)
-        differences.append(drift)
-    return differences
+    :return: list of results of end_state that are not in start_state
+    """
+    return [
+        drift for kind, drift in merge_diff(sorted(start_state.results), sorted(end_state.results))
+        if kind == NEW
+    ]
+
+
+def merge_diff(
+    start_results: Iterable[List[str]],
+    end_results: Iterable[List[str]],
+) -> Iterator[Tuple[str, Drift]]:
+    """
+    Diffs two sorted streams of results in a single pass, holding only one result of each in memory.
+
+    :type start_results: Iterable of List of Strings.
+    :param start_results: The sorted results of the earlier state.
+    :type end_results: Iterable of List of Strings.
+    :param end_results: The sorted results of the later state.
+    :return: (NEW, drift) for every result that is only in end_results and (MISSING, drift) for every result that is
+    only in start_results, in sorted order. Duplicate results are reported once.
+    """
+    start_iter = _unique_sorted(start_results)
+    end_iter = _unique_sorted(end_results)
+    start = next(start_iter, None)
+    end = next(end_iter, None)
+    while start is not None and end is not None:
+        if start == end:
+            start = next(start_iter, None)
+            end = next(end_iter, None)
+        elif start < end:
+            yield MISSING, _to_drift(start)
+            start = next(start_iter, None)
+        else:
+            yield NEW, _to_drift(end)
+            end = next(end_iter, None)
+    while start is not None:
+        yield MISSING, _to_drift(start)
+        start = next(start_iter, None)
+    while end is not None:
+        yield NEW, _to_drift(end)
+        end = next(end_iter, None)
+
+
+def _unique_sorted(results: Iterable[List[str]]) -> Iterator[List[str]]:
+    previous: Optional[List[str]] = None
+    for result in results:
+        if previous is not None:
+            if result == previous:
+                continue
+            if result < previous:
+                raise ValueError(f"State results are not sorted: {result} comes after {previous}.")
+        yield result
+        previous = result
+
+
+def _to_drift(result: List[str]) -> Drift:
+    drift: Drift = []
+    for field in result:
+        value = field.split("|")
+        if len(value) > 1:
+            drift.append(value)
+        else:
+            drift.append(field)
+    return drift
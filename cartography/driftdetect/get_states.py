@@ -1,15 +1,18 @@
 import logging
 import os.path
 import time
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
-from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 import neo4j.exceptions
 from marshmallow import ValidationError
 from neo4j import GraphDatabase
 
-from cartography.client.core.tx import read_list_of_dicts_tx
 from cartography.driftdetect.add_shortcut import add_shortcut
 from cartography.driftdetect.config import UpdateConfig
 from cartography.driftdetect.model import State
@@ -17,9 +20,13 @@ from cartography.driftdetect.serializers import ShortcutSchema
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
 from cartography.driftdetect.util import valid_directory
+from cartography.graph.profiling import prepare_query
+from cartography.graph.profiling import record_query
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 4
+
 
 def run_get_states(config: UpdateConfig) -> None:
     """
@@ -73,27 +80,43 @@ def run_get_states(config: UpdateConfig) -> None:
             )
         return
 
-    with neo4j_driver.session() as session:
-        filename = '.'.join([str(i) for i in time.gmtime()] + ["json"])
-        state_serializer = StateSchema()
-        shortcut_serializer = ShortcutSchema()
-        for query_directory in FileSystem.walk(config.drift_detection_directory):
-            try:
-                get_query_state(session, query_directory, state_serializer, FileSystem, filename)
-                add_shortcut(FileSystem, shortcut_serializer, query_directory, 'most-recent', filename)
-            except ValidationError as err:
-                msg = "Unable to create State for directory {}, with data \n{}".format(
-                    query_directory,
-                    err.messages,
-                )
-                logger.exception(msg)
-            except KeyError as err:
-                msg = f"Could not find {err} field in state template for directory {query_directory}."
-                logger.exception(msg)
-            except FileNotFoundError as err:
-                logger.exception(err)
-            except neo4j.exceptions.CypherSyntaxError as err:
-                logger.exception(err)
+    filename = '.'.join([str(i) for i in time.gmtime()] + ["jsonl", "gz"])
+    workers = config.workers or DEFAULT_WORKERS
+    try:
+        # Each query directory gets its own session from the driver's connection pool, so up to `workers` validation
+        # queries run against Neo4j at the same time.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_update_query_directory, neo4j_driver, query_directory, filename)
+                for query_directory in FileSystem.walk(config.drift_detection_directory)
+            ]
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        neo4j_driver.close()
+
+
+def _update_query_directory(neo4j_driver: neo4j.Driver, query_directory: str, filename: str) -> None:
+    """
+    Gets the state of a single query directory and points its `most-recent` shortcut at it, logging any errors.
+    """
+    try:
+        with neo4j_driver.session() as session:
+            get_query_state(session, query_directory, StateSchema(), FileSystem, filename)
+        add_shortcut(FileSystem, ShortcutSchema(), query_directory, 'most-recent', filename)
+    except ValidationError as err:
+        msg = "Unable to create State for directory {}, with data \n{}".format(
+            query_directory,
+            err.messages,
+        )
+        logger.exception(msg)
+    except KeyError as err:
+        msg = f"Could not find {err} field in state template for directory {query_directory}."
+        logger.exception(msg)
+    except FileNotFoundError as err:
+        logger.exception(err)
+    except neo4j.exceptions.CypherSyntaxError as err:
+        logger.exception(err)
 
 
 def get_query_state(
@@ -121,7 +144,10 @@ def get_query_state(
     state_data = storage.load(os.path.join(query_directory, "template.json"))
     state = state_serializer.load(state_data)
     get_state(session, state)
-    new_state_data = state_serializer.dump(state)
+    # Results are already lists of strings, so only serialize the rest of the state and hand the results to storage
+    # as they are. Running millions of rows through the schema doubles the time it takes to write a large state.
+    new_state_data = StateSchema(exclude=('results',)).dump(state)
+    new_state_data['results'] = state.results
     fp = os.path.join(query_directory, filename)
     storage.write(new_state_data, fp)
     return state
@@ -137,25 +163,39 @@ def get_state(session: neo4j.Session, state: State) -> None:
     :param state: State to be updated.
     :return:
     """
-
-    new_results: List[Dict[str, Any]] = session.read_transaction(
-        read_list_of_dicts_tx,
-        state.validation_query,
-    )
+    properties, results = session.read_transaction(read_state_results_tx, state.validation_query)
     logger.debug(f"Updating results for {state.name}")
+    state.properties = properties
+    results.sort()
+    state.results = results
+
+
+def read_state_results_tx(tx: neo4j.Transaction, query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Runs the given validation query and converts each record to a list of strings as it is streamed from Neo4j, so
+    that the raw records never have to be held in memory all at once.
 
-    # The keys will be the same across all items in the returned list
-    state.properties = list(new_results[0].keys()) if len(new_results) > 0 else []
-
-    results = []
-    for record in new_results:
-        values = []
-        for field in record.values():
-            if isinstance(field, list):
-                s = "|".join(sorted(str(i) for i in field))
-                values.append(s)
-            else:
-                values.append(str(field))
-        results.append(values)
-
-    state.results = sorted(results)
+    :param tx: A neo4j read transaction object
+    :param query: The validation query of a State.
+    :return: A tuple of the returned keys and the list of results, in the order returned by Neo4j.
+    """
+    result = tx.run(prepare_query(query))
+    properties: Optional[List[str]] = None
+    results: List[List[str]] = []
+    for record in result:
+        if properties is None:
+            # The keys will be the same across all records
+            properties = list(record.keys())
+        results.append(_serialize_values(record.values()))
+    record_query(query, result.consume(), len(results))
+    return properties or [], results
+
+
+def _serialize_values(values: Iterable[Any]) -> List[str]:
+    serialized = []
+    for field in values:
+        if isinstance(field, list):
+            serialized.append("|".join(sorted(str(i) for i in field)))
+        else:
+            serialized.append(str(field))
+    return serialized
@@ -1,48 +1,58 @@
-def report_drift_new(results, state_properties):
+import sys
+
+
+def report_drift_new(results, state_properties, out=None):
     """
     Prints new additions in Query Results between two states.
 
-    :type results: List of List of Strings.
-    :param results: Deviation information.
+    :type results: Iterable of List of Strings.
+    :param results: Deviation information. Consumed one result at a time.
+    :type out: TextIO.
+    :param out: File to print to. Defaults to stdout.
     :return: None
     """
-    print("New Query Results:")
-    print()
-    for result in results:
-        for field, value in zip(state_properties, result):
-            print(field, ": ", value)
-        print()
+    _report_results("New Query Results:", results, state_properties, out or sys.stdout)
 
 
-def report_drift_missing(results, state_properties):
+def report_drift_missing(results, state_properties, out=None):
     """
     Prints missing results in Query Results between two states.
 
-    :type results: List of List of Strings.
-    :param results: Deviation information.
+    :type results: Iterable of List of Strings.
+    :param results: Deviation information. Consumed one result at a time.
+    :type out: TextIO.
+    :param out: File to print to. Defaults to stdout.
     :return: None
     """
-    print("Missing Query Results:")
-    print()
-    for result in results:
-        for field, value in zip(state_properties, result):
-            print(field, ": ", value)
-        print()
+    _report_results("Missing Query Results:", results, state_properties, out or sys.stdout)
 
 
-def report_drift(new_results, missing_results, state_name, state_properties):
+def report_drift(new_results, missing_results, state_name, state_properties, out=None):
     """
     Prints the results between two states.
-    :param new_results: List of new results.
-    :param missing_results: List of missing results.
+    New results are consumed in full before the first missing result is requested, so missing_results may be a
+    generator that only becomes available once new_results is exhausted.
+    :param new_results: Iterable of new results.
+    :param missing_results: Iterable of missing results.
     :param state_name: Query Name.
     :param state_properties: Query Properties.
+    :param out: File to print to. Defaults to stdout.
     :return: None.
     """
-    print("Query Name: ", state_name)
-    print()
-    if new_results:
-        report_drift_new(new_results, state_properties)
-    print()
-    if missing_results:
-        report_drift_missing(missing_results, state_properties)
+    out = out or sys.stdout
+    print("Query Name: ", state_name, file=out)
+    print(file=out)
+    report_drift_new(new_results, state_properties, out)
+    print(file=out)
+    report_drift_missing(missing_results, state_properties, out)
+
+
+def _report_results(title, results, state_properties, out):
+    # The title is only printed if there is at least one result, without materializing the results to find out.
+    for i, result in enumerate(results):
+        if i == 0:
+            print(title, file=out)
+            print(file=out)
+        for field, value in zip(state_properties, result):
+            print(field, ": ", value, file=out)
+        print(file=out)
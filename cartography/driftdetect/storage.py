@@ -1,5 +1,15 @@
+import gzip
 import json
 import os
+from typing import Any
+from typing import Dict
+from typing import Iterable
+
+# Gzip'd files start with these two bytes, see RFC 1952.
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Compressing the largest states at the default level 9 is several times slower than at level 6 for little gain.
+GZIP_COMPRESSLEVEL = 6
 
 
 class FileSystem:
@@ -7,10 +17,14 @@ class FileSystem:
     def load(cls, file_path):
         """
         Loads a JSON object (dict) from a file.
+        Files written by write() to a `.gz` path are detected by their content, not by their name, and read back into
+        the same dict that was written, so callers do not need to know which format a state file uses.
         :type file_path: string.
         :param file_path: Filepath for the file.
         :return: Dictionary in JSON format.
         """
+        if cls._is_gzip(file_path):
+            return cls._load_lines(file_path)
         with open(file_path) as json_file:
             data = json.load(json_file)
         return data
@@ -19,16 +33,92 @@ class FileSystem:
     def write(cls, data, file_path):
         """
         Writes a JSON object (dict) to a file.
+        If file_path ends with `.gz`, the dict is written as gzip'd JSON lines: the first line holds every key except
+        `results`, followed by one line per item of `results`. This keeps large drift states small on disk and lets
+        them be written and read one result at a time.
         :type data: Dict
         :param data: Dictionary in JSON format.
         :type file_path: string
         :param file_path: Filepath to be written to.
         :return:
         """
+        if file_path.endswith('.gz'):
+            header = {key: value for key, value in data.items() if key != 'results'}
+            cls.write_lines(header, data.get('results', []), file_path)
+            return
         with open(file_path, 'w') as json_file:
             json.dump(data, json_file, sort_keys=True, indent=4)
             json_file.write('\n')
 
+    @classmethod
+    def write_lines(cls, header: Dict[str, Any], results: Iterable[Any], file_path: str) -> None:
+        """
+        Writes a header dict and an iterable of results to a gzip'd JSON lines file. The file is written next to its
+        destination and then moved into place, so readers never see a partially written state.
+        :param header: Dict to write on the first line.
+        :param results: Items to write, one per line.
+        :param file_path: Filepath to be written to.
+        :return:
+        """
+        tmp_path = f'{file_path}.tmp'
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=GZIP_COMPRESSLEVEL) as f:
+                f.write(json.dumps(header, sort_keys=True, separators=(',', ':')))
+                f.write('\n')
+                for result in results:
+                    f.write(json.dumps(result, separators=(',', ':')))
+                    f.write('\n')
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load_header(cls, file_path):
+        """
+        Loads everything but the `results` of a file written by write().
+        :type file_path: string.
+        :param file_path: Filepath for the file.
+        :return: Dictionary in JSON format, without `results`.
+        """
+        if cls._is_gzip(file_path):
+            with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+                return json.loads(f.readline())
+        data = cls.load(file_path)
+        data.pop('results', None)
+        return data
+
+    @classmethod
+    def iter_results(cls, file_path):
+        """
+        Yields the `results` of a file written by write() in sorted order.
+        Gzip'd JSON lines files are streamed one result at a time and are expected to have been written in sorted
+        order, as get-state does. Plain JSON files have to be read in full anyway, so their results are sorted in
+        memory; this keeps hand-written and older states usable.
+        :type file_path: string.
+        :param file_path: Filepath for the file.
+        :yield: Results.
+        """
+        if cls._is_gzip(file_path):
+            with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+                f.readline()
+                for line in f:
+                    yield json.loads(line)
+        else:
+            yield from sorted(cls.load(file_path).get('results', []))
+
+    @classmethod
+    def _is_gzip(cls, file_path):
+        with open(file_path, 'rb') as f:
+            return f.read(2) == GZIP_MAGIC
+
+    @classmethod
+    def _load_lines(cls, file_path):
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            data = json.loads(f.readline())
+            data['results'] = [json.loads(line) for line in f]
+        return data
+
     @classmethod
     def walk(cls, drift_detection_directory):
         """
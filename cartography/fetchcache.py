@@ -0,0 +1,135 @@
+import base64
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# (module, account, region, call) of a raw API response, e.g. ('ec2', '123456789012', 'us-east-1',
+# 'DescribeInstances-3f2a...'). Components that do not apply are given as 'global'.
+FetchKey = Tuple[str, str, str, str]
+
+_UNSAFE_PATH_CHARS = re.compile(r'[^A-Za-z0-9_.\-]')
+
+
+class FetchCacheMiss(Exception):
+    """
+    Raised when replaying from a FetchCache that has no recorded response for a call.
+    """
+
+
+class FetchCache:
+    """
+    A local store of raw provider API responses, placed between the get_* functions of intel modules and the
+    transform_* and load_* functions. In record mode the responses of a sync are written to the store; in replay mode
+    they are read back instead of calling the provider, so that the graph can be reloaded from a capture offline, e.g.
+    to test a transform change or to benchmark ingestion against a fixed workload.
+
+    Responses are stored gzipped under `objects/`, named by the sha256 of their content so that identical responses
+    are only stored once. `refs/<module>/<account>/<region>/<call>` holds the hash of the response of each call.
+
+    :type directory: string
+    :param directory: The directory of the store. It is created if it does not exist.
+    :type replay: bool
+    :param replay: If True, responses are replayed from the store. If False, responses are recorded to it.
+    """
+
+    def __init__(self, directory: str, replay: bool = False):
+        self.directory = directory
+        self.replay = replay
+        if replay and not os.path.isdir(directory):
+            raise ValueError(f'Cannot replay API responses from "{directory}": it is not a directory.')
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: FetchKey) -> Any:
+        """
+        :return: The response recorded for the given key.
+        :raises FetchCacheMiss: If no response was recorded for the given key.
+        """
+        try:
+            with open(self._ref_path(key)) as f:
+                digest = f.read().strip()
+            with gzip.open(self._object_path(digest), 'rt', encoding='utf-8') as f:
+                return json.load(f, object_hook=_decode)
+        except FileNotFoundError:
+            raise FetchCacheMiss(f'No response was recorded in "{self.directory}" for {"/".join(key)}.')
+
+    def put(self, key: FetchKey, response: Any) -> None:
+        """
+        Record the given response for the given key, replacing any response previously recorded for it.
+        """
+        content = json.dumps(response, default=_encode, sort_keys=True).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            _atomic_write(object_path, gzip.compress(content, compresslevel=6))
+        _atomic_write(self._ref_path(key), digest.encode('utf-8'))
+
+    def _ref_path(self, key: FetchKey) -> str:
+        return os.path.join(self.directory, 'refs', *(_UNSAFE_PATH_CHARS.sub('_', part) for part in key))
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], f'{digest}.json.gz')
+
+
+def call_digest(params: Any) -> str:
+    """
+    :return: A short digest of the given JSON-serializable call parameters, to tell calls to the same API apart in a
+    FetchKey.
+    """
+    content = json.dumps(params, default=_encode, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _atomic_write(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _encode(value: Any) -> Dict[str, str]:
+    # Provider SDKs return datetimes and bytes, which transforms expect to get back as such on replay.
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f'Object of type {type(value).__name__} cannot be recorded in a FetchCache.')
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.datetime.fromisoformat(obj['__datetime__'])
+        if '__bytes__' in obj:
+            return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+_fetch_cache: Optional[FetchCache] = None
+
+
+def set_fetch_cache(cache: Optional[FetchCache]) -> None:
+    """
+    Set the process-wide FetchCache. Pass None to call provider APIs directly.
+    """
+    global _fetch_cache
+    _fetch_cache = cache
+
+
+def get_fetch_cache() -> Optional[FetchCache]:
+    return _fetch_cache
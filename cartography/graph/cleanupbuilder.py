@@ -2,6 +2,7 @@ from dataclasses import asdict
 from string import Template
 from typing import Dict
 from typing import List
+from typing import Tuple
 
 from cartography.graph.querybuilder import _build_match_clause
 from cartography.graph.querybuilder import rel_present_on_node_schema
@@ -41,6 +42,67 @@ def build_cleanup_queries(node_schema: CartographyNodeSchema) -> List[str]:
     return result
 
 
+def build_id_set_cleanup_queries(node_schema: CartographyNodeSchema) -> Tuple[str, str]:
+    """
+    Generates the queries of an id-set cleanup of the stale nodes of the given CartographyNodeSchema, an alternative to
+    the first query of build_cleanup_queries() for when the ids of the nodes loaded by the current sync are known.
+    Instead of scanning the nodes attached to the sub resource for stale `lastupdated` values in repeated batches, the
+    ids of the nodes attached to the sub resource are read once, and the ones that were not loaded are deleted by id.
+    :param node_schema: The given CartographyNodeSchema
+    :return: A query that returns the ids of all nodes attached to the sub resource as `id`, and a query that deletes
+    the nodes with ids in $StaleIds that are attached to the sub resource. Nodes that were updated by this sync are
+    never deleted, even if their id is in $StaleIds.
+    """
+    if not node_schema.sub_resource_relationship:
+        raise ValueError(
+            "Auto-creating a cleanup job for a node_schema without a sub resource relationship is not supported. "
+            f'Please check the class definition of "{node_schema.__class__.__name__}".',
+        )
+    _validate_target_node_matcher_for_cleanup_job(node_schema.sub_resource_relationship.target_node_matcher)
+
+    sub_resource_link = _build_sub_resource_link(node_schema.sub_resource_relationship)
+    sub_resource_match = Template(
+        "(:$sub_resource_label{$match_sub_res_clause})",
+    ).safe_substitute(
+        sub_resource_label=node_schema.sub_resource_relationship.target_node_label,
+        match_sub_res_clause=_build_match_clause(node_schema.sub_resource_relationship.target_node_matcher),
+    )
+    list_ids_query = Template(
+        """
+        MATCH (n:$node_label)$sub_resource_link$sub_resource_match
+        RETURN n.id AS id;
+        """,
+    ).safe_substitute(
+        node_label=node_schema.label,
+        sub_resource_link=sub_resource_link,
+        sub_resource_match=sub_resource_match,
+    )
+    delete_query = Template(
+        """
+        UNWIND $$StaleIds AS stale_id
+        MATCH (n:$node_label{id: stale_id})$sub_resource_link$sub_resource_match
+        WHERE n.lastupdated <> $$UPDATE_TAG
+        DETACH DELETE n;
+        """,
+    ).safe_substitute(
+        node_label=node_schema.label,
+        sub_resource_link=sub_resource_link,
+        sub_resource_match=sub_resource_match,
+    )
+    return list_ids_query, delete_query
+
+
+def _build_sub_resource_link(sub_resource_relationship: CartographyRelSchema) -> str:
+    """
+    Draw the given sub resource rel with the correct direction, e.g. `<-[s:RESOURCE]-`.
+    """
+    if sub_resource_relationship.direction == LinkDirection.INWARD:
+        sub_resource_link_template = Template("<-[s:$SubResourceRelLabel]-")
+    else:
+        sub_resource_link_template = Template("-[s:$SubResourceRelLabel]->")
+    return sub_resource_link_template.safe_substitute(SubResourceRelLabel=sub_resource_relationship.rel_label)
+
+
 def _build_cleanup_node_and_rel_queries(
         node_schema: CartographyNodeSchema,
         selected_relationship: CartographyRelSchema,
@@ -68,13 +130,7 @@ def _build_cleanup_node_and_rel_queries(
         )
 
     # Draw sub resource rel with correct direction
-    if node_schema.sub_resource_relationship.direction == LinkDirection.INWARD:
-        sub_resource_link_template = Template("<-[s:$SubResourceRelLabel]-")
-    else:
-        sub_resource_link_template = Template("-[s:$SubResourceRelLabel]->")
-    sub_resource_link = sub_resource_link_template.safe_substitute(
-        SubResourceRelLabel=node_schema.sub_resource_relationship.rel_label,
-    )
+    sub_resource_link = _build_sub_resource_link(node_schema.sub_resource_relationship)
 
     # The cleanup node query must always be before the cleanup rel query
     delete_action_clauses = [
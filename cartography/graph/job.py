@@ -1,24 +1,40 @@
 import json
 import logging
+import os
 import string
+from functools import lru_cache
 from pathlib import Path
 from string import Template
 from typing import Any
 from typing import Dict
+from typing import FrozenSet
 from typing import List
 from typing import Optional
 from typing import Set
+from typing import Tuple
+from typing import Type
 from typing import Union
 
 import neo4j
 
 from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.cleanupbuilder import build_id_set_cleanup_queries
+from cartography.graph.loadedids import pop_loaded_ids
 from cartography.graph.statement import get_job_shortname
 from cartography.graph.statement import GraphStatement
+from cartography.graph.statement import IdSetCleanupStatement
 from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Process-level cache of parsed cleanup statements and their expected parameters, keyed by node schema class.
+# Cartography node schemas are stateless declarations, so the generated cleanup queries for a given class never change.
+_NODE_SCHEMA_CLEANUP_TEMPLATES: Dict[
+    Type[CartographyNodeSchema],
+    Tuple[Tuple[GraphStatement, ...], FrozenSet[str]],
+] = {}
+
 
 def _get_identifiers(template: string.Template) -> List[str]:
     """
@@ -71,35 +87,54 @@ class GraphJob:
     A job that will run against the cartography graph. A job is a sequence of statements which execute sequentially.
     """
 
-    def __init__(self, name: str, statements: List[GraphStatement], short_name: Optional[str] = None):
+    def __init__(
+        self,
+        name: str,
+        statements: List[GraphStatement],
+        short_name: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ):
         # E.g. "Okta intel module cleanup"
         self.name = name
         self.statements: List[GraphStatement] = statements
         # E.g. "okta_import_cleanup"
         self.short_name = short_name
+        # Job-level parameters, bound on top of each statement's own parameters when the job runs. Keeping them here
+        # instead of on the statements lets many jobs share the same (cached) GraphStatement objects.
+        self.parameters: Dict[str, Any] = parameters or {}
 
     def merge_parameters(self, parameters: Dict) -> None:
         """
         Merge parameters for all job statements.
         """
-        for s in self.statements:
-            s.merge_parameters(parameters)
+        tmp = self.parameters.copy()
+        tmp.update(parameters)
+        self.parameters = tmp
 
-    def run(self, neo4j_session: neo4j.Session) -> None:
+    def run(self, neo4j_session: neo4j.Session, parameters: Optional[Dict] = None) -> None:
         """
         Run the job. This will execute all statements sequentially.
+        :param neo4j_session: The Neo4j session
+        :param parameters: Optional per-run parameters, e.g. the common job parameters of the current sync. These are
+        bound at execution time and are not saved on the job, so a cached job template can be run many times.
         """
+        if parameters:
+            bound_parameters = self.parameters.copy()
+            bound_parameters.update(parameters)
+        else:
+            bound_parameters = self.parameters
         logger.debug("Starting job '%s'.", self.name)
-        for stm in self.statements:
-            try:
-                stm.run(neo4j_session)
-            except Exception as e:
-                logger.error(
-                    "Unhandled error while executing statement in job '%s': %s",
-                    self.name,
-                    e,
-                )
-                raise
+        with span(self.short_name or self.name, 'job'):
+            for stm in self.statements:
+                try:
+                    stm.run(neo4j_session, bound_parameters)
+                except Exception as e:
+                    logger.error(
+                        "Unhandled error while executing statement in job '%s': %s",
+                        self.name,
+                        e,
+                    )
+                    raise
         log_msg = f"Finished job {self.short_name}" if self.short_name else f"Finished job {self.name}"
         logger.info(log_msg)
 
@@ -107,9 +142,14 @@ class GraphJob:
         """
         Convert job to a dictionary.
         """
+        statements = []
+        for s in self.statements:
+            statement = s.as_dict()
+            statement["parameters"] = s.bind_parameters(self.parameters)
+            statements.append(statement)
         return {
             "name": self.name,
-            "statements": [s.as_dict() for s in self.statements],
+            "statements": statements,
             "short_name": self.short_name,
         }
 
@@ -133,15 +173,17 @@ class GraphJob:
         Create a cleanup job from a CartographyNodeSchema object.
         For a given node, the fields used in the node_schema.sub_resource_relationship.target_node_node_matcher.keys()
         must be provided as keys and values in the params dict.
+        The generated statements are cached per node schema class and shared between jobs; the given `parameters` are
+        bound to the returned job and only applied to the statements at execution time.
+        If id-set cleanup is enabled (see cartography.graph.loadedids) and ids of the schema were loaded for the sub
+        resource in `parameters`, the stale nodes are deleted by id, see IdSetCleanupStatement.
         """
-        queries: List[str] = build_cleanup_queries(node_schema)
-
-        expected_param_keys: Set[str] = get_parameters(queries)
+        statements, expected_param_keys = _get_node_schema_cleanup_template(node_schema)
         actual_param_keys: Set[str] = set(parameters.keys())
         # Hacky, but LIMIT_SIZE is specified by default in cartography.graph.statement, so we exclude it from validation
         actual_param_keys.add('LIMIT_SIZE')
 
-        missing_params: Set[str] = expected_param_keys - actual_param_keys
+        missing_params: Set[str] = set(expected_param_keys - actual_param_keys)
 
         if missing_params:
             raise ValueError(
@@ -149,14 +191,24 @@ class GraphJob:
                 f'value passed to `parameters`.',
             )
 
-        statements: List[GraphStatement] = [
-            GraphStatement(query, parameters=parameters, iterative=True, iterationsize=100) for query in queries
-        ]
+        job_statements = list(statements)
+        loaded_ids = pop_loaded_ids(node_schema, parameters)
+        if loaded_ids is not None:
+            # The first statement deletes the stale nodes, the others only delete stale relationships.
+            list_ids_query, delete_query = build_id_set_cleanup_queries(node_schema)
+            job_statements[0] = IdSetCleanupStatement(
+                list_ids_query,
+                delete_query,
+                loaded_ids,
+                parent_job_name=node_schema.label,
+                parent_job_sequence_num=1,
+            )
 
         return cls(
             f"Cleanup {node_schema.label}",
-            statements,
+            job_statements,
             node_schema.label,
+            parameters,
         )
 
     @classmethod
@@ -172,6 +224,16 @@ class GraphJob:
         name: str = data["name"]
         return cls(name, statements, job_shortname)
 
+    @classmethod
+    def get_cached_json_file(cls, file_path: Union[str, Path]) -> 'GraphJob':
+        """
+        Same as from_json_file(), but returns a parsed job template shared by every caller in this process. The file is
+        only re-read and re-parsed if its modification time changes. The returned job must be treated as immutable:
+        pass per-run parameters to GraphJob.run() instead of calling merge_parameters() on it.
+        """
+        path = os.fspath(file_path)
+        return _get_json_file_job_template(path, os.stat(path).st_mtime_ns)
+
     @classmethod
     def run_from_json(
         cls, neo4j_session: neo4j.Session, blob: str, parameters: Dict, short_name: Optional[str] = None,
@@ -194,10 +256,8 @@ class GraphJob:
         if not parameters:
             parameters = {}
 
-        job: GraphJob = cls.from_json_file(file_path)
-
-        job.merge_parameters(parameters)
-        job.run(neo4j_session)
+        job: GraphJob = cls.get_cached_json_file(file_path)
+        job.run(neo4j_session, parameters)
 
 
 def _get_statements_from_json(blob: Dict, short_job_name: Optional[str] = None) -> List[GraphStatement]:
@@ -211,3 +271,37 @@ def _get_statements_from_json(blob: Dict, short_job_name: Optional[str] = None)
         statements.append(statement)
 
     return statements
+
+
+@lru_cache(maxsize=None)
+def _get_json_file_job_template(file_path: str, mtime_ns: int) -> GraphJob:
+    """
+    Parse the given job file once per (path, modification time) pair. `mtime_ns` is only used as part of the cache key.
+    """
+    return GraphJob.from_json_file(file_path)
+
+
+def _get_node_schema_cleanup_template(
+        node_schema: CartographyNodeSchema,
+) -> Tuple[Tuple[GraphStatement, ...], FrozenSet[str]]:
+    """
+    Return the cleanup statements and the set of query parameters that they expect for the given node schema, building
+    them with build_cleanup_queries() the first time that the schema class is seen.
+    """
+    schema_type = type(node_schema)
+    template = _NODE_SCHEMA_CLEANUP_TEMPLATES.get(schema_type)
+    if template is None:
+        queries: List[str] = build_cleanup_queries(node_schema)
+        statements = tuple(
+            GraphStatement(
+                query,
+                iterative=True,
+                iterationsize=100,
+                parent_job_name=node_schema.label,
+                parent_job_sequence_num=i + 1,
+            )
+            for i, query in enumerate(queries)
+        )
+        template = (statements, frozenset(get_parameters(queries)))
+        _NODE_SCHEMA_CLEANUP_TEMPLATES[schema_type] = template
+    return template
@@ -0,0 +1,87 @@
+import logging
+import threading
+from dataclasses import asdict
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Type
+
+from cartography.models.core.nodes import CartographyNodeSchema
+
+logger = logging.getLogger(__name__)
+
+# (node schema class, values of the sub resource's TargetNodeMatcher PropertyRefs), e.g.
+# (EC2InstanceSchema, ('123456789012',)).
+LoadedIdsKey = Tuple[Type[CartographyNodeSchema], Tuple[Any, ...]]
+
+_lock = threading.Lock()
+_enabled = False
+_loaded_ids: Dict[LoadedIdsKey, Set[Any]] = {}
+
+
+def set_id_set_cleanup(enabled: bool) -> None:
+    """
+    Set whether cartography.client.core.tx.load() records the ids that it writes, so that the cleanup jobs built with
+    GraphJob.from_node_schema() delete the stale nodes of a sub resource by id instead of scanning all of its nodes for
+    stale `lastupdated` values. Clears the ids recorded so far.
+    """
+    global _enabled
+    with _lock:
+        _enabled = enabled
+        _loaded_ids.clear()
+
+
+def _sub_resource_key(node_schema: CartographyNodeSchema, parameters: Mapping[str, Any]) -> Optional[LoadedIdsKey]:
+    sub_resource_rel = node_schema.sub_resource_relationship
+    if not sub_resource_rel:
+        return None
+    prop_refs = asdict(sub_resource_rel.target_node_matcher).values()
+    if not all(ref.set_in_kwargs and ref.name in parameters for ref in prop_refs):
+        # The sub resource is not the same for all items of the load, so ids cannot be grouped by it.
+        return None
+    return type(node_schema), tuple(parameters[ref.name] for ref in prop_refs)
+
+
+def record_loaded_ids(
+        node_schema: CartographyNodeSchema,
+        dict_list: List[Dict[str, Any]],
+        kwargs: Mapping[str, Any],
+) -> None:
+    """
+    Record the ids of the nodes of the given schema that are being loaded, if id-set cleanup is enabled. Loading the
+    same schema and sub resource several times in a sync, e.g. once per region, adds to the same set of ids.
+    :param node_schema: The CartographyNodeSchema being loaded.
+    :param dict_list: The items being loaded.
+    :param kwargs: The keyword args of the load, which include the sub resource id.
+    """
+    if not _enabled:
+        return
+    key = _sub_resource_key(node_schema, kwargs)
+    if key is None:
+        return
+    id_ref = node_schema.properties.id
+    if id_ref.set_in_kwargs:
+        ids = {kwargs.get(id_ref.name)} if dict_list else set()
+    else:
+        ids = {item.get(id_ref.name) for item in dict_list}
+    with _lock:
+        _loaded_ids.setdefault(key, set()).update(ids)
+
+
+def pop_loaded_ids(node_schema: CartographyNodeSchema, parameters: Mapping[str, Any]) -> Optional[Set[Any]]:
+    """
+    :return: The ids of the nodes of the given schema that were loaded for the sub resource given in `parameters`
+    since id-set cleanup was enabled, and forget them. None if id-set cleanup is disabled or nothing was loaded for
+    the sub resource, in which case the cleanup should fall back to `lastupdated`.
+    """
+    if not _enabled:
+        return None
+    key = _sub_resource_key(node_schema, parameters)
+    if key is None:
+        return None
+    with _lock:
+        return _loaded_ids.pop(key, None)
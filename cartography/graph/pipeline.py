@@ -0,0 +1,180 @@
+import contextvars
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import neo4j
+
+from cartography.client.core.tx import load
+from cartography.client.core.tx import load_graph_data
+from cartography.graph.sessions import can_open_sessions
+from cartography.graph.sessions import open_session
+from cartography.models.core.nodes import CartographyNodeSchema
+
+logger = logging.getLogger(__name__)
+
+# A write of a pipeline: it is called with the session of the writer that runs it.
+Write = Callable[[neo4j.Session], None]
+
+# Number of writes that each writer session can have queued before producers block.
+PENDING_WRITES_PER_WRITER = 2
+
+# Number of writer sessions of the pipelines opened during a sync. With 0, writes run inline in the producer's session.
+_writer_sessions = 0
+
+
+def set_writer_sessions(count: Optional[int]) -> None:
+    """
+    Set the number of Neo4j sessions that write the data of the pipelines opened with open_write_pipeline() while
+    their producers fetch the next data. None or 0 disables pipelining: writes then run inline.
+    """
+    global _writer_sessions
+    _writer_sessions = count or 0
+
+
+class WritePipeline:
+    """
+    Decouples fetching data from writing it to the graph: producers submit writes to a bounded queue, and a pool of
+    writer threads, each with a Neo4j session of its own, runs them. Writes are run in any order and concurrently with
+    each other, so each write must not depend on another write of the pipeline that was not followed by a barrier().
+    The queue is bounded so that producers cannot fetch much further ahead of the writers than the writers can write.
+
+    If a write fails, the writes submitted after it are skipped, and the error is raised to the producer by its next
+    call to submit() or barrier().
+
+    Use open_write_pipeline() rather than creating a WritePipeline directly.
+
+    :type writers: int
+    :param writers: The number of writer sessions.
+    """
+
+    def __init__(self, writers: int):
+        self._queue: 'queue.Queue[Optional[Write]]' = queue.Queue(maxsize=writers * PENDING_WRITES_PER_WRITER)
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._write_forever, name=f'neo4j-writer-{i}', daemon=True) for i in range(writers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _write_forever(self) -> None:
+        try:
+            with open_session() as neo4j_session:
+                while self._write_next(neo4j_session):
+                    pass
+        except BaseException as e:
+            # The session could not be opened: fail the pipeline, and keep draining it so that producers do not block.
+            self._set_error(e)
+            while self._write_next(None):
+                pass
+
+    def _write_next(self, neo4j_session: Optional[neo4j.Session]) -> bool:
+        write = self._queue.get()
+        try:
+            if write is None:
+                return False
+            if self._error is None and neo4j_session is not None:
+                write(neo4j_session)
+        except BaseException as e:
+            logger.warning("A write of the write pipeline failed, skipping the writes that follow it.")
+            self._set_error(e)
+        finally:
+            self._queue.task_done()
+        return True
+
+    def _set_error(self, error: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, write: Write) -> None:
+        """
+        Queue a write, blocking while the queue is full. The write runs in the context of the caller, so that e.g. the
+        queries that it runs are profiled under the caller's query scope.
+        """
+        self._raise_error()
+        context = contextvars.copy_context()
+        self._queue.put(lambda neo4j_session: context.run(write, neo4j_session))
+
+    def submit_load(self, node_schema: CartographyNodeSchema, dict_list: List[Dict[str, Any]], **kwargs: Any) -> None:
+        """
+        Queue a call to cartography.client.core.tx.load().
+        """
+        self.submit(lambda neo4j_session: load(neo4j_session, node_schema, dict_list, **kwargs))
+
+    def submit_query(self, query: str, dict_list: List[Dict[str, Any]], **kwargs: Any) -> None:
+        """
+        Queue a call to cartography.client.core.tx.load_graph_data(), for modules that load with handwritten queries.
+        """
+        self.submit(lambda neo4j_session: load_graph_data(neo4j_session, query, dict_list, **kwargs))
+
+    def barrier(self) -> None:
+        """
+        Wait until all the writes submitted so far are done, e.g. before running the cleanup jobs of the data that they
+        write, or before writes that match on the nodes that they write.
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """
+        Stop the writers once the writes submitted so far are done. Call barrier() first to raise their errors.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class _InlineWritePipeline(WritePipeline):
+    """
+    A WritePipeline that runs each write in the producer's session as soon as it is submitted.
+    """
+
+    def __init__(self, neo4j_session: neo4j.Session):
+        self._neo4j_session = neo4j_session
+
+    def submit(self, write: Write) -> None:
+        write(self._neo4j_session)
+
+    def barrier(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@contextmanager
+def open_write_pipeline(neo4j_session: neo4j.Session) -> Iterator[WritePipeline]:
+    """
+    Open a WritePipeline with the number of writer sessions given to set_writer_sessions(). Leaving the context waits
+    for all of its writes, so cleanup jobs run after the context see all the data written in it. If pipelining is
+    disabled, or a stage function is called directly with a session rather than during a sync, the writes run inline in
+    `neo4j_session` instead.
+    """
+    if _writer_sessions <= 0 or not can_open_sessions():
+        yield _InlineWritePipeline(neo4j_session)
+        return
+
+    pipeline = WritePipeline(_writer_sessions)
+    try:
+        yield pipeline
+        pipeline.barrier()
+    except BaseException:
+        # Do not write the rest of the data of a producer that failed.
+        pipeline._set_error(RuntimeError("The producer of the write pipeline failed."))
+        raise
+    finally:
+        pipeline.close()
@@ -0,0 +1,264 @@
+import argparse
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import neo4j
+
+from cartography.graph.job import get_parameters
+from cartography.graph.job import GraphJob
+from cartography.graph.statement import GraphStatement
+from cartography.util import get_job_template
+
+if sys.version_info >= (3, 7):
+    from importlib.resources import contents
+else:
+    from importlib_resources import contents
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_PACKAGES = (
+    'cartography.data.jobs.analysis',
+    'cartography.data.jobs.cleanup',
+    'cartography.data.jobs.scoped_analysis',
+)
+
+SEVERITY_ERROR = 'error'
+SEVERITY_WARNING = 'warning'
+_SEVERITY_RANK = {SEVERITY_WARNING: 1, SEVERITY_ERROR: 2}
+
+# Operators that read from an index instead of scanning every node with a given label.
+_INDEX_OPERATORS = (
+    'NodeIndexSeek',
+    'NodeUniqueIndexSeek',
+    'NodeIndexSeekByRange',
+    'NodeUniqueIndexSeekByRange',
+    'MultiNodeIndexSeek',
+    'AssertingMultiNodeIndexSeek',
+    'NodeIndexScan',
+    'NodeIndexContainsScan',
+    'NodeIndexEndsWithScan',
+    'DirectedRelationshipIndexSeek',
+    'UndirectedRelationshipIndexSeek',
+    'DirectedRelationshipIndexScan',
+    'UndirectedRelationshipIndexScan',
+    'DirectedRelationshipTypeScan',
+    'UndirectedRelationshipTypeScan',
+    'NodeByIdSeek',
+)
+
+
+@dataclass(frozen=True)
+class PlanFinding:
+    """
+    A plan-hostile operator found in the EXPLAIN plan of a job statement.
+    """
+    job: str
+    sequence_num: int
+    operator: str
+    severity: str
+    query: str
+
+    def __str__(self) -> str:
+        return f'{self.severity.upper()}: {self.job} statement #{self.sequence_num} uses {self.operator}'
+
+
+def _operator_name(plan: Dict[str, Any]) -> str:
+    # Neo4j 4.x suffixes operators with the runtime, e.g. "AllNodesScan@neo4j".
+    return plan.get('operatorType', '').split('@')[0]
+
+
+def _contains_index_operator(plan: Dict[str, Any]) -> bool:
+    if _operator_name(plan) in _INDEX_OPERATORS:
+        return True
+    return any(_contains_index_operator(child) for child in plan.get('children', []))
+
+
+def find_plan_issues(plan: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Walk the given EXPLAIN/PROFILE plan and return a list of (operator, severity) pairs for plan-hostile operators:
+    - AllNodesScan (error): the statement reads every node in the graph.
+    - CartesianProduct (error) unless every side of the product is anchored on an index.
+    - NodeByLabelScan (warning) if the statement does not use an index anywhere.
+    - Eager (warning): the statement materializes its whole intermediate result in memory.
+    :param plan: The plan dict as found on neo4j.ResultSummary.plan or neo4j.ResultSummary.profile.
+    """
+    uses_index = _contains_index_operator(plan)
+    issues: List[Tuple[str, str]] = []
+
+    def visit(node: Dict[str, Any]) -> None:
+        operator = _operator_name(node)
+        children = node.get('children', [])
+        if operator == 'AllNodesScan':
+            issues.append((operator, SEVERITY_ERROR))
+        elif operator == 'CartesianProduct':
+            if not all(_contains_index_operator(child) for child in children):
+                issues.append((operator, SEVERITY_ERROR))
+        elif operator == 'NodeByLabelScan':
+            if not uses_index:
+                issues.append((operator, SEVERITY_WARNING))
+        elif operator.startswith('Eager'):
+            issues.append((operator, SEVERITY_WARNING))
+        for child in children:
+            visit(child)
+
+    visit(plan)
+    return issues
+
+
+def iter_job_statements(
+        packages: Iterable[str] = DEFAULT_JOB_PACKAGES,
+        directories: Iterable[str] = (),
+) -> Iterator[Tuple[str, GraphStatement]]:
+    """
+    Yield (job name, statement) for every statement of every JSON job in the given Python packages and directories.
+    Directories are searched recursively, the same way that cartography.intel.analysis discovers analysis jobs.
+    """
+    for package in packages:
+        for filename in sorted(contents(package)):
+            if not filename.endswith('.json'):
+                continue
+            for statement in get_job_template(package, filename).statements:
+                yield f'{package}/{filename}', statement
+    for directory in directories:
+        for path in sorted(Path(directory).glob('**/*.json')):
+            for statement in GraphJob.from_json_file(path).statements:
+                yield str(path), statement
+
+
+def explain_statement(neo4j_session: neo4j.Session, statement: GraphStatement) -> Dict[str, Any]:
+    """
+    Run `EXPLAIN` for the given statement and return its plan. Nothing is executed against the graph. Query parameters
+    are only needed to compile the query, so they are filled in with placeholder values.
+    """
+    parameters: Dict[str, Any] = {param: None for param in get_parameters([statement.query])}
+    parameters.update(statement.parameters)
+    parameters['LIMIT_SIZE'] = statement.iterationsize or 1
+    summary = neo4j_session.run(f'EXPLAIN {statement.query}', parameters).consume()
+    return summary.plan
+
+
+def check_job_plans(
+        neo4j_session: neo4j.Session,
+        packages: Iterable[str] = DEFAULT_JOB_PACKAGES,
+        directories: Iterable[str] = (),
+) -> List[PlanFinding]:
+    """
+    EXPLAIN every statement of the jobs in the given packages and directories and return the plan-hostile operators
+    found. See find_plan_issues().
+    """
+    findings: List[PlanFinding] = []
+    for job, statement in iter_job_statements(packages, directories):
+        plan = explain_statement(neo4j_session, statement)
+        for operator, severity in find_plan_issues(plan):
+            findings.append(
+                PlanFinding(job, statement.parent_job_sequence_num or 0, operator, severity, statement.query),
+            )
+    return findings
+
+
+def assert_job_plans_ok(
+        neo4j_session: neo4j.Session,
+        packages: Iterable[str] = DEFAULT_JOB_PACKAGES,
+        directories: Iterable[str] = (),
+        fail_on: str = SEVERITY_ERROR,
+) -> None:
+    """
+    Test helper: raise AssertionError listing every finding at or above the `fail_on` severity.
+    """
+    findings = _filter_findings(check_job_plans(neo4j_session, packages, directories), fail_on)
+    if findings:
+        raise AssertionError(
+            'Plan-hostile job statements found:\n' + '\n'.join(f'{f}\n    {f.query}' for f in findings),
+        )
+
+
+def _filter_findings(findings: List[PlanFinding], min_severity: str) -> List[PlanFinding]:
+    return [f for f in findings if _SEVERITY_RANK[f.severity] >= _SEVERITY_RANK[min_severity]]
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='cartography check-job-plans',
+        description=(
+            'Runs EXPLAIN against Neo4j for every statement of the cleanup and analysis jobs shipped with cartography '
+            '(and optionally of your own analysis jobs) and reports statements whose plans scan all nodes, build '
+            'cartesian products, scan whole labels without using an index, or use eager operators. Nothing is '
+            'written to the graph. Run `cartography --selected-modules create-indexes` first so that the plans reflect '
+            'your production indexes.'
+        ),
+    )
+    parser.add_argument(
+        '--neo4j-uri',
+        type=str,
+        default='bolt://localhost:7687',
+        help='A valid Neo4j URI to run EXPLAIN against.',
+    )
+    parser.add_argument(
+        '--neo4j-user',
+        type=str,
+        default=None,
+        help='A username with which to authenticate to Neo4j.',
+    )
+    parser.add_argument(
+        '--neo4j-password-env-var',
+        type=str,
+        default=None,
+        help='The name of an environment variable containing a password with which to authenticate to Neo4j.',
+    )
+    parser.add_argument(
+        '--neo4j-database',
+        type=str,
+        default=None,
+        help='The name of the database in Neo4j to connect to.',
+    )
+    parser.add_argument(
+        '--analysis-job-directory',
+        type=str,
+        default=None,
+        help='A path to a directory containing additional analysis jobs to check, searched recursively.',
+    )
+    parser.add_argument(
+        '--fail-on',
+        type=str,
+        default=SEVERITY_ERROR,
+        choices=[SEVERITY_ERROR, SEVERITY_WARNING, 'never'],
+        help='Exit with a non-zero status if there are findings of at least this severity. Default = error.',
+    )
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    """
+    Entrypoint for the `cartography check-job-plans` subcommand.
+    """
+    config = _build_parser().parse_args(argv)
+    neo4j_auth: Optional[Tuple[str, Optional[str]]] = None
+    if config.neo4j_user:
+        password = os.environ.get(config.neo4j_password_env_var) if config.neo4j_password_env_var else None
+        neo4j_auth = (config.neo4j_user, password)
+    directories = [config.analysis_job_directory] if config.analysis_job_directory else []
+
+    driver = neo4j.GraphDatabase.driver(config.neo4j_uri, auth=neo4j_auth)
+    try:
+        with driver.session(database=config.neo4j_database) as neo4j_session:
+            findings = check_job_plans(neo4j_session, DEFAULT_JOB_PACKAGES, directories)
+    finally:
+        driver.close()
+
+    for finding in findings:
+        print(finding)
+        print(f'    {finding.query}')
+    logger.info('Found %d plan-hostile job statements.', len(findings))
+    if config.fail_on != 'never' and _filter_findings(findings, config.fail_on):
+        return 1
+    return 0
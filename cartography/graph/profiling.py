@@ -0,0 +1,210 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+import neo4j
+
+from cartography.stats import get_stats_client
+
+
+logger = logging.getLogger(__name__)
+stat_handler = get_stats_client(__name__)
+
+# The (name, sequence number) of the job or load operation that the currently executing query belongs to. This lets the
+# read_*_tx helpers and load_graph_data() attribute their queries without changing their signatures.
+_query_scope: ContextVar[Tuple[Optional[str], Optional[int]]] = ContextVar('query_scope', default=(None, None))
+
+_STATSD_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_\-]')
+
+DEFAULT_SLOW_QUERY_THRESHOLD_MS = 1000
+
+
+class QueryProfiler:
+    """
+    Records server timings, row counts and optionally sampled PROFILE plans for queries executed through
+    GraphStatement, cartography.client.core.tx.load_graph_data() and the cartography.client.core.tx.read_*_tx helpers.
+
+    For each query, timings are sent to statsd as timers (if statsd is enabled) and, if a slow query log file is
+    configured, queries that take at least `slow_query_threshold_ms` on the server are written to it as JSON lines.
+    """
+
+    def __init__(
+            self,
+            slow_query_log_path: Optional[str] = None,
+            slow_query_threshold_ms: int = DEFAULT_SLOW_QUERY_THRESHOLD_MS,
+            profile_sample_rate: float = 0.0,
+    ):
+        """
+        :param slow_query_log_path: Optional. The path of a JSON-lines file to append slow queries to.
+        :param slow_query_threshold_ms: Queries that take at least this long (result_available_after +
+        result_consumed_after) are written to the slow query log.
+        :param profile_sample_rate: A float between 0 and 1. This fraction of queries is run with `PROFILE` and their
+        plans, including db hits per operator, are included in the slow query log.
+        """
+        self.slow_query_log_path = slow_query_log_path
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.profile_sample_rate = profile_sample_rate
+        self._lock = threading.Lock()
+        self._log_file: Optional[TextIO] = None
+        if slow_query_log_path:
+            self._log_file = open(slow_query_log_path, 'a', buffering=1)
+
+    def prepare_query(self, query: str) -> str:
+        """
+        :return: The query to send to Neo4j, prefixed with `PROFILE` if this execution was sampled for profiling.
+        """
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate:
+            stripped = query.lstrip()
+            if stripped[:7].upper() not in ('PROFILE', 'EXPLAIN'):
+                return f"PROFILE {stripped}"
+        return query
+
+    def record(
+            self,
+            query: str,
+            summary: neo4j.ResultSummary,
+            rows: Optional[int] = None,
+            name: Optional[str] = None,
+            sequence_num: Optional[int] = None,
+    ) -> None:
+        """
+        Record the execution of the given query.
+        :param query: The query as written by its author, i.e. without any `PROFILE` prefix.
+        :param summary: The ResultSummary of the consumed neo4j.Result.
+        :param rows: The number of rows returned by or sent to the query, if known.
+        :param name: The name of the job or load operation that the query belongs to. Falls back to the current
+        query_scope().
+        :param sequence_num: The 1-based position of the query in its job. Falls back to the current query_scope().
+        """
+        if name is None:
+            name, scope_sequence_num = _query_scope.get()
+            sequence_num = sequence_num if sequence_num is not None else scope_sequence_num
+        available_after = summary.result_available_after or 0
+        consumed_after = summary.result_consumed_after or 0
+        total_ms = available_after + consumed_after
+
+        metric = _to_metric_name(name, sequence_num)
+        stat_handler.timing(f'{metric}.result_available_after', available_after)
+        stat_handler.timing(f'{metric}.result_consumed_after', consumed_after)
+        if rows is not None:
+            stat_handler.incr(f'{metric}.rows', rows)
+
+        if not self._log_file or total_ms < self.slow_query_threshold_ms:
+            return
+
+        entry: Dict[str, Any] = {
+            'timestamp': time.time(),
+            'name': name,
+            'sequence_num': sequence_num,
+            'result_available_after': available_after,
+            'result_consumed_after': consumed_after,
+            'total_ms': total_ms,
+            'rows': rows,
+            'counters': {k: v for k, v in vars(summary.counters).items() if v and not k.startswith('_')},
+            'query': query,
+        }
+        if summary.profile:
+            entry['db_hits'] = _total_db_hits(summary.profile)
+            entry['profile'] = _summarize_plan(summary.profile)
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._log_file.write(line + '\n')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log_file:
+                self._log_file.close()
+                self._log_file = None
+
+
+_query_profiler: Optional[QueryProfiler] = None
+
+
+def set_query_profiler(profiler: Optional[QueryProfiler]) -> None:
+    """
+    Set the process-wide QueryProfiler. Pass None to disable query profiling.
+    """
+    global _query_profiler
+    if _query_profiler and _query_profiler is not profiler:
+        _query_profiler.close()
+    _query_profiler = profiler
+
+
+def get_query_profiler() -> Optional[QueryProfiler]:
+    return _query_profiler
+
+
+def prepare_query(query: str) -> str:
+    """
+    :return: The given query, possibly prefixed with `PROFILE` if query profiling is enabled and this execution was
+    sampled.
+    """
+    if _query_profiler is None:
+        return query
+    return _query_profiler.prepare_query(query)
+
+
+def record_query(
+        query: str,
+        summary: neo4j.ResultSummary,
+        rows: Optional[int] = None,
+        name: Optional[str] = None,
+        sequence_num: Optional[int] = None,
+) -> None:
+    """
+    Record the execution of a query if query profiling is enabled. See QueryProfiler.record().
+    """
+    if _query_profiler is None:
+        return
+    try:
+        _query_profiler.record(query, summary, rows, name, sequence_num)
+    except Exception:
+        # Profiling must never break a sync.
+        logger.warning("Failed to record query profile.", exc_info=True)
+
+
+@contextmanager
+def query_scope(name: str, sequence_num: Optional[int] = None) -> Iterator[None]:
+    """
+    Attribute all queries recorded within this context to the given job or load operation name.
+    """
+    token = _query_scope.set((name, sequence_num))
+    try:
+        yield
+    finally:
+        _query_scope.reset(token)
+
+
+def _to_metric_name(name: Optional[str], sequence_num: Optional[int]) -> str:
+    metric = _STATSD_UNSAFE_CHARS.sub('_', name) if name else 'unnamed'
+    if sequence_num is not None:
+        metric = f'{metric}.{sequence_num}'
+    return metric
+
+
+def _total_db_hits(plan: Dict[str, Any]) -> int:
+    return plan.get('dbHits', 0) + sum(_total_db_hits(child) for child in plan.get('children', []))
+
+
+def _summarize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a PROFILE plan to the fields useful for finding slow operators.
+    """
+    return {
+        'operator': plan.get('operatorType'),
+        'rows': plan.get('rows'),
+        'db_hits': plan.get('dbHits'),
+        'details': plan.get('args', {}).get('Details'),
+        'children': [_summarize_plan(child) for child in plan.get('children', [])],
+    }
@@ -1,4 +1,5 @@
 import logging
+import re
 from dataclasses import asdict
 from string import Template
 from typing import Dict
@@ -47,11 +48,20 @@ def _build_node_properties_statement(
     :return: The resulting Neo4j SET clause to set the given attributes on the node
     """
     ingest_fields_template = Template('i.$node_property = $property_ref')
+    lowercase_fields_template = Template('i.$lowercase_property = toLower($property_ref)')
 
     set_clause = ',\n'.join([
         ingest_fields_template.safe_substitute(node_property=node_property, property_ref=property_ref)
         for node_property, property_ref in node_property_map.items()
         if node_property != 'id'  # The `MERGE` clause will have already set `id`; let's not set it again.
+    ] + [
+        # Maintain the lowercase shadow property that case-insensitive TargetNodeMatchers compare against.
+        lowercase_fields_template.safe_substitute(
+            lowercase_property=lowercase_property_name(node_property),
+            property_ref=property_ref,
+        )
+        for node_property, property_ref in node_property_map.items()
+        if property_ref.ignore_case
     ])
 
     # Set extra labels on the node if specified
@@ -61,6 +71,69 @@ def _build_node_properties_statement(
     return set_clause
 
 
+# The node property that holds the content hash of the item that a node was last fully written from, when
+# build_ingestion_query() is called with skip_unchanged=True, and the field of each item that carries the hash.
+CONTENT_HASH_PROPERTY = 'content_hash'
+CONTENT_HASH_FIELD = '_cartography_content_hash'
+
+# The node properties that change on every sync, and so are left out of content hashes and always written.
+_ALWAYS_SET_NODE_PROPERTIES = {'id', 'lastupdated'}
+
+
+def _build_skip_unchanged_node_properties_statement(
+        node_property_map: Dict[str, PropertyRef],
+        extra_node_labels: Optional[ExtraNodeLabels] = None,
+) -> str:
+    """
+    Generate a Neo4j clause like _build_node_properties_statement(), except that only `lastupdated` is set on nodes
+    whose stored content hash matches the hash of their item. All other properties and labels, and the hash itself, are
+    only set on new nodes and on nodes whose content changed:
+        ```
+        i.lastupdated = $lastupdated
+        FOREACH (_ IN CASE WHEN i.content_hash = item._cartography_content_hash THEN [] ELSE [1] END |
+            SET
+                i.node_prop_1 = item.Prop1,
+                i.content_hash = item._cartography_content_hash
+        )
+        ```
+    The hashes are computed client-side by cartography.client.core.tx.load(), see content_hash_fields().
+    :param node_property_map: Mapping of node attribute names as str to PropertyRef objects
+    :param extra_node_labels: Optional ExtraNodeLabels object to set on the node as string
+    :return: The resulting Neo4j SET clause to set the given attributes on the node
+    """
+    template = Template(
+        """i.lastupdated = $lastupdated
+            FOREACH (_ IN CASE WHEN i.$hash_property = item.$hash_field THEN [] ELSE [1] END |
+                SET
+                    $set_node_properties_statement
+            )""",
+    )
+    changed_property_map = {
+        node_property: property_ref
+        for node_property, property_ref in node_property_map.items()
+        if node_property != 'lastupdated'
+    }
+    changed_property_map[CONTENT_HASH_PROPERTY] = PropertyRef(CONTENT_HASH_FIELD)
+    return template.safe_substitute(
+        lastupdated=node_property_map['lastupdated'],
+        hash_property=CONTENT_HASH_PROPERTY,
+        hash_field=CONTENT_HASH_FIELD,
+        set_node_properties_statement=_build_node_properties_statement(changed_property_map, extra_node_labels),
+    )
+
+
+def content_hash_fields(node_schema: CartographyNodeSchema) -> List[PropertyRef]:
+    """
+    :return: The PropertyRefs whose values make up the content hash of an item of the given node schema: all of the
+    node properties except `id` and `lastupdated`, in a stable order.
+    """
+    return [
+        property_ref
+        for node_property, property_ref in asdict(node_schema.properties).items()
+        if node_property not in _ALWAYS_SET_NODE_PROPERTIES
+    ]
+
+
 def _build_rel_properties_statement(rel_var: str, rel_property_map: Optional[Dict[str, PropertyRef]] = None) -> str:
     """
     Generate a Neo4j clause that sets relationship properties using the given mapping of attribute names to
@@ -109,22 +182,42 @@ def _build_match_clause(matcher: TargetNodeMatcher) -> str:
     return ', '.join(match.safe_substitute(Key=key, PropRef=prop_ref) for key, prop_ref in matcher_asdict.items())
 
 
+def lowercase_property_name(prop_name: str) -> str:
+    """
+    :return: The name of the shadow property holding the lowercased value of the given node property, e.g.
+    `username_lower` for `username`. Case-insensitive TargetNodeMatchers compare against the shadow property so that
+    the match can use an index instead of applying toLower() to every node of the target label.
+    """
+    return f'{prop_name}_lower'
+
+
 def _build_where_clause_for_rel_match(node_var: str, matcher: TargetNodeMatcher) -> str:
     """
     Same as _build_match_clause, but puts the matching logic in a WHERE clause.
-    This is intended specifically to use for joining with relationships where we need a case-insensitive match.
+    This is intended specifically to use for joining with relationships where we need a case-insensitive match: keys
+    with `ignore_case=True` are compared against their lowercase shadow property on the target node, see
+    lowercase_property_name(). Target nodes without the shadow property, i.e. nodes written by handwritten queries or
+    by an older version of cartography, are compared with toLower() instead.
     :param matcher: A TargetNodeMatcher object
     :return: a Neo4j where clause
     """
     match = Template("$node_var.$key = $prop_ref")
-    case_insensitive_match = Template("toLower($node_var.$key) = toLower($prop_ref)")
+    case_insensitive_match = Template(
+        "($node_var.$lowercase_key = toLower($prop_ref) OR\n"
+        "($node_var.$lowercase_key IS NULL AND toLower($node_var.$key) = toLower($prop_ref)))",
+    )
 
     matcher_asdict = asdict(matcher)
 
     result = []
     for key, prop_ref in matcher_asdict.items():
         if prop_ref.ignore_case:
-            prop_line = case_insensitive_match.safe_substitute(node_var=node_var, key=key, prop_ref=prop_ref)
+            prop_line = case_insensitive_match.safe_substitute(
+                node_var=node_var,
+                key=key,
+                lowercase_key=lowercase_property_name(key),
+                prop_ref=prop_ref,
+            )
         else:
             prop_line = match.safe_substitute(node_var=node_var, key=key, prop_ref=prop_ref)
         result.append(prop_line)
@@ -150,7 +243,68 @@ def _asdict_with_validate_relprops(link: CartographyRelSchema) -> Dict[str, Prop
     return rel_props_as_dict
 
 
-def _build_attach_sub_resource_statement(sub_resource_link: Optional[CartographyRelSchema] = None) -> str:
+def _is_kwargs_only_matcher(matcher: TargetNodeMatcher) -> bool:
+    """
+    :return: True if every PropertyRef of the given TargetNodeMatcher is set in kwargs, i.e. if the matcher selects the
+    same target node(s) for every item of $DictList.
+    """
+    return all(prop_ref.set_in_kwargs for prop_ref in asdict(matcher).values())
+
+
+def _get_hoisted_node_vars(
+        sub_resource_relationship: Optional[CartographyRelSchema],
+        other_relationships: Optional[OtherRelationships],
+        hoisted_rels: Set[CartographyRelSchema],
+) -> List[Tuple[str, CartographyRelSchema]]:
+    """
+    :return: The (node variable, relationship) pairs of the relationships in hoisted_rels, using the same node variables
+    as _build_attach_sub_resource_statement() and _build_attach_additional_links_statement().
+    """
+    result = []
+    if sub_resource_relationship and sub_resource_relationship in hoisted_rels:
+        result.append(('j', sub_resource_relationship))
+    if other_relationships:
+        for num, link in enumerate(other_relationships.rels):
+            if link in hoisted_rels:
+                result.append((f'n{num}', link))
+    return result
+
+
+def _build_match_hoisted_targets_statement(hoisted_node_vars: List[Tuple[str, CartographyRelSchema]]) -> str:
+    """
+    Generates the Neo4j statement that matches the target nodes of the given relationships once, before the UNWIND of
+    build_ingestion_query(). Each variable `x` of hoisted_node_vars is bound to a list `x_nodes` of the matched nodes,
+    which is empty if there is no match, so that the statement always returns exactly one row.
+    This is a private function not meant to be called outside of build_ingestion_query().
+    """
+    hoisted_match_template = Template(
+        """
+        OPTIONAL MATCH ($node_var:$TargetLabel)
+        WHERE
+            $WhereClause
+        WITH $carried_vars
+        """,
+    )
+    statements = []
+    carried: List[str] = []
+    for node_var, link in hoisted_node_vars:
+        carried.append(f'collect({node_var}) AS {node_var}_nodes')
+        statements.append(
+            hoisted_match_template.safe_substitute(
+                node_var=node_var,
+                TargetLabel=link.target_node_label,
+                WhereClause=_build_where_clause_for_rel_match(node_var, link.target_node_matcher),
+                carried_vars=', '.join(carried),
+            ),
+        )
+        carried[-1] = f'{node_var}_nodes'
+    return ''.join(statements)
+
+
+def _build_attach_sub_resource_statement(
+        sub_resource_link: Optional[CartographyRelSchema] = None,
+        hoisted: bool = False,
+) -> str:
     """
     Generates a Neo4j statement to attach a sub resource to a node. A 'sub resource' is a term we made up to describe
     billing units of a given resource. For example,
@@ -160,23 +314,37 @@ def _build_attach_sub_resource_statement(sub_resource_link: Optional[Cartography
     - etc.
     This is a private function not meant to be called outside of build_ingest_query().
     :param sub_resource_link: Optional: The CartographyRelSchema object connecting previous node(s) to the sub resource.
+    :param hoisted: If True, the sub resource has already been matched before the UNWIND into the list `j_nodes`, see
+    _build_match_hoisted_targets_statement().
     :return: a Neo4j clause that connects previous node(s) to a sub resource, taking into account the labels, attribute
     keys, and directionality. If sub_resource_link is None, return an empty string.
     """
     if not sub_resource_link:
         return ''
 
-    sub_resource_attach_template = Template(
-        """
-        WITH i, item
-        OPTIONAL MATCH (j:$SubResourceLabel{$MatchClause})
-        WITH i, item, j WHERE j IS NOT NULL
-        $RelMergeClause
-        ON CREATE SET r.firstseen = timestamp()
-        SET
-            $set_rel_properties_statement
-        """,
-    )
+    if hoisted:
+        sub_resource_attach_template = Template(
+            """
+            WITH i, item, j_nodes
+            UNWIND j_nodes AS j
+            $RelMergeClause
+            ON CREATE SET r.firstseen = timestamp()
+            SET
+                $set_rel_properties_statement
+            """,
+        )
+    else:
+        sub_resource_attach_template = Template(
+            """
+            WITH i, item
+            OPTIONAL MATCH (j:$SubResourceLabel{$MatchClause})
+            WITH i, item, j WHERE j IS NOT NULL
+            $RelMergeClause
+            ON CREATE SET r.firstseen = timestamp()
+            SET
+                $set_rel_properties_statement
+            """,
+        )
 
     if sub_resource_link.direction == LinkDirection.INWARD:
         rel_merge_template = Template("""MERGE (i)<-[r:$SubResourceRelLabel]-(j)""")
@@ -199,6 +367,7 @@ def _build_attach_sub_resource_statement(sub_resource_link: Optional[Cartography
 
 def _build_attach_additional_links_statement(
         additional_relationships: Optional[OtherRelationships] = None,
+        hoisted_rels: Optional[Set[CartographyRelSchema]] = None,
 ) -> str:
     """
     Generates a Neo4j statement to attach one or more CartographyRelSchemas to node(s) previously mentioned in the
@@ -206,12 +375,25 @@ def _build_attach_additional_links_statement(
     This is a private function not meant to be called outside of build_ingestion_query().
     :param additional_relationships: Optional list of CartographyRelSchema describing what other relationships should
     be created from the previous node(s) in this query.
+    :param hoisted_rels: Optional set of the relationships whose target nodes have already been matched before the
+    UNWIND, see _build_match_hoisted_targets_statement().
     :return: A Neo4j clause that connects previous node(s) to the given additional_links., taking into account the
     labels, attribute keys, and directionality. If additional_relationships is None, return an empty string.
     """
     if not additional_relationships:
         return ''
 
+    hoisted_links_template = Template(
+        """
+        WITH i, item, ${node_var}_nodes
+        UNWIND ${node_var}_nodes AS $node_var
+        $RelMerge
+        ON CREATE SET $rel_var.firstseen = timestamp()
+        SET
+            $set_rel_properties_statement
+        """,
+    )
+
     additional_links_template = Template(
         """
         WITH i, item
@@ -243,7 +425,8 @@ def _build_attach_additional_links_statement(
 
         rel_props_as_dict = _asdict_with_validate_relprops(link)
 
-        additional_ref = additional_links_template.safe_substitute(
+        template = hoisted_links_template if hoisted_rels and link in hoisted_rels else additional_links_template
+        additional_ref = template.safe_substitute(
             AddlLabel=link.target_node_label,
             WhereClause=_build_where_clause_for_rel_match(node_var, link.target_node_matcher),
             node_var=node_var,
@@ -259,6 +442,7 @@ def _build_attach_additional_links_statement(
 def _build_attach_relationships_statement(
         sub_resource_relationship: Optional[CartographyRelSchema],
         other_relationships: Optional[OtherRelationships],
+        hoisted_rels: Optional[Set[CartographyRelSchema]] = None,
 ) -> str:
     """
     Use Neo4j subqueries to attach sub resource and/or other relationships.
@@ -267,12 +451,18 @@ def _build_attach_relationships_statement(
     For example, if an EC2Instance has attachments to NetworkInterfaces and AWSAccounts, but our data only includes
     EC2Instance to AWSAccount information, structuring the ingestion query with subqueries allows us to build a query
     that will ignore the null relationships and continue to MERGE the ones that exist.
+    The target nodes of the relationships in hoisted_rels are expected to have been matched before the UNWIND, and are
+    carried into the subqueries.
     """
     if not sub_resource_relationship and not other_relationships:
         return ""
 
-    attach_sub_resource_statement = _build_attach_sub_resource_statement(sub_resource_relationship)
-    attach_additional_links_statement = _build_attach_additional_links_statement(other_relationships)
+    hoisted_rels = hoisted_rels or set()
+    attach_sub_resource_statement = _build_attach_sub_resource_statement(
+        sub_resource_relationship,
+        hoisted=sub_resource_relationship in hoisted_rels,
+    )
+    attach_additional_links_statement = _build_attach_additional_links_statement(other_relationships, hoisted_rels)
 
     statements = []
     statements += [attach_sub_resource_statement] if attach_sub_resource_statement else []
@@ -280,15 +470,19 @@ def _build_attach_relationships_statement(
 
     attach_relationships_statement = 'UNION'.join(stmt for stmt in statements)
 
+    hoisted_node_vars = _get_hoisted_node_vars(sub_resource_relationship, other_relationships, hoisted_rels)
     query_template = Template(
         """
-        WITH i, item
+        WITH $carried_vars
         CALL {
             $attach_relationships_statement
         }
         """,
     )
-    return query_template.safe_substitute(attach_relationships_statement=attach_relationships_statement)
+    return query_template.safe_substitute(
+        carried_vars=', '.join(['i', 'item'] + [f'{node_var}_nodes' for node_var, _ in hoisted_node_vars]),
+        attach_relationships_statement=attach_relationships_statement,
+    )
 
 
 def rel_present_on_node_schema(
@@ -349,6 +543,7 @@ def filter_selected_relationships(
 def build_ingestion_query(
         node_schema: CartographyNodeSchema,
         selected_relationships: Optional[Set[CartographyRelSchema]] = None,
+        skip_unchanged: bool = False,
 ) -> str:
     """
     Generates a Neo4j query from the given CartographyNodeSchema to ingest the specified nodes and relationships so that
@@ -360,6 +555,9 @@ def build_ingestion_query(
     If selected_relationships is None (default), then we create a query using all RelSchema specified in
     node_schema.sub_resource_relationship + node_schema.other_relationships.
     If selected_relationships is the empty set, we create a query with no relationship attachments at all.
+    :param skip_unchanged: If True, the query expects every item of $DictList to carry a content hash in the field
+    CONTENT_HASH_FIELD, and only sets `lastupdated` on existing nodes whose stored hash matches it instead of rewriting
+    all of their properties. Relationships are merged as usual. If False, the query removes the stored hash.
     :return: An optimized Neo4j query that can be used to ingest nodes and relationships.
     Important notes:
     - The resulting query uses the UNWIND + MERGE pattern (see
@@ -368,14 +566,18 @@ def build_ingestion_query(
     - The query assumes that a list of dicts will be passed to it through parameter $DictList.
     - The query sets `firstseen` attributes on all the nodes and relationships that it creates.
     - The query is intended to be supplied as input to cartography.core.client.tx.load_graph_data().
+    - Target nodes that are matched only on kwargs, like the sub resource, are the same for every item of $DictList, so
+      they are matched once before the UNWIND instead of once per item.
     """
     query_template = Template(
         """
+        $match_hoisted_targets_statement
         UNWIND $DictList AS item
             MERGE (i:$node_label{id: $dict_id_field})
             ON CREATE SET i.firstseen = timestamp()
             SET
                 $set_node_properties_statement
+            $remove_content_hash_statement
             $attach_relationships_statement
         """,
     )
@@ -389,26 +591,64 @@ def build_ingestion_query(
     if selected_relationships or selected_relationships == set():
         sub_resource_rel, other_rels = filter_selected_relationships(node_schema, selected_relationships)
 
+    # Nodes of the schema's own labels may be created by this very query, so they are always matched per item.
+    node_labels = {node_schema.label}
+    if node_schema.extra_node_labels:
+        node_labels.update(node_schema.extra_node_labels.labels)
+    selected_rels = [sub_resource_rel] if sub_resource_rel else []
+    selected_rels += other_rels.rels if other_rels else []
+    hoisted_rels = {
+        rel for rel in selected_rels
+        if _is_kwargs_only_matcher(rel.target_node_matcher) and rel.target_node_label not in node_labels
+    }
+
     ingest_query = query_template.safe_substitute(
+        match_hoisted_targets_statement=_build_match_hoisted_targets_statement(
+            _get_hoisted_node_vars(sub_resource_rel, other_rels, hoisted_rels),
+        ),
         node_label=node_schema.label,
         dict_id_field=node_props.id,
-        set_node_properties_statement=_build_node_properties_statement(
+        set_node_properties_statement=(
+            _build_skip_unchanged_node_properties_statement if skip_unchanged else _build_node_properties_statement
+        )(
             node_props_as_dict,
             node_schema.extra_node_labels,
         ),
-        attach_relationships_statement=_build_attach_relationships_statement(sub_resource_rel, other_rels),
+        # A full write makes the content hash of an earlier skip_unchanged load stale: drop it, so that a later
+        # skip_unchanged load rewrites the node instead of matching the old hash.
+        remove_content_hash_statement='' if skip_unchanged else f'REMOVE i.{CONTENT_HASH_PROPERTY}',
+        attach_relationships_statement=_build_attach_relationships_statement(
+            sub_resource_rel,
+            other_rels,
+            hoisted_rels,
+        ),
     )
     return ingest_query
 
 
+_INDEX_TEMPLATE = Template('CREATE INDEX IF NOT EXISTS FOR (n:$TargetNodeLabel) ON (n.$TargetAttribute);')
+_UNIQUE_CONSTRAINT_TEMPLATE = Template(
+    'CREATE CONSTRAINT IF NOT EXISTS FOR (n:$TargetNodeLabel) REQUIRE n.$TargetAttribute IS UNIQUE;',
+)
+_INDEX_QUERY = re.compile(r'^CREATE INDEX IF NOT EXISTS FOR \(n:(\w+)\) ON \(n\.(\w+)\);?$')
+_UNIQUE_CONSTRAINT_QUERY = re.compile(
+    r'^CREATE CONSTRAINT IF NOT EXISTS FOR \(n:(\w+)\) REQUIRE n\.(\w+) IS UNIQUE;?$',
+)
+
+
 def build_create_index_queries(node_schema: CartographyNodeSchema) -> List[str]:
     """
     Generate queries to create indexes for the given CartographyNodeSchema and all node types attached to it via its
     relationships.
     :param node_schema: The Cartography node_schema object
-    :return: A list of queries of the form `CREATE INDEX IF NOT EXISTS FOR (n:$TargetNodeLabel) ON (n.$TargetAttribute)`
+    :return: A list of queries of the form
+    `CREATE INDEX IF NOT EXISTS FOR (n:$TargetNodeLabel) ON (n.$TargetAttribute)`, or of the form
+    `CREATE CONSTRAINT IF NOT EXISTS FOR (n:$TargetNodeLabel) REQUIRE n.$TargetAttribute IS UNIQUE` for node properties
+    declared with `PropertyRef(..., unique=True)`.
     """
-    index_template = Template('CREATE INDEX IF NOT EXISTS FOR (n:$TargetNodeLabel) ON (n.$TargetAttribute);')
+    index_template = _INDEX_TEMPLATE
+    node_props_as_dict: Dict[str, PropertyRef] = asdict(node_schema.properties)
+    unique_props = [prop_name for prop_name, prop_ref in node_props_as_dict.items() if prop_ref.unique]
 
     # First ensure an index exists for the node_schema and all extra labels on the `id` and `lastupdated` fields
     result = [
@@ -436,18 +676,64 @@ def build_create_index_queries(node_schema: CartographyNodeSchema) -> List[str]:
         rel_schemas.extend([node_schema.sub_resource_relationship])
     if node_schema.other_relationships:
         rel_schemas.extend(node_schema.other_relationships.rels)
+    # Case-insensitive matches are done on the lowercase shadow property of the target node.
     for rs in rel_schemas:
-        for target_key in asdict(rs.target_node_matcher).keys():
+        for target_key, target_ref in asdict(rs.target_node_matcher).items():
             result.append(
-                index_template.safe_substitute(TargetNodeLabel=rs.target_node_label, TargetAttribute=target_key),
+                index_template.safe_substitute(
+                    TargetNodeLabel=rs.target_node_label,
+                    TargetAttribute=lowercase_property_name(target_key) if target_ref.ignore_case else target_key,
+                ),
             )
 
-    # Now, include extra indexes defined by the module author on the node schema's property refs.
-    node_props_as_dict: Dict[str, PropertyRef] = asdict(node_schema.properties)
+    # Now, include extra indexes defined by the module author on the node schema's property refs, and indexes on the
+    # lowercase shadow properties written for node properties with ignore_case=True.
     result.extend([
         index_template.safe_substitute(
             TargetNodeLabel=node_schema.label,
             TargetAttribute=prop_name,
         ) for prop_name, prop_ref in node_props_as_dict.items() if prop_ref.extra_index
     ])
+    result.extend([
+        index_template.safe_substitute(
+            TargetNodeLabel=node_schema.label,
+            TargetAttribute=lowercase_property_name(prop_name),
+        ) for prop_name, prop_ref in node_props_as_dict.items() if prop_ref.ignore_case
+    ])
+
+    # Finally, replace the indexes on unique properties with uniqueness constraints, which are backed by an index.
+    if unique_props:
+        replaced = {
+            index_template.safe_substitute(TargetNodeLabel=node_schema.label, TargetAttribute=prop_name)
+            for prop_name in unique_props
+        }
+        result = [query for query in result if query not in replaced]
+        result.extend([
+            _UNIQUE_CONSTRAINT_TEMPLATE.safe_substitute(TargetNodeLabel=node_schema.label, TargetAttribute=prop_name)
+            for prop_name in unique_props
+        ])
     return result
+
+
+def parse_create_index_query(query: str) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a query generated by build_create_index_queries() or found in cartography/data/indexes.cypher.
+    :param query: The query
+    :return: A tuple of (node label, property name, whether the query creates a uniqueness constraint), or None if the
+    query is not of one of the forms generated by build_create_index_queries().
+    """
+    query = query.strip()
+    match = _INDEX_QUERY.match(query)
+    if match:
+        return match.group(1), match.group(2), False
+    match = _UNIQUE_CONSTRAINT_QUERY.match(query)
+    if match:
+        return match.group(1), match.group(2), True
+    return None
+
+
+def build_create_index_query(label: str, prop_name: str) -> str:
+    """
+    :return: A query of the form `CREATE INDEX IF NOT EXISTS FOR (n:$TargetNodeLabel) ON (n.$TargetAttribute);`.
+    """
+    return _INDEX_TEMPLATE.safe_substitute(TargetNodeLabel=label, TargetAttribute=prop_name)
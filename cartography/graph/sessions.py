@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from typing import Iterator
+from typing import Optional
+
+import neo4j
+
+_driver: Optional[neo4j.Driver] = None
+_database: Optional[str] = None
+
+
+def set_neo4j_driver(driver: Optional[neo4j.Driver], database: Optional[str] = None) -> None:
+    """
+    Set the Neo4j driver of the running sync, so that sync stages can open additional sessions for work that they run
+    concurrently. Neo4j sessions are not thread-safe, so each worker needs its own. Pass None to unset it.
+    """
+    global _driver, _database
+    _driver = driver
+    _database = database
+
+
+def can_open_sessions() -> bool:
+    """
+    :return: True if open_session() can be used, i.e. a sync is running. False e.g. when a stage function is called
+    directly with a session, in which case the stage should do its work serially in that session.
+    """
+    return _driver is not None
+
+
+@contextmanager
+def open_session() -> Iterator[neo4j.Session]:
+    """
+    Open a new session on the database of the running sync.
+    """
+    if _driver is None:
+        raise RuntimeError("No Neo4j driver is set: open_session() can only be used while a sync is running.")
+    with _driver.session(database=_database) as neo4j_session:
+        yield neo4j_session
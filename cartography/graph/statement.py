@@ -4,11 +4,15 @@ import os
 from pathlib import Path
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Optional
+from typing import Set
 from typing import Union
 
 import neo4j
 
+from cartography.graph.profiling import prepare_query
+from cartography.graph.profiling import record_query
 from cartography.stats import get_stats_client
 
 
@@ -66,14 +70,32 @@ class GraphStatement:
         tmp.update(parameters)
         self.parameters = tmp
 
-    def run(self, session: neo4j.Session) -> None:
+    def bind_parameters(self, parameters: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Return the parameters to execute this statement with, overlaying the given per-run parameters on top of the
+        statement's own. Unlike merge_parameters(), this does not mutate the statement, so a single parsed statement can
+        be shared by many runs (e.g. one per AWS account and region).
+        """
+        if not parameters:
+            bound = self.parameters
+        else:
+            bound = self.parameters.copy()
+            bound.update(parameters)
+        if self.iterative and bound.get("LIMIT_SIZE") != self.iterationsize:
+            bound = {**bound, "LIMIT_SIZE": self.iterationsize}
+        return bound
+
+    def run(self, session: neo4j.Session, parameters: Optional[Dict] = None) -> None:
         """
         Run the statement. This will execute the query against the graph.
+        :param session: The Neo4j session
+        :param parameters: Optional per-run parameters to bind on top of the statement's own parameters.
         """
+        bound_parameters = self.bind_parameters(parameters)
         if self.iterative:
-            self._run_iterative(session)
+            self._run_iterative(session, bound_parameters)
         else:
-            session.write_transaction(self._run_noniterative).consume()
+            session.write_transaction(self._run_noniterative, bound_parameters).consume()
         logger.info(f"Completed {self.parent_job_name} statement #{self.parent_job_sequence_num}")
 
     def as_dict(self) -> Dict[str, Any]:
@@ -87,14 +109,18 @@ class GraphStatement:
             "iterationsize": self.iterationsize,
         }
 
-    def _run_noniterative(self, tx: neo4j.Transaction) -> neo4j.Result:
+    def _run_noniterative(self, tx: neo4j.Transaction, parameters: Optional[Dict] = None) -> neo4j.Result:
         """
         Non-iterative statement execution.
         """
-        result: neo4j.Result = tx.run(self.query, self.parameters)
+        result: neo4j.Result = tx.run(
+            prepare_query(self.query),
+            self.parameters if parameters is None else parameters,
+        )
 
         # Handle stats
         summary: neo4j.ResultSummary = result.consume()
+        record_query(self.query, summary, name=self.parent_job_name, sequence_num=self.parent_job_sequence_num)
         stat_handler.incr('constraints_added', summary.counters.constraints_added)
         stat_handler.incr('constraints_removed', summary.counters.constraints_removed)
         stat_handler.incr('indexes_added', summary.counters.indexes_added)
@@ -109,16 +135,17 @@ class GraphStatement:
 
         return result
 
-    def _run_iterative(self, session: neo4j.Session) -> None:
+    def _run_iterative(self, session: neo4j.Session, parameters: Optional[Dict] = None) -> None:
         """
         Iterative statement execution.
 
         Expects the query to return the total number of records updated.
         """
-        self.parameters["LIMIT_SIZE"] = self.iterationsize
+        if parameters is None:
+            parameters = self.bind_parameters()
 
         while True:
-            result: neo4j.Result = session.write_transaction(self._run_noniterative)
+            result: neo4j.Result = session.write_transaction(self._run_noniterative, parameters)
 
             # Exit if we have finished processing all items
             if not result.consume().counters.contains_updates:
@@ -155,3 +182,61 @@ class GraphStatement:
             data = json.load(json_file)
 
         return cls.create_from_json(data, get_job_shortname(file_path))
+
+
+class IdSetCleanupStatement(GraphStatement):
+    """
+    A statement that deletes the nodes of a sub resource that were not loaded by the current sync, given the set of ids
+    that were. The ids of the nodes attached to the sub resource are read with one query, and the difference is deleted
+    by id in batches, so the nodes of the sub resource are scanned once however many of them are stale. See
+    cartography.graph.cleanupbuilder.build_id_set_cleanup_queries().
+    """
+
+    def __init__(
+            self,
+            list_ids_query: str,
+            delete_query: str,
+            loaded_ids: Set[Any],
+            batch_size: int = 10000,
+            parent_job_name: Optional[str] = None,
+            parent_job_sequence_num: Optional[int] = None,
+    ):
+        super().__init__(
+            delete_query,
+            parent_job_name=parent_job_name,
+            parent_job_sequence_num=parent_job_sequence_num,
+        )
+        self.list_ids_query = list_ids_query
+        self.loaded_ids = loaded_ids
+        self.batch_size = batch_size
+
+    def run(self, session: neo4j.Session, parameters: Optional[Dict] = None) -> None:
+        bound_parameters = self.bind_parameters(parameters)
+        existing_ids: List[Any] = session.read_transaction(self._read_ids, bound_parameters)
+        stale_ids = [node_id for node_id in existing_ids if node_id not in self.loaded_ids]
+        for start in range(0, len(stale_ids), self.batch_size):
+            session.write_transaction(
+                self._run_noniterative,
+                {**bound_parameters, 'StaleIds': stale_ids[start:start + self.batch_size]},
+            ).consume()
+        logger.info(
+            f"Completed {self.parent_job_name} statement #{self.parent_job_sequence_num}: "
+            f"{len(stale_ids)} of {len(existing_ids)} nodes were not loaded by this sync.",
+        )
+
+    def _read_ids(self, tx: neo4j.Transaction, parameters: Dict[str, Any]) -> List[Any]:
+        result: neo4j.Result = tx.run(prepare_query(self.list_ids_query), parameters)
+        ids = [record['id'] for record in result]
+        record_query(
+            self.list_ids_query,
+            result.consume(),
+            name=self.parent_job_name,
+            sequence_num=self.parent_job_sequence_num,
+        )
+        return ids
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "list_ids_query": self.list_ids_query,
+        }
@@ -5,6 +5,7 @@ from typing import Any
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Tuple
 
 import boto3
 import botocore.exceptions
@@ -13,14 +14,20 @@ import neo4j
 from . import ec2
 from . import organizations
 from .resources import RESOURCE_FUNCTIONS
+from cartography.checkpoint import is_unit_complete
+from cartography.checkpoint import mark_unit_complete
 from cartography.config import Config
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
+from cartography.intel.aws.util.fetchcache import instrument_boto3_session
 from cartography.stats import get_stats_client
+from cartography.tracing import span
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_analysis_and_ensure_deps
 from cartography.util import run_analysis_job
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
+from cartography.workqueue import get_work_queue
+from cartography.workqueue import run_work_units
 
 
 stat_handler = get_stats_client(__name__)
@@ -61,7 +68,7 @@ def _sync_one_account(
         if func_name in RESOURCE_FUNCTIONS:
             # Skip permission relationships and tags for now because they rely on data already being in the graph
             if func_name not in ['permission_relationships', 'resourcegroupstaggingapi']:
-                RESOURCE_FUNCTIONS[func_name](**sync_args)
+                _sync_resource(func_name, current_aws_account_id, sync_args)
             else:
                 continue
         else:
@@ -69,11 +76,11 @@ def _sync_one_account(
 
     # MAP IAM permissions
     if 'permission_relationships' in aws_requested_syncs:
-        RESOURCE_FUNCTIONS['permission_relationships'](**sync_args)
+        _sync_resource('permission_relationships', current_aws_account_id, sync_args)
 
     # AWS Tags - Must always be last.
     if 'resourcegroupstaggingapi' in aws_requested_syncs:
-        RESOURCE_FUNCTIONS['resourcegroupstaggingapi'](**sync_args)
+        _sync_resource('resourcegroupstaggingapi', current_aws_account_id, sync_args)
 
     run_analysis_job(
         'aws_ec2_iaminstanceprofile.json',
@@ -97,6 +104,23 @@ def _sync_one_account(
     )
 
 
+def _sync_resource(func_name: str, current_aws_account_id: str, sync_args: Dict[str, Any]) -> None:
+    """
+    Run the sync function of the given AWS resource for the current account, unless it was completed by a previous run
+    of the sync being resumed.
+    """
+    if is_unit_complete('aws', current_aws_account_id, func_name):
+        logger.info(
+            "Skipping '%s' for AWS account %s, it was completed by a previous run.",
+            func_name,
+            current_aws_account_id,
+        )
+        return
+    with span(func_name, 'resource'):
+        RESOURCE_FUNCTIONS[func_name](**sync_args)
+    mark_unit_complete('aws', current_aws_account_id, func_name)
+
+
 def _autodiscover_account_regions(boto3_session: boto3.session.Session, account_id: str) -> List[str]:
     regions: List[str] = []
     try:
@@ -138,6 +162,37 @@ def _autodiscover_accounts(
         logger.warning(f"The current account ({account_id}) doesn't have enough permissions to perform autodiscovery.")
 
 
+def _sync_account(
+    neo4j_session: neo4j.Session,
+    profile_name: str,
+    account_id: str,
+    num_accounts: int,
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_requested_syncs: List[str],
+) -> None:
+    logger.info("Syncing AWS account with ID '%s' using configured profile '%s'.", account_id, profile_name)
+    common_job_parameters["AWS_ID"] = account_id
+    if num_accounts == 1:
+        # Use the default boto3 session because boto3 gets confused if you give it a profile name with 1 account
+        boto3_session = boto3.Session()
+    else:
+        boto3_session = boto3.Session(profile_name=profile_name)
+    instrument_boto3_session(boto3_session, account_id)
+
+    with span(account_id, 'account', profile=profile_name):
+        _autodiscover_accounts(neo4j_session, boto3_session, account_id, sync_tag, common_job_parameters)
+
+        _sync_one_account(
+            neo4j_session,
+            boto3_session,
+            account_id,
+            sync_tag,
+            common_job_parameters,
+            aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
+        )
+
+
 def _sync_multiple_accounts(
     neo4j_session: neo4j.Session,
     accounts: Dict[str, str],
@@ -154,48 +209,65 @@ def _sync_multiple_accounts(
 
     num_accounts = len(accounts)
 
-    for profile_name, account_id in accounts.items():
-        logger.info("Syncing AWS account with ID '%s' using configured profile '%s'.", account_id, profile_name)
-        common_job_parameters["AWS_ID"] = account_id
-        if num_accounts == 1:
-            # Use the default boto3 session because boto3 gets confused if you give it a profile name with 1 account
-            boto3_session = boto3.Session()
-        else:
-            boto3_session = boto3.Session(profile_name=profile_name)
-
-        _autodiscover_accounts(neo4j_session, boto3_session, account_id, sync_tag, common_job_parameters)
-
-        try:
-            _sync_one_account(
-                neo4j_session,
-                boto3_session,
-                account_id,
-                sync_tag,
-                common_job_parameters,
-                aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
+    queue = get_work_queue()
+    if queue is not None:
+        if aws_best_effort_mode:
+            logger.warning(
+                "aws-best-effort-mode is ignored with a work queue: failed accounts are retried and fail the sync.",
             )
-        except Exception as e:
-            if aws_best_effort_mode:
-                timestamp = datetime.datetime.now()
-                failed_account_ids.append(account_id)
-                exception_traceback = traceback.TracebackException.from_exception(e)
-                traceback_string = ''.join(exception_traceback.format())
-                exception_tracebacks.append(f'{timestamp} - Exception for account ID: {account_id}\n{traceback_string}')
-                logger.warning(
-                    f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are continuing "
-                    f"on to the next AWS account. All exceptions will be aggregated and re-logged at the end of the "
-                    f"sync.",
-                    exc_info=True,
-                )
+        # Let the workers of the distributed sync run the accounts, and help them until all of them are done.
+        queue.publish(
+            sync_tag,
+            [
+                (('aws', account_id), {'profile_name': profile_name, 'num_accounts': num_accounts})
+                for profile_name, account_id in accounts.items()
+            ],
+        )
+        run_work_units(
+            queue,
+            sync_tag,
+            ('aws',),
+            lambda claimed: _sync_account(
+                neo4j_session, claimed.payload['profile_name'], claimed.unit[1], claimed.payload['num_accounts'],
+                sync_tag, common_job_parameters, aws_requested_syncs,
+            ),
+        )
+    else:
+        for profile_name, account_id in accounts.items():
+            if is_unit_complete('aws', account_id):
+                logger.info("Skipping AWS account with ID '%s', it was completed by a previous run.", account_id)
                 continue
-            else:
-                raise
+            try:
+                _sync_account(
+                    neo4j_session, profile_name, account_id, num_accounts, sync_tag, common_job_parameters,
+                    aws_requested_syncs,
+                )
+                mark_unit_complete('aws', account_id)
+            except Exception as e:
+                if aws_best_effort_mode:
+                    timestamp = datetime.datetime.now()
+                    failed_account_ids.append(account_id)
+                    exception_traceback = traceback.TracebackException.from_exception(e)
+                    traceback_string = ''.join(exception_traceback.format())
+                    exception_tracebacks.append(
+                        f'{timestamp} - Exception for account ID: {account_id}\n{traceback_string}',
+                    )
+                    logger.warning(
+                        f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are "
+                        f"continuing on to the next AWS account. All exceptions will be aggregated and re-logged at "
+                        f"the end of the sync.",
+                        exc_info=True,
+                    )
+                    continue
+                else:
+                    raise
 
     if failed_account_ids:
         logger.error(f'AWS sync failed for accounts {failed_account_ids}')
         raise Exception('\n'.join(exception_tracebacks))
 
-    del common_job_parameters["AWS_ID"]
+    # AWS_ID is not set if every account was skipped because a previous run completed it.
+    common_job_parameters.pop("AWS_ID", None)
 
     # There may be orphan Principals which point outside of known AWS accounts. This job cleans
     # up those nodes after all AWS accounts have been synced.
@@ -252,14 +324,26 @@ def _perform_aws_analysis(
     )
 
 
-@timeit
-def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
-    common_job_parameters = {
+def _build_common_job_parameters(config: Config) -> Dict[str, Any]:
+    return {
         "UPDATE_TAG": config.update_tag,
         "permission_relationships_file": config.permission_relationships_file,
+        "aws_tags_single_pass": config.aws_tags_single_pass,
     }
+
+
+def _get_requested_syncs(config: Config) -> List[str]:
+    if config.aws_requested_syncs:
+        return parse_and_validate_aws_requested_syncs(config.aws_requested_syncs)
+    return list(RESOURCE_FUNCTIONS.keys())
+
+
+@timeit
+def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
+    common_job_parameters = _build_common_job_parameters(config)
     try:
         boto3_session = boto3.Session()
+        instrument_boto3_session(boto3_session)
     except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
         logger.debug("Error occurred calling boto3.Session().", exc_info=True)
         logger.error(
@@ -291,9 +375,7 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
             ),
         )
 
-    requested_syncs: List[str] = list(RESOURCE_FUNCTIONS.keys())
-    if config.aws_requested_syncs:
-        requested_syncs = parse_and_validate_aws_requested_syncs(config.aws_requested_syncs)
+    requested_syncs = _get_requested_syncs(config)
 
     sync_successful = _sync_multiple_accounts(
         neo4j_session,
@@ -306,3 +388,22 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
 
     if sync_successful:
         _perform_aws_analysis(requested_syncs, neo4j_session, common_job_parameters)
+
+
+def run_work_unit(neo4j_session: neo4j.Session, config: Config, unit: Tuple[str, ...], payload: Dict[str, Any]) -> None:
+    """
+    Sync one AWS account published to the work queue by the aws stage of a distributed sync. The worker running it must
+    be configured like the coordinator, e.g. with the same --aws-requested-syncs and AWS profiles.
+    :param unit: ('aws', account_id)
+    :param payload: The AWS profile of the account, and the number of accounts of the sync.
+    """
+    _, account_id = unit
+    _sync_account(
+        neo4j_session,
+        payload['profile_name'],
+        account_id,
+        payload['num_accounts'],
+        config.update_tag,
+        _build_common_job_parameters(config),
+        _get_requested_syncs(config),
+    )
@@ -1,3 +1,4 @@
+import functools
 import logging
 import time
 from collections import namedtuple
@@ -10,6 +11,7 @@ import neo4j
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.graph.pipeline import open_write_pipeline
 from cartography.intel.aws.ec2.util import get_botocore_config
 from cartography.models.aws.ec2.instances import EC2InstanceSchema
 from cartography.models.aws.ec2.keypairs import EC2KeyPairSchema
@@ -319,21 +321,25 @@ def sync_ec2_instances(
         update_tag: int,
         common_job_parameters: Dict[str, Any],
 ) -> None:
-    for region in regions:
-        logger.info("Syncing EC2 instances for region '%s' in account '%s'.", region, current_aws_account_id)
-        reservations = get_ec2_instances(boto3_session, region)
-        ec2_data = transform_ec2_instances(reservations, region, current_aws_account_id)
-        load_ec2_instance_data(
-            neo4j_session,
-            region,
-            current_aws_account_id,
-            update_tag,
-            ec2_data.reservation_list,
-            ec2_data.instance_list,
-            ec2_data.subnet_list,
-            ec2_data.sg_list,
-            ec2_data.keypair_list,
-            ec2_data.network_interface_list,
-            ec2_data.instance_ebs_volumes_list,
-        )
+    # The instances of a region are written while the next region is fetched.
+    with open_write_pipeline(neo4j_session) as pipeline:
+        for region in regions:
+            logger.info("Syncing EC2 instances for region '%s' in account '%s'.", region, current_aws_account_id)
+            reservations = get_ec2_instances(boto3_session, region)
+            ec2_data = transform_ec2_instances(reservations, region, current_aws_account_id)
+            pipeline.submit(
+                functools.partial(
+                    load_ec2_instance_data,
+                    region=region,
+                    current_aws_account_id=current_aws_account_id,
+                    update_tag=update_tag,
+                    reservation_list=ec2_data.reservation_list,
+                    instance_list=ec2_data.instance_list,
+                    subnet_list=ec2_data.subnet_list,
+                    sg_list=ec2_data.sg_list,
+                    key_pair_list=ec2_data.keypair_list,
+                    nic_list=ec2_data.network_interface_list,
+                    ebs_volumes_list=ec2_data.instance_ebs_volumes_list,
+                ),
+            )
     cleanup(neo4j_session, common_job_parameters)
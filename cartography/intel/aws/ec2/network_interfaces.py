@@ -1,3 +1,4 @@
+import functools
 import logging
 import re
 from collections import namedtuple
@@ -11,6 +12,7 @@ import neo4j
 from .util import get_botocore_config
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.graph.pipeline import open_write_pipeline
 from cartography.models.aws.ec2.networkinterfaces import EC2NetworkInterfaceSchema
 from cartography.models.aws.ec2.privateip_networkinterface import EC2PrivateIpNetworkInterfaceSchema
 from cartography.models.aws.ec2.securitygroup_networkinterface import EC2SecurityGroupNetworkInterfaceSchema
@@ -238,18 +240,24 @@ def sync_network_interfaces(
         update_tag: int,
         common_job_parameters: Dict,
 ) -> None:
-    for region in regions:
-        logger.info(f"Syncing EC2 network interfaces for region '{region}' in account '{current_aws_account_id}'.")
-        data = get_network_interface_data(boto3_session, region)
-        ec2_network_data = transform_network_interface_data(data, region)
-        load_network_data(
-            neo4j_session,
-            region,
-            current_aws_account_id,
-            update_tag,
-            ec2_network_data.network_interface_list,
-            ec2_network_data.private_ip_list,
-            ec2_network_data.subnet_list,
-            ec2_network_data.sg_list,
-        )
+    # The network interfaces of a region are written while the next region is fetched.
+    with open_write_pipeline(neo4j_session) as pipeline:
+        for region in regions:
+            logger.info(
+                f"Syncing EC2 network interfaces for region '{region}' in account '{current_aws_account_id}'.",
+            )
+            data = get_network_interface_data(boto3_session, region)
+            ec2_network_data = transform_network_interface_data(data, region)
+            pipeline.submit(
+                functools.partial(
+                    load_network_data,
+                    region=region,
+                    current_aws_account_id=current_aws_account_id,
+                    update_tag=update_tag,
+                    network_interface_list=ec2_network_data.network_interface_list,
+                    private_ip_list=ec2_network_data.private_ip_list,
+                    subnet_list=ec2_network_data.subnet_list,
+                    sg_list=ec2_network_data.sg_list,
+                ),
+            )
     cleanup_network_interfaces(neo4j_session, common_job_parameters)
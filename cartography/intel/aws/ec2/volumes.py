@@ -1,3 +1,4 @@
+import functools
 import logging
 from typing import Any
 from typing import Dict
@@ -8,6 +9,7 @@ import neo4j
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.graph.pipeline import open_write_pipeline
 from cartography.intel.aws.util.arns import build_arn
 from cartography.models.aws.ec2.volumes import EBSVolumeSchema
 from cartography.util import aws_handle_regions
@@ -95,9 +97,19 @@ def sync_ebs_volumes(
         update_tag: int,
         common_job_parameters: Dict[str, Any],
 ) -> None:
-    for region in regions:
-        logger.debug("Syncing volumes for region '%s' in account '%s'.", region, current_aws_account_id)
-        data = get_volumes(boto3_session, region)
-        transformed_data = transform_volumes(data, region, current_aws_account_id)
-        load_volumes(neo4j_session, transformed_data, region, current_aws_account_id, update_tag)
+    # The volumes of a region are written while the next region is fetched.
+    with open_write_pipeline(neo4j_session) as pipeline:
+        for region in regions:
+            logger.debug("Syncing volumes for region '%s' in account '%s'.", region, current_aws_account_id)
+            data = get_volumes(boto3_session, region)
+            transformed_data = transform_volumes(data, region, current_aws_account_id)
+            pipeline.submit(
+                functools.partial(
+                    load_volumes,
+                    ebs_data=transformed_data,
+                    region=region,
+                    current_aws_account_id=current_aws_account_id,
+                    update_tag=update_tag,
+                ),
+            )
     cleanup_volumes(neo4j_session, common_job_parameters)
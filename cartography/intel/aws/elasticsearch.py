@@ -8,7 +8,7 @@ import botocore.config
 import neo4j
 from policyuniverse.policy import Policy
 
-from cartography.intel.dns import ingest_dns_record_by_fqdn
+from cartography.intel.dns import ingest_dns_records_by_fqdn
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -95,33 +95,32 @@ def _load_es_domains(
         aws_update_tag=aws_update_tag,
     )
 
+    _link_es_domains_to_dns(neo4j_session, domain_list, aws_update_tag)
     for domain in domain_list:
         domain_id = domain["DomainId"]
-        _link_es_domains_to_dns(neo4j_session, domain_id, domain, aws_update_tag)
         _link_es_domain_vpc(neo4j_session, domain_id, domain, aws_update_tag)
         _process_access_policy(neo4j_session, domain_id, domain)
 
 
 @timeit
-def _link_es_domains_to_dns(
-    neo4j_session: neo4j.Session, domain_id: str, domain_data: Dict, aws_update_tag: int,
-) -> None:
+def _link_es_domains_to_dns(neo4j_session: neo4j.Session, domain_list: List[Dict], aws_update_tag: int) -> None:
     """
-    Link the ES domain to its DNS FQDN endpoint and create associated nodes in the graph
-    if needed
+    Link the ES domains to their DNS FQDN endpoints and create associated nodes in the graph
+    if needed. The endpoints are resolved concurrently.
 
     :param neo4j_session: Neo4j session object
-    :param domain_id: ES domain id
-    :param domain_data: domain data
+    :param domain_list: domain data of the ES domains
     """
     # TODO add support for endpoints to this method
-    if domain_data.get("Endpoint"):
-        ingest_dns_record_by_fqdn(
-            neo4j_session, aws_update_tag, domain_data["Endpoint"], domain_id,
-            record_label="ESDomain", dns_node_additional_label="AWSDNSRecord",
-        )
-    else:
-        logger.debug(f"No es endpoint data for domain id {domain_id}")
+    records = []
+    for domain in domain_list:
+        if domain.get("Endpoint"):
+            records.append((domain["Endpoint"], domain["DomainId"]))
+        else:
+            logger.debug(f"No es endpoint data for domain id {domain['DomainId']}")
+    ingest_dns_records_by_fqdn(
+        neo4j_session, aws_update_tag, records, record_label="ESDomain", dns_node_additional_label="AWSDNSRecord",
+    )
 
 
 @timeit
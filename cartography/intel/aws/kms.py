@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import Any
@@ -14,11 +15,17 @@ from botocore.exceptions import ClientError
 from policyuniverse.policy import Policy
 
 from cartography.util import aws_handle_regions
+from cartography.util import batch
+from cartography.util import is_throttling_exception
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
+from cartography.util import to_asynchronous
+from cartography.util import to_synchronous
 
 logger = logging.getLogger(__name__)
 
+GRANT_BATCH_SIZE = 1000
+
 
 @timeit
 @aws_handle_regions
@@ -29,17 +36,23 @@ def get_kms_key_list(boto3_session: boto3.session.Session, region: str) -> List[
     for page in paginator.paginate():
         key_list.extend(page['Keys'])
 
-    described_key_list = []
-    for key in key_list:
-        try:
-            response = client.describe_key(KeyId=key["KeyId"])['KeyMetadata']
-        except ClientError as e:
-            logger.warning("Failed to describe key with key id - {}. Error - {}".format(key["KeyId"], e))
-            continue
+    # Keys are described concurrently, with backoff on throttling errors.
+    described_keys = to_synchronous(*[to_asynchronous(describe_key, key, client) for key in key_list])
+    return [described_key for described_key in described_keys if described_key is not None]
 
-        described_key_list.append(response)
 
-    return described_key_list
+@timeit
+def describe_key(key: Dict, client: botocore.client.BaseClient) -> Optional[Dict]:
+    """
+    Gets the KMS Key metadata. Returns None if the key cannot be described.
+    """
+    try:
+        return client.describe_key(KeyId=key["KeyId"])['KeyMetadata']
+    except ClientError as e:
+        if is_throttling_exception(e):
+            raise
+        logger.warning("Failed to describe key with key id - {}. Error - {}".format(key["KeyId"], e))
+        return None
 
 
 @timeit
@@ -48,14 +61,22 @@ def get_kms_key_details(
     boto3_session: boto3.session.Session, kms_key_data: Dict, region: str,
 ) -> Generator[Any, Any, Any]:
     """
-    Iterates over all KMS Keys.
+    Iterates over all KMS Keys. Yields key id, policy, aliases and grants of each key, fetched concurrently.
     """
     client = boto3_session.client('kms', region_name=region)
-    for key in kms_key_data:
-        policy = get_policy(key, client)
-        aliases = get_aliases(key, client)
-        grants = get_grants(key, client)
-        yield key['KeyId'], policy, aliases, grants
+
+    KeyDetail = Tuple[str, Any, List[Any], List[Any]]
+
+    async def _get_key_detail(key: Dict[str, Any]) -> KeyDetail:
+        policy, aliases, grants = await asyncio.gather(
+            to_asynchronous(get_policy, key, client),
+            to_asynchronous(get_aliases, key, client),
+            to_asynchronous(get_grants, key, client),
+        )
+        return key['KeyId'], policy, aliases, grants
+
+    key_details = to_synchronous(*[_get_key_detail(key) for key in kms_key_data])
+    yield from key_details
 
 
 @timeit
@@ -159,11 +180,12 @@ def _load_kms_key_grants(neo4j_session: neo4j.Session, grants_list: List[Dict],
     for grant in grants_list:
         grant['CreationDate'] = str(grant['CreationDate'])
 
-    neo4j_session.run(
-        ingest_grants,
-        grants=grants_list,
-        UpdateTag=update_tag,
-    )
+    for grants_batch in batch(grants_list, size=GRANT_BATCH_SIZE):
+        neo4j_session.run(
+            ingest_grants,
+            grants=grants_batch,
+            UpdateTag=update_tag,
+        )
 
 
 @timeit
@@ -216,7 +238,7 @@ def load_kms_key_details(
             policies.append(parsed_policy)
         if len(alias) > 0:
             aliases.extend(alias)
-        if len(grants) > 0:
+        if len(grant) > 0:
             grants.extend(grant)
 
     # cleanup existing policy properties
@@ -5,6 +5,7 @@ import boto3
 import botocore.exceptions
 import neo4j
 
+from cartography.intel.aws.util.fetchcache import instrument_boto3_session
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
@@ -48,6 +49,7 @@ def get_aws_accounts_from_botocore_config(boto3_session: boto3.session.Session)
             continue
         try:
             profile_boto3_session = boto3.Session(profile_name=profile_name)
+            instrument_boto3_session(profile_boto3_session)
         except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
             logger.debug("Error occurred calling boto3.Session() with profile_name '%s'.", profile_name, exc_info=True)
             logger.error(
@@ -1,19 +1,31 @@
 import logging
+import re
+import time
 from string import Template
+from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Set
 
 import boto3
 import neo4j
 
 from cartography.intel.aws.iam import get_role_tags
 from cartography.util import aws_handle_regions
-from cartography.util import batch
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+# Initial, minimum and maximum number of TAGGED relationships or AWSTag nodes written per transaction, and the duration
+# of a transaction that the batch size is adapted to.
+TAG_BATCH_SIZE = 1000
+TAG_BATCH_SIZE_MIN = 100
+TAG_BATCH_SIZE_MAX = 10000
+TAG_BATCH_TARGET_SECONDS = 1.0
+
 
 def get_short_id_from_ec2_arn(arn: str) -> str:
     """
@@ -140,43 +152,134 @@ def get_tags(boto3_session: boto3.session.Session, resource_type: str, region: s
     return resources
 
 
-def _load_tags_tx(
+@timeit
+@aws_handle_regions
+def get_tags_for_all_resources(boto3_session: boto3.session.Session, region: str) -> List[Dict]:
+    """
+    Retrieve the tag data of all tagged resources of the region, whatever their resource type, in a single scan.
+    """
+    client = boto3_session.client('resourcegroupstaggingapi', region_name=region)
+    paginator = client.get_paginator('get_resources')
+    resources: List[Dict] = []
+    for page in paginator.paginate():
+        resources.extend(page['ResourceTagMappingList'])
+    return resources
+
+
+def _load_tagged_relationships_tx(
     tx: neo4j.Transaction,
-    tag_data: Dict,
-    resource_type: str,
-    region: str,
+    relationships: List[Dict],
+    resource_label: str,
+    resource_property: str,
     current_aws_account_id: str,
     aws_update_tag: int,
-) -> None:
-    INGEST_TAG_TEMPLATE = Template("""
-    UNWIND $TagData as tag_mapping
-        UNWIND tag_mapping.Tags as input_tag
-            MATCH
-            (a:AWSAccount{id:$Account})-[res:RESOURCE]->(resource:$resource_label{$property:tag_mapping.resource_id})
-            MERGE
-            (aws_tag:AWSTag:Tag{id:input_tag.Key + ":" + input_tag.Value})
-            ON CREATE SET aws_tag.firstseen = timestamp()
-
-            SET aws_tag.lastupdated = $UpdateTag,
-            aws_tag.key = input_tag.Key,
-            aws_tag.value =  input_tag.Value,
-            aws_tag.region = $Region
-
-            MERGE (resource)-[r:TAGGED]->(aws_tag)
-            SET r.lastupdated = $UpdateTag,
-            r.firstseen = timestamp()
+) -> List[str]:
+    INGEST_TAGGED_TEMPLATE = Template("""
+    UNWIND $Relationships as rel
+        MATCH (:AWSAccount{id:$Account})-[:RESOURCE]->(resource:$resource_label{$property:rel.resource_id})
+        MERGE (aws_tag:AWSTag:Tag{id:rel.tag_id})
+        ON CREATE SET aws_tag.firstseen = timestamp()
+        MERGE (resource)-[r:TAGGED]->(aws_tag)
+        ON CREATE SET r.firstseen = timestamp()
+        SET r.lastupdated = $UpdateTag
+        RETURN DISTINCT aws_tag.id AS tag_id
     """)
-    query = INGEST_TAG_TEMPLATE.safe_substitute(
-        resource_label=TAG_RESOURCE_TYPE_MAPPINGS[resource_type]['label'],
-        property=TAG_RESOURCE_TYPE_MAPPINGS[resource_type]['property'],
-    )
-    tx.run(
+    query = INGEST_TAGGED_TEMPLATE.safe_substitute(resource_label=resource_label, property=resource_property)
+    result = tx.run(
         query,
-        TagData=tag_data,
+        Relationships=relationships,
         UpdateTag=aws_update_tag,
-        Region=region,
         Account=current_aws_account_id,
     )
+    return [record['tag_id'] for record in result]
+
+
+def _load_tag_properties_tx(tx: neo4j.Transaction, tags: List[Dict], region: str, aws_update_tag: int) -> List[str]:
+    ingest_tags = """
+    UNWIND $Tags as tag
+        MATCH (aws_tag:AWSTag{id:tag.id})
+        SET aws_tag.lastupdated = $UpdateTag,
+        aws_tag.key = tag.key,
+        aws_tag.value = tag.value,
+        aws_tag.region = $Region
+    """
+    tx.run(ingest_tags, Tags=tags, UpdateTag=aws_update_tag, Region=region)
+    return []
+
+
+def _write_in_adaptive_batches(
+    neo4j_session: neo4j.Session,
+    tx_func: Callable[..., List[Any]],
+    items: List[Any],
+    **kwargs: Any,
+) -> List[Any]:
+    """
+    Write `items` with `tx_func` in one transaction per batch. The batch size starts at TAG_BATCH_SIZE and is doubled
+    while batches take less than half of TAG_BATCH_TARGET_SECONDS and halved while they take more than twice as long,
+    within TAG_BATCH_SIZE_MIN and TAG_BATCH_SIZE_MAX.
+    :return: The concatenated results of the `tx_func` calls.
+    """
+    results: List[Any] = []
+    size = TAG_BATCH_SIZE
+    start = 0
+    while start < len(items):
+        items_batch = items[start:start + size]
+        started_at = time.monotonic()
+        results.extend(neo4j_session.write_transaction(tx_func, items_batch, **kwargs))
+        elapsed = time.monotonic() - started_at
+        start += len(items_batch)
+        if elapsed < TAG_BATCH_TARGET_SECONDS / 2:
+            size = min(size * 2, TAG_BATCH_SIZE_MAX)
+        elif elapsed > TAG_BATCH_TARGET_SECONDS * 2:
+            size = max(size // 2, TAG_BATCH_SIZE_MIN)
+    return results
+
+
+@timeit
+def load_tag_mappings(
+    neo4j_session: neo4j.Session,
+    tag_data_by_resource_type: Dict[str, List[Dict]],
+    region: str,
+    current_aws_account_id: str,
+    aws_update_tag: int,
+    tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
+) -> None:
+    """
+    Load the transformed tag mappings of several resource types. The TAGGED relationships are written per resource
+    label, and then the properties of every distinct AWSTag that was attached to a resource are set once, however many
+    resources share it.
+    :param tag_data_by_resource_type: resource type -> tag mappings, with `resource_id` set by transform_tags()
+    """
+    tags: Dict[str, Dict] = {}
+    loaded_tag_ids: Set[str] = set()
+    for resource_type, tag_data in tag_data_by_resource_type.items():
+        relationships = []
+        for tag_mapping in tag_data:
+            for input_tag in tag_mapping['Tags']:
+                tag_id = f"{input_tag['Key']}:{input_tag['Value']}"
+                tags.setdefault(tag_id, {'id': tag_id, 'key': input_tag['Key'], 'value': input_tag['Value']})
+                relationships.append({'resource_id': tag_mapping['resource_id'], 'tag_id': tag_id})
+        if not relationships:
+            continue
+        logger.debug(f"Loading {len(relationships)} TAGGED relationships for resource type {resource_type}")
+        loaded_tag_ids.update(
+            _write_in_adaptive_batches(
+                neo4j_session,
+                _load_tagged_relationships_tx,
+                relationships,
+                resource_label=tag_resource_type_mappings[resource_type]['label'],
+                resource_property=tag_resource_type_mappings[resource_type]['property'],
+                current_aws_account_id=current_aws_account_id,
+                aws_update_tag=aws_update_tag,
+            ),
+        )
+    _write_in_adaptive_batches(
+        neo4j_session,
+        _load_tag_properties_tx,
+        [tags[tag_id] for tag_id in sorted(loaded_tag_ids)],
+        region=region,
+        aws_update_tag=aws_update_tag,
+    )
 
 
 @timeit
@@ -188,15 +291,13 @@ def load_tags(
     current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    for tag_data_batch in batch(tag_data, size=100):
-        neo4j_session.write_transaction(
-            _load_tags_tx,
-            tag_data=tag_data_batch,
-            resource_type=resource_type,
-            region=region,
-            current_aws_account_id=current_aws_account_id,
-            aws_update_tag=aws_update_tag,
-        )
+    load_tag_mappings(
+        neo4j_session,
+        {resource_type: tag_data},  # type: ignore
+        region,
+        current_aws_account_id,
+        aws_update_tag,
+    )
 
 
 @timeit
@@ -213,11 +314,86 @@ def compute_resource_id(tag_mapping: Dict, resource_type: str) -> str:
     return resource_id
 
 
+def get_resource_type_from_arn(
+    arn: str, tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
+) -> Optional[str]:
+    """
+    Return the key of `tag_resource_type_mappings` that the resource with the given ARN belongs to, or None if the
+    resource type is not supported.
+    For example, for "arn:aws:ec2:us-east-1:test_account:instance/i-1337", return 'ec2:instance', and for
+    "arn:aws:elasticloadbalancing:us-east-1:test_account:loadbalancer/app/foo/ab123", return
+    'elasticloadbalancing:loadbalancer/app'.
+    :param arn: The ARN
+    :return: The resource type
+    """
+    parts = arn.split(':', 5)
+    if len(parts) < 6:
+        return None
+    service, resource = parts[2], parts[5]
+    segments = re.split('[/:]', resource)
+    candidates = []
+    if len(segments) > 1:
+        candidates.append(f"{service}:{segments[0]}/{segments[1]}")
+    candidates.extend([f"{service}:{segments[0]}", service])
+    for candidate in candidates:
+        if candidate in tag_resource_type_mappings:
+            return candidate
+    return None
+
+
+@timeit
+def route_tag_mappings(
+    tag_data: List[Dict], tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
+) -> Dict[str, List[Dict]]:
+    """
+    Group the tag mappings returned by an unfiltered get_tags_for_all_resources() by their resource type, and set
+    their `resource_id`. Mappings of unsupported resource types are dropped.
+    """
+    tag_data_by_resource_type: Dict[str, List[Dict]] = {}
+    for tag_mapping in tag_data:
+        resource_type = get_resource_type_from_arn(tag_mapping['ResourceARN'], tag_resource_type_mappings)
+        if resource_type is None:
+            continue
+        tag_mapping['resource_id'] = compute_resource_id(tag_mapping, resource_type)
+        tag_data_by_resource_type.setdefault(resource_type, []).append(tag_mapping)
+    return tag_data_by_resource_type
+
+
 @timeit
 def cleanup(neo4j_session: neo4j.Session, common_job_parameters: Dict) -> None:
     run_cleanup_job('aws_import_tags_cleanup.json', neo4j_session, common_job_parameters)
 
 
+def _sync_single_pass(
+    neo4j_session: neo4j.Session,
+    boto3_session: boto3.session.Session,
+    regions: List[str],
+    current_aws_account_id: str,
+    update_tag: int,
+    tag_resource_type_mappings: Dict,
+) -> None:
+    role_tags = None
+    for region in regions:
+        logger.info(f"Syncing AWS tags for account {current_aws_account_id} and region {region} in a single pass")
+        tag_data_by_resource_type = route_tag_mappings(
+            get_tags_for_all_resources(boto3_session, region), tag_resource_type_mappings,
+        )
+        if 'iam:role' in tag_resource_type_mappings:
+            # IAM roles are global, and not supported by the resourcegroupstaggingapi, so fetch their tags only once.
+            if role_tags is None:
+                role_tags = get_tags(boto3_session, 'iam:role', region)
+                transform_tags(role_tags, 'iam:role')  # type: ignore
+            tag_data_by_resource_type['iam:role'] = role_tags
+        load_tag_mappings(
+            neo4j_session,
+            tag_data_by_resource_type,
+            region,
+            current_aws_account_id,
+            update_tag,
+            tag_resource_type_mappings,
+        )
+
+
 @timeit
 def sync(
     neo4j_session: neo4j.Session,
@@ -228,18 +404,23 @@ def sync(
     common_job_parameters: Dict,
     tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
 ) -> None:
-    for region in regions:
-        logger.info(f"Syncing AWS tags for account {current_aws_account_id} and region {region}")
-        for resource_type in tag_resource_type_mappings.keys():
-            tag_data = get_tags(boto3_session, resource_type, region)
-            transform_tags(tag_data, resource_type)  # type: ignore
-            logger.info(f"Loading {len(tag_data)} tags for resource type {resource_type}")
-            load_tags(
-                neo4j_session=neo4j_session,
-                tag_data=tag_data,  # type: ignore
-                resource_type=resource_type,
-                region=region,
-                current_aws_account_id=current_aws_account_id,
-                aws_update_tag=update_tag,
-            )
+    if common_job_parameters.get('aws_tags_single_pass'):
+        _sync_single_pass(
+            neo4j_session, boto3_session, regions, current_aws_account_id, update_tag, tag_resource_type_mappings,
+        )
+    else:
+        for region in regions:
+            logger.info(f"Syncing AWS tags for account {current_aws_account_id} and region {region}")
+            for resource_type in tag_resource_type_mappings.keys():
+                tag_data = get_tags(boto3_session, resource_type, region)
+                transform_tags(tag_data, resource_type)  # type: ignore
+                logger.info(f"Loading {len(tag_data)} tags for resource type {resource_type}")
+                load_tags(
+                    neo4j_session=neo4j_session,
+                    tag_data=tag_data,  # type: ignore
+                    resource_type=resource_type,
+                    region=region,
+                    current_aws_account_id=current_aws_account_id,
+                    aws_update_tag=update_tag,
+                )
     cleanup(neo4j_session, common_job_parameters)
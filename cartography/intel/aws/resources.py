@@ -1,89 +1,56 @@
+from typing import Callable
 from typing import Dict
 
-from . import apigateway
-from . import config
-from . import dynamodb
-from . import ecr
-from . import ecs
-from . import eks
-from . import elasticache
-from . import elasticsearch
-from . import emr
-from . import iam
-from . import inspector
-from . import kms
-from . import lambda_function
-from . import permission_relationships
-from . import rds
-from . import redshift
-from . import resourcegroupstaggingapi
-from . import route53
-from . import s3
-from . import secretsmanager
-from . import securityhub
-from . import sqs
-from . import ssm
-from .ec2.auto_scaling_groups import sync_ec2_auto_scaling_groups
-from .ec2.elastic_ip_addresses import sync_elastic_ip_addresses
-from .ec2.images import sync_ec2_images
-from .ec2.instances import sync_ec2_instances
-from .ec2.internet_gateways import sync_internet_gateways
-from .ec2.key_pairs import sync_ec2_key_pairs
-from .ec2.launch_templates import sync_ec2_launch_templates
-from .ec2.load_balancer_v2s import sync_load_balancer_v2s
-from .ec2.load_balancers import sync_load_balancers
-from .ec2.network_interfaces import sync_network_interfaces
-from .ec2.reserved_instances import sync_ec2_reserved_instances
-from .ec2.security_groups import sync_ec2_security_groupinfo
-from .ec2.snapshots import sync_ebs_snapshots
-from .ec2.subnets import sync_subnets
-from .ec2.tgw import sync_transit_gateways
-from .ec2.volumes import sync_ebs_volumes
-from .ec2.vpc import sync_vpc
-from .ec2.vpc_peerings import sync_vpc_peerings
+from cartography.registry import LazyEntryPoint
 
-RESOURCE_FUNCTIONS: Dict = {
-    'iam': iam.sync,
-    's3': s3.sync,
-    'dynamodb': dynamodb.sync,
-    'ec2:launch_templates': sync_ec2_launch_templates,
-    'ec2:autoscalinggroup': sync_ec2_auto_scaling_groups,
+# Sync functions are imported when they are called, so that a sync of a few AWS resources does not import the modules
+# of all of them.
+RESOURCE_FUNCTIONS: Dict[str, Callable] = {
+    'iam': LazyEntryPoint('cartography.intel.aws.iam:sync'),
+    's3': LazyEntryPoint('cartography.intel.aws.s3:sync'),
+    'dynamodb': LazyEntryPoint('cartography.intel.aws.dynamodb:sync'),
+    'ec2:launch_templates': LazyEntryPoint('cartography.intel.aws.ec2.launch_templates:sync_ec2_launch_templates'),
+    'ec2:autoscalinggroup': LazyEntryPoint(
+        'cartography.intel.aws.ec2.auto_scaling_groups:sync_ec2_auto_scaling_groups',
+    ),
     # `ec2:instance` must be included before `ssm` and `ec2:images`,
     # they rely on EC2Instance data provided by this module.
-    'ec2:instance': sync_ec2_instances,
-    'ec2:images': sync_ec2_images,
-    'ec2:keypair': sync_ec2_key_pairs,
-    'ec2:load_balancer': sync_load_balancers,
-    'ec2:load_balancer_v2': sync_load_balancer_v2s,
-    'ec2:network_interface': sync_network_interfaces,
-    'ec2:security_group': sync_ec2_security_groupinfo,
-    'ec2:subnet': sync_subnets,
-    'ec2:tgw': sync_transit_gateways,
-    'ec2:vpc': sync_vpc,
-    'ec2:vpc_peering': sync_vpc_peerings,
-    'ec2:internet_gateway': sync_internet_gateways,
-    'ec2:reserved_instances': sync_ec2_reserved_instances,
-    'ec2:volumes': sync_ebs_volumes,
-    'ec2:snapshots': sync_ebs_snapshots,
-    'ecr': ecr.sync,
-    'ecs': ecs.sync,
-    'eks': eks.sync,
-    'elasticache': elasticache.sync,
-    'elastic_ip_addresses': sync_elastic_ip_addresses,
-    'emr': emr.sync,
-    'lambda_function': lambda_function.sync,
-    'kms': kms.sync,
-    'rds': rds.sync,
-    'redshift': redshift.sync,
-    'route53': route53.sync,
-    'elasticsearch': elasticsearch.sync,
-    'permission_relationships': permission_relationships.sync,
-    'resourcegroupstaggingapi': resourcegroupstaggingapi.sync,
-    'apigateway': apigateway.sync,
-    'secretsmanager': secretsmanager.sync,
-    'securityhub': securityhub.sync,
-    'sqs': sqs.sync,
-    'ssm': ssm.sync,
-    'inspector': inspector.sync,
-    'config': config.sync,
+    'ec2:instance': LazyEntryPoint('cartography.intel.aws.ec2.instances:sync_ec2_instances'),
+    'ec2:images': LazyEntryPoint('cartography.intel.aws.ec2.images:sync_ec2_images'),
+    'ec2:keypair': LazyEntryPoint('cartography.intel.aws.ec2.key_pairs:sync_ec2_key_pairs'),
+    'ec2:load_balancer': LazyEntryPoint('cartography.intel.aws.ec2.load_balancers:sync_load_balancers'),
+    'ec2:load_balancer_v2': LazyEntryPoint('cartography.intel.aws.ec2.load_balancer_v2s:sync_load_balancer_v2s'),
+    'ec2:network_interface': LazyEntryPoint('cartography.intel.aws.ec2.network_interfaces:sync_network_interfaces'),
+    'ec2:security_group': LazyEntryPoint('cartography.intel.aws.ec2.security_groups:sync_ec2_security_groupinfo'),
+    'ec2:subnet': LazyEntryPoint('cartography.intel.aws.ec2.subnets:sync_subnets'),
+    'ec2:tgw': LazyEntryPoint('cartography.intel.aws.ec2.tgw:sync_transit_gateways'),
+    'ec2:vpc': LazyEntryPoint('cartography.intel.aws.ec2.vpc:sync_vpc'),
+    'ec2:vpc_peering': LazyEntryPoint('cartography.intel.aws.ec2.vpc_peerings:sync_vpc_peerings'),
+    'ec2:internet_gateway': LazyEntryPoint('cartography.intel.aws.ec2.internet_gateways:sync_internet_gateways'),
+    'ec2:reserved_instances': LazyEntryPoint(
+        'cartography.intel.aws.ec2.reserved_instances:sync_ec2_reserved_instances',
+    ),
+    'ec2:volumes': LazyEntryPoint('cartography.intel.aws.ec2.volumes:sync_ebs_volumes'),
+    'ec2:snapshots': LazyEntryPoint('cartography.intel.aws.ec2.snapshots:sync_ebs_snapshots'),
+    'ecr': LazyEntryPoint('cartography.intel.aws.ecr:sync'),
+    'ecs': LazyEntryPoint('cartography.intel.aws.ecs:sync'),
+    'eks': LazyEntryPoint('cartography.intel.aws.eks:sync'),
+    'elasticache': LazyEntryPoint('cartography.intel.aws.elasticache:sync'),
+    'elastic_ip_addresses': LazyEntryPoint('cartography.intel.aws.ec2.elastic_ip_addresses:sync_elastic_ip_addresses'),
+    'emr': LazyEntryPoint('cartography.intel.aws.emr:sync'),
+    'lambda_function': LazyEntryPoint('cartography.intel.aws.lambda_function:sync'),
+    'kms': LazyEntryPoint('cartography.intel.aws.kms:sync'),
+    'rds': LazyEntryPoint('cartography.intel.aws.rds:sync'),
+    'redshift': LazyEntryPoint('cartography.intel.aws.redshift:sync'),
+    'route53': LazyEntryPoint('cartography.intel.aws.route53:sync'),
+    'elasticsearch': LazyEntryPoint('cartography.intel.aws.elasticsearch:sync'),
+    'permission_relationships': LazyEntryPoint('cartography.intel.aws.permission_relationships:sync'),
+    'resourcegroupstaggingapi': LazyEntryPoint('cartography.intel.aws.resourcegroupstaggingapi:sync'),
+    'apigateway': LazyEntryPoint('cartography.intel.aws.apigateway:sync'),
+    'secretsmanager': LazyEntryPoint('cartography.intel.aws.secretsmanager:sync'),
+    'securityhub': LazyEntryPoint('cartography.intel.aws.securityhub:sync'),
+    'sqs': LazyEntryPoint('cartography.intel.aws.sqs:sync'),
+    'ssm': LazyEntryPoint('cartography.intel.aws.ssm:sync'),
+    'inspector': LazyEntryPoint('cartography.intel.aws.inspector:sync'),
+    'config': LazyEntryPoint('cartography.intel.aws.config:sync'),
 }
@@ -1,5 +1,11 @@
 import logging
+from collections import deque
+from itertools import islice
+from typing import Awaitable
+from typing import Deque
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -8,50 +14,85 @@ import boto3
 import botocore
 import neo4j
 
+from cartography.util import batch
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
+from cartography.util import to_asynchronous
+from cartography.util import to_synchronous
 
 logger = logging.getLogger(__name__)
 
 
+# Number of hosted zones whose record sets are fetched concurrently. ListResourceRecordSets is limited to 5 requests
+# per second per account, so keep this below that.
+ZONE_FETCH_WORKERS = 4
+# Number of records loaded or linked per transaction.
+RECORD_BATCH_SIZE = 1000
+
+
 @timeit
-def link_aws_resources(neo4j_session: neo4j.Session, update_tag: int) -> None:
-    # find records that point to other records
-    link_records = """
-    MATCH (n:AWSDNSRecord) WITH n MATCH (v:AWSDNSRecord{value: n.name})
-    WHERE NOT n = v
-    MERGE (v)-[p:DNS_POINTS_TO]->(n)
-    ON CREATE SET p.firstseen = timestamp()
-    SET p.lastupdated = $update_tag
+def link_aws_resources(neo4j_session: neo4j.Session, records: List[Dict], update_tag: int) -> None:
+    """
+    Link the given records, which were just loaded, to the records, load balancers and EC2 instances that they point
+    to, and link the records that point to them. Only the given records are joined, rather than every AWSDNSRecord in
+    the graph, so each account's sync only does work proportional to its own records.
+    :param records: Dicts with the `id`, `name` and `value` of the records.
+    """
+    # find records that point to the given records
+    link_records_to = """
+    UNWIND $records AS record
+        MATCH (n:AWSDNSRecord{id: record.id})
+        MATCH (v:AWSDNSRecord{value: record.name})
+        WHERE NOT n = v
+        MERGE (v)-[p:DNS_POINTS_TO]->(n)
+        ON CREATE SET p.firstseen = timestamp()
+        SET p.lastupdated = $update_tag
+    """
+
+    # find records that the given records point to
+    link_records_from = """
+    UNWIND $records AS record
+        MATCH (v:AWSDNSRecord{id: record.id})
+        MATCH (n:AWSDNSRecord{name: record.value})
+        WHERE NOT n = v
+        MERGE (v)-[p:DNS_POINTS_TO]->(n)
+        ON CREATE SET p.firstseen = timestamp()
+        SET p.lastupdated = $update_tag
     """
-    neo4j_session.run(link_records, update_tag=update_tag)
 
     # find records that point to AWS LoadBalancers
     link_elb = """
-    MATCH (n:AWSDNSRecord) WITH n MATCH (l:LoadBalancer{dnsname: n.value})
-    MERGE (n)-[p:DNS_POINTS_TO]->(l)
-    ON CREATE SET p.firstseen = timestamp()
-    SET p.lastupdated = $update_tag
+    UNWIND $records AS record
+        MATCH (n:AWSDNSRecord{id: record.id})
+        MATCH (l:LoadBalancer{dnsname: record.value})
+        MERGE (n)-[p:DNS_POINTS_TO]->(l)
+        ON CREATE SET p.firstseen = timestamp()
+        SET p.lastupdated = $update_tag
     """
-    neo4j_session.run(link_elb, update_tag=update_tag)
 
     # find records that point to AWS LoadBalancersV2
     link_elbv2 = """
-    MATCH (n:AWSDNSRecord) WITH n MATCH (l:LoadBalancerV2{dnsname: n.value})
-    MERGE (n)-[p:DNS_POINTS_TO]->(l)
-    ON CREATE SET p.firstseen = timestamp()
-    SET p.lastupdated = $update_tag
+    UNWIND $records AS record
+        MATCH (n:AWSDNSRecord{id: record.id})
+        MATCH (l:LoadBalancerV2{dnsname: record.value})
+        MERGE (n)-[p:DNS_POINTS_TO]->(l)
+        ON CREATE SET p.firstseen = timestamp()
+        SET p.lastupdated = $update_tag
     """
-    neo4j_session.run(link_elbv2, update_tag=update_tag)
 
     # find records that point to AWS EC2 Instances
     link_ec2 = """
-    MATCH (n:AWSDNSRecord) WITH n MATCH (e:EC2Instance{publicdnsname: n.value})
-    MERGE (n)-[p:DNS_POINTS_TO]->(e)
-    ON CREATE SET p.firstseen = timestamp()
-    SET p.lastupdated = $update_tag
+    UNWIND $records AS record
+        MATCH (n:AWSDNSRecord{id: record.id})
+        MATCH (e:EC2Instance{publicdnsname: record.value})
+        MERGE (n)-[p:DNS_POINTS_TO]->(e)
+        ON CREATE SET p.firstseen = timestamp()
+        SET p.lastupdated = $update_tag
     """
-    neo4j_session.run(link_ec2, update_tag=update_tag)
+
+    for query in (link_records_to, link_records_from, link_elb, link_elbv2, link_ec2):
+        for records_batch in batch(records, size=RECORD_BATCH_SIZE):
+            neo4j_session.run(query, records=records_batch, update_tag=update_tag)
 
 
 @timeit
@@ -328,7 +369,7 @@ def transform_zone(zone: Dict) -> Dict:
 
 @timeit
 def load_dns_details(
-    neo4j_session: neo4j.Session, dns_details: List[Tuple[Dict, List[Dict]]], current_aws_id: str,
+    neo4j_session: neo4j.Session, dns_details: Iterable[Tuple[Dict, List[Dict]]], current_aws_id: str,
     update_tag: int,
 ) -> None:
     """
@@ -337,11 +378,21 @@ def load_dns_details(
     (:AWSDNSZone)--(:NameServer),
     (:AWSDNSRecord{type:"NS"})-[:DNS_POINTS_TO]->(:NameServer),
     (:AWSDNSRecord)-[:DNS_POINTS_TO]->(:AWSDNSRecord).
+    Zones are loaded as they come from `dns_details`, which may be a generator such as get_zones(). A, ALIAS and CNAME
+    records are loaded in batches of RECORD_BATCH_SIZE across zones.
     """
+    loaders = {'A': load_a_records, 'ALIAS': load_alias_records, 'CNAME': load_cname_records}
+    pending_records: Dict[str, List[Dict]] = {record_type: [] for record_type in loaders}
+    # The id, name and value of every record loaded, to link them once all of them are loaded.
+    loaded_records: List[Dict] = []
+
+    def flush(min_size: int) -> None:
+        for record_type, records in pending_records.items():
+            if records and len(records) >= min_size:
+                loaders[record_type](neo4j_session, records, update_tag)
+                pending_records[record_type] = []
+
     for zone, zone_record_sets in dns_details:
-        zone_a_records = []
-        zone_alias_records = []
-        zone_cname_records = []
         zone_ns_records = []
         parsed_zone = transform_zone(zone)
 
@@ -351,27 +402,20 @@ def load_dns_details(
             if record_set['Type'] == 'A' or record_set['Type'] == 'CNAME':
                 record = transform_record_set(record_set, zone['Id'], record_set['Name'][:-1])
 
-                if record['type'] == 'A':
-                    zone_a_records.append(record)
-                elif record['type'] == 'ALIAS':
-                    zone_alias_records.append(record)
-                elif record['type'] == 'CNAME':
-                    zone_cname_records.append(record)
+                pending_records[record['type']].append(record)
+                loaded_records.append({'id': record['id'], 'name': record['name'], 'value': record['value']})
 
             if record_set['Type'] == 'NS':
                 record = transform_ns_record_set(record_set, zone['Id'])
-                zone_ns_records.append(record)
-        if zone_a_records:
-            load_a_records(neo4j_session, zone_a_records, update_tag)
-
-        if zone_alias_records:
-            load_alias_records(neo4j_session, zone_alias_records, update_tag)
-
-        if zone_cname_records:
-            load_cname_records(neo4j_session, zone_cname_records, update_tag)
+                if record:
+                    zone_ns_records.append(record)
+                    # NS records are loaded with their name as their value.
+                    loaded_records.append({'id': record['id'], 'name': record['name'], 'value': record['name']})
+        flush(RECORD_BATCH_SIZE)
         if zone_ns_records:
             load_ns_records(neo4j_session, zone_ns_records, parsed_zone['name'][:-1], update_tag)
-    link_aws_resources(neo4j_session, update_tag)
+    flush(1)
+    link_aws_resources(neo4j_session, loaded_records, update_tag)
 
 
 @timeit
@@ -385,17 +429,33 @@ def get_zone_record_sets(client: botocore.client.BaseClient, zone_id: str) -> Li
 
 
 @timeit
-def get_zones(client: botocore.client.BaseClient) -> List[Tuple[Dict, List[Dict]]]:
+def get_hosted_zones(client: botocore.client.BaseClient) -> List[Dict]:
     paginator = client.get_paginator('list_hosted_zones')
     hosted_zones: List[Dict] = []
     for page in paginator.paginate():
         hosted_zones.extend(page['HostedZones'])
+    return hosted_zones
 
-    results: List[Tuple[Dict, List[Dict]]] = []
-    for hosted_zone in hosted_zones:
-        record_sets = get_zone_record_sets(client, hosted_zone['Id'])
-        results.append((hosted_zone, record_sets))
-    return results
+
+def get_zones(
+    client: botocore.client.BaseClient, max_workers: int = ZONE_FETCH_WORKERS,
+) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    Yield every hosted zone with its record sets. The record sets of up to `max_workers` zones are fetched
+    concurrently, with backoff on throttling errors, and are held in memory until their zone is yielded, so that zones
+    can be loaded while the next ones are fetched.
+    """
+    hosted_zones = get_hosted_zones(client)
+    zones = iter(hosted_zones)
+    pending: Deque[Tuple[Dict, Awaitable[List[Dict]]]] = deque()
+    for hosted_zone in islice(zones, max_workers):
+        pending.append((hosted_zone, to_asynchronous(get_zone_record_sets, client, hosted_zone['Id'])))
+    while pending:
+        hosted_zone, future = pending.popleft()
+        record_sets = to_synchronous(future)[0]
+        for next_zone in islice(zones, 1):
+            pending.append((next_zone, to_asynchronous(get_zone_record_sets, client, next_zone['Id'])))
+        yield hosted_zone, record_sets
 
 
 def _create_dns_record_id(zoneid: str, name: str, record_type: str) -> str:
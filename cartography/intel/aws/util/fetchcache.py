@@ -0,0 +1,78 @@
+import logging
+from functools import partial
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.awsrequest import HTTPHeaders
+
+from cartography.fetchcache import call_digest
+from cartography.fetchcache import FetchCache
+from cartography.fetchcache import FetchKey
+from cartography.fetchcache import get_fetch_cache
+
+logger = logging.getLogger(__name__)
+
+_CALL_CONTEXT_KEY = 'cartography_fetch_call'
+
+
+def instrument_boto3_session(boto3_session: boto3.session.Session, account_id: Optional[str] = None) -> None:
+    """
+    Route the API calls of all clients created from the given session through the process-wide FetchCache, if one is
+    set: their responses are either recorded to it or replayed from it. This must be called before any client is
+    created from the session.
+
+    :param boto3_session: The session.
+    :param account_id: The AWS account of the session. Defaults to the profile name of the session, for the sessions
+    used to find out which accounts to sync.
+    """
+    cache = get_fetch_cache()
+    if cache is None:
+        return
+    account = account_id or boto3_session.profile_name
+    events = boto3_session.events
+    events.register('before-parameter-build', _save_call_params)
+    if cache.replay:
+        events.register('before-call', partial(_replay_response, cache, account))
+    else:
+        events.register('after-call', partial(_record_response, cache, account))
+
+
+def _save_call_params(params: Dict[str, Any], context: Dict[str, Any], **kwargs: Any) -> None:
+    # Called with the parameters of the call as passed by the caller, including pagination tokens.
+    context[_CALL_CONTEXT_KEY] = call_digest(params)
+
+
+def _fetch_key(account: str, event_name: str, context: Dict[str, Any]) -> FetchKey:
+    # event_name is of the form `before-call.<service>.<operation>`.
+    _, service, operation = event_name.split('.', 2)
+    return (
+        service,
+        account,
+        context.get('client_region') or 'global',
+        f'{operation}-{context.get(_CALL_CONTEXT_KEY, "")}',
+    )
+
+
+def _replay_response(
+    cache: FetchCache, account: str, event_name: str, context: Dict[str, Any], **kwargs: Any,
+) -> Tuple[AWSResponse, Dict[str, Any]]:
+    recorded = cache.get(_fetch_key(account, event_name, context))
+    parsed = recorded['response']
+    parsed['ResponseMetadata'] = {'HTTPStatusCode': recorded['status_code'], 'HTTPHeaders': {}, 'RetryAttempts': 0}
+    return AWSResponse('', recorded['status_code'], HTTPHeaders(), None), parsed
+
+
+def _record_response(
+    cache: FetchCache, account: str, event_name: str, http_response: AWSResponse, parsed: Dict[str, Any],
+    context: Dict[str, Any], **kwargs: Any,
+) -> None:
+    # Request ids and headers differ on every call, so they are left out to let identical responses be stored once.
+    response = {k: v for k, v in parsed.items() if k != 'ResponseMetadata'}
+    cache.put(
+        _fetch_key(account, event_name, context),
+        {'status_code': http_response.status_code, 'response': response},
+    )
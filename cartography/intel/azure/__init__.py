@@ -1,4 +1,6 @@
 import logging
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -11,22 +13,43 @@ from . import sql
 from . import storage
 from . import subscription
 from . import tenant
+from .util.clients import clear_management_clients
 from .util.credentials import Authenticator
 from .util.credentials import Credentials
 from cartography.config import Config
+from cartography.graph.sessions import can_open_sessions
+from cartography.graph.sessions import open_session
+from cartography.tracing import in_current_context
+from cartography.tracing import span
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SUBSCRIPTION_WORKERS = 4
+
 
 def _sync_one_subscription(
     neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
-    compute.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
-    cosmosdb.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
-    sql.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
-    storage.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
+    try:
+        with span(subscription_id, 'subscription'):
+            compute.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
+            cosmosdb.sync(
+                neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters,
+            )
+            sql.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
+            storage.sync(neo4j_session, credentials.arm_credentials, subscription_id, update_tag, common_job_parameters)
+    finally:
+        clear_management_clients(subscription_id)
+
+
+def _sync_subscription_in_worker(
+    credentials: Credentials, subscription_id: str, update_tag: int, common_job_parameters: Dict,
+) -> None:
+    logger.info("Syncing Azure Subscription with ID '%s'", subscription_id)
+    with open_session() as neo4j_session:
+        _sync_one_subscription(neo4j_session, credentials, subscription_id, update_tag, common_job_parameters)
 
 
 def _sync_tenant(
@@ -39,19 +62,46 @@ def _sync_tenant(
 
 def _sync_multiple_subscriptions(
     neo4j_session: neo4j.Session, credentials: Credentials, tenant_id: str, subscriptions: List[Dict],
-    update_tag: int, common_job_parameters: Dict,
+    update_tag: int, common_job_parameters: Dict, workers: Optional[int] = None,
 ) -> None:
+    """
+    Sync the given subscriptions, up to `workers` of them at the same time, each in its own Neo4j session. If no
+    additional sessions can be opened, e.g. when called outside of a sync, the subscriptions are synced one at a time
+    in `neo4j_session`.
+    """
     logger.info("Syncing Azure subscriptions")
 
     subscription.sync(neo4j_session, tenant_id, subscriptions, update_tag, common_job_parameters)
 
-    for sub in subscriptions:
-        logger.info("Syncing Azure Subscription with ID '%s'", sub['subscriptionId'])
-        common_job_parameters['AZURE_SUBSCRIPTION_ID'] = sub['subscriptionId']
-
-        _sync_one_subscription(neo4j_session, credentials, sub['subscriptionId'], update_tag, common_job_parameters)
+    # Every subscription gets its own copy of the job parameters, since they are synced concurrently.
+    subscription_job_parameters = [
+        (sub['subscriptionId'], {**common_job_parameters, 'AZURE_SUBSCRIPTION_ID': sub['subscriptionId']})
+        for sub in subscriptions
+    ]
+    workers = min(workers or DEFAULT_SUBSCRIPTION_WORKERS, len(subscriptions))
+    if workers <= 1 or not can_open_sessions():
+        for subscription_id, job_parameters in subscription_job_parameters:
+            logger.info("Syncing Azure Subscription with ID '%s'", subscription_id)
+            _sync_one_subscription(neo4j_session, credentials, subscription_id, update_tag, job_parameters)
+        return
 
-    del common_job_parameters["AZURE_SUBSCRIPTION_ID"]
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='azure-subscription')
+    futures: List['Future[None]'] = []
+    try:
+        futures = [
+            executor.submit(
+                in_current_context(_sync_subscription_in_worker), credentials, subscription_id, update_tag,
+                job_parameters,
+            )
+            for subscription_id, job_parameters in subscription_job_parameters
+        ]
+        for future in futures:
+            future.result()
+    finally:
+        # If a subscription failed, don't start the ones that are still queued.
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
 
 
 @timeit
@@ -98,5 +148,5 @@ def start_azure_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
 
     _sync_multiple_subscriptions(
         neo4j_session, credentials, credentials.get_tenant_id(), subscriptions, config.update_tag,
-        common_job_parameters,
+        common_job_parameters, config.azure_subscription_workers,
     )
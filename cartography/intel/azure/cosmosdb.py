@@ -1,5 +1,6 @@
 import logging
 import uuid
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import Generator
@@ -12,7 +13,10 @@ from azure.core.exceptions import HttpResponseError
 from azure.core.exceptions import ResourceNotFoundError
 from azure.mgmt.cosmosdb import CosmosDBManagementClient
 
+from .util.clients import get_management_client
 from .util.credentials import Credentials
+from .util.details import chunked
+from .util.details import fetch_details
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -24,8 +28,7 @@ def get_client(credentials: Credentials, subscription_id: str) -> CosmosDBManage
     """
     Getting the CosmosDB client
     """
-    client = CosmosDBManagementClient(credentials, subscription_id)
-    return client
+    return get_management_client(CosmosDBManagementClient, credentials, subscription_id)
 
 
 @timeit
@@ -414,13 +417,16 @@ def get_database_account_details(
 ) -> Generator[Any, Any, Any]:
     """
     Iterate over the database accounts and return the list of SQL and MongoDB databases, Cassandra keyspaces and
-    table resources associated with each database account.
-    """
-    for database_account in database_account_list:
-        sql_databases = get_sql_databases(credentials, subscription_id, database_account)
-        cassandra_keyspaces = get_cassandra_keyspaces(credentials, subscription_id, database_account)
-        mongodb_databases = get_mongodb_databases(credentials, subscription_id, database_account)
-        table_resources = get_table_resources(credentials, subscription_id, database_account)
+    table resources associated with each database account, fetching them concurrently.
+    """
+    fetchers = [
+        partial(get_sql_databases, credentials, subscription_id),
+        partial(get_cassandra_keyspaces, credentials, subscription_id),
+        partial(get_mongodb_databases, credentials, subscription_id),
+        partial(get_table_resources, credentials, subscription_id),
+    ]
+    for database_account, resources in fetch_details(database_account_list, fetchers):
+        sql_databases, cassandra_keyspaces, mongodb_databases, table_resources = resources
         yield database_account['id'], database_account['name'], database_account[
             'resourceGroup'
         ], sql_databases, cassandra_keyspaces, mongodb_databases, table_resources
@@ -568,50 +574,46 @@ def load_database_account_details(
     """
     Create dictionaries for SQL Databases, Cassandra Keyspaces, MongoDB Databases and table resources.
     """
-    sql_databases: List[Dict] = []
-    cassandra_keyspaces: List[Dict] = []
-    mongodb_databases: List[Dict] = []
-    table_resources: List[Dict] = []
+    for chunk in chunked(details):
+        sql_databases: List[Dict] = []
+        cassandra_keyspaces: List[Dict] = []
+        mongodb_databases: List[Dict] = []
+        table_resources: List[Dict] = []
 
-    for account_id, name, resourceGroup, sql_database, cassandra_keyspace, mongodb_database, table in details:
-        if len(sql_database) > 0:
-            dbs = transform_database_account_resources(account_id, name, resourceGroup, sql_database)
-            sql_databases.extend(dbs)
+        for account_id, name, resourceGroup, sql_database, cassandra_keyspace, mongodb_database, table in chunk:
+            if len(sql_database) > 0:
+                dbs = transform_database_account_resources(account_id, name, resourceGroup, sql_database)
+                sql_databases.extend(dbs)
 
-        if len(cassandra_keyspace) > 0:
-            keyspaces = transform_database_account_resources(account_id, name, resourceGroup, cassandra_keyspace)
-            cassandra_keyspaces.extend(keyspaces)
+            if len(cassandra_keyspace) > 0:
+                keyspaces = transform_database_account_resources(account_id, name, resourceGroup, cassandra_keyspace)
+                cassandra_keyspaces.extend(keyspaces)
 
-        if len(mongodb_database) > 0:
-            mongo_dbs = transform_database_account_resources(account_id, name, resourceGroup, mongodb_database)
-            mongodb_databases.extend(mongo_dbs)
+            if len(mongodb_database) > 0:
+                mongo_dbs = transform_database_account_resources(account_id, name, resourceGroup, mongodb_database)
+                mongodb_databases.extend(mongo_dbs)
 
-        if len(table) > 0:
-            t = transform_database_account_resources(account_id, name, resourceGroup, table)
-            table_resources.extend(t)
+            if len(table) > 0:
+                t = transform_database_account_resources(account_id, name, resourceGroup, table)
+                table_resources.extend(t)
 
-    # Loading the table resources
-    _load_table_resources(neo4j_session, table_resources, update_tag)
-    # Cleanup of table resources (done here because table resource doesn't have any other child resources in it)
-    cleanup_table_resources(neo4j_session, common_job_parameters)
+        # Loading the table resources
+        _load_table_resources(neo4j_session, table_resources, update_tag)
 
-    # Loading SQL databases, Cassandra Keyspaces and MongoDB databases
-    _load_sql_databases(neo4j_session, sql_databases, update_tag)
-    _load_cassandra_keyspaces(neo4j_session, cassandra_keyspaces, update_tag)
-    _load_mongodb_databases(neo4j_session, mongodb_databases, update_tag)
+        # Loading SQL databases, Cassandra Keyspaces and MongoDB databases
+        _load_sql_databases(neo4j_session, sql_databases, update_tag)
+        _load_cassandra_keyspaces(neo4j_session, cassandra_keyspaces, update_tag)
+        _load_mongodb_databases(neo4j_session, mongodb_databases, update_tag)
 
-    sync_sql_database_details(
-        neo4j_session, credentials, subscription_id, sql_databases, update_tag,
-        common_job_parameters,
-    )
-    sync_cassandra_keyspace_details(
-        neo4j_session, credentials, subscription_id, cassandra_keyspaces, update_tag,
-        common_job_parameters,
-    )
-    sync_mongodb_database_details(
-        neo4j_session, credentials, subscription_id, mongodb_databases, update_tag,
-        common_job_parameters,
-    )
+        sync_sql_database_details(neo4j_session, credentials, subscription_id, sql_databases, update_tag)
+        sync_cassandra_keyspace_details(neo4j_session, credentials, subscription_id, cassandra_keyspaces, update_tag)
+        sync_mongodb_database_details(neo4j_session, credentials, subscription_id, mongodb_databases, update_tag)
+
+    # Clean up only once every chunk is loaded, or the resources of the chunks not loaded yet would be deleted.
+    cleanup_table_resources(neo4j_session, common_job_parameters)
+    cleanup_sql_database_details(neo4j_session, common_job_parameters)
+    cleanup_cassandra_keyspace_details(neo4j_session, common_job_parameters)
+    cleanup_mongodb_database_details(neo4j_session, common_job_parameters)
 
 
 @timeit
@@ -729,11 +731,10 @@ def _load_table_resources(neo4j_session: neo4j.Session, table_resources: List[Di
 @timeit
 def sync_sql_database_details(
         neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, sql_databases: List[Dict],
-        update_tag: int, common_job_parameters: Dict,
+        update_tag: int,
 ) -> None:
     sql_database_details = get_sql_database_details(credentials, subscription_id, sql_databases)
     load_sql_database_details(neo4j_session, sql_database_details, update_tag)
-    cleanup_sql_database_details(neo4j_session, common_job_parameters)
 
 
 @timeit
@@ -743,8 +744,8 @@ def get_sql_database_details(
     """
     Iterate over the SQL databases to retrieve the SQL containers in them.
     """
-    for database in sql_databases:
-        containers = get_sql_containers(credentials, subscription_id, database)
+    fetchers = [partial(get_sql_containers, credentials, subscription_id)]
+    for database, (containers,) in fetch_details(sql_databases, fetchers):
         yield database['id'], containers
 
 
@@ -784,15 +785,16 @@ def load_sql_database_details(neo4j_session: neo4j.Session, details: List[Tuple[
     """
     Create dictionary for SQL Containers
     """
-    containers: List[Dict] = []
+    for chunk in chunked(details):
+        containers: List[Dict] = []
 
-    for database_id, container in details:
-        if len(container) > 0:
-            for c in container:
-                c['database_id'] = database_id
-            containers.extend(container)
+        for database_id, container in chunk:
+            if len(container) > 0:
+                for c in container:
+                    c['database_id'] = database_id
+                containers.extend(container)
 
-    _load_sql_containers(neo4j_session, containers, update_tag)
+        _load_sql_containers(neo4j_session, containers, update_tag)
 
 
 @timeit
@@ -832,11 +834,10 @@ def _load_sql_containers(neo4j_session: neo4j.Session, containers: List[Dict], u
 @timeit
 def sync_cassandra_keyspace_details(
         neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, cassandra_keyspaces: List[Dict],
-        update_tag: int, common_job_parameters: Dict,
+        update_tag: int,
 ) -> None:
     cassandra_keyspace_details = get_cassandra_keyspace_details(credentials, subscription_id, cassandra_keyspaces)
     load_cassandra_keyspace_details(neo4j_session, cassandra_keyspace_details, update_tag)
-    cleanup_cassandra_keyspace_details(neo4j_session, common_job_parameters)
 
 
 @timeit
@@ -846,8 +847,8 @@ def get_cassandra_keyspace_details(
     """
     Iterate through the Cassandra keyspaces to get the list of tables in each keyspace.
     """
-    for keyspace in cassandra_keyspaces:
-        cassandra_tables = get_cassandra_tables(credentials, subscription_id, keyspace)
+    fetchers = [partial(get_cassandra_tables, credentials, subscription_id)]
+    for keyspace, (cassandra_tables,) in fetch_details(cassandra_keyspaces, fetchers):
         yield keyspace['id'], cassandra_tables
 
 
@@ -889,15 +890,16 @@ def load_cassandra_keyspace_details(
     """
     Create a dictionary for Cassandra tables.
     """
-    cassandra_tables: List[Dict] = []
+    for chunk in chunked(details):
+        cassandra_tables: List[Dict] = []
 
-    for keyspace_id, cassandra_table in details:
-        if len(cassandra_table) > 0:
-            for t in cassandra_table:
-                t['keyspace_id'] = keyspace_id
-            cassandra_tables.extend(cassandra_table)
+        for keyspace_id, cassandra_table in chunk:
+            if len(cassandra_table) > 0:
+                for t in cassandra_table:
+                    t['keyspace_id'] = keyspace_id
+                cassandra_tables.extend(cassandra_table)
 
-    _load_cassandra_tables(neo4j_session, cassandra_tables, update_tag)
+        _load_cassandra_tables(neo4j_session, cassandra_tables, update_tag)
 
 
 @timeit
@@ -934,11 +936,10 @@ def _load_cassandra_tables(neo4j_session: neo4j.Session, cassandra_tables: List[
 @timeit
 def sync_mongodb_database_details(
         neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, mongodb_databases: List[Dict],
-        update_tag: int, common_job_parameters: Dict,
+        update_tag: int,
 ) -> None:
     mongodb_databases_details = get_mongodb_databases_details(credentials, subscription_id, mongodb_databases)
     load_mongodb_databases_details(neo4j_session, mongodb_databases_details, update_tag)
-    cleanup_mongodb_database_details(neo4j_session, common_job_parameters)
 
 
 @timeit
@@ -948,8 +949,8 @@ def get_mongodb_databases_details(
     """
     Iterate through the MongoDB Databases to get the list of collections in each mongoDB database.
     """
-    for database in mongodb_databases:
-        collections = get_mongodb_collections(credentials, subscription_id, database)
+    fetchers = [partial(get_mongodb_collections, credentials, subscription_id)]
+    for database, (collections,) in fetch_details(mongodb_databases, fetchers):
         yield database['id'], collections
 
 
@@ -991,15 +992,16 @@ def load_mongodb_databases_details(
     """
     Create a dictionary for MongoDB tables.
     """
-    collections: List[Dict] = []
+    for chunk in chunked(details):
+        collections: List[Dict] = []
 
-    for database_id, collection in details:
-        if len(collection) > 0:
-            for c in collection:
-                c['database_id'] = database_id
-            collections.extend(collection)
+        for database_id, collection in chunk:
+            if len(collection) > 0:
+                for c in collection:
+                    c['database_id'] = database_id
+                collections.extend(collection)
 
-    _load_collections(neo4j_session, collections, update_tag)
+        _load_collections(neo4j_session, collections, update_tag)
 
 
 @timeit
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import Generator
@@ -14,7 +15,10 @@ from azure.mgmt.sql.models import SecurityAlertPolicyName
 from azure.mgmt.sql.models import TransparentDataEncryptionName
 from msrestazure.azure_exceptions import CloudError
 
+from .util.clients import get_management_client
 from .util.credentials import Credentials
+from .util.details import chunked
+from .util.details import fetch_details
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -26,8 +30,7 @@ def get_client(credentials: Credentials, subscription_id: str) -> SqlManagementC
     """
     Getting the Azure SQL client
     """
-    client = SqlManagementClient(credentials, subscription_id)
-    return client
+    return get_management_client(SqlManagementClient, credentials, subscription_id)
 
 
 @timeit
@@ -104,16 +107,19 @@ def get_server_details(
         credentials: Credentials, subscription_id: str, server_list: List[Dict],
 ) -> Generator[Any, Any, Any]:
     """
-    Iterate over each servers to get its resource details.
-    """
-    for server in server_list:
-        dns_alias = get_dns_aliases(credentials, subscription_id, server)
-        ad_admins = get_ad_admins(credentials, subscription_id, server)
-        r_databases = get_recoverable_databases(credentials, subscription_id, server)
-        rd_databases = get_restorable_dropped_databases(credentials, subscription_id, server)
-        fgs = get_failover_groups(credentials, subscription_id, server)
-        elastic_pools = get_elastic_pools(credentials, subscription_id, server)
-        databases = get_databases(credentials, subscription_id, server)
+    Iterate over each servers to get its resource details, fetching them concurrently.
+    """
+    fetchers = [
+        partial(get_dns_aliases, credentials, subscription_id),
+        partial(get_ad_admins, credentials, subscription_id),
+        partial(get_recoverable_databases, credentials, subscription_id),
+        partial(get_restorable_dropped_databases, credentials, subscription_id),
+        partial(get_failover_groups, credentials, subscription_id),
+        partial(get_elastic_pools, credentials, subscription_id),
+        partial(get_databases, credentials, subscription_id),
+    ]
+    for server, server_details in fetch_details(server_list, fetchers):
+        dns_alias, ad_admins, r_databases, rd_databases, fgs, elastic_pools, databases = server_details
         yield server['id'], server['name'], server[
             'resourceGroup'
         ], dns_alias, ad_admins, r_databases, rd_databases, fgs, elastic_pools, databases
@@ -316,69 +322,70 @@ def load_server_details(
         details: List[Tuple[Any, Any, Any, Any, Any, Any, Any, Any, Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionaries for every resource in the server so we can import them in a single query
-    """
-    dns_aliases = []
-    ad_admins = []
-    recoverable_databases = []
-    restorable_dropped_databases = []
-    failover_groups = []
-    elastic_pools = []
-    databases = []
-
-    for server_id, name, rg, dns_alias, ad_admin, r_database, rd_database, fg, elastic_pool, database in details:
-        if len(dns_alias) > 0:
-            for alias in dns_alias:
-                alias['server_name'] = name
-                alias['server_id'] = server_id
-                dns_aliases.append(alias)
-
-        if len(ad_admin) > 0:
-            for admin in ad_admin:
-                admin['server_name'] = name
-                admin['server_id'] = server_id
-                ad_admins.append(admin)
-
-        if len(r_database) > 0:
-            for rdb in r_database:
-                rdb['server_name'] = name
-                rdb['server_id'] = server_id
-                recoverable_databases.append(rdb)
-
-        if len(rd_database) > 0:
-            for rddb in rd_database:
-                rddb['server_name'] = name
-                rddb['server_id'] = server_id
-                restorable_dropped_databases.append(rddb)
-
-        if len(fg) > 0:
-            for group in fg:
-                group['server_name'] = name
-                group['server_id'] = server_id
-                failover_groups.append(group)
-
-        if len(elastic_pool) > 0:
-            for pool in elastic_pool:
-                pool['server_name'] = name
-                pool['server_id'] = server_id
-                elastic_pools.append(pool)
-
-        if len(database) > 0:
-            for db in database:
-                db['server_name'] = name
-                db['server_id'] = server_id
-                db['resource_group_name'] = rg
-                databases.append(db)
-
-    _load_server_dns_aliases(neo4j_session, dns_aliases, update_tag)
-    _load_server_ad_admins(neo4j_session, ad_admins, update_tag)
-    _load_recoverable_databases(neo4j_session, recoverable_databases, update_tag)
-    _load_restorable_dropped_databases(neo4j_session, restorable_dropped_databases, update_tag)
-    _load_failover_groups(neo4j_session, failover_groups, update_tag)
-    _load_elastic_pools(neo4j_session, elastic_pools, update_tag)
-    _load_databases(neo4j_session, databases, update_tag)
-
-    sync_database_details(neo4j_session, credentials, subscription_id, databases, update_tag)
+    Create dictionaries for every resource in the server so we can import them in a single query per chunk
+    """
+    for chunk in chunked(details):
+        dns_aliases = []
+        ad_admins = []
+        recoverable_databases = []
+        restorable_dropped_databases = []
+        failover_groups = []
+        elastic_pools = []
+        databases = []
+
+        for server_id, name, rg, dns_alias, ad_admin, r_database, rd_database, fg, elastic_pool, database in chunk:
+            if len(dns_alias) > 0:
+                for alias in dns_alias:
+                    alias['server_name'] = name
+                    alias['server_id'] = server_id
+                    dns_aliases.append(alias)
+
+            if len(ad_admin) > 0:
+                for admin in ad_admin:
+                    admin['server_name'] = name
+                    admin['server_id'] = server_id
+                    ad_admins.append(admin)
+
+            if len(r_database) > 0:
+                for rdb in r_database:
+                    rdb['server_name'] = name
+                    rdb['server_id'] = server_id
+                    recoverable_databases.append(rdb)
+
+            if len(rd_database) > 0:
+                for rddb in rd_database:
+                    rddb['server_name'] = name
+                    rddb['server_id'] = server_id
+                    restorable_dropped_databases.append(rddb)
+
+            if len(fg) > 0:
+                for group in fg:
+                    group['server_name'] = name
+                    group['server_id'] = server_id
+                    failover_groups.append(group)
+
+            if len(elastic_pool) > 0:
+                for pool in elastic_pool:
+                    pool['server_name'] = name
+                    pool['server_id'] = server_id
+                    elastic_pools.append(pool)
+
+            if len(database) > 0:
+                for db in database:
+                    db['server_name'] = name
+                    db['server_id'] = server_id
+                    db['resource_group_name'] = rg
+                    databases.append(db)
+
+        _load_server_dns_aliases(neo4j_session, dns_aliases, update_tag)
+        _load_server_ad_admins(neo4j_session, ad_admins, update_tag)
+        _load_recoverable_databases(neo4j_session, recoverable_databases, update_tag)
+        _load_restorable_dropped_databases(neo4j_session, restorable_dropped_databases, update_tag)
+        _load_failover_groups(neo4j_session, failover_groups, update_tag)
+        _load_elastic_pools(neo4j_session, elastic_pools, update_tag)
+        _load_databases(neo4j_session, databases, update_tag)
+
+        sync_database_details(neo4j_session, credentials, subscription_id, databases, update_tag)
 
 
 @timeit
@@ -617,13 +624,18 @@ def get_database_details(
         credentials: Credentials, subscription_id: str, databases: List[Dict],
 ) -> Generator[Any, Any, Any]:
     """
-    Iterate over the databases to get the details of resources in it.
-    """
-    for database in databases:
-        replication_links = get_replication_links(credentials, subscription_id, database)
-        db_threat_detection_policies = get_db_threat_detection_policies(credentials, subscription_id, database)
-        restore_points = get_restore_points(credentials, subscription_id, database)
-        transparent_data_encryptions = get_transparent_data_encryptions(credentials, subscription_id, database)
+    Iterate over the databases to get the details of resources in it, fetching them concurrently.
+    """
+    fetchers = [
+        partial(get_replication_links, credentials, subscription_id),
+        partial(get_db_threat_detection_policies, credentials, subscription_id),
+        partial(get_restore_points, credentials, subscription_id),
+        partial(get_transparent_data_encryptions, credentials, subscription_id),
+    ]
+    for database, database_details in fetch_details(databases, fetchers):
+        replication_links, db_threat_detection_policies, restore_points, transparent_data_encryptions = (
+            database_details
+        )
         yield database[
             'id'
         ], replication_links, db_threat_detection_policies, restore_points, transparent_data_encryptions
@@ -748,36 +760,39 @@ def load_database_details(
         neo4j_session: neo4j.Session, details: List[Tuple[Any, Any, Any, Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionaries for every resource in a database so we can import them in a single query
-    """
-    replication_links = []
-    threat_detection_policies = []
-    restore_points = []
-    encryptions_list = []
-
-    for databaseId, replication_link, db_threat_detection_policy, restore_point, transparent_data_encryption in details:
-        if len(replication_link) > 0:
-            for link in replication_link:
-                link['database_id'] = databaseId
-                replication_links.append(link)
-
-        if len(db_threat_detection_policy) > 0:
-            db_threat_detection_policy['database_id'] = databaseId
-            threat_detection_policies.append(db_threat_detection_policy)
-
-        if len(restore_point) > 0:
-            for point in restore_point:
-                point['database_id'] = databaseId
-                restore_points.append(point)
-
-        if len(transparent_data_encryption) > 0:
-            transparent_data_encryption['database_id'] = databaseId
-            encryptions_list.append(transparent_data_encryption)
-
-    _load_replication_links(neo4j_session, replication_links, update_tag)
-    _load_db_threat_detection_policies(neo4j_session, threat_detection_policies, update_tag)
-    _load_restore_points(neo4j_session, restore_points, update_tag)
-    _load_transparent_data_encryptions(neo4j_session, encryptions_list, update_tag)
+    Create dictionaries for every resource in a database so we can import them in a single query per chunk
+    """
+    for chunk in chunked(details):
+        replication_links = []
+        threat_detection_policies = []
+        restore_points = []
+        encryptions_list = []
+
+        for (
+            databaseId, replication_link, db_threat_detection_policy, restore_point, transparent_data_encryption,
+        ) in chunk:
+            if len(replication_link) > 0:
+                for link in replication_link:
+                    link['database_id'] = databaseId
+                    replication_links.append(link)
+
+            if len(db_threat_detection_policy) > 0:
+                db_threat_detection_policy['database_id'] = databaseId
+                threat_detection_policies.append(db_threat_detection_policy)
+
+            if len(restore_point) > 0:
+                for point in restore_point:
+                    point['database_id'] = databaseId
+                    restore_points.append(point)
+
+            if len(transparent_data_encryption) > 0:
+                transparent_data_encryption['database_id'] = databaseId
+                encryptions_list.append(transparent_data_encryption)
+
+        _load_replication_links(neo4j_session, replication_links, update_tag)
+        _load_db_threat_detection_policies(neo4j_session, threat_detection_policies, update_tag)
+        _load_restore_points(neo4j_session, restore_points, update_tag)
+        _load_transparent_data_encryptions(neo4j_session, encryptions_list, update_tag)
 
 
 @timeit
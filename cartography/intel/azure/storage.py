@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import Generator
@@ -11,7 +12,10 @@ from azure.core.exceptions import HttpResponseError
 from azure.core.exceptions import ResourceNotFoundError
 from azure.mgmt.storage import StorageManagementClient
 
+from .util.clients import get_management_client
 from .util.credentials import Credentials
+from .util.details import chunked
+from .util.details import fetch_details
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -23,8 +27,7 @@ def get_client(credentials: Credentials, subscription_id: str) -> StorageManagem
     """
     Getting the Azure Storage client
     """
-    client = StorageManagementClient(credentials, subscription_id)
-    return client
+    return get_management_client(StorageManagementClient, credentials, subscription_id)
 
 
 @timeit
@@ -108,13 +111,16 @@ def get_storage_account_details(
         credentials: Credentials, subscription_id: str, storage_account_list: List[Dict],
 ) -> Generator[Any, Any, Any]:
     """
-    Iterates over all Storage Accounts to get the different storage services.
+    Iterates over all Storage Accounts to get the different storage services, fetching them concurrently.
     """
-    for storage_account in storage_account_list:
-        queue_services = get_queue_services(credentials, subscription_id, storage_account)
-        table_services = get_table_services(credentials, subscription_id, storage_account)
-        file_services = get_file_services(credentials, subscription_id, storage_account)
-        blob_services = get_blob_services(credentials, subscription_id, storage_account)
+    fetchers = [
+        partial(get_queue_services, credentials, subscription_id),
+        partial(get_table_services, credentials, subscription_id),
+        partial(get_file_services, credentials, subscription_id),
+        partial(get_blob_services, credentials, subscription_id),
+    ]
+    for storage_account, services in fetch_details(storage_account_list, fetchers):
+        queue_services, table_services, file_services, blob_services = services
         yield storage_account['id'], storage_account['name'], storage_account[
             'resourceGroup'
         ], queue_services, table_services, file_services, blob_services
@@ -227,51 +233,52 @@ def load_storage_account_details(
         details: List[Tuple[Any, Any, Any, Any, Any, Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionaries for every Azure storage service so we can import them in a single query
-    """
-    queue_services: List[Dict] = []
-    table_services: List[Dict] = []
-    file_services: List[Dict] = []
-    blob_services: List[Dict] = []
-
-    for account_id, name, resourceGroup, queue_service, table_service, file_service, blob_service in details:
-        if len(queue_service) > 0:
-            for service in queue_service:
-                service['storage_account_name'] = name
-                service['storage_account_id'] = account_id
-                service['resource_group_name'] = resourceGroup
-            queue_services.extend(queue_service)
-
-        if len(table_service) > 0:
-            for service in table_service:
-                service['storage_account_name'] = name
-                service['storage_account_id'] = account_id
-                service['resource_group_name'] = resourceGroup
-            table_services.extend(table_service)
-
-        if len(file_service) > 0:
-            for service in file_service:
-                service['storage_account_name'] = name
-                service['storage_account_id'] = account_id
-                service['resource_group_name'] = resourceGroup
-            file_services.extend(file_service)
-
-        if len(blob_service) > 0:
-            for service in blob_service:
-                service['storage_account_name'] = name
-                service['storage_account_id'] = account_id
-                service['resource_group_name'] = resourceGroup
-            blob_services.extend(blob_service)
-
-    _load_queue_services(neo4j_session, queue_services, update_tag)
-    _load_table_services(neo4j_session, table_services, update_tag)
-    _load_file_services(neo4j_session, file_services, update_tag)
-    _load_blob_services(neo4j_session, blob_services, update_tag)
-
-    sync_queue_services_details(neo4j_session, credentials, subscription_id, queue_services, update_tag)
-    sync_table_services_details(neo4j_session, credentials, subscription_id, table_services, update_tag)
-    sync_file_services_details(neo4j_session, credentials, subscription_id, file_services, update_tag)
-    sync_blob_services_details(neo4j_session, credentials, subscription_id, blob_services, update_tag)
+    Create dictionaries for every Azure storage service so we can import them in a single query per chunk
+    """
+    for chunk in chunked(details):
+        queue_services: List[Dict] = []
+        table_services: List[Dict] = []
+        file_services: List[Dict] = []
+        blob_services: List[Dict] = []
+
+        for account_id, name, resourceGroup, queue_service, table_service, file_service, blob_service in chunk:
+            if len(queue_service) > 0:
+                for service in queue_service:
+                    service['storage_account_name'] = name
+                    service['storage_account_id'] = account_id
+                    service['resource_group_name'] = resourceGroup
+                queue_services.extend(queue_service)
+
+            if len(table_service) > 0:
+                for service in table_service:
+                    service['storage_account_name'] = name
+                    service['storage_account_id'] = account_id
+                    service['resource_group_name'] = resourceGroup
+                table_services.extend(table_service)
+
+            if len(file_service) > 0:
+                for service in file_service:
+                    service['storage_account_name'] = name
+                    service['storage_account_id'] = account_id
+                    service['resource_group_name'] = resourceGroup
+                file_services.extend(file_service)
+
+            if len(blob_service) > 0:
+                for service in blob_service:
+                    service['storage_account_name'] = name
+                    service['storage_account_id'] = account_id
+                    service['resource_group_name'] = resourceGroup
+                blob_services.extend(blob_service)
+
+        _load_queue_services(neo4j_session, queue_services, update_tag)
+        _load_table_services(neo4j_session, table_services, update_tag)
+        _load_file_services(neo4j_session, file_services, update_tag)
+        _load_blob_services(neo4j_session, blob_services, update_tag)
+
+        sync_queue_services_details(neo4j_session, credentials, subscription_id, queue_services, update_tag)
+        sync_table_services_details(neo4j_session, credentials, subscription_id, table_services, update_tag)
+        sync_file_services_details(neo4j_session, credentials, subscription_id, file_services, update_tag)
+        sync_blob_services_details(neo4j_session, credentials, subscription_id, blob_services, update_tag)
 
 
 @timeit
@@ -398,8 +405,8 @@ def get_queue_services_details(
     """
     Returning the queues with their respective queue service id.
     """
-    for queue_service in queue_services:
-        queues = get_queues(credentials, subscription_id, queue_service)
+    fetchers = [partial(get_queues, credentials, subscription_id)]
+    for queue_service, (queues,) in fetch_details(queue_services, fetchers):
         yield queue_service['id'], queues
 
 
@@ -437,17 +444,18 @@ def load_queue_services_details(
         neo4j_session: neo4j.Session, details: List[Tuple[Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionary for the queue so we can import them in a single query
+    Create dictionary for the queue so we can import them in a single query per chunk
     """
-    queues: List[Dict] = []
+    for chunk in chunked(details):
+        queues: List[Dict] = []
 
-    for queue_service_id, queue in details:
-        if len(queue) > 0:
-            for q in queue:
-                q['service_id'] = queue_service_id
-            queues.extend(queue)
+        for queue_service_id, queue in chunk:
+            if len(queue) > 0:
+                for q in queue:
+                    q['service_id'] = queue_service_id
+                queues.extend(queue)
 
-    _load_queues(neo4j_session, queues, update_tag)
+        _load_queues(neo4j_session, queues, update_tag)
 
 
 @timeit
@@ -491,8 +499,8 @@ def get_table_services_details(
     """
     Returning the tables with their respective table service id.
     """
-    for table_service in table_services:
-        tables = get_tables(credentials, subscription_id, table_service)
+    fetchers = [partial(get_tables, credentials, subscription_id)]
+    for table_service, (tables,) in fetch_details(table_services, fetchers):
         yield table_service['id'], tables
 
 
@@ -530,17 +538,18 @@ def load_table_services_details(
         neo4j_session: neo4j.Session, details: List[Tuple[Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionary for the table so we can import them in a single query
+    Create dictionary for the table so we can import them in a single query per chunk
     """
-    tables: List[Dict] = []
+    for chunk in chunked(details):
+        tables: List[Dict] = []
 
-    for table_service_id, table in details:
-        if len(table) > 0:
-            for t in table:
-                t['service_id'] = table_service_id
-            tables.extend(table)
+        for table_service_id, table in chunk:
+            if len(table) > 0:
+                for t in table:
+                    t['service_id'] = table_service_id
+                tables.extend(table)
 
-    _load_tables(neo4j_session, tables, update_tag)
+        _load_tables(neo4j_session, tables, update_tag)
 
 
 @timeit
@@ -585,8 +594,8 @@ def get_file_services_details(
     """
     Returning the shares with their respective file service id.
     """
-    for file_service in file_services:
-        shares = get_shares(credentials, subscription_id, file_service)
+    fetchers = [partial(get_shares, credentials, subscription_id)]
+    for file_service, (shares,) in fetch_details(file_services, fetchers):
         yield file_service['id'], shares
 
 
@@ -624,17 +633,18 @@ def load_file_services_details(
         neo4j_session: neo4j.Session, details: List[Tuple[Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionary for the shares so we can import them in a single query
+    Create dictionary for the shares so we can import them in a single query per chunk
     """
-    shares: List[Dict] = []
+    for chunk in chunked(details):
+        shares: List[Dict] = []
 
-    for file_service_id, share in details:
-        if len(share) > 0:
-            for s in share:
-                s['service_id'] = file_service_id
-            shares.extend(share)
+        for file_service_id, share in chunk:
+            if len(share) > 0:
+                for s in share:
+                    s['service_id'] = file_service_id
+                shares.extend(share)
 
-    _load_shares(neo4j_session, shares, update_tag)
+        _load_shares(neo4j_session, shares, update_tag)
 
 
 @timeit
@@ -689,8 +699,8 @@ def get_blob_services_details(
     """
     Returning the blob containers with their respective blob service id.
     """
-    for blob_service in blob_services:
-        blob_containers = get_blob_containers(credentials, subscription_id, blob_service)
+    fetchers = [partial(get_blob_containers, credentials, subscription_id)]
+    for blob_service, (blob_containers,) in fetch_details(blob_services, fetchers):
         yield blob_service['id'], blob_containers
 
 
@@ -729,17 +739,18 @@ def load_blob_services_details(
         neo4j_session: neo4j.Session, details: List[Tuple[Any, Any]], update_tag: int,
 ) -> None:
     """
-    Create dictionary for the blob containers so we can import them in a single query
+    Create dictionary for the blob containers so we can import them in a single query per chunk
     """
-    blob_containers: List[Dict] = []
+    for chunk in chunked(details):
+        blob_containers: List[Dict] = []
 
-    for blob_service_id, container in details:
-        if len(container) > 0:
-            for c in container:
-                c['service_id'] = blob_service_id
-            blob_containers.extend(container)
+        for blob_service_id, container in chunk:
+            if len(container) > 0:
+                for c in container:
+                    c['service_id'] = blob_service_id
+                blob_containers.extend(container)
 
-    _load_blob_containers(neo4j_session, blob_containers, update_tag)
+        _load_blob_containers(neo4j_session, blob_containers, update_tag)
 
 
 @timeit
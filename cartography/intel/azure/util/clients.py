@@ -0,0 +1,49 @@
+import logging
+import threading
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_lock = threading.Lock()
+# (id of the credentials, subscription id, client class) -> (credentials, client). The credentials are kept so that
+# their id cannot be reused by other credentials while the client is cached.
+_clients: Dict[Tuple[int, str, type], Tuple[Any, Any]] = {}
+
+
+def get_management_client(client_class: Type[T], credentials: Any, subscription_id: str) -> T:
+    """
+    Return the management client of the given class for the given credentials and subscription, creating it on first
+    use. Creating a client sets up its HTTP pipeline and credential policy, so the intel modules share one client per
+    (credentials, subscription, service) instead of creating one in every getter.
+    """
+    key = (id(credentials), subscription_id, client_class)
+    with _lock:
+        cached = _clients.get(key)
+        if cached is not None and cached[0] is credentials:
+            return cached[1]
+        client = client_class(credentials, subscription_id)  # type: ignore
+        _clients[key] = (credentials, client)
+        return client
+
+
+def clear_management_clients(subscription_id: Optional[str] = None) -> None:
+    """
+    Close and forget the cached management clients of the given subscription, or of all subscriptions.
+    """
+    with _lock:
+        keys = [key for key in _clients if subscription_id is None or key[1] == subscription_id]
+        clients = [_clients.pop(key)[1] for key in keys]
+    for client in clients:
+        close = getattr(client, 'close', None)
+        if close:
+            try:
+                close()
+            except Exception as e:
+                logger.debug("Failed to close Azure management client %s: %s", type(client).__name__, e)
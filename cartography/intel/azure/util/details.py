@@ -0,0 +1,72 @@
+import itertools
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Sequence
+from typing import Tuple
+from typing import TypeVar
+
+T = TypeVar('T')
+
+# Number of detail calls to the Azure API that are in flight at the same time, per detail walk.
+DETAIL_FETCH_WORKERS = 8
+# Number of resources whose details are loaded to the graph at a time.
+DETAIL_CHUNK_SIZE = 100
+
+
+def fetch_details(
+    items: Iterable[T], fetchers: Sequence[Callable[[T], Any]], max_workers: int = DETAIL_FETCH_WORKERS,
+) -> Iterator[Tuple[T, List[Any]]]:
+    """
+    Call every fetcher on every item, up to `max_workers` calls at the same time, and yield each item with the results
+    of its fetchers in the order of `fetchers`. Items are yielded in their input order, and only the items of about
+    `max_workers` calls are fetched ahead of the consumer, so the details held in memory stay bounded however many
+    items there are. An exception raised by a fetcher is raised to the consumer when its item is reached.
+    :param items: The resources to fetch the details of, e.g. the storage accounts of a subscription.
+    :param fetchers: The functions that each fetch one kind of detail of a resource, e.g. its queue services.
+    :param max_workers: The maximum number of fetcher calls in flight. With 1 or less, fetchers are called serially.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield item, [fetch(item) for fetch in fetchers]
+        return
+
+    # Keep enough items pending to keep every worker busy, even if an item has fewer fetchers than workers.
+    window = max(1, -(-max_workers // max(1, len(fetchers))))
+    pending: Deque[Tuple[T, List['Future[Any]']]] = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='azure-details')
+    try:
+        iterator = iter(items)
+        for item in itertools.islice(iterator, window):
+            pending.append((item, [executor.submit(fetch, item) for fetch in fetchers]))
+        while pending:
+            item, futures = pending.popleft()
+            results = [future.result() for future in futures]
+            for next_item in itertools.islice(iterator, 1):
+                pending.append((next_item, [executor.submit(fetch, next_item) for fetch in fetchers]))
+            yield item, results
+    finally:
+        # Do not start the calls that are still queued if the consumer stopped early or a fetcher failed.
+        for _, queued in pending:
+            for future in queued:
+                future.cancel()
+        executor.shutdown(wait=True)
+
+
+def chunked(items: Iterable[T], size: int = DETAIL_CHUNK_SIZE) -> Iterator[List[T]]:
+    """
+    Lazily split `items` into lists of at most `size` items, unlike cartography.util.batch() which consumes all of
+    them first.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,12 +1,35 @@
+import importlib
 import logging
+import pkgutil
+from typing import Any
+from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
 
 import neo4j
 
+import cartography.models
+from cartography.client.core.tx import mark_indexes_ensured
 from cartography.config import Config
+from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import build_create_index_query
+from cartography.graph.querybuilder import parse_create_index_query
+from cartography.models.core.nodes import CartographyNodeSchema
 from cartography.util import load_resource_binary
 logger = logging.getLogger(__name__)
 
+# (label, property) of a single-property node index
+IndexKey = Tuple[str, str]
+
+
+class ExistingIndex(NamedTuple):
+    name: str
+    # True if the index backs a uniqueness constraint
+    unique: bool
+
 
 def get_index_statements() -> List[str]:
     statements = []
@@ -18,8 +41,225 @@ def get_index_statements() -> List[str]:
     return statements
 
 
+def get_node_schemas() -> List[type]:
+    """
+    Import every module in cartography.models and return all CartographyNodeSchema classes defined there.
+    """
+    for module_info in pkgutil.walk_packages(cartography.models.__path__, f'{cartography.models.__name__}.'):
+        importlib.import_module(module_info.name)
+
+    def subclasses(cls: Any) -> Iterator[type]:
+        for subclass in cls.__subclasses__():
+            yield subclass
+            yield from subclasses(subclass)
+
+    return sorted(
+        {
+            schema for schema in subclasses(CartographyNodeSchema)
+            if schema.__module__.startswith(f'{cartography.models.__name__}.')
+        },
+        key=lambda schema: (schema.__module__, schema.__name__),
+    )
+
+
+def get_all_index_statements() -> List[str]:
+    """
+    :return: The statements in indexes.cypher followed by the statements needed by every CartographyNodeSchema in
+    cartography.models, without duplicates. Indexes on properties that a schema declares as unique are left out, since
+    the uniqueness constraint creates its own index.
+    """
+    statements = get_index_statements()
+    for schema in get_node_schemas():
+        statements.extend(build_create_index_queries(schema()))
+    unique_keys = set()
+    for statement in statements:
+        parsed = parse_create_index_query(statement)
+        if parsed and parsed[2]:
+            unique_keys.add((parsed[0], parsed[1]))
+
+    def keep(statement: str) -> bool:
+        if not statement.strip():
+            return False
+        parsed = parse_create_index_query(statement)
+        return parsed is None or parsed[2] or (parsed[0], parsed[1]) not in unique_keys
+
+    return list(dict.fromkeys(filter(keep, statements)))
+
+
+def index_key(statement: str) -> Optional[IndexKey]:
+    """
+    :return: The (label, property) that the given `CREATE INDEX IF NOT EXISTS` or `CREATE CONSTRAINT IF NOT EXISTS`
+    statement creates an index for, or None if the statement is not for a single node property.
+    """
+    parsed = parse_create_index_query(statement)
+    if not parsed:
+        return None
+    return parsed[0], parsed[1]
+
+
+def get_existing_indexes(neo4j_session: neo4j.Session) -> Dict[IndexKey, ExistingIndex]:
+    """
+    :return: The node indexes usable for lookups on a single property, including the indexes backing uniqueness
+    constraints, keyed by (label, property).
+    """
+    result = neo4j_session.run(
+        "SHOW INDEXES YIELD name, entityType, labelsOrTypes, properties, type, owningConstraint "
+        "WHERE entityType = 'NODE' AND type <> 'FULLTEXT' AND type <> 'LOOKUP' "
+        "RETURN name, labelsOrTypes, properties, owningConstraint",
+    )
+    existing = {}
+    for record in result:
+        labels, properties = record['labelsOrTypes'], record['properties']
+        # Composite indexes cannot serve a lookup on a single property.
+        if labels and properties and len(labels) == 1 and len(properties) == 1:
+            existing[(labels[0], properties[0])] = ExistingIndex(record['name'], record['owningConstraint'] is not None)
+    return existing
+
+
+def count_duplicate_nodes(neo4j_session: neo4j.Session, label: str, prop_name: str) -> int:
+    """
+    :return: The number of values of `prop_name` that are shared by more than one node with the given label.
+    """
+    query = f"""
+    MATCH (n:`{label}`) WHERE n.`{prop_name}` IS NOT NULL
+    WITH n.`{prop_name}` AS value, count(*) AS nodes
+    WHERE nodes > 1
+    RETURN count(value) AS duplicates
+    """
+    return neo4j_session.run(query).single()['duplicates']
+
+
+def _duplicate_groups_query(label: str, prop_name: str) -> str:
+    """
+    :return: The start of a query that yields one row per node to merge away: `keep` is the most recently updated node
+    of its group of nodes sharing a value of `prop_name`, `duplicates` are the other nodes of the group and `duplicate`
+    is one of them.
+    """
+    return f"""
+    MATCH (n:`{label}`) WHERE n.`{prop_name}` IS NOT NULL
+    WITH n ORDER BY coalesce(n.lastupdated, 0) DESC, id(n)
+    WITH n.`{prop_name}` AS value, collect(n) AS nodes
+    WHERE size(nodes) > 1
+    WITH nodes[0] AS keep, nodes[1..] AS duplicates
+    UNWIND duplicates AS duplicate
+    """
+
+
+def merge_duplicate_nodes(neo4j_session: neo4j.Session, label: str, prop_name: str) -> int:
+    """
+    Migration helper for PropertyRef(..., unique=True): merges the nodes with the given label that share a value of
+    `prop_name`, so that a uniqueness constraint can be created.
+
+    The most recently updated node of each group is kept and takes the earliest `firstseen` of the group. The
+    relationships of the other nodes are moved to it, unless it already has a relationship of the same type with the
+    same node, and the other nodes are then deleted. Relationships between nodes of the same group are dropped.
+    Cypher cannot create a relationship of a type that is only known at run time without APOC, which cartography does
+    not require, so relationships are moved with one query per relationship type and direction.
+    :return: The number of nodes deleted.
+    """
+    groups = _duplicate_groups_query(label, prop_name)
+    rel_types = [
+        record['rel_type'] for record in neo4j_session.run(
+            groups + "MATCH (duplicate)-[r]-() RETURN DISTINCT type(r) AS rel_type",
+        )
+    ]
+    for rel_type in rel_types:
+        for pattern, moved_pattern in (
+            (f"(duplicate)-[r:`{rel_type}`]->(other)", f"(keep)-[moved:`{rel_type}`]->(other)"),
+            (f"(other)-[r:`{rel_type}`]->(duplicate)", f"(other)-[moved:`{rel_type}`]->(keep)"),
+        ):
+            neo4j_session.run(
+                groups + f"""
+                MATCH {pattern}
+                WHERE other <> keep AND NOT other IN duplicates
+                MERGE {moved_pattern}
+                ON CREATE SET moved = properties(r)
+                """,
+            ).consume()
+
+    deleted = neo4j_session.run(
+        groups + """
+        SET keep.firstseen = CASE
+            WHEN duplicate.firstseen < keep.firstseen THEN duplicate.firstseen
+            ELSE keep.firstseen
+        END
+        DETACH DELETE duplicate
+        RETURN count(*) AS deleted
+        """,
+    ).single()['deleted']
+    logger.info(
+        "Merged duplicate %s nodes on %s, moving %d relationship types and deleting %d nodes.",
+        label, prop_name, len(rel_types), deleted,
+    )
+    return deleted
+
+
+def _create_unique_constraint(
+    neo4j_session: neo4j.Session,
+    statement: str,
+    label: str,
+    prop_name: str,
+    existing: Optional[ExistingIndex],
+    merge_duplicates: bool,
+) -> bool:
+    """
+    Migrate the given property to a uniqueness constraint.
+    :return: True if the constraint was created. False if the label has duplicate nodes and merge_duplicates is False,
+    in which case a plain index is kept or created instead.
+    """
+    duplicates = count_duplicate_nodes(neo4j_session, label, prop_name)
+    if duplicates and not merge_duplicates:
+        logger.warning(
+            "Not creating a uniqueness constraint on %s.%s because %d values are shared by more than one node. Run "
+            "the create-indexes stage with --merge-duplicate-nodes to merge them.",
+            label,
+            prop_name,
+            duplicates,
+        )
+        if not existing:
+            neo4j_session.run(build_create_index_query(label, prop_name))
+        return False
+    if duplicates:
+        merge_duplicate_nodes(neo4j_session, label, prop_name)
+    if existing:
+        # Neo4j does not allow a uniqueness constraint and a plain index on the same property.
+        logger.info("Replacing index %s with a uniqueness constraint.", existing.name)
+        neo4j_session.run(f"DROP INDEX `{existing.name}` IF EXISTS")
+    neo4j_session.run(statement)
+    return True
+
+
 def run(neo4j_session: neo4j.Session, config: Config) -> None:
     logger.info("Creating indexes for cartography node types.")
-    for statement in get_index_statements():
-        logger.debug("Executing statement: %s", statement)
-        neo4j_session.run(statement)
+    statements = get_all_index_statements()
+    existing = get_existing_indexes(neo4j_session)
+    merge_duplicates = bool(config.merge_duplicate_nodes) if config else False
+    created = 0
+    ensured = []
+    for statement in statements:
+        parsed = parse_create_index_query(statement)
+        if parsed is None:
+            # Not a form that can be compared against SHOW INDEXES, so leave it to IF NOT EXISTS.
+            neo4j_session.run(statement)
+            ensured.append(statement)
+            continue
+        label, prop_name, unique = parsed
+        current = existing.get((label, prop_name))
+        if unique and not (current and current.unique):
+            if _create_unique_constraint(neo4j_session, statement, label, prop_name, current, merge_duplicates):
+                # Constraints that could not be created are left out, so that ensure_indexes() retries them on load.
+                ensured.append(statement)
+            created += 1
+            continue
+        if not current:
+            logger.debug("Executing statement: %s", statement)
+            neo4j_session.run(statement)
+            created += 1
+        ensured.append(statement)
+    logger.info("%d of %d indexes already exist, created %d.", len(statements) - created, len(statements), created)
+    mark_indexes_ensured(ensured)
+
+    timeout = config.index_population_timeout if config else None
+    if created and timeout:
+        logger.info("Waiting up to %d seconds for new indexes to come online.", timeout)
+        neo4j_session.run("CALL db.awaitIndexes($timeout)", timeout=timeout).consume()
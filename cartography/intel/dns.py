@@ -1,9 +1,16 @@
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from string import Template
 from typing import Any
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
 
+import dns.exception
 import dns.rdatatype
 import dns.resolver
 import neo4j
@@ -12,6 +19,15 @@ from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+# Number of FQDNs resolved at the same time by ingest_dns_records_by_fqdn().
+DEFAULT_RESOLVE_WORKERS = 16
+# Seconds after which the resolution of an FQDN is given up, across all nameservers and retries.
+DEFAULT_RESOLVE_TIMEOUT = 5.0
+
+_cache_lock = threading.Lock()
+# fqdn -> (time.time() at which the answer expires per its TTL, answer)
+_answer_cache: Dict[str, Tuple[float, Any]] = {}
+
 
 @timeit
 def ingest_dns_record_by_fqdn(
@@ -40,7 +56,7 @@ def ingest_dns_record_by_fqdn(
     :param dns_node_additional_label: The specific label of the DNSRecord, e.g. AWSDNSRecord.
     :return: the graph node id for the new/merged record
     """
-    fqdn_data = get_dns_resolution_by_fqdn(fqdn)
+    fqdn_data = get_dns_resolution_by_fqdn(fqdn, timeout=DEFAULT_RESOLVE_TIMEOUT)
     record_type = get_dns_record_type(fqdn_data)
 
     if record_type == 'A':
@@ -66,6 +82,91 @@ def ingest_dns_record_by_fqdn(
         )
 
 
+@timeit
+def ingest_dns_records_by_fqdn(
+    neo4j_session: neo4j.Session, update_tag: int, records: Iterable[Tuple[str, str]], record_label: str,
+    dns_node_additional_label: str, max_workers: int = DEFAULT_RESOLVE_WORKERS,
+    timeout: float = DEFAULT_RESOLVE_TIMEOUT,
+) -> List[str]:
+    """
+    Batch version of ingest_dns_record_by_fqdn(): resolves the given FQDNs concurrently, then creates their
+    :DNSRecord nodes and their DNS_POINTS_TO relationships to the `record_label` nodes and to the :Ip nodes in one
+    query each.
+    Unlike ingest_dns_record_by_fqdn(), an FQDN that cannot be resolved within `timeout` seconds or that does not
+    resolve to an A record is logged and skipped instead of failing the whole batch.
+
+    Example usage in ElasticSearch sync:
+    ingest_dns_records_by_fqdn(neo4j_session, aws_update_tag, [(endpoint, domain_id), ...], "ESDomain",
+                               "AWSDNSRecord")
+
+    :param neo4j_session: Neo4j session object
+    :param update_tag: Update tag to set the node with and childs
+    :param records: (fqdn, points_to_record) pairs, where points_to_record is the id of the `record_label` node to
+    set the DNS_POINTS_TO relationship to
+    :param record_label: the label of the nodes to attach to the DNS records, e.g. "ESDomain"
+    :param dns_node_additional_label: The specific label of the DNSRecords, e.g. AWSDNSRecord.
+    :param max_workers: the number of FQDNs to resolve at the same time
+    :param timeout: the number of seconds after which the resolution of an FQDN is given up
+    :return: the graph node ids of the new/merged records
+    """
+    records = list(records)
+    answers = resolve_fqdns({fqdn for fqdn, _ in records}, max_workers=max_workers, timeout=timeout)
+
+    record_data: List[Dict[str, Any]] = []
+    for fqdn, points_to_record in records:
+        fqdn_data = answers.get(fqdn)
+        if fqdn_data is None:
+            continue
+        record_type = get_dns_record_type(fqdn_data)
+        if record_type != 'A':
+            logger.warning(
+                "Ingestion of DNS record type '%s' by FQDN has not been implemented. Skipping '%s'.", record_type, fqdn,
+            )
+            continue
+        ip_list = [str(result) for result in fqdn_data]
+        record_data.append({
+            'id': f"{fqdn}+{record_type}",
+            'name': fqdn,
+            'type': record_type,
+            'value': ",".join(ip_list),
+            'points_to_id': points_to_record,
+            'ip_list': ip_list,
+        })
+
+    template = Template("""
+    UNWIND $Records AS data
+    MERGE (record:DNSRecord:$dns_node_additional_label{id: data.id})
+    ON CREATE SET record.firstseen = timestamp(), record.name = data.name, record.type = data.type
+    SET record.lastupdated = $update_tag, record.value = data.value
+    WITH record, data
+    MATCH (n:$record_label{id: data.points_to_id})
+    MERGE (record)-[r:DNS_POINTS_TO]->(n)
+    ON CREATE SET r.firstseen = timestamp()
+    SET r.lastupdated = $update_tag
+    """)
+    link_ips = """
+    UNWIND $Records AS data
+    MATCH (parent:DNSRecord{id: data.id})
+    WITH parent, data
+    UNWIND data.ip_list AS current_ip
+    MERGE (ip_node:Ip{id: current_ip})
+    ON CREATE SET ip_node.firstseen = timestamp(), ip_node.ip = current_ip
+    SET ip_node.lastupdated = $update_tag
+    WITH parent, ip_node
+    MERGE (parent)-[r:DNS_POINTS_TO]->(ip_node)
+    ON CREATE SET r.firstseen = timestamp()
+    SET r.lastupdated = $update_tag
+    """
+    if record_data:
+        neo4j_session.run(
+            template.safe_substitute(record_label=record_label, dns_node_additional_label=dns_node_additional_label),
+            Records=record_data,
+            update_tag=update_tag,
+        )
+        neo4j_session.run(link_ips, Records=record_data, update_tag=update_tag)
+    return [data['id'] for data in record_data]
+
+
 @timeit
 def _link_ip_to_A_record(neo4j_session: neo4j.Session, update_tag: int, ip_list: List[str], parent_record: str) -> None:
     """
@@ -141,15 +242,75 @@ def ingest_dns_record(
     return record_id
 
 
+def _new_resolver(timeout: Optional[float]) -> dns.resolver.Resolver:
+    resolver = dns.resolver.Resolver()
+    if timeout is not None:
+        resolver.lifetime = timeout
+    return resolver
+
+
+def _resolve(resolver: dns.resolver.Resolver, fqdn: str) -> Any:
+    now = time.time()
+    with _cache_lock:
+        cached = _answer_cache.get(fqdn)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    # dnspython 2 renamed Resolver.query() to Resolver.resolve().
+    resolve = getattr(resolver, 'resolve', None) or resolver.query
+    answer = resolve(fqdn)
+    with _cache_lock:
+        _answer_cache[fqdn] = (answer.expiration, answer)
+    return answer
+
+
+def clear_dns_cache() -> None:
+    """
+    Forget the DNS answers cached by get_dns_resolution_by_fqdn() and resolve_fqdns().
+    """
+    with _cache_lock:
+        _answer_cache.clear()
+
+
 @timeit
-def get_dns_resolution_by_fqdn(fqdn: str) -> Any:
+def get_dns_resolution_by_fqdn(fqdn: str, timeout: Optional[float] = None) -> Any:
     """
-    Get dns resolution data for fqdn
+    Get dns resolution data for fqdn. Answers are cached in-process for as long as their TTL allows.
 
     :param fqdn: record to query
+    :param timeout: the number of seconds after which the resolution is given up with dns.exception.Timeout. None
+    uses the resolver's default.
     :return: DNS resolution Answer as dns.resolver.Answer
     """
-    return dns.resolver.query(fqdn)
+    return _resolve(_new_resolver(timeout), fqdn)
+
+
+@timeit
+def resolve_fqdns(
+    fqdns: Iterable[str], max_workers: int = DEFAULT_RESOLVE_WORKERS, timeout: float = DEFAULT_RESOLVE_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Resolve the given FQDNs concurrently, using the cached answers of the FQDNs whose TTL has not expired.
+
+    :param fqdns: records to query
+    :param max_workers: the number of FQDNs to resolve at the same time
+    :param timeout: the number of seconds after which the resolution of an FQDN is given up
+    :return: fqdn -> DNS resolution Answer as dns.resolver.Answer, for the FQDNs that could be resolved
+    """
+    fqdns = list(dict.fromkeys(fqdns))
+    if not fqdns:
+        return {}
+    resolver = _new_resolver(timeout)
+
+    def resolve(fqdn: str) -> Tuple[str, Any]:
+        try:
+            return fqdn, _resolve(resolver, fqdn)
+        except dns.exception.DNSException as e:
+            logger.warning("Failed to resolve '%s': %s", fqdn, e)
+            return fqdn, None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(fqdns))), thread_name_prefix='dns') as executor:
+        results = list(executor.map(resolve, fqdns))
+    return {fqdn: answer for fqdn, answer in results if answer is not None}
 
 
 def get_dns_record_type(record_data: Any) -> str:
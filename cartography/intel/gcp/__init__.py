@@ -17,6 +17,7 @@ from cartography.intel.gcp import crm
 from cartography.intel.gcp import dns
 from cartography.intel.gcp import gke
 from cartography.intel.gcp import storage
+from cartography.tracing import span
 from cartography.util import run_analysis_job
 from cartography.util import timeit
 
@@ -207,7 +208,8 @@ def _sync_multiple_projects(
     for project in projects:
         project_id = project['projectId']
         logger.info("Syncing GCP project %s.", project_id)
-        _sync_single_project(neo4j_session, resources, project_id, gcp_update_tag, common_job_parameters)
+        with span(project_id, 'project'):
+            _sync_single_project(neo4j_session, resources, project_id, gcp_update_tag, common_job_parameters)
 
 
 @timeit
@@ -84,6 +84,7 @@ def load_organization_users(
     ON CREATE SET u.firstseen = timestamp()
     SET u.fullname = user.node.name,
     u.username = user.node.login,
+    u.username_lower = toLower(user.node.login),
     u.has_2fa_enabled = user.hasTwoFactorEnabled,
     u.role = user.role,
     u.is_site_admin = user.node.isSiteAdmin,
@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import OtherRelationships
+from cartography.models.core.relationships import TargetNodeMatcher
+
+
+@dataclass(frozen=True)
+class APIGatewayRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+# (:AWSAccount)-[:RESOURCE]->(:APIGatewayRestAPI), and likewise for the stages, client certificates and resources
+class APIGatewayToAWSAccount(CartographyRelSchema):
+    target_node_label: str = 'AWSAccount'
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {'id': PropertyRef('AWS_ID', set_in_kwargs=True)},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "RESOURCE"
+    properties: APIGatewayRelProperties = APIGatewayRelProperties()
+
+
+@dataclass(frozen=True)
+class APIGatewayRestAPINodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef('id')
+    createddate: PropertyRef = PropertyRef('createdDate')
+    version: PropertyRef = PropertyRef('version')
+    minimumcompressionsize: PropertyRef = PropertyRef('minimumCompressionSize')
+    disableexecuteapiendpoint: PropertyRef = PropertyRef('disableExecuteApiEndpoint')
+    region: PropertyRef = PropertyRef('Region', set_in_kwargs=True)
+    anonymous_access: PropertyRef = PropertyRef('anonymous_access')
+    anonymous_actions: PropertyRef = PropertyRef('anonymous_actions')
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class APIGatewayRestAPISchema(CartographyNodeSchema):
+    label: str = 'APIGatewayRestAPI'
+    properties: APIGatewayRestAPINodeProperties = APIGatewayRestAPINodeProperties()
+    sub_resource_relationship: APIGatewayToAWSAccount = APIGatewayToAWSAccount()
+
+
+@dataclass(frozen=True)
+class APIGatewayStageNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef('arn')
+    stagename: PropertyRef = PropertyRef('stageName')
+    createddate: PropertyRef = PropertyRef('createdDate')
+    deploymentid: PropertyRef = PropertyRef('deploymentId')
+    clientcertificateid: PropertyRef = PropertyRef('clientCertificateId')
+    cacheclusterenabled: PropertyRef = PropertyRef('cacheClusterEnabled')
+    cacheclusterstatus: PropertyRef = PropertyRef('cacheClusterStatus')
+    tracingenabled: PropertyRef = PropertyRef('tracingEnabled')
+    webaclarn: PropertyRef = PropertyRef('webAclArn')
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+# (:APIGatewayRestAPI)-[:ASSOCIATED_WITH]->(:APIGatewayStage)
+class APIGatewayStageToRestAPI(CartographyRelSchema):
+    target_node_label: str = 'APIGatewayRestAPI'
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {'id': PropertyRef('apiId')},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "ASSOCIATED_WITH"
+    properties: APIGatewayRelProperties = APIGatewayRelProperties()
+
+
+@dataclass(frozen=True)
+class APIGatewayStageSchema(CartographyNodeSchema):
+    label: str = 'APIGatewayStage'
+    properties: APIGatewayStageNodeProperties = APIGatewayStageNodeProperties()
+    sub_resource_relationship: APIGatewayToAWSAccount = APIGatewayToAWSAccount()
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            APIGatewayStageToRestAPI(),
+        ],
+    )
+
+
+@dataclass(frozen=True)
+class APIGatewayClientCertificateNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef('clientCertificateId')
+    createddate: PropertyRef = PropertyRef('createdDate')
+    expirationdate: PropertyRef = PropertyRef('expirationDate')
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+# (:APIGatewayStage)-[:HAS_CERTIFICATE]->(:APIGatewayClientCertificate)
+class APIGatewayClientCertificateToStage(CartographyRelSchema):
+    target_node_label: str = 'APIGatewayStage'
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {'id': PropertyRef('stageArn')},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "HAS_CERTIFICATE"
+    properties: APIGatewayRelProperties = APIGatewayRelProperties()
+
+
+@dataclass(frozen=True)
+class APIGatewayClientCertificateSchema(CartographyNodeSchema):
+    label: str = 'APIGatewayClientCertificate'
+    properties: APIGatewayClientCertificateNodeProperties = APIGatewayClientCertificateNodeProperties()
+    sub_resource_relationship: APIGatewayToAWSAccount = APIGatewayToAWSAccount()
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            APIGatewayClientCertificateToStage(),
+        ],
+    )
+
+
+@dataclass(frozen=True)
+class APIGatewayResourceNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef('id')
+    path: PropertyRef = PropertyRef('path')
+    pathpart: PropertyRef = PropertyRef('pathPart')
+    parentid: PropertyRef = PropertyRef('parentId')
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+# (:APIGatewayRestAPI)-[:RESOURCE]->(:APIGatewayResource)
+class APIGatewayResourceToRestAPI(CartographyRelSchema):
+    target_node_label: str = 'APIGatewayRestAPI'
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {'id': PropertyRef('apiId')},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "RESOURCE"
+    properties: APIGatewayRelProperties = APIGatewayRelProperties()
+
+
+@dataclass(frozen=True)
+class APIGatewayResourceSchema(CartographyNodeSchema):
+    label: str = 'APIGatewayResource'
+    properties: APIGatewayResourceNodeProperties = APIGatewayResourceNodeProperties()
+    sub_resource_relationship: APIGatewayToAWSAccount = APIGatewayToAWSAccount()
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            APIGatewayResourceToRestAPI(),
+        ],
+    )
@@ -8,7 +8,7 @@ class PropertyRef:
     (PropertyRef.set_in_kwargs=True).
     """
 
-    def __init__(self, name: str, set_in_kwargs=False, extra_index=False, ignore_case=False):
+    def __init__(self, name: str, set_in_kwargs=False, extra_index=False, ignore_case=False, unique=False):
         """
         :param name: The name of the property
         :param set_in_kwargs: Optional. If True, the property is not defined on the data dict, and we expect to find the
@@ -23,8 +23,12 @@ class PropertyRef:
           - All properties included in target node matchers will always have indexes created for them.
             Defaults to False.
         :param ignore_case: If True, performs a case-insensitive match when comparing the value of this property during
-        relationship creation. Defaults to False. This only has effect as part of a TargetNodeMatcher, and this is not
-        supported for the sub resource relationship.
+        relationship creation. Defaults to False. As part of a TargetNodeMatcher, the match is done against the
+        lowercase shadow property `<key>_lower` of the target node, which is indexed, instead of the property itself;
+        this is not supported for the sub resource relationship. On a CartographyNodeProperties object, the ingestion
+        query maintains the shadow property `<name>_lower` of this property so that other nodes can match on it.
+        Nodes that are not loaded with a CartographyNodeSchema should set the shadow property themselves: target nodes
+        without it are still matched, but by applying toLower() to the property, which cannot use an index.
             Example on why you would set this to True:
             GitHub usernames can have both uppercase and lowercase characters, but GitHub itself treats usernames as
             case-insensitive. Suppose your company's internal personnel database stores GitHub usernames all as
@@ -33,11 +37,19 @@ class PropertyRef:
             cartography catalog of GitHubUser nodes. Therefore, you would need `ignore_case=True` in the PropertyRef
             that points to the GitHubUser node's name field, otherwise if one of your employees' GitHub usernames
             contains capital letters, you would not be able to map them properly to a GitHubUser node in your graph.
+        :param unique: If True, create a uniqueness constraint for this property on the node's label instead of a plain
+        index. This only has effect on the properties of a CartographyNodeProperties object. Defaults to False.
+            Set this on the `id` property of nodes whose ids are unique for their label, e.g. ARNs: the
+            `MERGE (i:Label{id: ...})` in the ingestion query can then use the constraint to find the node, and
+            concurrent writers can no longer create duplicate nodes. If the graph already contains duplicate nodes,
+            the constraint is only created once they have been merged, see
+            cartography.intel.create_indexes.merge_duplicate_nodes().
         """
         self.name = name
         self.set_in_kwargs = set_in_kwargs
         self.extra_index = extra_index
         self.ignore_case = ignore_case
+        self.unique = unique
 
     def _parameterize_name(self) -> str:
         return f"${self.name}"
@@ -0,0 +1,42 @@
+import importlib
+from typing import Any
+from typing import Callable
+
+
+class LazyEntryPoint:
+    """
+    A callable that stands in for a function in another module and only imports that module the first time it is
+    called. Registries of sync functions such as cartography.sync.TOP_LEVEL_MODULES and
+    cartography.intel.aws.resources.RESOURCE_FUNCTIONS use this so that importing them does not import the SDKs of
+    every intel module: a sync of a single module only pays for the modules that it actually runs.
+
+    :type target: string
+    :param target: The function to call, as "package.module:function".
+    """
+
+    def __init__(self, target: str):
+        module_name, sep, attribute = target.partition(':')
+        if not sep or not module_name or not attribute:
+            raise ValueError(f'Expected an entry point of the form "package.module:function", got "{target}".')
+        self.target = target
+        self.module_name = module_name
+        self.attribute = attribute
+
+    def resolve(self) -> Callable:
+        """
+        Import the target module and return the target function. The function is looked up again on every call so
+        that it can be patched in tests, but the import itself only happens once.
+        """
+        return getattr(importlib.import_module(self.module_name), self.attribute)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, LazyEntryPoint) and other.target == self.target
+
+    def __hash__(self) -> int:
+        return hash(self.target)
+
+    def __repr__(self) -> str:
+        return f'LazyEntryPoint({self.target!r})'
@@ -1,4 +1,5 @@
 import argparse
+import functools
 import logging
 import time
 from collections import OrderedDict
@@ -11,53 +12,73 @@ import neo4j.exceptions
 from neo4j import GraphDatabase
 from statsd import StatsClient
 
-import cartography.intel.analysis
-import cartography.intel.aws
-import cartography.intel.azure
-import cartography.intel.bigfix
-import cartography.intel.create_indexes
-import cartography.intel.crowdstrike
-import cartography.intel.crxcavator.crxcavator
-import cartography.intel.cve
-import cartography.intel.digitalocean
-import cartography.intel.duo
-import cartography.intel.gcp
-import cartography.intel.github
-import cartography.intel.gsuite
-import cartography.intel.kubernetes
-import cartography.intel.lastpass
-import cartography.intel.oci
-import cartography.intel.okta
-import cartography.intel.semgrep
+from cartography.checkpoint import CheckpointStore
+from cartography.checkpoint import is_unit_complete
+from cartography.checkpoint import mark_unit_complete
+from cartography.checkpoint import set_checkpoint_store
+from cartography.client.core.tx import set_skip_unchanged_writes
 from cartography.config import Config
+from cartography.fetchcache import FetchCache
+from cartography.fetchcache import set_fetch_cache
+from cartography.graph.loadedids import set_id_set_cleanup
+from cartography.graph.pipeline import set_writer_sessions
+from cartography.graph.profiling import DEFAULT_SLOW_QUERY_THRESHOLD_MS
+from cartography.graph.profiling import QueryProfiler
+from cartography.graph.profiling import set_query_profiler
+from cartography.graph.sessions import set_neo4j_driver
+from cartography.registry import LazyEntryPoint
 from cartography.stats import set_stats_client
+from cartography.tracing import get_tracer
+from cartography.tracing import set_tracer
+from cartography.tracing import span
+from cartography.tracing import Tracer
 from cartography.util import STATUS_FAILURE
 from cartography.util import STATUS_SUCCESS
+from cartography.workqueue import ClaimedUnit
+from cartography.workqueue import DEFAULT_MAX_ATTEMPTS
+from cartography.workqueue import get_work_queue
+from cartography.workqueue import POLL_INTERVAL_SECONDS
+from cartography.workqueue import run_claimed_unit
+from cartography.workqueue import run_work_units
+from cartography.workqueue import set_work_queue
+from cartography.workqueue import WorkQueue
 
 logger = logging.getLogger(__name__)
 
 
+# Stages are imported when they run, so that e.g. `cartography --selected-modules github` does not import the SDKs of
+# every other intel module.
 TOP_LEVEL_MODULES = OrderedDict({  # preserve order so that the default sync always runs `analysis` at the very end
-    'create-indexes': cartography.intel.create_indexes.run,
-    'aws': cartography.intel.aws.start_aws_ingestion,
-    'azure': cartography.intel.azure.start_azure_ingestion,
-    'crowdstrike': cartography.intel.crowdstrike.start_crowdstrike_ingestion,
-    'gcp': cartography.intel.gcp.start_gcp_ingestion,
-    'gsuite': cartography.intel.gsuite.start_gsuite_ingestion,
-    'crxcavator': cartography.intel.crxcavator.start_extension_ingestion,
-    'cve': cartography.intel.cve.start_cve_ingestion,
-    'oci': cartography.intel.oci.start_oci_ingestion,
-    'okta': cartography.intel.okta.start_okta_ingestion,
-    'github': cartography.intel.github.start_github_ingestion,
-    'digitalocean': cartography.intel.digitalocean.start_digitalocean_ingestion,
-    'kubernetes': cartography.intel.kubernetes.start_k8s_ingestion,
-    'lastpass': cartography.intel.lastpass.start_lastpass_ingestion,
-    'bigfix': cartography.intel.bigfix.start_bigfix_ingestion,
-    'duo': cartography.intel.duo.start_duo_ingestion,
-    'semgrep': cartography.intel.semgrep.start_semgrep_ingestion,
-    'analysis': cartography.intel.analysis.run,
+    'create-indexes': LazyEntryPoint('cartography.intel.create_indexes:run'),
+    'aws': LazyEntryPoint('cartography.intel.aws:start_aws_ingestion'),
+    'azure': LazyEntryPoint('cartography.intel.azure:start_azure_ingestion'),
+    'crowdstrike': LazyEntryPoint('cartography.intel.crowdstrike:start_crowdstrike_ingestion'),
+    'gcp': LazyEntryPoint('cartography.intel.gcp:start_gcp_ingestion'),
+    'gsuite': LazyEntryPoint('cartography.intel.gsuite:start_gsuite_ingestion'),
+    'crxcavator': LazyEntryPoint('cartography.intel.crxcavator:start_extension_ingestion'),
+    'cve': LazyEntryPoint('cartography.intel.cve:start_cve_ingestion'),
+    'oci': LazyEntryPoint('cartography.intel.oci:start_oci_ingestion'),
+    'okta': LazyEntryPoint('cartography.intel.okta:start_okta_ingestion'),
+    'github': LazyEntryPoint('cartography.intel.github:start_github_ingestion'),
+    'digitalocean': LazyEntryPoint('cartography.intel.digitalocean:start_digitalocean_ingestion'),
+    'kubernetes': LazyEntryPoint('cartography.intel.kubernetes:start_k8s_ingestion'),
+    'lastpass': LazyEntryPoint('cartography.intel.lastpass:start_lastpass_ingestion'),
+    'bigfix': LazyEntryPoint('cartography.intel.bigfix:start_bigfix_ingestion'),
+    'duo': LazyEntryPoint('cartography.intel.duo:start_duo_ingestion'),
+    'semgrep': LazyEntryPoint('cartography.intel.semgrep:start_semgrep_ingestion'),
+    'analysis': LazyEntryPoint('cartography.intel.analysis:run'),
 })
 
+# When a work queue is set, these stages split their work into smaller units, e.g. ('aws', '123456789012') for an AWS
+# account, that any worker can run with the entry point of the stage here.
+WORK_UNIT_RUNNERS = {
+    'aws': LazyEntryPoint('cartography.intel.aws:run_work_unit'),
+}
+
+# When a work queue is set, the coordinator runs these stages itself and publishes the other stages to the queue. Stages
+# still run one at a time and in order: only the units that a stage splits its work into run concurrently.
+COORDINATOR_STAGES = ('create-indexes', 'analysis')
+
 
 class Sync:
     """
@@ -104,19 +125,100 @@ class Sync:
         :param config: Configuration for the sync run.
         """
         logger.info("Starting sync with update tag '%d'", config.update_tag)
+        set_neo4j_driver(neo4j_driver, config.neo4j_database)
+        try:
+            with span('sync', 'sync', update_tag=config.update_tag):
+                self._run_stages(neo4j_driver, config)
+        finally:
+            set_neo4j_driver(None)
+        logger.info("Finishing sync with update tag '%d'", config.update_tag)
+        return STATUS_SUCCESS
+
+    def _run_stages(self, neo4j_driver: neo4j.Driver, config: Union[Config, argparse.Namespace]) -> None:
+        queue = get_work_queue()
         with neo4j_driver.session(database=config.neo4j_database) as neo4j_session:
             for stage_name, stage_func in self._stages.items():
+                if queue is not None and stage_name not in COORDINATOR_STAGES:
+                    # Stages read what earlier stages wrote, e.g. crxcavator links extensions to the users written by
+                    # gsuite, so a stage and the units it splits its work into are done before the next one starts.
+                    logger.info("Publishing sync stage '%s' to work queue %s", stage_name, queue.path)
+                    queue.publish(config.update_tag, [((stage_name,), {})])
+                    self._wait_for_work_units(neo4j_session, config, queue)
+                    continue
+                if is_unit_complete(stage_name):
+                    logger.info("Skipping sync stage '%s', it was completed by a previous run.", stage_name)
+                    continue
                 logger.info("Starting sync stage '%s'", stage_name)
                 try:
-                    stage_func(neo4j_session, config)
+                    with span(stage_name, 'stage'):
+                        stage_func(neo4j_session, config)
                 except (KeyboardInterrupt, SystemExit):
                     logger.warning("Sync interrupted during stage '%s'.", stage_name)
                     raise
                 except Exception:
                     logger.exception("Unhandled exception during sync stage '%s'", stage_name)
                     raise  # TODO this should be configurable
+                mark_unit_complete(stage_name)
                 logger.info("Finishing sync stage '%s'", stage_name)
-        logger.info("Finishing sync with update tag '%d'", config.update_tag)
+
+    def _wait_for_work_units(
+        self, neo4j_session: neo4j.Session, config: Union[Config, argparse.Namespace], queue: WorkQueue,
+    ) -> None:
+        logger.info("Waiting for the work units of sync '%d' to be done", config.update_tag)
+        run_work_units(queue, config.update_tag, (), functools.partial(self._run_unit, neo4j_session, config))
+
+    def _run_unit(
+        self, neo4j_session: neo4j.Session, config: Union[Config, argparse.Namespace], claimed: ClaimedUnit,
+    ) -> None:
+        # A worker runs the units of every sync published to its queue, under the update tag of each sync.
+        config.update_tag = claimed.update_tag
+        stage_name = claimed.unit[0]
+        with span('/'.join(claimed.unit), 'unit', update_tag=claimed.update_tag, attempt=claimed.attempt):
+            if len(claimed.unit) == 1 and stage_name in self._stages:
+                self._stages[stage_name](neo4j_session, config)
+            elif len(claimed.unit) > 1 and stage_name in WORK_UNIT_RUNNERS:
+                WORK_UNIT_RUNNERS[stage_name](neo4j_session, config, claimed.unit, claimed.payload)
+            else:
+                raise ValueError(f"Work unit {claimed.unit} does not belong to any stage of this sync.")
+
+
+class SyncWorker(Sync):
+    """
+    A worker of distributed syncs: it claims the units of work that coordinators publish to the work queue, e.g. whole
+    stages or AWS accounts, and runs them with the stages of the given sync until it is interrupted or, if
+    worker_idle_timeout is set, until no unit could be claimed for that many seconds.
+
+    :type sync: cartography.sync.Sync
+    :param sync: The sync whose stages run the units. It must have the stages of the coordinators' syncs.
+    """
+
+    def __init__(self, sync: Sync):
+        super().__init__()
+        self._stages = sync._stages
+
+    def run(self, neo4j_driver: neo4j.Driver, config: Union[Config, argparse.Namespace]) -> int:
+        queue = get_work_queue()
+        if queue is None:
+            raise ValueError("A work queue is required to run a sync worker.")
+        logger.info("Starting worker '%s' on work queue %s", queue.worker_id, queue.path)
+        set_neo4j_driver(neo4j_driver, config.neo4j_database)
+        try:
+            with neo4j_driver.session(database=config.neo4j_database) as neo4j_session:
+                run_unit = functools.partial(self._run_unit, neo4j_session, config)
+                idle_since = time.monotonic()
+                while True:
+                    claimed = queue.claim()
+                    if claimed is not None:
+                        run_claimed_unit(queue, claimed, run_unit)
+                        idle_since = time.monotonic()
+                        continue
+                    idle_seconds = time.monotonic() - idle_since
+                    if config.worker_idle_timeout is not None and idle_seconds >= config.worker_idle_timeout:
+                        break
+                    time.sleep(POLL_INTERVAL_SECONDS)
+        finally:
+            set_neo4j_driver(None)
+        logger.info("Stopping idle worker '%s'", queue.worker_id)
         return STATUS_SUCCESS
 
 
@@ -142,6 +244,19 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
             ),
         )
 
+    # Initialize query profiling if enabled
+    if config.query_profiling_enabled or config.slow_query_log_file:
+        set_query_profiler(
+            QueryProfiler(
+                slow_query_log_path=config.slow_query_log_file,
+                slow_query_threshold_ms=(
+                    config.slow_query_threshold_ms if config.slow_query_threshold_ms is not None
+                    else DEFAULT_SLOW_QUERY_THRESHOLD_MS
+                ),
+                profile_sample_rate=config.query_profile_sample_rate or 0.0,
+            ),
+        )
+
     neo4j_auth = None
     if config.neo4j_user or config.neo4j_password:
         neo4j_auth = (config.neo4j_user, config.neo4j_password)
@@ -184,9 +299,46 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
             )
         return STATUS_FAILURE
     default_update_tag = int(time.time())
+    if config.resume_update_tag:
+        # Reuse the update tag of the sync being resumed so that cleanup jobs treat the data it wrote as current.
+        config.update_tag = config.resume_update_tag
     if not config.update_tag:
         config.update_tag = default_update_tag
-    return sync.run(neo4j_driver, config)
+    if config.checkpoint_file:
+        set_checkpoint_store(
+            CheckpointStore(config.checkpoint_file, config.update_tag, resume=bool(config.resume_update_tag)),
+        )
+    if config.record_to or config.replay_from:
+        set_fetch_cache(FetchCache(config.replay_from or config.record_to, replay=bool(config.replay_from)))
+    set_skip_unchanged_writes(config.skip_unchanged_writes)
+    set_id_set_cleanup(config.id_set_cleanup)
+    set_writer_sessions(config.neo4j_writer_sessions)
+    if config.trace_file:
+        set_tracer(Tracer(config.trace_file, config.trace_format or 'json'))
+    if config.work_queue:
+        set_work_queue(WorkQueue(config.work_queue, max_attempts=config.work_unit_max_attempts or DEFAULT_MAX_ATTEMPTS))
+    try:
+        return sync.run(neo4j_driver, config)
+    finally:
+        _export_trace()
+        set_work_queue(None)
+        set_checkpoint_store(None)
+        set_fetch_cache(None)
+        set_skip_unchanged_writes(False)
+        set_id_set_cleanup(False)
+        set_writer_sessions(None)
+
+
+def _export_trace() -> None:
+    tracer = get_tracer()
+    if tracer is None:
+        return
+    set_tracer(None)
+    # The spans of a failed sync are exported too, since they show where it spent its time until it failed.
+    try:
+        tracer.export()
+    except Exception:
+        logger.warning("Failed to export the trace of the sync to %s.", tracer.path, exc_info=True)
 
 
 def build_default_sync() -> Sync:
@@ -0,0 +1,377 @@
+import argparse
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar('R')
+
+TRACE_FORMATS = ('json', 'chrome')
+
+# Spans of these categories run queries on Neo4j. The summary reports the gaps between them as idle time of Neo4j.
+NEO4J_CATEGORIES = ('load', 'job')
+
+
+class Span:
+    """
+    A timed operation of a sync, e.g. a stage, an AWS account, a resource, a load or a cleanup job. Spans nest: the
+    parent of a span is the span that was current in the context that started it.
+    """
+
+    __slots__ = ('id', 'parent_id', 'name', 'category', 'start', 'end', 'thread', 'attributes')
+
+    def __init__(
+        self,
+        id: int,
+        parent_id: Optional[int],
+        name: str,
+        category: str,
+        start: float,
+        end: Optional[float] = None,
+        thread: str = '',
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end
+        self.thread = thread
+        self.attributes = attributes or {}
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'category': self.category,
+            'start': self.start,
+            'end': self.end,
+            'thread': self.thread,
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Records the spans of a sync and exports them to a file, either as JSON (`{"spans": [...]}`, with start and end times
+    in seconds since the epoch) or in the Chrome trace event format, which chrome://tracing and https://ui.perfetto.dev
+    can open. Both formats can be summarized with `cartography trace-summary`.
+
+    :type path: string
+    :param path: The path of the file to export the spans to.
+    :type trace_format: string
+    :param trace_format: 'json' or 'chrome'.
+    """
+
+    def __init__(self, path: str, trace_format: str = 'json'):
+        if trace_format not in TRACE_FORMATS:
+            raise ValueError(f'Unknown trace format "{trace_format}", expected one of {", ".join(TRACE_FORMATS)}.')
+        self.path = path
+        self.trace_format = trace_format
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._spans: List[Span] = []
+
+    def start_span(self, name: str, category: str, attributes: Dict[str, Any]) -> Span:
+        parent = _current_span.get()
+        with self._lock:
+            span_id = next(self._ids)
+        return Span(
+            span_id,
+            parent.id if parent else None,
+            name,
+            category,
+            time.time(),
+            thread=threading.current_thread().name,
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end = time.time()
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return sorted(self._spans, key=lambda span: (span.start, span.id))
+
+    def export(self) -> None:
+        spans = self.spans()
+        if self.trace_format == 'chrome':
+            data = _to_chrome_trace(spans)
+        else:
+            data = {'spans': [span.to_dict() for span in spans]}
+        with open(self.path, 'w') as f:
+            json.dump(data, f, default=str)
+        logger.info("Wrote %d trace spans to %s.", len(spans), self.path)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """
+    Set the process-wide Tracer. Pass None to disable tracing.
+    """
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+@contextmanager
+def span(name: str, category: str, **attributes: Any) -> Iterator[None]:
+    """
+    Record the time spent in this context as a span, nested in the current span, if tracing is enabled.
+    :param name: The name of the span, e.g. the name of the stage or the id of the account.
+    :param category: The kind of span, e.g. 'stage', 'account', 'resource', 'load' or 'job'.
+    :param attributes: Extra attributes of the span, e.g. the number of items loaded.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    current = tracer.start_span(name, category, attributes)
+    token = _current_span.set(current)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        tracer.end_span(current)
+
+
+def in_current_context(func: Callable[..., R]) -> Callable[..., R]:
+    """
+    Return a function that calls `func` in a copy of the current context, so that the spans that it starts in another
+    thread, e.g. of a ThreadPoolExecutor, are nested in the current span. Make one per call: a context can only be
+    entered by one thread at a time.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+
+def _to_chrome_trace(spans: List[Span]) -> Dict[str, Any]:
+    threads: Dict[str, int] = {}
+    pid = os.getpid()
+    origin = spans[0].start if spans else 0.0
+    events: List[Dict[str, Any]] = []
+    for s in spans:
+        tid = threads.setdefault(s.thread, len(threads) + 1)
+        events.append({
+            'name': s.name,
+            'cat': s.category,
+            'ph': 'X',
+            'ts': round((s.start - origin) * 1e6),
+            'dur': round(s.duration * 1e6),
+            'pid': pid,
+            'tid': tid,
+            'args': {'id': s.id, 'parent_id': s.parent_id, 'start': s.start, **s.attributes},
+        })
+    for thread, tid in threads.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def load_spans(path: str) -> List[Span]:
+    """
+    Load the spans of a trace exported by a Tracer, in either format.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    spans: List[Span] = []
+    if 'traceEvents' in data:
+        threads = {
+            event['tid']: event['args']['name'] for event in data['traceEvents']
+            if event.get('ph') == 'M' and event.get('name') == 'thread_name'
+        }
+        for event in data['traceEvents']:
+            if event.get('ph') != 'X':
+                continue
+            args = dict(event.get('args', {}))
+            span_id, parent_id, start = args.pop('id'), args.pop('parent_id', None), args.pop('start')
+            spans.append(
+                Span(
+                    span_id, parent_id, event['name'], event.get('cat', ''), start, start + event['dur'] / 1e6,
+                    threads.get(event.get('tid'), ''), args,
+                ),
+            )
+    else:
+        for entry in data['spans']:
+            spans.append(
+                Span(
+                    entry['id'], entry['parent_id'], entry['name'], entry['category'], entry['start'], entry['end'],
+                    entry.get('thread', ''), entry.get('attributes'),
+                ),
+            )
+    return sorted(spans, key=lambda s: (s.start, s.id))
+
+
+def _children_by_parent(spans: List[Span]) -> Dict[Optional[int], List[Span]]:
+    children: Dict[Optional[int], List[Span]] = {}
+    ids = {s.id for s in spans}
+    for s in spans:
+        # The parent of a span is missing from the trace if the process died before the parent ended.
+        parent_id = s.parent_id if s.parent_id in ids else None
+        children.setdefault(parent_id, []).append(s)
+    return children
+
+
+def _union(intervals: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    merged: List[Tuple[float, float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def self_time(s: Span, children: List[Span]) -> float:
+    """
+    :return: The time of the span that none of its children covers.
+    """
+    covered = _union([(max(c.start, s.start), min(c.end or c.start, s.end or s.start)) for c in children])
+    return s.duration - sum(max(0.0, end - start) for start, end in covered)
+
+
+def critical_path(root: Span, children: Dict[Optional[int], List[Span]]) -> List[Span]:
+    """
+    :return: The chain of spans that determined when `root` ended, from `root` down to the innermost spans, in
+    chronological order within each level: going back from the end of a span, the child that ended last, then the child
+    that ended last before that child started, and so on.
+    """
+    path = [root]
+    chain: List[Span] = []
+    cursor = root.end or root.start
+    candidates = sorted(children.get(root.id, []), key=lambda c: c.end or c.start, reverse=True)
+    for child in candidates:
+        if (child.end or child.start) <= cursor:
+            chain.append(child)
+            cursor = child.start
+    for child in reversed(chain):
+        path.extend(critical_path(child, children))
+    return path
+
+
+def idle_gaps(spans: List[Span], start: float, end: float) -> List[Tuple[float, float]]:
+    """
+    :return: The intervals between `start` and `end` during which no span that queries Neo4j was running.
+    """
+    busy = _union([(s.start, s.end or s.start) for s in spans if s.category in NEO4J_CATEGORIES])
+    gaps = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start > cursor:
+            gaps.append((cursor, min(busy_start, end)))
+        cursor = max(cursor, busy_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return [(gap_start, gap_end) for gap_start, gap_end in gaps if gap_end > gap_start]
+
+
+def _label(s: Span) -> str:
+    return f'{s.category} {s.name}'
+
+
+def _innermost_at(spans: List[Span], moment: float) -> Optional[Span]:
+    running = [s for s in spans if s.start <= moment <= (s.end or s.start)]
+    return max(running, key=lambda s: s.start) if running else None
+
+
+def summarize(spans: List[Span], top: int = 10) -> str:
+    """
+    :return: A report of the critical path of the trace, its spans with the most self time, and the longest gaps
+    during which Neo4j was idle.
+    """
+    if not spans:
+        return 'The trace has no spans.'
+    children = _children_by_parent(spans)
+    by_id = {s.id: s for s in spans}
+    roots = children.get(None, [])
+    start = min(s.start for s in roots)
+    end = max(s.end or s.start for s in roots)
+    lines = [f'Trace of {len(spans)} spans over {end - start:.1f}s.', '', 'Critical path:']
+
+    root = max(roots, key=lambda s: s.duration)
+    for s in critical_path(root, children):
+        depth = 0
+        parent_id = s.parent_id
+        while parent_id in by_id:
+            depth += 1
+            parent_id = by_id[parent_id].parent_id
+        lines.append(f'  {"  " * depth}{_label(s)}: {s.duration:.1f}s')
+
+    lines += ['', f'Top {top} spans by self time:']
+    self_times = sorted(((self_time(s, children.get(s.id, [])), s) for s in spans), key=lambda t: -t[0])
+    for seconds, s in self_times[:top]:
+        lines.append(f'  {seconds:.1f}s  {_path(s, by_id)}')
+
+    lines += ['', f'Top {top} idle gaps of Neo4j:']
+    gaps = sorted(idle_gaps(spans, start, end), key=lambda gap: gap[0] - gap[1])
+    for gap_start, gap_end in gaps[:top]:
+        during = _innermost_at(spans, (gap_start + gap_end) / 2)
+        lines.append(
+            f'  {gap_end - gap_start:.1f}s at +{gap_start - start:.1f}s, during '
+            f'{_path(during, by_id) if during else "no span"}',
+        )
+    return '\n'.join(lines)
+
+
+def _path(s: Span, by_id: Dict[int, Span]) -> str:
+    labels = [_label(s)]
+    parent_id = s.parent_id
+    while parent_id in by_id:
+        labels.append(_label(by_id[parent_id]))
+        parent_id = by_id[parent_id].parent_id
+    return ' > '.join(reversed(labels))
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='cartography trace-summary',
+        description=(
+            'Summarize a trace written by a sync run with --trace-file: report its critical path, the spans with the '
+            'most self time, and the longest gaps during which Neo4j was idle.'
+        ),
+    )
+    parser.add_argument('trace_file', type=str, help='The trace file, in the json or chrome format.')
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='The number of spans and idle gaps to report. Defaults to 10.',
+    )
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    """
+    Entrypoint for the `cartography trace-summary` subcommand.
+    """
+    config = _build_parser().parse_args(argv)
+    print(summarize(load_spans(config.trace_file), top=config.top))
+    return 0
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import re
 import sys
+from functools import lru_cache
 from functools import partial
 from functools import wraps
 from string import Template
@@ -27,6 +28,7 @@ from cartography.graph.job import GraphJob
 from cartography.graph.statement import get_job_shortname
 from cartography.stats import get_stats_client
 from cartography.stats import ScopedStatsClient
+from cartography.tracing import in_current_context
 
 
 if sys.version_info >= (3, 7):
@@ -43,6 +45,18 @@ STATUS_KEYBOARD_INTERRUPT = 130
 DEFAULT_BATCH_SIZE = 1000
 
 
+@lru_cache(maxsize=None)
+def get_job_template(package: str, filename: str) -> GraphJob:
+    """
+    Reads and parses the JSON job `filename` from the given Python `package` once per process, and returns the parsed
+    GraphJob. Jobs shipped in cartography.data.jobs are run once per account/region/project, so caching them avoids
+    re-reading and re-parsing the same files over and over during a sync.
+    The returned job is shared by all callers and must be treated as immutable: pass per-run parameters to
+    GraphJob.run() instead of calling merge_parameters() on it.
+    """
+    return GraphJob.from_json(read_text(package, filename), get_job_shortname(filename))
+
+
 def run_analysis_job(
     filename: str,
     neo4j_session: neo4j.Session,
@@ -57,15 +71,7 @@ def run_analysis_job(
     not scoped to a single sub resource. That is they will apply to _all_ AWS accounts/_all_ GCP projects/_all_ Okta
     organizations/etc.
     """
-    GraphJob.run_from_json(
-        neo4j_session,
-        read_text(
-            package,
-            filename,
-        ),
-        common_job_parameters,
-        get_job_shortname(filename),
-    )
+    get_job_template(package, filename).run(neo4j_session, common_job_parameters)
 
 
 def run_analysis_and_ensure_deps(
@@ -122,15 +128,7 @@ def run_cleanup_job(
     filename: str, neo4j_session: neo4j.Session, common_job_parameters: Dict,
     package: str = 'cartography.data.jobs.cleanup',
 ) -> None:
-    GraphJob.run_from_json(
-        neo4j_session,
-        read_text(
-            package,
-            filename,
-        ),
-        common_job_parameters,
-        get_job_shortname(filename),
-    )
+    get_job_template(package, filename).run(neo4j_session, common_job_parameters)
 
 
 def merge_module_sync_metadata(
@@ -338,7 +336,7 @@ def is_throttling_exception(exc: Exception) -> bool:
     '''
     # https://boto3.amazonaws.com/v1/documentation/api/1.19.9/guide/error-handling.html
     if isinstance(exc, botocore.exceptions.ClientError):
-        if exc.response['Error']['Code'] in ['LimitExceededException', 'Throttling']:
+        if exc.response['Error']['Code'] in ['LimitExceededException', 'Throttling', 'ThrottlingException']:
             return True
     # add other exceptions here, if needed, like:
     # https://cloud.google.com/python/docs/reference/storage/1.39.0/retry_timeout#configuring-retries
@@ -392,7 +390,8 @@ def to_asynchronous(func: Callable[..., R], *args: Any, **kwargs: Any) -> Awaita
 
     # don't use @backoff as decorator, to preserve typing
     wrapped = backoff.on_exception(backoff.expo, CartographyThrottlingException)(wrapper)
-    call = partial(wrapped, *args, **kwargs)
+    # Run the call in the caller's context, so that the spans that it starts are nested in the caller's span.
+    call = partial(in_current_context(wrapped), *args, **kwargs)
     return asyncio.get_event_loop().run_in_executor(None, call)
 
 
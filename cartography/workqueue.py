@@ -0,0 +1,335 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from cartography.checkpoint import Unit
+
+logger = logging.getLogger(__name__)
+
+# Number of times a unit is run before it is marked as failed.
+DEFAULT_MAX_ATTEMPTS = 3
+# Seconds a claimed unit stays leased to its worker. Leases are renewed while the worker is alive, so this is how long
+# it takes for the unit of a worker that died to be claimed again.
+DEFAULT_LEASE_SECONDS = 300
+# Seconds to wait before polling the queue again when there is no unit to claim.
+POLL_INTERVAL_SECONDS = 1.0
+# Upper bound of the delay before a failed unit can be claimed again.
+MAX_RETRY_DELAY_SECONDS = 60
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_units (
+    update_tag INTEGER NOT NULL,
+    unit TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (update_tag, unit)
+)
+"""
+
+
+class ClaimedUnit(NamedTuple):
+    update_tag: int
+    unit: Unit
+    payload: Dict[str, Any]
+    attempt: int
+
+
+class WorkUnitsFailedError(Exception):
+    pass
+
+
+def _is_under(unit: Unit, prefix: Unit) -> bool:
+    return len(unit) > len(prefix) and unit[:len(prefix)] == prefix
+
+
+class WorkQueue:
+    """
+    A lease-based queue of the units of work of syncs, stored in a SQLite file so that a coordinator and any number of
+    `cartography worker` processes on the same machine (or sharing a filesystem with working locks) can distribute a
+    sync without an external broker.
+
+    A unit is published once per update tag, with a JSON payload of the parameters that its runner needs. A worker
+    claims a unit by leasing it: the lease is renewed in the background while the worker is alive, and a unit whose
+    lease expired is claimed again by another worker. A unit that fails is retried after a delay until it ran
+    `max_attempts` times, after which it is marked as failed.
+
+    :type path: string
+    :param path: The path of the SQLite file. It is created if it does not exist.
+    :type max_attempts: int
+    :param max_attempts: The number of times a unit is run before it is marked as failed.
+    :type lease_seconds: float
+    :param lease_seconds: How long a claimed unit stays leased without its lease being renewed.
+    """
+
+    def __init__(
+        self, path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._lock = threading.Lock()
+        # Transactions are started explicitly, so that claims take the write lock before reading the pending units.
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            path, timeout=60, isolation_level=None, check_same_thread=False,
+        )
+        self._conn.execute(_SCHEMA)
+        self._heartbeat: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def _execute(self, statements: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError(f"Work queue {self.path} is closed.")
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self._conn)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            return result
+
+    def publish(self, update_tag: int, units: Iterable[Tuple[Unit, Dict[str, Any]]]) -> None:
+        """
+        Publish units for the given update tag. Units that are already published for it are left as they are, except
+        failed units, which are retried: publishing the units of a sync again resumes it.
+        """
+        rows = [(update_tag, json.dumps(list(unit)), json.dumps(payload)) for unit, payload in units]
+        self._execute(
+            lambda conn: conn.executemany(
+                """
+                INSERT INTO work_units (update_tag, unit, payload, status) VALUES (?, ?, ?, 'pending')
+                ON CONFLICT (update_tag, unit) DO UPDATE SET
+                    payload = excluded.payload, status = 'pending', attempts = 0, not_before = 0, error = NULL
+                WHERE status = 'failed'
+                """,
+                rows,
+            ),
+        )
+
+    def claim(self, update_tag: Optional[int] = None, prefix: Optional[Unit] = None) -> Optional[ClaimedUnit]:
+        """
+        Lease the oldest unit that can be run, optionally only among the units of the given update tag that are under
+        the given prefix, e.g. ('aws',) for the AWS accounts of a sync.
+        :return: The claimed unit, or None if no unit can be claimed right now.
+        """
+        def _claim(conn: sqlite3.Connection) -> Optional[ClaimedUnit]:
+            now = time.time()
+            self._expire_leases(conn, now)
+            query = (
+                "SELECT rowid, update_tag, unit, payload, attempts FROM work_units "
+                "WHERE status = 'pending' AND not_before <= ?"
+            )
+            params: List[Any] = [now]
+            if update_tag is not None:
+                query += " AND update_tag = ?"
+                params.append(update_tag)
+            for rowid, tag, unit_json, payload, attempts in conn.execute(query + " ORDER BY rowid", params):
+                unit = tuple(json.loads(unit_json))
+                if prefix is not None and not _is_under(unit, prefix):
+                    continue
+                conn.execute(
+                    "UPDATE work_units SET status = 'running', attempts = ?, lease_owner = ?, lease_expires = ? "
+                    "WHERE rowid = ?",
+                    (attempts + 1, self.worker_id, now + self.lease_seconds, rowid),
+                )
+                return ClaimedUnit(tag, unit, json.loads(payload), attempts + 1)
+            return None
+
+        claimed = self._execute(_claim)
+        if claimed is not None:
+            self._start_heartbeat()
+        return claimed
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        # The worker of these units died or hung: retry them, unless they already ran too many times.
+        conn.execute(
+            "UPDATE work_units SET status = 'failed', lease_owner = NULL, error = 'The lease of the unit expired.' "
+            "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+            (now, self.max_attempts),
+        )
+        conn.execute(
+            "UPDATE work_units SET status = 'pending', lease_owner = NULL "
+            "WHERE status = 'running' AND lease_expires < ?",
+            (now,),
+        )
+
+    def complete(self, claimed: ClaimedUnit) -> None:
+        self._finish(claimed, DONE, None, 0)
+
+    def fail(self, claimed: ClaimedUnit, error: str) -> None:
+        """
+        Record that the claimed unit failed. It is retried after an exponential delay, unless it already ran
+        `max_attempts` times, in which case it is marked as failed.
+        """
+        if claimed.attempt >= self.max_attempts:
+            self._finish(claimed, FAILED, error, 0)
+        else:
+            self._finish(claimed, PENDING, error, time.time() + min(MAX_RETRY_DELAY_SECONDS, 2 ** claimed.attempt))
+
+    def _finish(self, claimed: ClaimedUnit, status: str, error: Optional[str], not_before: float) -> None:
+        # Only the current lease owner can finish the unit: if our lease expired, another worker has claimed it since.
+        self._execute(
+            lambda conn: conn.execute(
+                "UPDATE work_units SET status = ?, error = ?, not_before = ?, lease_owner = NULL "
+                "WHERE update_tag = ? AND unit = ? AND status = 'running' AND lease_owner = ?",
+                (status, error, not_before, claimed.update_tag, json.dumps(list(claimed.unit)), self.worker_id),
+            ),
+        )
+
+    def renew_leases(self) -> None:
+        """
+        Extend the leases of all the units claimed by this queue object.
+        """
+        self._execute(
+            lambda conn: conn.execute(
+                "UPDATE work_units SET lease_expires = ? WHERE status = 'running' AND lease_owner = ?",
+                (time.time() + self.lease_seconds, self.worker_id),
+            ),
+        )
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(target=self._renew_leases_forever, name='work-queue-heartbeat')
+            self._heartbeat.daemon = True
+            self._heartbeat.start()
+
+    def _renew_leases_forever(self) -> None:
+        while not self._closed.wait(max(1.0, self.lease_seconds / 3)):
+            try:
+                self.renew_leases()
+            except Exception:
+                logger.warning("Failed to renew the leases of work queue %s.", self.path, exc_info=True)
+
+    def status(self, update_tag: int, prefix: Unit = ()) -> Dict[str, List[Unit]]:
+        """
+        :return: The units of the given update tag under the given prefix, by status.
+        """
+        units: Dict[str, List[Unit]] = {PENDING: [], RUNNING: [], DONE: [], FAILED: []}
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError(f"Work queue {self.path} is closed.")
+            rows = self._conn.execute(
+                "SELECT unit, status FROM work_units WHERE update_tag = ? ORDER BY rowid", (update_tag,),
+            ).fetchall()
+        for unit_json, status in rows:
+            unit = tuple(json.loads(unit_json))
+            if _is_under(unit, prefix):
+                units[status].append(unit)
+        return units
+
+    def errors(self, update_tag: int) -> Dict[Unit, str]:
+        """
+        :return: The error of the last failed attempt of every failed unit of the given update tag.
+        """
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError(f"Work queue {self.path} is closed.")
+            rows = self._conn.execute(
+                "SELECT unit, error FROM work_units WHERE update_tag = ? AND status = 'failed'", (update_tag,),
+            ).fetchall()
+        return {tuple(json.loads(unit_json)): error for unit_json, error in rows}
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def run_claimed_unit(
+    queue: WorkQueue, claimed: ClaimedUnit, run_unit: Callable[[ClaimedUnit], None],
+) -> None:
+    """
+    Run a claimed unit and record its outcome in the queue. Exceptions of the unit are logged and recorded, so that the
+    unit is retried, rather than raised.
+    """
+    logger.info("Starting work unit %s of sync %d (attempt %d).", claimed.unit, claimed.update_tag, claimed.attempt)
+    try:
+        run_unit(claimed)
+    except Exception:
+        logger.exception("Work unit %s of sync %d failed.", claimed.unit, claimed.update_tag)
+        queue.fail(claimed, traceback.format_exc())
+        return
+    except BaseException:
+        queue.fail(claimed, 'The worker was interrupted.')
+        raise
+    queue.complete(claimed)
+    logger.info("Finishing work unit %s of sync %d.", claimed.unit, claimed.update_tag)
+
+
+def run_work_units(
+    queue: WorkQueue,
+    update_tag: int,
+    prefix: Unit,
+    run_unit: Callable[[ClaimedUnit], None],
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+) -> None:
+    """
+    Wait until all the units of the given update tag under the given prefix are done, helping the workers by claiming
+    and running units in this process too, so that a sync completes even if no worker is running.
+    :raises WorkUnitsFailedError: If any of the units failed, once all of them have finished.
+    """
+    while True:
+        claimed = queue.claim(update_tag, prefix)
+        if claimed is not None:
+            run_claimed_unit(queue, claimed, run_unit)
+            continue
+        units = queue.status(update_tag, prefix)
+        if not units[PENDING] and not units[RUNNING]:
+            break
+        time.sleep(poll_interval)
+
+    if units[FAILED]:
+        errors = queue.errors(update_tag)
+        raise WorkUnitsFailedError(
+            '\n'.join(f'Work unit {unit} of sync {update_tag} failed:\n{errors.get(unit)}' for unit in units[FAILED]),
+        )
+
+
+_work_queue: Optional[WorkQueue] = None
+
+
+def set_work_queue(queue: Optional[WorkQueue]) -> None:
+    """
+    Set the process-wide WorkQueue. While one is set, syncs publish their units of work to it instead of running them
+    directly. Pass None to unset it.
+    """
+    global _work_queue
+    if _work_queue and _work_queue is not queue:
+        _work_queue.close()
+    _work_queue = queue
+
+
+def get_work_queue() -> Optional[WorkQueue]:
+    return _work_queue
@@ -0,0 +1,220 @@
+"""
+Ingestion benchmarks. Measures the throughput of the loaders and cleanup jobs of cartography against a local Neo4j:
+
+    python -m tests.benchmarks.run --scale 100000 --output bench.json
+    python -m tests.benchmarks.run --scale 100000 --compare bench.json
+
+WARNING: the benchmarks delete everything in the Neo4j database that they run against.
+
+Every workload of tests.benchmarks.workloads runs in a fresh process against an empty database, in three phases:
+- `load`: load all records with update tag 1, creating their nodes and relationships.
+- `reload`: load the same records with update tag 2, as in the steady state of a periodic sync.
+- `cleanup`: run the cleanup jobs with update tag 3, deleting all records.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import neo4j
+
+logger = logging.getLogger(__name__)
+
+SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+
+class CountingSession:
+    """
+    Proxy of a neo4j.Session that counts the transactions run through it: auto-commit transactions run with run(), and
+    transaction functions run with read_transaction() and write_transaction().
+    """
+
+    def __init__(self, session: neo4j.Session):
+        self._session = session
+        self.transactions = 0
+
+    def run(self, *args: Any, **kwargs: Any) -> neo4j.Result:
+        self.transactions += 1
+        return self._session.run(*args, **kwargs)
+
+    def read_transaction(self, *args: Any, **kwargs: Any) -> Any:
+        self.transactions += 1
+        return self._session.read_transaction(*args, **kwargs)
+
+    def write_transaction(self, *args: Any, **kwargs: Any) -> Any:
+        self.transactions += 1
+        return self._session.write_transaction(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(
+    session: neo4j.Session, workload: str, phase: str, rows: int, func: Callable[[CountingSession], None],
+) -> Dict[str, Any]:
+    counting_session = CountingSession(session)
+    start = time.perf_counter()
+    func(counting_session)
+    seconds = time.perf_counter() - start
+    return {
+        'workload': workload,
+        'phase': phase,
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+        'transactions': counting_session.transactions,
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+    }
+
+
+def _clear_database(session: neo4j.Session) -> None:
+    session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+
+
+def run_workload(neo4j_uri: str, name: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Run the given workload against an empty database. Meant to be run in a fresh process, so that the peak RSS reported
+    for the workload is its own.
+    """
+    from cartography.client.core import tx
+    from cartography.intel.create_indexes import get_all_index_statements
+    from tests.benchmarks.workloads import build_workload
+
+    workload = build_workload(name, count)
+    driver = neo4j.GraphDatabase.driver(neo4j_uri)
+    try:
+        with driver.session() as session:
+            _clear_database(session)
+            for statement in get_all_index_statements():
+                session.run(statement).consume()
+            session.run("CALL db.awaitIndexes(300)").consume()
+            tx.mark_indexes_ensured(get_all_index_statements())
+            workload.setup(session)
+            results = [
+                _measure(session, name, 'load', count, lambda s: workload.load(s, 1)),
+                _measure(session, name, 'reload', count, lambda s: workload.load(s, 2)),
+                _measure(session, name, 'cleanup', count, lambda s: workload.cleanup(s, 3)),
+            ]
+            _clear_database(session)
+    finally:
+        driver.close()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> None:
+    baseline_results = {
+        (r['workload'], r['phase']): r for r in (baseline['results'] if baseline else [])
+    }
+    header = f"{'workload':<50} {'phase':<8} {'rows/s':>12} {'seconds':>10} {'tx':>10} {'rss MB':>8}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for r in results:
+        line = (
+            f"{r['workload']:<50} {r['phase']:<8} {r['rows_per_sec'] or 0:>12.1f} {r['seconds']:>10.3f} "
+            f"{r['transactions']:>10} {r['peak_rss_mb']:>8.1f}"
+        )
+        base = baseline_results.get((r['workload'], r['phase']))
+        if base and base['rows_per_sec'] and r['rows_per_sec']:
+            line += f" {r['rows_per_sec'] / base['rows_per_sec']:>7.2f}x"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from tests.benchmarks.workloads import get_workload_names
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.benchmarks.run',
+        description='Benchmark cartography ingestion against a local Neo4j. Deletes all data in the database.',
+    )
+    parser.add_argument(
+        '--neo4j-uri', default=os.environ.get('NEO4J_URL', 'bolt://localhost:7687'),
+        help='Neo4j database to benchmark against. Default = $NEO4J_URL or bolt://localhost:7687.',
+    )
+    parser.add_argument(
+        '--scale', default='1k',
+        help=f'Records per workload, either a number or one of {", ".join(SCALES)}. Default = 1k.',
+    )
+    parser.add_argument(
+        '--workloads', default=None,
+        help='Comma-separated workloads to run, e.g. "schema:EC2InstanceSchema,legacy:iam". Default = all.',
+    )
+    parser.add_argument('--list', action='store_true', help='List the workloads and exit.')
+    parser.add_argument('--output', default=None, help='Path of a JSON file to write the results to.')
+    parser.add_argument(
+        '--compare', default=None,
+        help='Path of a JSON file written by --output on another commit, to report rows/s relative to it.',
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    names = get_workload_names()
+    if args.list:
+        print('\n'.join(names))
+        return 0
+    if args.workloads:
+        selected = [name.strip() for name in args.workloads.split(',')]
+        unknown = set(selected) - set(names)
+        if unknown:
+            parser.error(f'Unknown workloads: {", ".join(sorted(unknown))}. See --list.')
+        names = selected
+    count = SCALES[args.scale.lower()] if args.scale.lower() in SCALES else int(args.scale)
+
+    results: List[Dict[str, Any]] = []
+    # One process per workload, so that peak RSS is measured per workload and state does not leak between workloads.
+    context = multiprocessing.get_context('spawn')
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            workload_results = executor.submit(run_workload, args.neo4j_uri, name, count).result()
+        results.extend(workload_results)
+        _print_results(workload_results, None)
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': int(time.time()),
+        'scale': count,
+        'neo4j_uri': args.neo4j_uri,
+        'results': results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != count:
+            logger.warning('The baseline was run with scale %s, not %d.', baseline.get('scale'), count)
+        print()
+        _print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Synthetic ingestion workloads for the benchmark suite in tests.benchmarks.run.
+
+Each Workload generates `count` records that are shaped like the data its loader expects, loads them to Neo4j and runs
+the cleanup jobs of the loader. Records are generated deterministically from their index so that runs on different
+commits load exactly the same data.
+"""
+from dataclasses import asdict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+import neo4j
+
+from cartography.client.core.tx import load
+from cartography.graph.job import GraphJob
+from cartography.graph.querybuilder import lowercase_property_name
+from cartography.intel.aws import iam
+from cartography.intel.aws import route53
+from cartography.intel.aws import s3
+from cartography.intel.aws.ec2 import security_groups
+from cartography.intel.create_indexes import get_node_schemas
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.util import run_cleanup_job
+
+ACCOUNT_ID = '000000000000'
+REGION = 'us-east-1'
+
+
+class Workload(NamedTuple):
+    name: str
+    # Creates the nodes that the loaded records attach to. Not measured.
+    setup: Callable[[neo4j.Session], None]
+    # Loads the records with the given update tag.
+    load: Callable[[neo4j.Session, int], None]
+    # Runs the cleanup jobs of the loader with the given update tag.
+    cleanup: Callable[[neo4j.Session, int], None]
+
+
+def _create_nodes(neo4j_session: neo4j.Session, label: str, properties: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(properties), 10000):
+        neo4j_session.run(
+            f"UNWIND $Properties AS properties CREATE (n:`{label}`) SET n = properties",
+            Properties=properties[start:start + 10000],
+        ).consume()
+
+
+def _kwarg_value(name: str, update_tag: int) -> Any:
+    if name == 'lastupdated':
+        return update_tag
+    if name in ('AWS_ID', 'AccountId'):
+        return ACCOUNT_ID
+    if name == 'Region':
+        return REGION
+    return f'bench-{name}'
+
+
+def _schema_kwargs(node_schema: CartographyNodeSchema, update_tag: int) -> Dict[str, Any]:
+    """
+    :return: A value for every PropertyRef of the schema that is set in kwargs.
+    """
+    prop_refs = list(asdict(node_schema.properties).values())
+    for rel in _schema_rels(node_schema):
+        prop_refs.extend(asdict(rel.properties).values())
+        prop_refs.extend(asdict(rel.target_node_matcher).values())
+    return {ref.name: _kwarg_value(ref.name, update_tag) for ref in prop_refs if ref.set_in_kwargs}
+
+
+def _schema_rels(node_schema: CartographyNodeSchema) -> List[CartographyRelSchema]:
+    rels = [node_schema.sub_resource_relationship] if node_schema.sub_resource_relationship else []
+    if node_schema.other_relationships:
+        rels.extend(node_schema.other_relationships.rels)
+    return rels
+
+
+def _target_pool_size(count: int) -> int:
+    # Every target node is shared by about 10 records, as e.g. EC2 instances share subnets and security groups.
+    return max(1, count // 10)
+
+
+def _target_value(rel: CartographyRelSchema, key: str, index: int) -> str:
+    return f'{rel.target_node_label}-{key}-{index}'
+
+
+def schema_workload(node_schema: CartographyNodeSchema, count: int) -> Workload:
+    """
+    :return: A workload that loads `count` records of the given node schema with cartography.client.core.tx.load(), each
+    attached to the targets of all of its relationships, and cleans them up with GraphJob.from_node_schema().
+    """
+    label = node_schema.label
+    rels = _schema_rels(node_schema)
+    pool = _target_pool_size(count)
+    id_field = node_schema.properties.id.name
+
+    records = []
+    for i in range(count):
+        record: Dict[str, Any] = {
+            ref.name: f'{name}-{i}'
+            for name, ref in asdict(node_schema.properties).items() if not ref.set_in_kwargs
+        }
+        for rel in rels:
+            for key, ref in asdict(rel.target_node_matcher).items():
+                if not ref.set_in_kwargs and ref.name != id_field:
+                    record[ref.name] = _target_value(rel, key, i % pool)
+        record[id_field] = f'{label}-{i}'
+        records.append(record)
+
+    def setup(neo4j_session: neo4j.Session) -> None:
+        kwargs = _schema_kwargs(node_schema, 0)
+        for rel in rels:
+            matcher = asdict(rel.target_node_matcher)
+            kwargs_only = all(ref.set_in_kwargs for ref in matcher.values())
+            targets = []
+            for j in range(1 if kwargs_only else pool):
+                target: Dict[str, Any] = {}
+                for key, ref in matcher.items():
+                    target[key] = kwargs[ref.name] if ref.set_in_kwargs else _target_value(rel, key, j)
+                    if ref.ignore_case:
+                        target[lowercase_property_name(key)] = target[key].lower()
+                targets.append(target)
+            _create_nodes(neo4j_session, rel.target_node_label, targets)
+
+    def load_records(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        load(neo4j_session, node_schema, records, **_schema_kwargs(node_schema, update_tag))
+
+    def cleanup(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        if not node_schema.sub_resource_relationship:
+            return
+        parameters = {'UPDATE_TAG': update_tag, **_schema_kwargs(node_schema, update_tag)}
+        GraphJob.from_node_schema(node_schema, parameters).run(neo4j_session)
+
+    return Workload(f'schema:{node_schema.__class__.__name__}', setup, load_records, cleanup)
+
+
+def _create_account(neo4j_session: neo4j.Session) -> None:
+    _create_nodes(neo4j_session, 'AWSAccount', [{'id': ACCOUNT_ID, 'inscope': True}])
+
+
+def security_groups_workload(count: int) -> Workload:
+    pool = _target_pool_size(count)
+    groups = [
+        {
+            'GroupId': f'sg-{i}',
+            'GroupName': f'group-{i}',
+            'Description': f'security group {i}',
+            'VpcId': f'vpc-{i % pool}',
+            'IpPermissions': [{
+                'IpProtocol': 'tcp', 'FromPort': 443, 'ToPort': 443,
+                'IpRanges': [{'CidrIp': f'10.{i % 256}.0.0/16'}],
+            }],
+            'IpPermissionsEgress': [{'IpProtocol': '-1', 'IpRanges': [{'CidrIp': '0.0.0.0/0'}]}],
+        }
+        for i in range(count)
+    ]
+
+    def setup(neo4j_session: neo4j.Session) -> None:
+        _create_account(neo4j_session)
+        _create_nodes(neo4j_session, 'AWSVpc', [{'id': f'vpc-{j}'} for j in range(pool)])
+
+    def load_groups(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        security_groups.load_ec2_security_groupinfo(neo4j_session, groups, REGION, ACCOUNT_ID, update_tag)
+
+    def cleanup(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        security_groups.cleanup_ec2_security_groupinfo(
+            neo4j_session, {'UPDATE_TAG': update_tag, 'AWS_ID': ACCOUNT_ID},
+        )
+
+    return Workload('legacy:ec2_security_groups', setup, load_groups, cleanup)
+
+
+def iam_workload(count: int) -> Workload:
+    """
+    Half of the records are users and half are roles trusting the account root.
+    """
+    users = [
+        {
+            'Arn': f'arn:aws:iam::{ACCOUNT_ID}:user/user-{i}', 'UserId': f'AIDA{i}', 'UserName': f'user-{i}',
+            'Path': '/', 'CreateDate': '2023-01-01 00:00:00+00:00',
+        }
+        for i in range(count // 2)
+    ]
+    roles = [
+        {
+            'Arn': f'arn:aws:iam::{ACCOUNT_ID}:role/role-{i}', 'RoleId': f'AROA{i}', 'RoleName': f'role-{i}',
+            'Path': '/', 'CreateDate': '2023-01-01 00:00:00+00:00',
+            'AssumeRolePolicyDocument': {
+                'Statement': [{
+                    'Effect': 'Allow', 'Action': 'sts:AssumeRole',
+                    'Principal': {'AWS': f'arn:aws:iam::{ACCOUNT_ID}:root'},
+                }],
+            },
+        }
+        for i in range(count - count // 2)
+    ]
+
+    def load_principals(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        iam.load_users(neo4j_session, users, ACCOUNT_ID, update_tag)
+        iam.load_roles(neo4j_session, roles, ACCOUNT_ID, update_tag)
+
+    def cleanup(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        parameters = {'UPDATE_TAG': update_tag, 'AWS_ID': ACCOUNT_ID}
+        run_cleanup_job('aws_import_users_cleanup.json', neo4j_session, parameters)
+        run_cleanup_job('aws_import_roles_cleanup.json', neo4j_session, parameters)
+
+    return Workload('legacy:iam', _create_account, load_principals, cleanup)
+
+
+def route53_workload(count: int) -> Workload:
+    """
+    Records are spread over zones of 100 records, a third each of A, CNAME and NS records.
+    """
+    dns_details = []
+    for z in range(0, count, 100):
+        zone_id = f'/hostedzone/Z{z}'
+        zone_name = f'zone{z}.example.com.'
+        record_sets = []
+        for i in range(z, min(z + 100, count)):
+            name = f'record{i}.{zone_name}'
+            if i % 3 == 0:
+                record_type, value = 'A', f'10.0.{i % 256}.1'
+            elif i % 3 == 1:
+                record_type, value = 'CNAME', f'record{i - 1}.{zone_name}'
+            else:
+                record_type, value = 'NS', f'ns{i % 4}.example.net.'
+            record_sets.append({'Name': name, 'Type': record_type, 'ResourceRecords': [{'Value': value}]})
+        zone = {
+            'Id': zone_id, 'Name': zone_name, 'Config': {'PrivateZone': False},
+            'ResourceRecordSetCount': len(record_sets),
+        }
+        dns_details.append((zone, record_sets))
+
+    def load_dns(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        route53.load_dns_details(neo4j_session, dns_details, ACCOUNT_ID, update_tag)
+
+    def cleanup(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        route53.cleanup_route53(neo4j_session, ACCOUNT_ID, update_tag)
+
+    return Workload('legacy:route53', _create_account, load_dns, cleanup)
+
+
+def s3_workload(count: int) -> Workload:
+    buckets = {
+        'Buckets': [
+            {'Name': f'bucket-{i}', 'Region': REGION, 'CreationDate': '2023-01-01 00:00:00+00:00'}
+            for i in range(count)
+        ],
+    }
+
+    def load_buckets(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        s3.load_s3_buckets(neo4j_session, buckets, ACCOUNT_ID, update_tag)
+
+    def cleanup(neo4j_session: neo4j.Session, update_tag: int) -> None:
+        s3.cleanup_s3_buckets(neo4j_session, {'UPDATE_TAG': update_tag, 'AWS_ID': ACCOUNT_ID})
+
+    return Workload('legacy:s3', _create_account, load_buckets, cleanup)
+
+
+LEGACY_WORKLOADS: Dict[str, Callable[[int], Workload]] = {
+    'legacy:ec2_security_groups': security_groups_workload,
+    'legacy:iam': iam_workload,
+    'legacy:route53': route53_workload,
+    'legacy:s3': s3_workload,
+}
+
+
+def get_workload_names() -> List[str]:
+    """
+    :return: The names of all workloads: one per CartographyNodeSchema in cartography.models, and the legacy loaders.
+    """
+    return [f'schema:{schema.__name__}' for schema in get_node_schemas()] + list(LEGACY_WORKLOADS)
+
+
+def build_workload(name: str, count: int) -> Workload:
+    if name in LEGACY_WORKLOADS:
+        return LEGACY_WORKLOADS[name](count)
+    for schema in get_node_schemas():
+        if name == f'schema:{schema.__name__}':
+            return schema_workload(schema(), count)
+    raise ValueError(f'Unknown benchmark workload "{name}". Valid workloads are: {", ".join(get_workload_names())}.')
@@ -42,3 +42,16 @@ class FakeEmpSchema(CartographyNodeSchema):
     other_relationships: OtherRelationships = OtherRelationships([
         FakeEmpToGitHubUser(),
     ])
+
+
+@dataclass(frozen=True)
+class FakeGitHubUserNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef('id')
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+    username: PropertyRef = PropertyRef('username', ignore_case=True)
+
+
+@dataclass(frozen=True)
+class FakeGitHubUserSchema(CartographyNodeSchema):
+    label: str = 'GitHubUser'
+    properties: FakeGitHubUserNodeProperties = FakeGitHubUserNodeProperties()
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import OtherRelationships
+from cartography.models.core.relationships import TargetNodeMatcher
+from tests.data.graph.querybuilder.sample_models.simple_node import SimpleNodeProperties
+from tests.data.graph.querybuilder.sample_models.simple_node import SimpleNodeToSubResourceRel
+
+
+# Test defining a node whose other relationships are matched only on kwargs.
+@dataclass(frozen=True)
+class KwargsRelProps(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class SimpleNodeToHelloAssetRel(CartographyRelSchema):
+    """
+    (:SimpleNode)-[:ASSOCIATED_WITH]->(:HelloAsset), where the HelloAsset is the same for all items
+    """
+    target_node_label: str = 'HelloAsset'
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {'id': PropertyRef('hello_asset_id', set_in_kwargs=True)},
+    )
+    direction: LinkDirection = LinkDirection.OUTWARD
+    rel_label: str = "ASSOCIATED_WITH"
+    properties: KwargsRelProps = KwargsRelProps()
+
+
+@dataclass(frozen=True)
+class SimpleNodeToParentRel(CartographyRelSchema):
+    """
+    (:SimpleNode)<-[:PARENT_OF]-(:SimpleNode), where the parent may be created by the same load
+    """
+    target_node_label: str = 'SimpleNode'
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {'id': PropertyRef('parent_id', set_in_kwargs=True)},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "PARENT_OF"
+    properties: KwargsRelProps = KwargsRelProps()
+
+
+@dataclass(frozen=True)
+class SimpleNodeWithKwargsRelsSchema(CartographyNodeSchema):
+    label: str = 'SimpleNode'
+    properties: SimpleNodeProperties = SimpleNodeProperties()
+    sub_resource_relationship: SimpleNodeToSubResourceRel = SimpleNodeToSubResourceRel()
+    other_relationships: Optional[OtherRelationships] = OtherRelationships(
+        [
+            SimpleNodeToHelloAssetRel(),
+            SimpleNodeToParentRel(),
+        ],
+    )
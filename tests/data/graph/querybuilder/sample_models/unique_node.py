@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+
+
+# Test defining a node whose id is backed by a uniqueness constraint.
+@dataclass(frozen=True)
+class UniqueNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef('Id', unique=True)
+    lastupdated: PropertyRef = PropertyRef('lastupdated', set_in_kwargs=True)
+    arn: PropertyRef = PropertyRef('Arn', extra_index=True)
+
+
+@dataclass(frozen=True)
+class UniqueNodeSchema(CartographyNodeSchema):
+    label: str = 'UniqueNode'
+    properties: UniqueNodeProperties = UniqueNodeProperties()
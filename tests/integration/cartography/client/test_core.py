@@ -1,10 +1,12 @@
 from cartography.client.core.tx import ensure_indexes
+from cartography.client.core.tx import load
 from cartography.client.core.tx import read_list_of_dicts_tx
 from cartography.client.core.tx import read_list_of_tuples_tx
 from cartography.client.core.tx import read_list_of_values_tx
 from cartography.client.core.tx import read_single_dict_tx
 from cartography.client.core.tx import read_single_value_tx
 from tests.data.graph.querybuilder.sample_models.interesting_asset import InterestingAssetSchema
+from tests.data.graph.querybuilder.sample_models.simple_node import SimpleNodeSchema
 
 
 def _ensure_test_data(neo4j_session):
@@ -143,3 +145,17 @@ def test_ensure_indexes(neo4j_session):
     # Assert that the indexed property for all 3 node labels is as expected (`id` in this case)
     indexed_fields = {item['properties'][0] for item in indexes}
     assert indexed_fields == {'id', 'lastupdated'}
+
+
+def test_load_rewrites_nodes_after_loads_without_skip_unchanged(neo4j_session):
+    data_a = [{'Id': 'simple-1', 'property1': 'a', 'property2': 'a'}]
+    data_b = [{'Id': 'simple-1', 'property1': 'b', 'property2': 'b'}]
+
+    # Act: a load with skip_unchanged stores the hash of A, a full load writes B, then A is loaded with skip_unchanged
+    load(neo4j_session, SimpleNodeSchema(), data_a, skip_unchanged=True, lastupdated=1)
+    load(neo4j_session, SimpleNodeSchema(), data_b, skip_unchanged=False, lastupdated=2)
+    load(neo4j_session, SimpleNodeSchema(), data_a, skip_unchanged=True, lastupdated=3)
+
+    # Assert: the node is not left with B because of the hash of A stored by the first load
+    node = neo4j_session.run("MATCH (n:SimpleNode{id: 'simple-1'}) RETURN n").single()['n']
+    assert (node['property1'], node['property2'], node['lastupdated']) == ('a', 'a', 3)
@@ -1,5 +1,7 @@
 from unittest import mock
 
+import pytest
+
 import cartography.util
 from cartography.util import run_cleanup_job
 
@@ -33,6 +35,14 @@ SAMPLE_CLEANUP_JOB = """
 SAMPLE_JOB_FILENAME = '/path/to/this/cleanupjob/mycleanupjob.json'
 
 
+@pytest.fixture(autouse=True)
+def clear_job_template_cache():
+    # run_cleanup_job() caches parsed jobs by filename, so make sure each test reads its mocked job contents.
+    cartography.util.get_job_template.cache_clear()
+    yield
+    cartography.util.get_job_template.cache_clear()
+
+
 @mock.patch.object(cartography.util, 'read_text', return_value=SAMPLE_CLEANUP_JOB)
 def test_run_cleanup_job_on_relationships(mock_read_text: mock.MagicMock, neo4j_session):
     # Arrange: nodes id1 and id2 are connected to each other at time T2 via stale RELship r
@@ -0,0 +1,9 @@
+import cartography.intel.create_indexes
+from cartography.graph.plancheck import assert_job_plans_ok
+
+
+def test_shipped_jobs_have_index_backed_plans(neo4j_session):
+    # Plans depend on the available indexes, so create them as a real sync would.
+    cartography.intel.create_indexes.run(neo4j_session, None)
+
+    assert_job_plans_ok(neo4j_session)
@@ -25,3 +25,23 @@ def test_load_team_members_data(neo4j_session):
     assert check_rels(neo4j_session, 'FakeEmployee', 'email', 'GitHubUser', 'username', 'IDENTITY_GITHUB') == {
         ('hjsimpson@example.com', 'HjsimPson'), ('mbsimpson@example.com', 'mbsimp-son'),
     }
+
+
+def test_load_team_members_data_without_lowercase_property(neo4j_session):
+    # Arrange: GitHubUser nodes written by an older version of cartography, without the username_lower property
+    neo4j_session.run("MATCH (n) DETACH DELETE n")
+    load_organization_users(
+        neo4j_session,
+        FAKE_GITHUB_USER_DATA,
+        FAKE_GITHUB_ORG_DATA,
+        TEST_UPDATE_TAG,
+    )
+    neo4j_session.run("MATCH (u:GitHubUser) REMOVE u.username_lower")
+
+    # Act: Create team members
+    load(neo4j_session, FakeEmpSchema(), FAKE_EMPLOYEE_DATA, lastupdated=TEST_UPDATE_TAG)
+
+    # Assert the case insensitive match falls back to comparing the lowercased usernames
+    assert check_rels(neo4j_session, 'FakeEmployee', 'email', 'GitHubUser', 'username', 'IDENTITY_GITHUB') == {
+        ('hjsimpson@example.com', 'HjsimPson'), ('mbsimpson@example.com', 'mbsimp-son'),
+    }
@@ -75,6 +75,7 @@ def test_load_apigateway_stages(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_stages(
         neo4j_session,
         data,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
@@ -109,6 +110,7 @@ def test_load_apigateway_stages_relationships(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_stages(
         neo4j_session,
         data_stages,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
@@ -141,6 +143,7 @@ def test_load_apigateway_certificates(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_certificates(
         neo4j_session,
         data,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
@@ -165,6 +168,7 @@ def test_load_apigateway_certificates_relationships(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_stages(
         neo4j_session,
         data_stages,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
@@ -173,6 +177,7 @@ def test_load_apigateway_certificates_relationships(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_certificates(
         neo4j_session,
         data_certificates,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
@@ -205,6 +210,7 @@ def test_load_apigateway_resources(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_resources(
         neo4j_session,
         data,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
@@ -238,6 +244,7 @@ def test_load_apigateway_resources_relationships(neo4j_session):
     cartography.intel.aws.apigateway._load_apigateway_resources(
         neo4j_session,
         data_resources,
+        TEST_ACCOUNT_ID,
         TEST_UPDATE_TAG,
     )
 
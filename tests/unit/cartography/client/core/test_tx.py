@@ -0,0 +1,63 @@
+from unittest import mock
+
+from cartography.client.core import tx
+from cartography.client.core.tx import add_content_hashes
+from cartography.graph.querybuilder import build_ingestion_query
+from cartography.graph.querybuilder import CONTENT_HASH_FIELD
+from tests.data.graph.querybuilder.sample_models.simple_node import SimpleNodeSchema
+
+
+def _hashes(items, query=None, **kwargs):
+    query = query or build_ingestion_query(SimpleNodeSchema(), skip_unchanged=True)
+    return [item[CONTENT_HASH_FIELD] for item in add_content_hashes(SimpleNodeSchema(), query, items, **kwargs)]
+
+
+def test_add_content_hashes_ignores_id_and_lastupdated():
+    items = [
+        {'Id': 'a', 'property1': 'x', 'property2': 'y'},
+        {'Id': 'b', 'property1': 'x', 'property2': 'y'},
+    ]
+    first, second = _hashes(items, lastupdated=1)
+    assert first == second
+    assert _hashes(items[:1], lastupdated=2) == [first]
+    # The items are copied, not modified.
+    assert CONTENT_HASH_FIELD not in items[0]
+
+
+def test_add_content_hashes_changes_with_content_and_query():
+    base = _hashes([{'Id': 'a', 'property1': 'x', 'property2': 'y'}], lastupdated=1)
+    assert _hashes([{'Id': 'a', 'property1': 'x', 'property2': 'z'}], lastupdated=1) != base
+    # A property going missing is a change too.
+    assert _hashes([{'Id': 'a', 'property1': 'x'}], lastupdated=1) != base
+    # Changing the schema rewrites every node once.
+    assert _hashes([{'Id': 'a', 'property1': 'x', 'property2': 'y'}], query='another query', lastupdated=1) != base
+
+
+def test_load_without_skip_unchanged_drops_content_hash():
+    """
+    A full load must drop the hash stored by an earlier skip_unchanged load, or a later skip_unchanged load of the
+    original data would match that hash and leave the data of the full load in place.
+    """
+    graph = {}
+
+    def load_graph_data(neo4j_session, query, dict_list, **kwargs):
+        # Applies the parts of the ingestion query that read and write the content hash.
+        for item in dict_list:
+            node = graph.setdefault(item['Id'], {})
+            if 'FOREACH' in query and node.get('content_hash') == item[CONTENT_HASH_FIELD]:
+                continue
+            node.update(property1=item['property1'], property2=item['property2'])
+            if CONTENT_HASH_FIELD in item:
+                node['content_hash'] = item[CONTENT_HASH_FIELD]
+            if 'REMOVE i.content_hash' in query:
+                node.pop('content_hash', None)
+
+    data_a = [{'Id': 'a', 'property1': 'a', 'property2': 'a'}]
+    data_b = [{'Id': 'a', 'property1': 'b', 'property2': 'b'}]
+    with mock.patch.object(tx, 'ensure_indexes'), mock.patch.object(tx, 'load_graph_data', load_graph_data):
+        tx.load(mock.MagicMock(), SimpleNodeSchema(), data_a, skip_unchanged=True, lastupdated=1)
+        tx.load(mock.MagicMock(), SimpleNodeSchema(), data_b, skip_unchanged=False, lastupdated=2)
+        assert 'content_hash' not in graph['a']
+        tx.load(mock.MagicMock(), SimpleNodeSchema(), data_a, skip_unchanged=True, lastupdated=3)
+
+    assert (graph['a']['property1'], graph['a']['property2']) == ('a', 'a')
@@ -1,4 +1,10 @@
+import pytest
+
 from cartography.graph.job import GraphJob
+from cartography.graph.loadedids import record_loaded_ids
+from cartography.graph.loadedids import set_id_set_cleanup
+from cartography.graph.statement import IdSetCleanupStatement
+from tests.data.graph.querybuilder.sample_models.interesting_asset import InterestingAssetSchema
 from tests.data.jobs.sample import SAMPLE_CLEANUP_JOB
 
 
@@ -10,3 +16,73 @@ def test_graphjob_from_json():
     assert job.name == "cleanup stale resources"
     assert len(job.statements) == 3
     assert job.short_name is None
+
+
+def test_graphjob_run_binds_parameters_without_mutating_statements(mocker):
+    job: GraphJob = GraphJob.from_json(SAMPLE_CLEANUP_JOB)
+    neo4j_session = mocker.Mock()
+    # Stop the iterative statements after their first batch
+    neo4j_session.write_transaction.return_value.consume.return_value.counters.contains_updates = False
+
+    job.run(neo4j_session, {'UPDATE_TAG': 1})
+
+    # Each statement is executed with the per-run parameters, but the parsed statements are left untouched so that
+    # they can be shared across runs.
+    for stm, call in zip(job.statements, neo4j_session.write_transaction.call_args_list):
+        assert call.args[1] == {'LIMIT_SIZE': 100, 'UPDATE_TAG': 1}
+        assert stm.parameters == {'LIMIT_SIZE': 100}
+    assert job.parameters == {}
+
+
+def test_graphjob_from_node_schema_reuses_statements():
+    job_1 = GraphJob.from_node_schema(InterestingAssetSchema(), {'UPDATE_TAG': 1, 'sub_resource_id': 'a'})
+    job_2 = GraphJob.from_node_schema(InterestingAssetSchema(), {'UPDATE_TAG': 2, 'sub_resource_id': 'b'})
+
+    assert job_1.statements == job_2.statements
+    assert all(s1 is s2 for s1, s2 in zip(job_1.statements, job_2.statements))
+    assert job_1.parameters == {'UPDATE_TAG': 1, 'sub_resource_id': 'a'}
+    assert job_2.parameters == {'UPDATE_TAG': 2, 'sub_resource_id': 'b'}
+
+
+def test_graphjob_from_node_schema_missing_params():
+    with pytest.raises(ValueError):
+        GraphJob.from_node_schema(InterestingAssetSchema(), {'UPDATE_TAG': 1})
+
+
+@pytest.fixture
+def id_set_cleanup():
+    set_id_set_cleanup(True)
+    yield
+    set_id_set_cleanup(False)
+
+
+def test_graphjob_from_node_schema_id_set_cleanup(id_set_cleanup, mocker):
+    schema = InterestingAssetSchema()
+    # Loads of the same sub resource add up, e.g. one per region.
+    record_loaded_ids(schema, [{'Id': 'a1'}], {'sub_resource_id': 'a', 'lastupdated': 1})
+    record_loaded_ids(schema, [{'Id': 'a2'}], {'sub_resource_id': 'a', 'lastupdated': 1})
+    record_loaded_ids(schema, [{'Id': 'b1'}], {'sub_resource_id': 'b', 'lastupdated': 1})
+
+    job = GraphJob.from_node_schema(schema, {'UPDATE_TAG': 1, 'sub_resource_id': 'a'})
+    # Only the stale node statement changes.
+    assert isinstance(job.statements[0], IdSetCleanupStatement)
+    assert job.statements[0].loaded_ids == {'a1', 'a2'}
+    other_job = GraphJob.from_node_schema(schema, {'UPDATE_TAG': 1, 'sub_resource_id': 'c'})
+    assert job.statements[1:] == other_job.statements[1:]
+    # The ids are only used once.
+    assert not isinstance(
+        GraphJob.from_node_schema(schema, {'UPDATE_TAG': 1, 'sub_resource_id': 'a'}).statements[0],
+        IdSetCleanupStatement,
+    )
+
+    neo4j_session = mocker.Mock()
+    neo4j_session.read_transaction.return_value = ['a1', 'a2', 'a3', 'a4']
+    job.statements[0].run(neo4j_session, job.parameters)
+    neo4j_session.write_transaction.assert_called_once()
+    assert neo4j_session.write_transaction.call_args.args[1]['StaleIds'] == ['a3', 'a4']
+
+
+def test_graphjob_from_node_schema_id_set_cleanup_disabled():
+    record_loaded_ids(InterestingAssetSchema(), [{'Id': 'a1'}], {'sub_resource_id': 'a', 'lastupdated': 1})
+    job = GraphJob.from_node_schema(InterestingAssetSchema(), {'UPDATE_TAG': 1, 'sub_resource_id': 'a'})
+    assert not isinstance(job.statements[0], IdSetCleanupStatement)
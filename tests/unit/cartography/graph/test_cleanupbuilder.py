@@ -4,6 +4,7 @@ import pytest
 
 from cartography.graph.cleanupbuilder import _build_cleanup_node_and_rel_queries
 from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.cleanupbuilder import build_id_set_cleanup_queries
 from cartography.graph.job import get_parameters
 from cartography.models.aws.emr import EMRClusterToAWSAccount
 from tests.data.graph.querybuilder.sample_models.asset_with_non_kwargs_tgm import FakeEC2InstanceSchema
@@ -112,6 +113,23 @@ def test_build_cleanup_queries():
     assert clean_query_list(actual_queries) == clean_query_list(expected_queries)
 
 
+def test_build_id_set_cleanup_queries():
+    list_ids_query, delete_query = build_id_set_cleanup_queries(InterestingAssetSchema())
+    expected_queries = [
+        """
+        MATCH (n:InterestingAsset)<-[s:RELATIONSHIP_LABEL]-(:SubResource{id: $sub_resource_id})
+        RETURN n.id AS id;
+        """,
+        """
+        UNWIND $StaleIds AS stale_id
+        MATCH (n:InterestingAsset{id: stale_id})<-[s:RELATIONSHIP_LABEL]-(:SubResource{id: $sub_resource_id})
+        WHERE n.lastupdated <> $UPDATE_TAG
+        DETACH DELETE n;
+        """,
+    ]
+    assert clean_query_list([list_ids_query, delete_query]) == clean_query_list(expected_queries)
+
+
 def test_get_params_from_queries():
     """
     Test that we are able to correctly retrieve parameter names from the generated cleanup queries.
@@ -0,0 +1,67 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from cartography.graph import pipeline
+from cartography.graph import sessions
+from cartography.graph.pipeline import open_write_pipeline
+from cartography.graph.pipeline import set_writer_sessions
+
+
+@pytest.fixture
+def driver():
+    driver = mock.MagicMock()
+    driver.session.side_effect = lambda database: mock.MagicMock()
+    sessions.set_neo4j_driver(driver)
+    set_writer_sessions(3)
+    yield driver
+    set_writer_sessions(None)
+    sessions.set_neo4j_driver(None)
+
+
+def test_write_pipeline_writes_on_writer_sessions(driver):
+    written = []
+    lock = threading.Lock()
+
+    def write(item, neo4j_session):
+        with lock:
+            written.append((item, neo4j_session))
+
+    producer_session = mock.MagicMock()
+    with open_write_pipeline(producer_session) as write_pipeline:
+        for i in range(20):
+            write_pipeline.submit(lambda neo4j_session, i=i: write(i, neo4j_session))
+        write_pipeline.barrier()
+        assert sorted(item for item, _ in written) == list(range(20))
+        write_pipeline.submit(lambda neo4j_session: write(20, neo4j_session))
+
+    # Leaving the pipeline waits for its writes, which ran on the writer sessions rather than the producer's.
+    assert len(written) == 21
+    assert producer_session not in {neo4j_session for _, neo4j_session in written}
+    assert driver.session.call_count == 3
+
+
+def test_write_pipeline_raises_write_errors(driver):
+    written = []
+
+    def fail(neo4j_session):
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError, match='boom'):
+        with open_write_pipeline(mock.MagicMock()) as write_pipeline:
+            write_pipeline.submit(fail)
+            write_pipeline.barrier()
+            write_pipeline.submit(written.append)
+
+    # The producer stops at the first submit() after the failure.
+    assert written == []
+
+
+@mock.patch.object(pipeline, 'load')
+def test_write_pipeline_is_inline_without_writer_sessions(mock_load):
+    neo4j_session = mock.MagicMock()
+    schema = mock.MagicMock()
+    with open_write_pipeline(neo4j_session) as write_pipeline:
+        write_pipeline.submit_load(schema, [{'id': 1}], lastupdated=1)
+        mock_load.assert_called_once_with(neo4j_session, schema, [{'id': 1}], lastupdated=1)
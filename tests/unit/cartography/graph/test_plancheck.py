@@ -0,0 +1,62 @@
+from cartography.graph import plancheck
+from cartography.graph.plancheck import find_plan_issues
+from cartography.graph.plancheck import iter_job_statements
+
+
+def _op(operator_type, *children):
+    return {'operatorType': f'{operator_type}@neo4j', 'children': list(children)}
+
+
+def test_all_nodes_scan_is_an_error():
+    plan = _op('ProduceResults', _op('Filter', _op('AllNodesScan')))
+    assert find_plan_issues(plan) == [('AllNodesScan', 'error')]
+
+
+def test_cartesian_product_of_index_seeks_is_allowed():
+    plan = _op('ProduceResults', _op('CartesianProduct', _op('NodeIndexSeek'), _op('NodeUniqueIndexSeek')))
+    assert find_plan_issues(plan) == []
+
+
+def test_cartesian_product_with_a_label_scan_is_an_error():
+    plan = _op('ProduceResults', _op('CartesianProduct', _op('NodeIndexSeek'), _op('NodeByLabelScan')))
+    assert find_plan_issues(plan) == [('CartesianProduct', 'error')]
+
+
+def test_label_scan_without_index_is_a_warning():
+    assert find_plan_issues(_op('ProduceResults', _op('Expand(All)', _op('NodeByLabelScan')))) == [
+        ('NodeByLabelScan', 'warning'),
+    ]
+    # A label scan is fine when the rest of the statement is anchored on an index.
+    plan = _op('ProduceResults', _op('Apply', _op('NodeIndexSeek'), _op('NodeByLabelScan')))
+    assert find_plan_issues(plan) == []
+
+
+def test_eager_is_a_warning():
+    plan = _op('EmptyResult', _op('Eager', _op('NodeIndexSeek')))
+    assert find_plan_issues(plan) == [('Eager', 'warning')]
+
+
+def test_iter_job_statements_covers_shipped_jobs():
+    jobs = {job for job, _ in iter_job_statements()}
+    assert 'cartography.data.jobs.analysis/aws_ec2_asset_exposure.json' in jobs
+    assert 'cartography.data.jobs.cleanup/aws_import_tags_cleanup.json' in jobs
+
+
+def test_shipped_jobs_do_not_match_unlabeled_nodes():
+    # `MATCH (n) WHERE ...` always compiles to an AllNodesScan.
+    offending = [
+        f'{job} statement #{statement.parent_job_sequence_num}'
+        for job, statement in iter_job_statements() if 'MATCH (n) ' in statement.query
+    ]
+    assert offending == []
+
+
+def test_main_exit_code(mocker):
+    mocker.patch('cartography.graph.plancheck.neo4j')
+    mocker.patch.object(
+        plancheck,
+        'check_job_plans',
+        return_value=[plancheck.PlanFinding('job.json', 1, 'Eager', 'warning', 'MATCH (n:A) RETURN n')],
+    )
+    assert plancheck.main([]) == 0
+    assert plancheck.main(['--fail-on', 'warning']) == 1
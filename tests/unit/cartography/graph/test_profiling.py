@@ -0,0 +1,89 @@
+import json
+from unittest import mock
+
+import pytest
+from neo4j import SummaryCounters
+
+from cartography.graph import profiling
+from cartography.graph.profiling import query_scope
+from cartography.graph.profiling import QueryProfiler
+from cartography.graph.statement import GraphStatement
+
+
+def _make_summary(available_after, consumed_after, profile=None):
+    summary = mock.Mock(
+        result_available_after=available_after,
+        result_consumed_after=consumed_after,
+        profile=profile,
+    )
+    summary.counters = SummaryCounters({'nodes-deleted': 3})
+    return summary
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    log_path = tmp_path / 'slow_queries.jsonl'
+    query_profiler = QueryProfiler(str(log_path), slow_query_threshold_ms=100)
+    profiling.set_query_profiler(query_profiler)
+    yield query_profiler
+    profiling.set_query_profiler(None)
+
+
+def _read_log(query_profiler):
+    with open(query_profiler.slow_query_log_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_only_slow_queries_are_logged(profiler):
+    profiling.record_query('MATCH (n) RETURN n', _make_summary(10, 5), 1, 'fast_job', 1)
+    profiling.record_query('MATCH (n) RETURN n', _make_summary(90, 20), 2, 'slow_job', 2)
+
+    entries = _read_log(profiler)
+    assert len(entries) == 1
+    assert entries[0]['name'] == 'slow_job'
+    assert entries[0]['sequence_num'] == 2
+    assert entries[0]['total_ms'] == 110
+    assert entries[0]['rows'] == 2
+    assert entries[0]['counters'] == {'nodes_deleted': 3}
+
+
+def test_query_scope_names_queries(profiler):
+    with query_scope('load.EC2Instance'):
+        profiling.record_query('UNWIND $DictList AS item RETURN item', _make_summary(500, 0), 10)
+
+    entries = _read_log(profiler)
+    assert entries[0]['name'] == 'load.EC2Instance'
+    assert entries[0]['sequence_num'] is None
+
+
+def test_profile_plan_db_hits(profiler):
+    plan = {
+        'operatorType': 'ProduceResults@neo4j',
+        'dbHits': 0,
+        'rows': 1,
+        'args': {},
+        'children': [{'operatorType': 'AllNodesScan@neo4j', 'dbHits': 1001, 'rows': 1000, 'args': {}, 'children': []}],
+    }
+    profiling.record_query('MATCH (n) RETURN n', _make_summary(1000, 0, plan), 1, 'job', 1)
+
+    entry = _read_log(profiler)[0]
+    assert entry['db_hits'] == 1001
+    assert entry['profile']['children'][0]['operator'] == 'AllNodesScan@neo4j'
+
+
+def test_prepare_query_sampling():
+    assert QueryProfiler(profile_sample_rate=0.0).prepare_query('MATCH (n) RETURN n') == 'MATCH (n) RETURN n'
+    assert QueryProfiler(profile_sample_rate=1.0).prepare_query('MATCH (n) RETURN n') == 'PROFILE MATCH (n) RETURN n'
+    assert QueryProfiler(profile_sample_rate=1.0).prepare_query('EXPLAIN MATCH (n)') == 'EXPLAIN MATCH (n)'
+
+
+def test_graph_statement_records_job_name(profiler):
+    statement = GraphStatement('MATCH (n) DETACH DELETE n', parent_job_name='my_job', parent_job_sequence_num=3)
+    tx = mock.Mock()
+    tx.run.return_value.consume.return_value = _make_summary(200, 0)
+
+    statement._run_noniterative(tx)
+
+    entry = _read_log(profiler)[0]
+    assert (entry['name'], entry['sequence_num']) == ('my_job', 3)
+    assert entry['query'] == 'MATCH (n) DETACH DELETE n'
@@ -1,5 +1,6 @@
 from cartography.graph.querybuilder import build_ingestion_query
 from tests.data.graph.querybuilder.sample_models.interesting_asset import InterestingAssetSchema
+from tests.data.graph.querybuilder.sample_models.kwargs_rels import SimpleNodeWithKwargsRelsSchema
 from tests.unit.cartography.graph.helpers import remove_leading_whitespace_and_empty_lines
 
 
@@ -8,6 +9,10 @@ def test_build_ingestion_query_complex():
     query = build_ingestion_query(InterestingAssetSchema())
 
     expected = """
+        OPTIONAL MATCH (j:SubResource)
+        WHERE
+            j.id = $sub_resource_id
+        WITH collect(j) AS j_nodes
         UNWIND $DictList AS item
             MERGE (i:InterestingAsset{id: item.Id})
             ON CREATE SET i.firstseen = timestamp()
@@ -16,12 +21,12 @@ def test_build_ingestion_query_complex():
                 i.property1 = item.property1,
                 i.property2 = item.property2,
                 i:AnotherNodeLabel:YetAnotherNodeLabel
+            REMOVE i.content_hash
 
-            WITH i, item
+            WITH i, item, j_nodes
             CALL {
-                WITH i, item
-                OPTIONAL MATCH (j:SubResource{id: $sub_resource_id})
-                WITH i, item, j WHERE j IS NOT NULL
+                WITH i, item, j_nodes
+                UNWIND j_nodes AS j
                 MERGE (i)<-[r:RELATIONSHIP_LABEL]-(j)
                 ON CREATE SET r.firstseen = timestamp()
                 SET
@@ -57,3 +62,63 @@ def test_build_ingestion_query_complex():
     actual_query = remove_leading_whitespace_and_empty_lines(query)
     expected_query = remove_leading_whitespace_and_empty_lines(expected)
     assert actual_query == expected_query
+
+
+def test_build_ingestion_query_hoists_kwargs_matchers():
+    """
+    Target nodes matched only on kwargs are matched once before the UNWIND, except for nodes of the schema's own label
+    which may be created by the query itself.
+    """
+    query = build_ingestion_query(SimpleNodeWithKwargsRelsSchema())
+
+    expected = """
+        OPTIONAL MATCH (j:SubResource)
+        WHERE
+            j.id = $sub_resource_id
+        WITH collect(j) AS j_nodes
+        OPTIONAL MATCH (n0:HelloAsset)
+        WHERE
+            n0.id = $hello_asset_id
+        WITH j_nodes, collect(n0) AS n0_nodes
+        UNWIND $DictList AS item
+            MERGE (i:SimpleNode{id: item.Id})
+            ON CREATE SET i.firstseen = timestamp()
+            SET
+                i.lastupdated = $lastupdated,
+                i.property1 = item.property1,
+                i.property2 = item.property2
+            REMOVE i.content_hash
+
+            WITH i, item, j_nodes, n0_nodes
+            CALL {
+                WITH i, item, j_nodes
+                UNWIND j_nodes AS j
+                MERGE (i)<-[r:RELATIONSHIP_LABEL]-(j)
+                ON CREATE SET r.firstseen = timestamp()
+                SET
+                    r.lastupdated = $lastupdated
+
+                UNION
+                WITH i, item, n0_nodes
+                UNWIND n0_nodes AS n0
+                MERGE (i)-[r0:ASSOCIATED_WITH]->(n0)
+                ON CREATE SET r0.firstseen = timestamp()
+                SET
+                    r0.lastupdated = $lastupdated
+
+                UNION
+                WITH i, item
+                OPTIONAL MATCH (n1:SimpleNode)
+                WHERE
+                    n1.id = $parent_id
+                WITH i, item, n1 WHERE n1 IS NOT NULL
+                MERGE (i)<-[r1:PARENT_OF]-(n1)
+                ON CREATE SET r1.firstseen = timestamp()
+                SET
+                    r1.lastupdated = $lastupdated
+            }
+    """
+
+    actual_query = remove_leading_whitespace_and_empty_lines(query)
+    expected_query = remove_leading_whitespace_and_empty_lines(expected)
+    assert actual_query == expected_query
@@ -1,6 +1,10 @@
 from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import parse_create_index_query
 from cartography.models.aws.emr import EMRClusterSchema
+from tests.data.graph.querybuilder.sample_models.fake_emps_githubusers import FakeEmpSchema
+from tests.data.graph.querybuilder.sample_models.fake_emps_githubusers import FakeGitHubUserSchema
 from tests.data.graph.querybuilder.sample_models.interesting_asset import InterestingAssetSchema
+from tests.data.graph.querybuilder.sample_models.unique_node import UniqueNodeSchema
 
 
 def test_build_create_index_queries():
@@ -28,3 +32,34 @@ def test_build_create_index_queries_for_emr():
         'CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.id);',
         'CREATE INDEX IF NOT EXISTS FOR (n:EMRCluster) ON (n.arn);',
     }
+
+
+def test_build_create_index_queries_unique_id():
+    result = build_create_index_queries(UniqueNodeSchema())
+    assert set(result) == {
+        'CREATE CONSTRAINT IF NOT EXISTS FOR (n:UniqueNode) REQUIRE n.id IS UNIQUE;',
+        'CREATE INDEX IF NOT EXISTS FOR (n:UniqueNode) ON (n.lastupdated);',
+        'CREATE INDEX IF NOT EXISTS FOR (n:UniqueNode) ON (n.arn);',
+    }
+    assert [parse_create_index_query(query) for query in sorted(result)] == [
+        ('UniqueNode', 'id', True),
+        ('UniqueNode', 'arn', False),
+        ('UniqueNode', 'lastupdated', False),
+    ]
+
+
+def test_build_create_index_queries_ignore_case():
+    """
+    Case-insensitive matches use the lowercase shadow property of the target node, which is indexed both by the
+    schemas matching on it and by the schema writing it.
+    """
+    assert set(build_create_index_queries(FakeEmpSchema())) == {
+        'CREATE INDEX IF NOT EXISTS FOR (n:FakeEmployee) ON (n.id);',
+        'CREATE INDEX IF NOT EXISTS FOR (n:FakeEmployee) ON (n.lastupdated);',
+        'CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.username_lower);',
+    }
+    assert set(build_create_index_queries(FakeGitHubUserSchema())) == {
+        'CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.id);',
+        'CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.lastupdated);',
+        'CREATE INDEX IF NOT EXISTS FOR (n:GitHubUser) ON (n.username_lower);',
+    }
@@ -1,5 +1,6 @@
 from cartography.graph.querybuilder import build_ingestion_query
 from tests.data.graph.querybuilder.sample_models.fake_emps_githubusers import FakeEmpSchema
+from tests.data.graph.querybuilder.sample_models.fake_emps_githubusers import FakeGitHubUserSchema
 from tests.data.graph.querybuilder.sample_models.simple_node import SimpleNodeSchema
 from tests.data.graph.querybuilder.sample_models.simple_node import SimpleNodeWithSubResourceSchema
 from tests.unit.cartography.graph.helpers import remove_leading_whitespace_and_empty_lines
@@ -34,6 +35,10 @@ def test_build_ingestion_query_with_sub_resource():
     query = build_ingestion_query(SimpleNodeWithSubResourceSchema())
 
     expected = """
+        OPTIONAL MATCH (j:SubResource)
+        WHERE
+            j.id = $sub_resource_id
+        WITH collect(j) AS j_nodes
         UNWIND $DictList AS item
             MERGE (i:SimpleNode{id: item.Id})
             ON CREATE SET i.firstseen = timestamp()
@@ -41,12 +46,12 @@ def test_build_ingestion_query_with_sub_resource():
                 i.lastupdated = $lastupdated,
                 i.property1 = item.property1,
                 i.property2 = item.property2
+            REMOVE i.content_hash
 
-            WITH i, item
+            WITH i, item, j_nodes
             CALL {
-                WITH i, item
-                OPTIONAL MATCH (j:SubResource{id: $sub_resource_id})
-                WITH i, item, j WHERE j IS NOT NULL
+                WITH i, item, j_nodes
+                UNWIND j_nodes AS j
                 MERGE (i)<-[r:RELATIONSHIP_LABEL]-(j)
                 ON CREATE SET r.firstseen = timestamp()
                 SET
@@ -71,13 +76,15 @@ def test_build_ingestion_query_case_insensitive_match():
                 i.lastupdated = $lastupdated,
                 i.email = item.email,
                 i.github_username = item.github_username
+            REMOVE i.content_hash
 
             WITH i, item
             CALL {
                 WITH i, item
                 OPTIONAL MATCH (n0:GitHubUser)
                 WHERE
-                    toLower(n0.username) = toLower(item.github_username)
+                    (n0.username_lower = toLower(item.github_username) OR
+                    (n0.username_lower IS NULL AND toLower(n0.username) = toLower(item.github_username)))
                 WITH i, item, n0 WHERE n0 IS NOT NULL
                 MERGE (i)-[r0:IDENTITY_GITHUB]->(n0)
                 ON CREATE SET r0.firstseen = timestamp()
@@ -90,3 +97,51 @@ def test_build_ingestion_query_case_insensitive_match():
     actual_query = remove_leading_whitespace_and_empty_lines(query)
     expected_query = remove_leading_whitespace_and_empty_lines(expected)
     assert actual_query == expected_query
+
+
+def test_build_ingestion_query_lowercase_shadow_property():
+    query = build_ingestion_query(FakeGitHubUserSchema())
+
+    expected = """
+        UNWIND $DictList AS item
+            MERGE (i:GitHubUser{id: item.id})
+            ON CREATE SET i.firstseen = timestamp()
+            SET
+                i.lastupdated = $lastupdated,
+                i.username = item.username,
+                i.username_lower = toLower(item.username)
+            REMOVE i.content_hash
+    """
+
+    # Assert: compare query outputs while ignoring leading whitespace.
+    actual_query = remove_leading_whitespace_and_empty_lines(query)
+    expected_query = remove_leading_whitespace_and_empty_lines(expected)
+    assert actual_query == expected_query
+
+
+def test_build_ingestion_query_skip_unchanged():
+    """
+    Test that with skip_unchanged, only lastupdated is set unconditionally and the other properties are only set when
+    the content hash of the item differs from the one stored on the node.
+    """
+    # Act
+    query = build_ingestion_query(SimpleNodeSchema(), skip_unchanged=True)
+
+    expected = """
+        UNWIND $DictList AS item
+            MERGE (i:SimpleNode{id: item.Id})
+            ON CREATE SET i.firstseen = timestamp()
+            SET
+                i.lastupdated = $lastupdated
+            FOREACH (_ IN CASE WHEN i.content_hash = item._cartography_content_hash THEN [] ELSE [1] END |
+                SET
+                    i.property1 = item.property1,
+                    i.property2 = item.property2,
+                    i.content_hash = item._cartography_content_hash
+            )
+    """
+
+    # Assert: compare query outputs while ignoring leading whitespace.
+    actual_query = remove_leading_whitespace_and_empty_lines(query)
+    expected_query = remove_leading_whitespace_and_empty_lines(expected)
+    assert actual_query == expected_query
@@ -1,5 +1,9 @@
+from unittest import mock
+
 import tests.data.aws.apigateway as test_data
+from cartography.intel.aws.apigateway import get_rest_api_details
 from cartography.intel.aws.apigateway import parse_policy
+from cartography.intel.aws.apigateway import transform_apigateway_rest_apis
 
 
 def test_parse_policy():
@@ -15,3 +19,40 @@ def test_none_policy():
     res = parse_policy(None, None)
 
     assert (res) is None
+
+
+def test_transform_apigateway_rest_apis_sets_anonymous_access():
+    rest_apis = [{'id': 'public', 'policy': test_data.DOUBLY_ESCAPED_POLICY}, {'id': 'private'}]
+
+    transform_apigateway_rest_apis(rest_apis)
+
+    assert rest_apis[0]['anonymous_access'] is True
+    assert rest_apis[0]['anonymous_actions'] == ['execute-api:Invoke']
+    assert rest_apis[1]['anonymous_access'] is False
+    assert rest_apis[1]['anonymous_actions'] == []
+
+
+def test_get_rest_api_details_fetches_every_stage_certificate():
+    client = mock.MagicMock()
+    client.get_stages.side_effect = lambda restApiId: {
+        'item': [
+            {'stageName': f'{restApiId}-a', 'clientCertificateId': f'{restApiId}-cert-a'},
+            {'stageName': f'{restApiId}-b'},
+            {'stageName': f'{restApiId}-c', 'clientCertificateId': f'{restApiId}-cert-c'},
+        ],
+    }
+    client.get_client_certificate.side_effect = lambda clientCertificateId: {'clientCertificateId': clientCertificateId}
+    client.get_paginator.return_value.paginate.side_effect = lambda restApiId: [{'items': [{'id': restApiId}]}]
+    boto3_session = mock.MagicMock()
+    boto3_session.client.return_value = client
+
+    details = get_rest_api_details(boto3_session, [{'id': 'api-1'}, {'id': 'api-2'}], 'us-east-1')
+
+    assert [api_id for api_id, _, _, _ in details] == ['api-1', 'api-2']
+    api_id, stages, certificates, resources = details[0]
+    assert len(stages) == 3
+    assert resources == [{'id': 'api-1'}]
+    assert certificates == [
+        {'clientCertificateId': 'api-1-cert-a', 'stageName': 'api-1-a'},
+        {'clientCertificateId': 'api-1-cert-c', 'stageName': 'api-1-c'},
+    ]
@@ -0,0 +1,50 @@
+import boto3
+import botocore.exceptions
+import pytest
+from botocore.stub import Stubber
+
+from cartography.fetchcache import FetchCache
+from cartography.fetchcache import FetchCacheMiss
+from cartography.fetchcache import set_fetch_cache
+from cartography.intel.aws.util.fetchcache import instrument_boto3_session
+
+
+@pytest.fixture
+def fetch_cache_dir(tmp_path):
+    yield str(tmp_path)
+    set_fetch_cache(None)
+
+
+def _client(account_id):
+    boto3_session = boto3.Session(
+        aws_access_key_id='testing', aws_secret_access_key='testing', region_name='us-east-1',
+    )
+    instrument_boto3_session(boto3_session, account_id)
+    return boto3_session.client('ec2')
+
+
+def test_record_and_replay_boto3_calls(fetch_cache_dir):
+    # Arrange: record a response and an error
+    set_fetch_cache(FetchCache(fetch_cache_dir))
+    client = _client('000000000000')
+    with Stubber(client) as stubber:
+        stubber.add_response('describe_vpcs', {'Vpcs': [{'VpcId': 'vpc-1'}]}, {'MaxResults': 5})
+        stubber.add_client_error('describe_vpcs', 'UnauthorizedOperation', expected_params={'MaxResults': 6})
+        client.describe_vpcs(MaxResults=5)
+        with pytest.raises(botocore.exceptions.ClientError):
+            client.describe_vpcs(MaxResults=6)
+
+    # Act: replay without calling AWS
+    set_fetch_cache(FetchCache(fetch_cache_dir, replay=True))
+    client = _client('000000000000')
+
+    # Assert
+    assert client.describe_vpcs(MaxResults=5)['Vpcs'] == [{'VpcId': 'vpc-1'}]
+    with pytest.raises(botocore.exceptions.ClientError) as e:
+        client.describe_vpcs(MaxResults=6)
+    assert e.value.response['Error']['Code'] == 'UnauthorizedOperation'
+    # Calls with other parameters or for another account were not recorded.
+    with pytest.raises(FetchCacheMiss):
+        client.describe_vpcs(MaxResults=7)
+    with pytest.raises(FetchCacheMiss):
+        _client('111111111111').describe_vpcs(MaxResults=5)
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from cartography.intel.aws import kms
+from tests.data.aws.kms import DESCRIBE_ALIASES
+from tests.data.aws.kms import DESCRIBE_GRANTS
+from tests.data.aws.kms import DESCRIBE_KEYS
+
+
+def test_get_kms_key_details_fetches_concurrently_and_retries_throttling():
+    client = mock.MagicMock()
+    client.get_key_policy.side_effect = [
+        ClientError({'Error': {'Code': 'ThrottlingException'}}, 'GetKeyPolicy'),
+        None,
+        None,
+    ]
+
+    def get_paginator(operation):
+        paginator = mock.MagicMock()
+        key = 'Aliases' if operation == 'list_aliases' else 'Grants'
+        paginator.paginate.side_effect = lambda KeyId: [{key: [{'KeyId': KeyId}]}]
+        return paginator
+
+    client.get_paginator.side_effect = get_paginator
+    boto3_session = mock.MagicMock()
+    boto3_session.client.return_value = client
+    keys = [{'KeyId': 'key-1'}, {'KeyId': 'key-2'}]
+
+    details = list(kms.get_kms_key_details(boto3_session, keys, 'us-east-1'))
+
+    assert [(key_id, aliases, grants) for key_id, _, aliases, grants in details] == [
+        ('key-1', [{'KeyId': 'key-1'}], [{'KeyId': 'key-1'}]),
+        ('key-2', [{'KeyId': 'key-2'}], [{'KeyId': 'key-2'}]),
+    ]
+    assert client.get_key_policy.call_count == 3
+
+
+@mock.patch.object(kms, 'run_cleanup_job')
+@mock.patch.object(kms, '_load_kms_key_grants')
+def test_load_kms_key_details_loads_grants(mock_load_grants, mock_cleanup):
+    key_id = DESCRIBE_KEYS[0]['KeyId']
+    details = [(key_id, None, DESCRIBE_ALIASES, DESCRIBE_GRANTS)]
+
+    kms.load_kms_key_details(mock.MagicMock(), details, 'us-east-1', '000000000000', 1)
+
+    assert mock_load_grants.call_args.args[1] == DESCRIBE_GRANTS
@@ -1,4 +1,6 @@
 import copy
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import cartography.intel.aws.resourcegroupstaggingapi as rgta
 import tests.data.aws.resourcegroupstaggingapi as test_data
@@ -44,3 +46,67 @@ def test_transform_tags():
     assert 'resource_id' not in get_resources_response[0]
     rgta.transform_tags(get_resources_response, 'ec2:instance')
     assert 'resource_id' in get_resources_response[0]
+
+
+def test_get_resource_type_from_arn():
+    assert rgta.get_resource_type_from_arn('arn:aws:ec2:us-east-1:1234:instance/i-abcd') == 'ec2:instance'
+    assert rgta.get_resource_type_from_arn('arn:aws:s3:::bucket_name') == 's3'
+    assert rgta.get_resource_type_from_arn('arn:aws:rds:us-east-1:1234:db:rds-db-1') == 'rds:db'
+    assert rgta.get_resource_type_from_arn('arn:aws:sqs:us-east-1:1234:my-queue') == 'sqs'
+    assert rgta.get_resource_type_from_arn(
+        'arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/app/foo/ab123',
+    ) == 'elasticloadbalancing:loadbalancer/app'
+    assert rgta.get_resource_type_from_arn(
+        'arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/foo',
+    ) == 'elasticloadbalancing:loadbalancer'
+    assert rgta.get_resource_type_from_arn(
+        'arn:aws:ec2:us-east-1:1234:transit-gateway-attachment/tgw-attach-1',
+    ) == 'ec2:transit-gateway-attachment'
+    assert rgta.get_resource_type_from_arn('arn:aws:sns:us-east-1:1234:my-topic') is None
+
+
+def test_route_tag_mappings():
+    get_resources_response = copy.deepcopy(test_data.GET_RESOURCES_RESPONSE)
+
+    routed = rgta.route_tag_mappings(get_resources_response)
+
+    assert {resource_type: [m['resource_id'] for m in mappings] for resource_type, mappings in routed.items()} == {
+        'ec2:instance': ['i-01'],
+        's3': ['bucket-1'],
+        'rds:db': ['arn:aws:rds:us-east-1:1234:db:rds-db-1'],
+    }
+
+
+def test_load_tag_mappings_writes_each_tag_once():
+    routed = rgta.route_tag_mappings(copy.deepcopy(test_data.GET_RESOURCES_RESPONSE))
+    neo4j_session = MagicMock()
+    calls = []
+
+    def write_transaction(tx_func, items, **kwargs):
+        calls.append((tx_func, items))
+        if tx_func is rgta._load_tagged_relationships_tx:
+            return [rel['tag_id'] for rel in items]
+        return []
+
+    neo4j_session.write_transaction.side_effect = write_transaction
+
+    rgta.load_tag_mappings(neo4j_session, routed, 'us-east-1', '1234', 1)
+
+    # One write per resource type for the TAGGED relationships, then one for the properties of the distinct tags.
+    assert [tx_func for tx_func, _ in calls[:-1]] == [rgta._load_tagged_relationships_tx] * 3
+    assert calls[-1][0] is rgta._load_tag_properties_tx
+    assert [tag['id'] for tag in calls[-1][1]] == [
+        'Department:Engineering', 'LastReviewed:January', 'Owner:cartography', 'TestKey:TestValue',
+    ]
+
+
+@patch.object(rgta, 'TAG_BATCH_SIZE', 2)
+@patch.object(rgta, 'TAG_BATCH_SIZE_MIN', 1)
+def test_write_in_adaptive_batches_grows_fast_batches():
+    neo4j_session = MagicMock()
+    neo4j_session.write_transaction.side_effect = lambda tx_func, items: list(items)
+
+    results = rgta._write_in_adaptive_batches(neo4j_session, MagicMock(), list(range(14)))
+
+    assert results == list(range(14))
+    assert [len(call.args[1]) for call in neo4j_session.write_transaction.call_args_list] == [2, 4, 8]
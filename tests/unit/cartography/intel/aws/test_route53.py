@@ -0,0 +1,85 @@
+from unittest import mock
+
+import botocore.exceptions
+
+from cartography.intel.aws import route53
+from tests.data.aws.route53 import GET_ZONES_SAMPLE_RESPONSE
+
+
+def _mock_client(zone_count):
+    client = mock.MagicMock()
+
+    def get_paginator(operation):
+        paginator = mock.MagicMock()
+        if operation == 'list_hosted_zones':
+            paginator.paginate.return_value = [{'HostedZones': [{'Id': f'Z{i}'} for i in range(zone_count)]}]
+        else:
+            paginator.paginate.side_effect = lambda HostedZoneId: [
+                {'ResourceRecordSets': [{'Name': f'{HostedZoneId}.example.com.', 'Type': 'A'}]},
+            ]
+        return paginator
+
+    client.get_paginator.side_effect = get_paginator
+    return client
+
+
+def test_get_zones_fetches_all_zones_in_order():
+    zones = list(route53.get_zones(_mock_client(25), max_workers=3))
+
+    assert [zone['Id'] for zone, _ in zones] == [f'Z{i}' for i in range(25)]
+    assert all(record_sets[0]['Name'] == f"{zone['Id']}.example.com." for zone, record_sets in zones)
+
+
+def _no_wait():
+    yield
+    while True:
+        yield 0
+
+
+@mock.patch('cartography.util.backoff.expo', _no_wait)
+def test_get_zones_retries_throttled_zones():
+    client = _mock_client(2)
+    get_paginator = client.get_paginator.side_effect
+    throttled = []
+
+    def paginate(HostedZoneId):
+        if not throttled:
+            throttled.append(HostedZoneId)
+            raise botocore.exceptions.ClientError({'Error': {'Code': 'Throttling'}}, 'ListResourceRecordSets')
+        return [{'ResourceRecordSets': [{'Name': f'{HostedZoneId}.example.com.', 'Type': 'A'}]}]
+
+    def throttling_paginator(operation):
+        paginator = get_paginator(operation)
+        if operation == 'list_resource_record_sets':
+            paginator.paginate.side_effect = paginate
+        return paginator
+
+    client.get_paginator.side_effect = throttling_paginator
+    zones = list(route53.get_zones(client, max_workers=1))
+
+    assert throttled == ['Z0']
+    assert [(zone['Id'], record_sets[0]['Name']) for zone, record_sets in zones] == [
+        ('Z0', 'Z0.example.com.'), ('Z1', 'Z1.example.com.'),
+    ]
+
+
+@mock.patch.object(route53, 'load_zone')
+@mock.patch.object(route53, 'load_ns_records')
+@mock.patch.object(route53, 'load_cname_records')
+@mock.patch.object(route53, 'load_alias_records')
+@mock.patch.object(route53, 'load_a_records')
+def test_load_dns_details_links_only_loaded_records(load_a, load_alias, load_cname, load_ns, load_zone):
+    neo4j_session = mock.MagicMock()
+
+    route53.load_dns_details(neo4j_session, iter(GET_ZONES_SAMPLE_RESPONSE), 'AWSID', 1)
+
+    loaded = load_a.call_args.args[1] + load_alias.call_args.args[1] + load_cname.call_args.args[1]
+    ns_loaded = load_ns.call_args.args[1]
+    expected_ids = {record['id'] for record in loaded + ns_loaded}
+    # Every link query is driven by the records loaded for this account, and none of them scans all records.
+    linked_ids = set()
+    for call in neo4j_session.run.call_args_list:
+        query = call.args[0]
+        assert 'UNWIND $records AS record' in query
+        linked_ids.update(record['id'] for record in call.kwargs['records'])
+    assert linked_ids == expected_ids
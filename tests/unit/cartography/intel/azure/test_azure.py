@@ -0,0 +1,70 @@
+from unittest import mock
+
+import cartography.intel.azure
+from cartography.graph import sessions
+from cartography.intel.azure.util.clients import clear_management_clients
+from cartography.intel.azure.util.clients import get_management_client
+
+
+class FakeClient:
+    def __init__(self, credentials, subscription_id):
+        self.credentials = credentials
+        self.subscription_id = subscription_id
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_get_management_client_caches_per_credentials_subscription_and_service():
+    credentials = object()
+    client = get_management_client(FakeClient, credentials, 'sub-1')
+
+    assert get_management_client(FakeClient, credentials, 'sub-1') is client
+    assert get_management_client(FakeClient, credentials, 'sub-2') is not client
+    assert get_management_client(FakeClient, object(), 'sub-1') is not client
+
+    clear_management_clients('sub-1')
+    assert client.closed
+    assert get_management_client(FakeClient, credentials, 'sub-1') is not client
+    clear_management_clients()
+
+
+@mock.patch.object(cartography.intel.azure.subscription, 'sync')
+@mock.patch.object(cartography.intel.azure, '_sync_one_subscription')
+def test_sync_multiple_subscriptions_concurrently(mock_sync_one, mock_subscription_sync):
+    subscriptions = [{'subscriptionId': f'sub-{i}'} for i in range(6)]
+    common_job_parameters = {'UPDATE_TAG': 1}
+
+    def sync_one(neo4j_session, credentials, subscription_id, update_tag, job_parameters):
+        assert job_parameters == {'UPDATE_TAG': 1, 'AZURE_SUBSCRIPTION_ID': subscription_id}
+
+    mock_sync_one.side_effect = sync_one
+    driver = mock.MagicMock()
+    driver.session.side_effect = lambda database: mock.MagicMock()
+    sessions.set_neo4j_driver(driver)
+    try:
+        cartography.intel.azure._sync_multiple_subscriptions(
+            mock.MagicMock(), mock.MagicMock(), 'tenant', subscriptions, 1, common_job_parameters, workers=3,
+        )
+    finally:
+        sessions.set_neo4j_driver(None)
+
+    assert sorted(call.args[2] for call in mock_sync_one.call_args_list) == [f'sub-{i}' for i in range(6)]
+    # Every subscription is synced in a session of its own, and the shared job parameters are left untouched.
+    assert driver.session.call_count == 6
+    assert common_job_parameters == {'UPDATE_TAG': 1}
+
+
+@mock.patch.object(cartography.intel.azure.subscription, 'sync')
+@mock.patch.object(cartography.intel.azure, '_sync_one_subscription')
+def test_sync_multiple_subscriptions_without_driver_is_serial(mock_sync_one, mock_subscription_sync):
+    neo4j_session = mock.MagicMock()
+    subscriptions = [{'subscriptionId': 'sub-1'}, {'subscriptionId': 'sub-2'}]
+
+    cartography.intel.azure._sync_multiple_subscriptions(
+        neo4j_session, mock.MagicMock(), 'tenant', subscriptions, 1, {'UPDATE_TAG': 1}, workers=3,
+    )
+
+    assert [call.args[0] for call in mock_sync_one.call_args_list] == [neo4j_session, neo4j_session]
+    assert [call.args[2] for call in mock_sync_one.call_args_list] == ['sub-1', 'sub-2']
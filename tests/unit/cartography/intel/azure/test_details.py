@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from cartography.intel.azure.util.details import chunked
+from cartography.intel.azure.util.details import fetch_details
+
+
+def test_fetch_details_yields_results_in_order():
+    fetchers = [lambda item: item * 2, lambda item: item * 3]
+
+    details = list(fetch_details(range(20), fetchers, max_workers=4))
+
+    assert details == [(i, [i * 2, i * 3]) for i in range(20)]
+    assert list(fetch_details(range(3), fetchers, max_workers=1)) == [(i, [i * 2, i * 3]) for i in range(3)]
+
+
+def test_fetch_details_runs_calls_concurrently_and_bounds_prefetching():
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    started = []
+
+    def fetch(item):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            started.append(item)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return item
+
+    details = fetch_details(range(100), [fetch, fetch], max_workers=4)
+    assert next(details) == (0, [0, 0])
+
+    assert 1 < max_in_flight <= 4
+    # Only a window of items is fetched ahead of the consumer.
+    assert len(started) <= 2 * 4
+    details.close()
+
+
+def test_fetch_details_raises_fetcher_errors():
+    def fetch(item):
+        if item == 3:
+            raise ValueError(item)
+        return item
+
+    with pytest.raises(ValueError):
+        list(fetch_details(range(10), [fetch], max_workers=4))
+
+
+def test_chunked_is_lazy():
+    consumed = []
+
+    def items():
+        for i in range(5):
+            consumed.append(i)
+            yield i
+
+    chunks = chunked(items(), 2)
+    assert next(chunks) == [0, 1]
+    assert consumed == [0, 1]
+    assert list(chunks) == [[2, 3], [4]]
@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from cartography.config import Config
+from cartography.intel import create_indexes
+from cartography.models.aws.ec2.instances import EC2InstanceSchema
+
+
+def _mock_session(existing, duplicates=0, rel_types=()):
+    """
+    :param existing: The (label, property, owning constraint) of the indexes returned by SHOW INDEXES.
+    :param rel_types: The types of the relationships of the duplicate nodes.
+    """
+    neo4j_session = MagicMock()
+
+    def run(query, **kwargs):
+        if query.startswith('SHOW INDEXES'):
+            return [
+                {'name': f'index_{label}_{prop}', 'labelsOrTypes': [label], 'properties': [prop], 'owningConstraint': c}
+                for label, prop, c in existing
+            ]
+        if 'RETURN DISTINCT type(r) AS rel_type' in query:
+            return [{'rel_type': rel_type} for rel_type in rel_types]
+        result = MagicMock()
+        result.single.return_value = {'duplicates': duplicates, 'deleted': duplicates}
+        return result
+    neo4j_session.run.side_effect = run
+    return neo4j_session
+
+
+def _queries(neo4j_session):
+    return [call.args[0] for call in neo4j_session.run.call_args_list]
+
+
+def test_get_all_index_statements_includes_schema_indexes():
+    statements = create_indexes.get_all_index_statements()
+
+    assert len(statements) == len(set(statements))
+    assert 'CREATE INDEX IF NOT EXISTS FOR (n:EC2Instance) ON (n.id);' in statements
+    assert EC2InstanceSchema in create_indexes.get_node_schemas()
+    # Every statement, from indexes.cypher or a schema, can be matched against the output of SHOW INDEXES.
+    assert all(create_indexes.index_key(statement) for statement in statements)
+
+
+def test_run_only_creates_missing_indexes():
+    statements = create_indexes.get_all_index_statements()
+    neo4j_session = _mock_session([(*create_indexes.index_key(statement), None) for statement in statements[1:]])
+
+    create_indexes.run(neo4j_session, Config('bolt://localhost:7687', index_population_timeout=60))
+
+    queries = _queries(neo4j_session)
+    assert queries[0].startswith('SHOW INDEXES')
+    assert queries[1:] == [statements[0], 'CALL db.awaitIndexes($timeout)']
+    neo4j_session.run.assert_called_with('CALL db.awaitIndexes($timeout)', timeout=60)
+
+
+def test_run_does_nothing_when_indexes_exist():
+    statements = create_indexes.get_all_index_statements()
+    neo4j_session = _mock_session([(*create_indexes.index_key(statement), None) for statement in statements])
+
+    create_indexes.run(neo4j_session, None)
+
+    assert neo4j_session.run.call_count == 1
+
+
+@patch.object(create_indexes, 'get_all_index_statements', return_value=[
+    'CREATE CONSTRAINT IF NOT EXISTS FOR (n:UniqueNode) REQUIRE n.id IS UNIQUE;',
+])
+def test_run_replaces_index_with_unique_constraint(mock_statements):
+    neo4j_session = _mock_session([('UniqueNode', 'id', None)])
+
+    create_indexes.run(neo4j_session, Config('bolt://localhost:7687'))
+
+    assert _queries(neo4j_session)[2:] == [
+        'DROP INDEX `index_UniqueNode_id` IF EXISTS',
+        'CREATE CONSTRAINT IF NOT EXISTS FOR (n:UniqueNode) REQUIRE n.id IS UNIQUE;',
+    ]
+
+
+@patch.object(create_indexes, 'get_all_index_statements', return_value=[
+    'CREATE CONSTRAINT IF NOT EXISTS FOR (n:UniqueNode) REQUIRE n.id IS UNIQUE;',
+])
+def test_run_keeps_index_when_there_are_duplicates(mock_statements):
+    neo4j_session = _mock_session([('UniqueNode', 'id', None)], duplicates=2)
+
+    create_indexes.run(neo4j_session, Config('bolt://localhost:7687'))
+
+    # Only SHOW INDEXES and the duplicate check ran: the existing index is kept.
+    assert len(_queries(neo4j_session)) == 2
+
+    neo4j_session = _mock_session([('UniqueNode', 'id', None)], duplicates=2, rel_types=['RESOURCE'])
+
+    create_indexes.run(neo4j_session, Config('bolt://localhost:7687', merge_duplicate_nodes=True))
+
+    queries = _queries(neo4j_session)
+    # The relationships of the duplicates are moved to the kept node, in both directions, before they are deleted.
+    assert 'MERGE (keep)-[moved:`RESOURCE`]->(other)' in queries[3]
+    assert 'MERGE (other)-[moved:`RESOURCE`]->(keep)' in queries[4]
+    assert 'DETACH DELETE duplicate' in queries[5]
+    assert queries[6:] == [
+        'DROP INDEX `index_UniqueNode_id` IF EXISTS',
+        'CREATE CONSTRAINT IF NOT EXISTS FOR (n:UniqueNode) REQUIRE n.id IS UNIQUE;',
+    ]
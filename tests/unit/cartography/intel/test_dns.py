@@ -0,0 +1,73 @@
+import time
+from unittest import mock
+
+import dns.exception
+import dns.rdatatype
+
+from cartography.intel import dns as cartography_dns
+
+
+class FakeAnswer(list):
+    rdtype = dns.rdatatype.A
+
+    def __init__(self, ips, ttl=300):
+        super().__init__(ips)
+        self.expiration = time.time() + ttl
+
+
+def _mock_resolver(answers):
+    resolver = mock.MagicMock()
+
+    def resolve(fqdn):
+        answer = answers[fqdn]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    resolver.resolve.side_effect = resolve
+    return resolver
+
+
+@mock.patch.object(cartography_dns, '_new_resolver')
+def test_resolve_fqdns_caches_answers_until_they_expire(mock_new_resolver):
+    resolver = _mock_resolver({
+        'fresh.example.com': FakeAnswer(['10.0.0.1']),
+        'expired.example.com': FakeAnswer(['10.0.0.2'], ttl=-1),
+        'timeout.example.com': dns.exception.Timeout(),
+    })
+    mock_new_resolver.return_value = resolver
+    cartography_dns.clear_dns_cache()
+    fqdns = ['fresh.example.com', 'expired.example.com', 'timeout.example.com']
+
+    try:
+        first = cartography_dns.resolve_fqdns(fqdns, max_workers=3)
+        second = cartography_dns.resolve_fqdns(fqdns, max_workers=3)
+    finally:
+        cartography_dns.clear_dns_cache()
+
+    # Failed resolutions are left out instead of failing the batch.
+    assert set(first) == set(second) == {'fresh.example.com', 'expired.example.com'}
+    resolved = sorted(call.args[0] for call in resolver.resolve.call_args_list)
+    assert resolved == sorted(fqdns + ['expired.example.com', 'timeout.example.com'])
+
+
+@mock.patch.object(cartography_dns, 'resolve_fqdns')
+def test_ingest_dns_records_by_fqdn_writes_all_records_in_one_query(mock_resolve_fqdns):
+    mock_resolve_fqdns.return_value = {
+        'a.example.com': FakeAnswer(['10.0.0.1', '10.0.0.2']),
+        'b.example.com': FakeAnswer(['10.0.0.3']),
+    }
+    neo4j_session = mock.MagicMock()
+
+    record_ids = cartography_dns.ingest_dns_records_by_fqdn(
+        neo4j_session, 1, [('a.example.com', 'domain-a'), ('b.example.com', 'domain-b'), ('c.example.com', 'c')],
+        'ESDomain', 'AWSDNSRecord',
+    )
+
+    assert record_ids == ['a.example.com+A', 'b.example.com+A']
+    assert neo4j_session.run.call_count == 2
+    records = neo4j_session.run.call_args.kwargs['Records']
+    assert [(r['points_to_id'], r['ip_list'], r['value']) for r in records] == [
+        ('domain-a', ['10.0.0.1', '10.0.0.2'], '10.0.0.1,10.0.0.2'),
+        ('domain-b', ['10.0.0.3'], '10.0.0.3'),
+    ]
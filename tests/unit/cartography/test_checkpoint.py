@@ -0,0 +1,72 @@
+from unittest import mock
+
+from cartography.checkpoint import CheckpointStore
+from cartography.checkpoint import set_checkpoint_store
+from cartography.config import Config
+from cartography.intel import aws
+from cartography.sync import Sync
+
+
+def test_checkpoint_store_resume(tmp_path):
+    path = str(tmp_path / 'checkpoints.jsonl')
+    store = CheckpointStore(path, 1)
+    store.mark_complete('aws', '000000000000', 'ec2:instance')
+    store.mark_complete('create-indexes')
+    store.close()
+    with open(path, 'a') as f:
+        f.write('{"update_tag": 1, "unit": ["aws", "0000')
+
+    # A different update tag does not see the units of another sync, and a new sync starts from scratch.
+    assert not CheckpointStore(path, 2, resume=True).is_complete('create-indexes')
+    assert not CheckpointStore(path, 1).is_complete('create-indexes')
+
+    store = CheckpointStore(path, 1)
+    store.mark_complete('create-indexes')
+    store.close()
+    store = CheckpointStore(path, 1, resume=True)
+    assert store.is_complete('create-indexes')
+    assert not store.is_complete('aws')
+
+
+def test_sync_skips_completed_stages(tmp_path):
+    path = str(tmp_path / 'checkpoints.jsonl')
+    store = CheckpointStore(path, 1)
+    store.mark_complete('first')
+    store.close()
+    first, second = mock.MagicMock(), mock.MagicMock()
+    sync = Sync()
+    sync.add_stages([('first', first), ('second', second)])
+
+    set_checkpoint_store(CheckpointStore(path, 1, resume=True))
+    try:
+        sync.run(mock.MagicMock(), Config('bolt://localhost:7687', update_tag=1))
+    finally:
+        set_checkpoint_store(None)
+
+    first.assert_not_called()
+    second.assert_called_once()
+    assert CheckpointStore(path, 1, resume=True).is_complete('second')
+
+
+@mock.patch.object(aws, 'run_analysis_job')
+@mock.patch.object(aws, 'merge_module_sync_metadata')
+def test_sync_one_account_skips_completed_resources(mock_metadata, mock_analysis, tmp_path):
+    path = str(tmp_path / 'checkpoints.jsonl')
+    store = CheckpointStore(path, 1)
+    store.mark_complete('aws', '000000000000', 'ec2:instance')
+    store.close()
+    functions = {'ec2:instance': mock.MagicMock(), 's3': mock.MagicMock()}
+
+    set_checkpoint_store(CheckpointStore(path, 1, resume=True))
+    try:
+        with mock.patch.dict(aws.RESOURCE_FUNCTIONS, functions):
+            aws._sync_one_account(
+                mock.MagicMock(), mock.MagicMock(), '000000000000', 1, {'UPDATE_TAG': 1}, regions=['us-east-1'],
+                aws_requested_syncs=['ec2:instance', 's3'],
+            )
+    finally:
+        set_checkpoint_store(None)
+
+    functions['ec2:instance'].assert_not_called()
+    functions['s3'].assert_called_once()
+    assert CheckpointStore(path, 1, resume=True).is_complete('aws', '000000000000', 's3')
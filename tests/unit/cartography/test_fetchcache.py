@@ -0,0 +1,30 @@
+import datetime
+import os
+
+import pytest
+
+from cartography.fetchcache import FetchCache
+from cartography.fetchcache import FetchCacheMiss
+
+
+def test_fetch_cache_round_trip(tmp_path):
+    cache = FetchCache(str(tmp_path))
+    response = {
+        'Instances': [{'LaunchTime': datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)}],
+        'Blob': b'\x00\x01',
+    }
+    cache.put(('ec2', '000000000000', 'us-east-1', 'DescribeInstances-abc'), response)
+    cache.put(('ec2', '000000000000', 'us-west-2', 'DescribeInstances-abc'), response)
+
+    replayed = FetchCache(str(tmp_path), replay=True).get(('ec2', '000000000000', 'us-east-1', 'DescribeInstances-abc'))
+
+    assert replayed == response
+    # Identical responses are stored once.
+    assert sum(len(files) for _, _, files in os.walk(tmp_path / 'objects')) == 1
+    with pytest.raises(FetchCacheMiss):
+        cache.get(('ec2', '000000000000', 'eu-west-1', 'DescribeInstances-abc'))
+
+
+def test_fetch_cache_replay_requires_directory(tmp_path):
+    with pytest.raises(ValueError):
+        FetchCache(str(tmp_path / 'does-not-exist'), replay=True)
@@ -1,9 +1,16 @@
+import json
+import subprocess
+import sys
+
 import pytest
 
+from cartography.intel.aws.resources import RESOURCE_FUNCTIONS
+from cartography.registry import LazyEntryPoint
 from cartography.sync import build_default_sync
 from cartography.sync import build_sync
 from cartography.sync import parse_and_validate_selected_modules
 from cartography.sync import TOP_LEVEL_MODULES
+from cartography.sync import WORK_UNIT_RUNNERS
 
 
 def test_build_default_sync():
@@ -37,3 +44,45 @@ def test_parse_and_validate_selected_modules():
     absolute_garbage = '#@$@#RDFFHKjsdfkjsd,KDFJHW#@,'
     with pytest.raises(ValueError):
         parse_and_validate_selected_modules(absolute_garbage)
+
+
+def test_top_level_modules_resolve():
+    for name, entry_point in TOP_LEVEL_MODULES.items():
+        assert callable(entry_point.resolve()), name
+
+
+def test_work_unit_runners_resolve():
+    for name, entry_point in WORK_UNIT_RUNNERS.items():
+        assert name in TOP_LEVEL_MODULES
+        assert callable(entry_point.resolve()), name
+
+
+def test_aws_resource_functions_resolve():
+    for name, entry_point in RESOURCE_FUNCTIONS.items():
+        assert callable(entry_point.resolve()), name
+
+
+def test_lazy_entry_point():
+    entry_point = LazyEntryPoint('cartography.util:batch')
+    assert list(entry_point([1, 2, 3], size=2)) == [[1, 2], [3]]
+    with pytest.raises(ValueError):
+        LazyEntryPoint('cartography.util.batch')
+
+
+def test_cli_import_does_not_import_intel_modules():
+    """
+    Guard against import-time regressions: `cartography` must not import the SDKs of intel modules until one of their
+    stages runs. Run in a fresh interpreter since this test process has imported them already.
+    """
+    code = (
+        'import json, sys\n'
+        'import cartography.cli\n'
+        'print(json.dumps(sorted(sys.modules)))\n'
+    )
+    modules = json.loads(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True).stdout)
+
+    heavy_modules = {
+        'azure', 'googleapiclient', 'kubernetes', 'okta', 'duo_client', 'falconpy', 'pdpyras', 'oci', 'adal',
+        'cartography.intel.aws.iam', 'cartography.intel.gcp', 'cartography.intel.github',
+    }
+    assert not heavy_modules.intersection(modules)
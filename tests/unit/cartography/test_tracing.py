@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from cartography.config import Config
+from cartography.sync import Sync
+from cartography.tracing import critical_path
+from cartography.tracing import idle_gaps
+from cartography.tracing import in_current_context
+from cartography.tracing import load_spans
+from cartography.tracing import self_time
+from cartography.tracing import set_tracer
+from cartography.tracing import Span
+from cartography.tracing import span
+from cartography.tracing import summarize
+from cartography.tracing import Tracer
+from cartography.util import to_asynchronous
+from cartography.util import to_synchronous
+
+
+def _traced(name, category):
+    with span(name, category):
+        pass
+
+
+@pytest.mark.parametrize('trace_format', ['json', 'chrome'])
+def test_spans_nest_across_threads(tmp_path, trace_format):
+    tracer = Tracer(str(tmp_path / 'trace.json'), trace_format)
+    set_tracer(tracer)
+    try:
+        with span('aws', 'stage'):
+            with span('000000000000', 'account'):
+                to_synchronous(to_asynchronous(_traced, 'kms', 'resource'))
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(in_current_context(_traced), 'sub-1', 'subscription').result()
+                # Without the current context, a span started in another thread is a root span.
+                executor.submit(_traced, 'orphan', 'load').result()
+    finally:
+        set_tracer(None)
+    tracer.export()
+
+    spans = {s.name: s for s in load_spans(tracer.path)}
+    assert spans['aws'].parent_id is None
+    assert spans['000000000000'].parent_id == spans['aws'].id
+    assert spans['kms'].parent_id == spans['000000000000'].id
+    assert spans['sub-1'].parent_id == spans['aws'].id
+    assert spans['orphan'].parent_id is None
+    assert spans['aws'].start <= spans['kms'].start <= spans['kms'].end <= spans['aws'].end
+
+
+def test_span_is_noop_without_tracer():
+    with span('aws', 'stage'):
+        pass
+
+
+def test_sync_records_stage_spans(tmp_path):
+    tracer = Tracer(str(tmp_path / 'trace.json'))
+    sync = Sync()
+    sync.add_stages([('first', mock.MagicMock()), ('second', mock.MagicMock())])
+    set_tracer(tracer)
+    try:
+        sync.run(mock.MagicMock(), Config('bolt://localhost:7687', update_tag=1))
+    finally:
+        set_tracer(None)
+
+    spans = tracer.spans()
+    assert [(s.name, s.category) for s in spans] == [('sync', 'sync'), ('first', 'stage'), ('second', 'stage')]
+    assert spans[1].parent_id == spans[0].id
+    assert spans[0].attributes == {'update_tag': 1}
+
+
+def _span(id, parent_id, name, category, start, end):
+    return Span(id, parent_id, name, category, float(start), float(end))
+
+
+def test_summarize_trace():
+    spans = [
+        _span(1, None, 'sync', 'sync', 0, 100),
+        _span(2, 1, 'aws', 'stage', 0, 90),
+        # Two accounts synced concurrently: the second one determines when the stage ends.
+        _span(3, 2, '000000000000', 'account', 0, 50),
+        _span(4, 2, '111111111111', 'account', 10, 85),
+        _span(5, 4, 'EC2Instance', 'load', 60, 80),
+        _span(6, 3, 'aws_import_ec2.json', 'job', 20, 30),
+        _span(7, 1, 'analysis', 'stage', 90, 100),
+    ]
+    children = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+
+    assert [s.name for s in critical_path(spans[0], children)] == [
+        'sync', 'aws', '111111111111', 'EC2Instance', 'analysis',
+    ]
+    assert self_time(spans[1], children[2]) == 5
+    assert self_time(spans[3], children[4]) == 55
+    assert idle_gaps(spans, 0, 100) == [(0, 20), (30, 60), (80, 100)]
+
+    report = summarize(spans, top=2)
+    assert 'Trace of 7 spans over 100.0s.' in report
+    assert '55.0s  sync sync > stage aws > account 111111111111' in report
+    assert '30.0s at +30.0s, during sync sync > stage aws > account 111111111111' in report
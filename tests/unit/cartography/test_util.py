@@ -12,6 +12,14 @@ from cartography.util import batch
 from cartography.util import run_analysis_and_ensure_deps
 
 
+@pytest.fixture(autouse=True)
+def clear_job_template_cache():
+    # Parsed jobs are cached per (package, filename), so make sure that each test sees its own mocks.
+    util.get_job_template.cache_clear()
+    yield
+    util.get_job_template.cache_clear()
+
+
 def test_run_analysis_job_default_package(mocker):
     mocker.patch('cartography.util.GraphJob')
     read_text_mock = mocker.patch('cartography.util.read_text')
@@ -33,6 +41,24 @@ def test_run_scoped_analysis_job_default_package(mocker):
     read_text_mock.assert_called_once_with('cartography.data.jobs.scoped_analysis', 'test.json')
 
 
+def test_run_cleanup_job_reuses_parsed_job(mocker):
+    graph_job_mock = mocker.patch('cartography.util.GraphJob')
+    read_text_mock = mocker.patch('cartography.util.read_text')
+    neo4j_session = mocker.Mock()
+
+    util.run_cleanup_job('test.json', neo4j_session, {'UPDATE_TAG': 1, 'AWS_ID': '1'})
+    util.run_cleanup_job('test.json', neo4j_session, {'UPDATE_TAG': 1, 'AWS_ID': '2'})
+
+    # The job file is read and parsed once, and per-run parameters are bound at execution time.
+    read_text_mock.assert_called_once_with('cartography.data.jobs.cleanup', 'test.json')
+    graph_job_mock.from_json.assert_called_once()
+    job = graph_job_mock.from_json.return_value
+    assert job.run.call_args_list == [
+        mock.call(neo4j_session, {'UPDATE_TAG': 1, 'AWS_ID': '1'}),
+        mock.call(neo4j_session, {'UPDATE_TAG': 1, 'AWS_ID': '2'}),
+    ]
+
+
 @patch(
     'cartography.util.backoff', Mock(
         on_exception=lambda *args, **kwargs: lambda func: func,
@@ -0,0 +1,151 @@
+import time
+from unittest import mock
+
+import pytest
+
+from cartography.config import Config
+from cartography.intel import aws
+from cartography.sync import Sync
+from cartography.sync import SyncWorker
+from cartography.workqueue import run_work_units
+from cartography.workqueue import set_work_queue
+from cartography.workqueue import WorkQueue
+from cartography.workqueue import WorkUnitsFailedError
+
+
+def test_work_queue_claim_and_complete(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    queue.publish(1, [(('aws',), {}), (('aws', '000000000000'), {'profile_name': 'default'}), (('gcp',), {})])
+    # Publishing a unit again does not run it twice.
+    queue.publish(1, [(('aws',), {})])
+
+    claimed = queue.claim(1, ('aws',))
+    assert claimed.unit == ('aws', '000000000000')
+    assert claimed.payload == {'profile_name': 'default'}
+    assert queue.claim(1, ('aws',)) is None
+
+    # Another worker sees the remaining units in the order they were published.
+    other = WorkQueue(str(tmp_path / 'queue.db'))
+    assert other.claim().unit == ('aws',)
+    assert other.claim().unit == ('gcp',)
+    assert other.claim() is None
+
+    queue.complete(claimed)
+    status = queue.status(1, ('aws',))
+    assert status['done'] == [('aws', '000000000000')]
+    assert status['running'] == []
+    assert queue.status(1)['running'] == [('aws',), ('gcp',)]
+    other.close()
+    queue.close()
+
+
+def test_work_queue_retries_failed_units(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'), max_attempts=2)
+    queue.publish(1, [(('aws',), {})])
+
+    claimed = queue.claim()
+    queue.fail(claimed, 'boom')
+    # The unit is retried after a delay.
+    assert queue.claim() is None
+    with mock.patch('cartography.workqueue.time.time', return_value=time.time() + 10):
+        claimed = queue.claim()
+    assert claimed.attempt == 2
+    queue.fail(claimed, 'boom again')
+    assert queue.status(1)['failed'] == [('aws',)]
+    assert queue.errors(1) == {('aws',): 'boom again'}
+
+    # Publishing the units of a sync again retries its failed units.
+    queue.publish(1, [(('aws',), {})])
+    assert queue.claim().attempt == 1
+    queue.close()
+
+
+def test_work_queue_reclaims_expired_leases(tmp_path):
+    dead_worker = WorkQueue(str(tmp_path / 'queue.db'), lease_seconds=0.05)
+    dead_worker.publish(1, [(('aws',), {})])
+    claimed = dead_worker.claim()
+    time.sleep(0.1)
+
+    worker = WorkQueue(str(tmp_path / 'queue.db'))
+    reclaimed = worker.claim()
+    assert reclaimed.unit == ('aws',)
+    assert reclaimed.attempt == 2
+    # The worker whose lease expired can no longer complete the unit.
+    dead_worker.complete(claimed)
+    assert worker.status(1)['running'] == [('aws',)]
+    worker.complete(reclaimed)
+    assert worker.status(1)['done'] == [('aws',)]
+    dead_worker.close()
+    worker.close()
+
+
+def test_run_work_units_raises_failed_units(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'), max_attempts=1)
+    queue.publish(1, [(('aws', 'a'), {}), (('aws', 'b'), {})])
+    run_unit = mock.MagicMock(side_effect=[ValueError('boom'), None])
+
+    with pytest.raises(WorkUnitsFailedError, match='boom'):
+        run_work_units(queue, 1, ('aws',), run_unit)
+
+    # Every unit ran even though the first one failed.
+    assert run_unit.call_count == 2
+    assert queue.status(1)['done'] == [('aws', 'b')]
+    queue.close()
+
+
+def test_coordinator_waits_for_work_units_before_analysis(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    calls = []
+    published = []
+    sync = Sync()
+    sync.add_stages([
+        ('create-indexes', lambda neo4j_session, config: calls.append('create-indexes')),
+        ('aws', lambda neo4j_session, config: calls.append(('aws', config.update_tag))),
+        ('gcp', lambda neo4j_session, config: calls.append(('gcp', config.update_tag))),
+        ('analysis', lambda neo4j_session, config: calls.append('analysis')),
+    ])
+
+    # Another sync published units for a worker to pick up too.
+    WorkQueue(path).publish(2, [(('gcp',), {})])
+    set_work_queue(WorkQueue(path))
+    try:
+        SyncWorker(sync).run(mock.MagicMock(), Config('bolt://localhost:7687', update_tag=0, worker_idle_timeout=0))
+        assert calls == [('gcp', 2)]
+        calls.clear()
+
+        queue = WorkQueue(path)
+        publish = queue.publish
+
+        def record_publish(update_tag, units):
+            published.append((units[0][0], queue.status(update_tag)['done']))
+            publish(update_tag, units)
+        queue.publish = record_publish
+        set_work_queue(queue)
+        sync.run(mock.MagicMock(), Config('bolt://localhost:7687', update_tag=1))
+    finally:
+        set_work_queue(None)
+
+    # Without any worker, the coordinator runs the published units itself.
+    assert calls == ['create-indexes', ('aws', 1), ('gcp', 1), 'analysis']
+    # Each stage is done before the next one is published, so that stages can depend on the ones before them.
+    assert published == [(('aws',), []), (('gcp',), [('aws',)])]
+
+
+@mock.patch.object(aws, 'run_cleanup_job')
+@mock.patch.object(aws, '_sync_account')
+@mock.patch.object(aws.organizations, 'sync')
+def test_sync_multiple_accounts_publishes_accounts(mock_org_sync, mock_sync_account, mock_cleanup, tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    accounts = {'profile-a': '000000000000', 'profile-b': '111111111111'}
+
+    set_work_queue(queue)
+    try:
+        assert aws._sync_multiple_accounts(mock.MagicMock(), accounts, 1, {'UPDATE_TAG': 1}, False, ['s3'])
+    finally:
+        set_work_queue(None)
+
+    assert [call.args[1:4] for call in mock_sync_account.call_args_list] == [
+        ('profile-a', '000000000000', 2),
+        ('profile-b', '111111111111', 2),
+    ]
+    mock_cleanup.assert_called_once()
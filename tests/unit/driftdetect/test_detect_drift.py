@@ -1,6 +1,13 @@
+import os
+
 import pytest
 
+from cartography.driftdetect.config import GetDriftConfig
+from cartography.driftdetect.detect_deviations import merge_diff
+from cartography.driftdetect.detect_deviations import MISSING
+from cartography.driftdetect.detect_deviations import NEW
 from cartography.driftdetect.detect_deviations import perform_drift_detection
+from cartography.driftdetect.detect_deviations import run_drift_detection
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
 
@@ -37,3 +44,55 @@ def test_drift_detection_errors():
     start_state.validation_query = "Invalid Validation Query"
     with pytest.raises(ValueError):
         perform_drift_detection(start_state, end_state)
+
+
+def test_merge_diff():
+    start = [["1", "a"], ["2", "b|c"], ["3", "d"], ["3", "d"]]
+    end = [["0", "z"], ["2", "b|c"], ["3", "d"], ["4", "e|f"]]
+    assert list(merge_diff(start, end)) == [
+        (NEW, ["0", "z"]),
+        (MISSING, ["1", "a"]),
+        (NEW, ["4", ["e", "f"]]),
+    ]
+
+
+def test_merge_diff_unsorted_results():
+    with pytest.raises(ValueError):
+        list(merge_diff([["2"], ["1"]], []))
+
+
+def _write_query_directory(query_directory):
+    query_directory.mkdir()
+    for filename in ("1.json", "2.json"):
+        data = FileSystem.load(os.path.join("tests/data/test_cli_detectors/detector", filename))
+        data["results"] = sorted(data["results"])
+        FileSystem.write(data, str(query_directory / filename.replace(".json", ".jsonl.gz")))
+    FileSystem.write(
+        {"name": "Test", "shortcuts": {"first": "1.jsonl.gz", "second": "2.jsonl.gz"}},
+        str(query_directory / "shortcut.json"),
+    )
+
+
+def test_run_drift_detection_streams_compressed_states(tmp_path, capsys):
+    _write_query_directory(tmp_path / "query")
+
+    run_drift_detection(GetDriftConfig(str(tmp_path / "query"), "first", "second"))
+
+    out = capsys.readouterr().out
+    new_out, missing_out = out.split("Missing Query Results:")
+    assert "New Query Results:" in new_out
+    assert "d.test :  36" in new_out
+    assert "d.test :  7" in missing_out
+
+
+def test_run_drift_detection_for_directories(tmp_path, capsys):
+    _write_query_directory(tmp_path / "query-1")
+    _write_query_directory(tmp_path / "query-2")
+    _write_query_directory(tmp_path / "query-3")
+    os.remove(tmp_path / "query-3" / "2.jsonl.gz")
+
+    run_drift_detection(GetDriftConfig(None, "first", "second", drift_detection_directory=str(tmp_path), workers=2))
+
+    out = capsys.readouterr().out
+    assert out.count("New Query Results:") == 2
+    assert out.count("Missing Query Results:") == 2
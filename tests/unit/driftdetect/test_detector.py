@@ -1,13 +1,27 @@
+import shutil
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
-from cartography.client.core.tx import read_list_of_dicts_tx
+from cartography.driftdetect.config import UpdateConfig
 from cartography.driftdetect.detect_deviations import compare_states
 from cartography.driftdetect.get_states import get_state
+from cartography.driftdetect.get_states import read_state_results_tx
+from cartography.driftdetect.get_states import run_get_states
 from cartography.driftdetect.model import State
+from cartography.driftdetect.serializers import ShortcutSchema
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
 
 
+def _run_tx(mock_result):
+    """
+    Run the transaction function passed to session.read_transaction() against a transaction returning mock_result.
+    """
+    mock_tx = MagicMock()
+    mock_tx.run.return_value = mock_result
+    return lambda tx_func, *args: tx_func(mock_tx, *args)
+
+
 def test_state_no_drift():
     """
     Test that a state that detects no drift returns none.
@@ -27,13 +41,13 @@ def test_state_no_drift():
 
     mock_result.__getitem__.side_effect = results.__getitem__
     mock_result.__iter__.side_effect = results.__iter__
-    mock_session.read_transaction.return_value = mock_result
+    mock_session.read_transaction.side_effect = _run_tx(mock_result)
     data = FileSystem.load("tests/data/detectors/test_expectations.json")
     state_old = StateSchema().load(data)
     state_new = State(state_old.name, state_old.validation_query, state_old.properties, [])
     get_state(mock_session, state_new)
     drifts = compare_states(state_old, state_new)
-    mock_session.read_transaction.assert_called_with(read_list_of_dicts_tx, state_new.validation_query)
+    mock_session.read_transaction.assert_called_with(read_state_results_tx, state_new.validation_query)
     assert not drifts
 
 
@@ -58,7 +72,7 @@ def test_state_picks_up_drift():
     # Arrange
     mock_result.__getitem__.side_effect = results.__getitem__
     mock_result.__iter__.side_effect = results.__iter__
-    mock_session.read_transaction.return_value = mock_result
+    mock_session.read_transaction.side_effect = _run_tx(mock_result)
     data = FileSystem.load("tests/data/detectors/test_expectations.json")
     state_old = StateSchema().load(data)
     state_new = State(state_old.name, state_old.validation_query, state_old.properties, [])
@@ -69,7 +83,7 @@ def test_state_picks_up_drift():
     drifts = compare_states(state_old, state_new)
 
     # Assert
-    mock_session.read_transaction.assert_called_with(read_list_of_dicts_tx, state_new.validation_query)
+    mock_session.read_transaction.assert_called_with(read_state_results_tx, state_new.validation_query)
     assert drifts
     assert ["7"] in drifts
 
@@ -94,7 +108,7 @@ def test_state_order_does_not_matter():
     # Arrange
     mock_result.__getitem__.side_effect = results.__getitem__
     mock_result.__iter__.side_effect = results.__iter__
-    mock_session.read_transaction.return_value = mock_result
+    mock_session.read_transaction.side_effect = _run_tx(mock_result)
     data = FileSystem.load("tests/data/detectors/test_expectations.json")
     state_old = StateSchema().load(data)
     state_new = State(state_old.name, state_old.validation_query, state_old.properties, [])
@@ -105,7 +119,7 @@ def test_state_order_does_not_matter():
     drifts = compare_states(state_old, state_new)
 
     # Assert
-    mock_session.read_transaction.assert_called_with(read_list_of_dicts_tx, state_new.validation_query)
+    mock_session.read_transaction.assert_called_with(read_state_results_tx, state_new.validation_query)
     assert not drifts
 
 
@@ -130,14 +144,14 @@ def test_state_multiple_expectations():
 
     mock_result.__getitem__.side_effect = results.__getitem__
     mock_result.__iter__.side_effect = results.__iter__
-    mock_session.read_transaction.return_value = mock_result
+    mock_session.read_transaction.side_effect = _run_tx(mock_result)
     data = FileSystem.load("tests/data/detectors/test_multiple_expectations.json")
     state_old = StateSchema().load(data)
     state_new = State(state_old.name, state_old.validation_query, state_old.properties, [])
     get_state(mock_session, state_new)
     state_new.properties = state_old.properties
     drifts = compare_states(state_old, state_new)
-    mock_session.read_transaction.assert_called_with(read_list_of_dicts_tx, state_new.validation_query)
+    mock_session.read_transaction.assert_called_with(read_state_results_tx, state_new.validation_query)
     assert ["7", "14"] in drifts
 
 
@@ -162,14 +176,14 @@ def test_drift_from_multiple_properties():
     ]
     mock_result.__getitem__.side_effect = results.__getitem__
     mock_result.__iter__.side_effect = results.__iter__
-    mock_session.read_transaction.return_value = mock_result
+    mock_session.read_transaction.side_effect = _run_tx(mock_result)
     data = FileSystem.load("tests/data/detectors/test_multiple_properties.json")
     state_old = StateSchema().load(data)
     state_new = State(state_old.name, state_old.validation_query, state_old.properties, [])
     get_state(mock_session, state_new)
     state_new.properties = state_old.properties
     drifts = compare_states(state_old, state_new)
-    mock_session.read_transaction.assert_called_with(read_list_of_dicts_tx, state_new.validation_query)
+    mock_session.read_transaction.assert_called_with(read_state_results_tx, state_new.validation_query)
     assert ["7", "14", ["21", "28", "35"]] in drifts
     assert ["3", "10", ["17", "24", "31"]] not in drifts
 
@@ -186,3 +200,32 @@ def test_json_loader():
     assert state.name == "Test-Expectations"
     assert state.validation_query == "MATCH (d) RETURN d.test"
     assert state.results == [['1'], ['2'], ['3'], ['4'], ['5'], ['6']]
+
+
+@patch('cartography.driftdetect.get_states.GraphDatabase')
+def test_run_get_states_writes_compressed_states(mock_graph_database, tmp_path):
+    """
+    Test that get-state captures every query directory and points its most-recent shortcut at a compressed state.
+    """
+    for query in ("query-1", "query-2"):
+        (tmp_path / query).mkdir()
+        shutil.copy("tests/data/test_update_detectors/test_detector/template.json", tmp_path / query)
+        FileSystem.write({"name": "test_detector", "shortcuts": {}}, str(tmp_path / query / "shortcut.json"))
+    mock_result = MagicMock()
+    results = [
+        {"d.test": "2", "d.test2": "9", "d.test3": ["30", "16"]},
+        {"d.test": "1", "d.test2": "8", "d.test3": ["15"]},
+    ]
+    mock_result.__iter__.side_effect = lambda: iter(results)
+    mock_session = mock_graph_database.driver.return_value.session.return_value.__enter__.return_value
+    mock_session.read_transaction.side_effect = _run_tx(mock_result)
+
+    run_get_states(UpdateConfig(str(tmp_path), "bolt://localhost:7687", workers=2))
+
+    for query in ("query-1", "query-2"):
+        shortcut = ShortcutSchema().load(FileSystem.load(str(tmp_path / query / "shortcut.json")))
+        filename = shortcut.shortcuts["most-recent"]
+        assert filename.endswith(".jsonl.gz")
+        state = StateSchema().load(FileSystem.load(str(tmp_path / query / filename)))
+        assert state.properties == ["d.test", "d.test2", "d.test3"]
+        assert state.results == [["1", "8", "15"], ["2", "9", "16|30"]]
@@ -0,0 +1,35 @@
+import gzip
+import json
+
+from cartography.driftdetect.serializers import StateSchema
+from cartography.driftdetect.storage import FileSystem
+
+
+def test_compressed_state_round_trip(tmp_path):
+    data = FileSystem.load("tests/data/detectors/test_multiple_properties.json")
+    fp = str(tmp_path / "state.jsonl.gz")
+
+    FileSystem.write(data, fp)
+
+    # The state is stored as gzip'd JSON lines: a header followed by one line per result.
+    with gzip.open(fp, 'rt') as f:
+        lines = f.read().splitlines()
+    assert 'results' not in json.loads(lines[0])
+    assert [json.loads(line) for line in lines[1:]] == data['results']
+    assert not (tmp_path / "state.jsonl.gz.tmp").exists()
+
+    # FileSystem.load() detects the format, so states load the same way regardless of how they were written.
+    loaded = FileSystem.load(fp)
+    assert loaded == data
+    assert StateSchema().load(loaded).results == StateSchema().load(data).results
+
+
+def test_uncompressed_json_is_still_written_as_json(tmp_path):
+    data = {"name": "test", "shortcuts": {"most-recent": "state.jsonl.gz"}}
+    fp = str(tmp_path / "shortcut.json")
+
+    FileSystem.write(data, fp)
+
+    with open(fp) as f:
+        assert json.load(f) == data
+    assert FileSystem.load(fp) == data